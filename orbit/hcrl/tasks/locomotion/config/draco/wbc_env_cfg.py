@@ -80,7 +80,18 @@ class MySceneCfg(InteractiveSceneCfg):
 class CommandsCfg:
     """Command specifications for the MDP."""
 
-    pass
+    gait = hcrl_mdp.GaitCommandCfg(
+        resampling_time_range=(10.0, 10.0),
+        scheduler=hcrl_mdp.DracoWalkGaitCfg(),
+        period_range=(0.7, 0.9),
+        swing=hcrl_mdp.SwingTrajectoryCfg(apex_height=0.08),
+        asset_name="robot",
+        foot_body_names=["l_ankle_ie_link", "r_ankle_ie_link"],
+    )
+    # running gait statistics of the feet (logged per episode)
+    gait_metrics = hcrl_mdp.GaitMetricsCfg(
+        sensor_cfg=SceneEntityCfg("contact_forces", body_names=["l_ankle_ie_link", "r_ankle_ie_link"]),
+    )
 
     """base_velocity = mdp.UniformVelocityCommandCfg(
         asset_name="robot",
@@ -98,8 +109,23 @@ class CommandsCfg:
 class ActionsCfg:
     """Action specifications for the MDP."""
 
-    joint_pos = mdp.JointEffortActionCfg(asset_name="robot", joint_names=["^(?!.*knee_fe_jp$).*"], scale=0.0)
-    # TODO: make custom WBC action cfg (WBC in self.apply_action())
+    joint_pos = hcrl_mdp.WBCJointActionCfg(
+        asset_name="robot",
+        joint_names=["^(?!.*knee_fe_jp$).*"],
+        body_name="torso_link",
+        scale=0.1,
+        gait_command_name="gait",
+        controller=hcrl_mdp.WBCControllerCfg(
+            tasks=[
+                hcrl_mdp.WBCTaskCfg(name="left_foot", task_type="pose", body_name="l_ankle_ie_link", gait_leg=0),
+                hcrl_mdp.WBCTaskCfg(name="right_foot", task_type="pose", body_name="r_ankle_ie_link", gait_leg=1),
+                hcrl_mdp.WBCTaskCfg(name="com", task_type="com"),
+                hcrl_mdp.WBCTaskCfg(name="torso_orientation", task_type="orientation"),
+                hcrl_mdp.WBCTaskCfg(name="joint_posture", task_type="joint", gain=0.1),
+            ],
+            damping=0.05,
+        ),
+    )
 
 
 @configclass
@@ -119,6 +145,11 @@ class ObservationsCfg:
         #)
         #velocity_commands = ObsTerm(func=mdp.generated_commands, params={"command_name": "base_velocity"})
         joint_pos = ObsTerm(func=mdp.joint_pos_rel, noise=Unoise(n_min=-0.01, n_max=0.01))
+        gait_phase = ObsTerm(func=hcrl_mdp.gait_phase, params={"command_name": "gait"})
+        gait_contact_schedule = ObsTerm(func=hcrl_mdp.gait_contact_schedule, params={"command_name": "gait"})
+        swing_foot_error = ObsTerm(func=hcrl_mdp.swing_foot_reference_error, params={"command_name": "gait"})
+        capture_point = ObsTerm(func=hcrl_mdp.capture_point)
+        centroidal_momentum = ObsTerm(func=hcrl_mdp.centroidal_momentum)
         #joint_vel = ObsTerm(func=mdp.joint_vel_rel, noise=Unoise(n_min=-1.5, n_max=1.5))
         #actions = ObsTerm(func=mdp.last_action)
 
@@ -190,7 +221,15 @@ class RandomizationCfg:
 @configclass
 class RewardsCfg:
     """Reward terms for the MDP."""
-    pass
+
+    swing_foot_tracking = RewTerm(
+        func=hcrl_mdp.swing_foot_tracking_exp, weight=0.5, params={"command_name": "gait", "std": 0.05}
+    )
+    capture_point_support = RewTerm(
+        func=hcrl_mdp.capture_point_support_l2,
+        weight=-1.0,
+        params={"feet_cfg": SceneEntityCfg("robot", body_names=["l_ankle_ie_link", "r_ankle_ie_link"])},
+    )
 
 
 @configclass
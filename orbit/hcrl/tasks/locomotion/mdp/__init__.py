@@ -2,4 +2,14 @@
 
 from .rewards import *  # noqa: F401, F403
 from .randomizations import *  # noqa: F401, F403
-from .actions import *  # noqa: F401, F403
\ No newline at end of file
+from .actions import *  # noqa: F401, F403
+from .controllers import *  # noqa: F401, F403
+from .qp import *  # noqa: F401, F403
+from .kinematics import *  # noqa: F401, F403
+from .dynamics import *  # noqa: F401, F403
+from .gait import *  # noqa: F401, F403
+from .swing import *  # noqa: F401, F403
+from .centroidal import *  # noqa: F401, F403
+from .commands import *  # noqa: F401, F403
+from .gait_metrics import *  # noqa: F401, F403
+from .observations import *  # noqa: F401, F403
@@ -8,14 +8,33 @@ from dataclasses import MISSING
 import carb
 
 from omni.isaac.lab.utils import configclass
+import omni.isaac.lab.utils.math as math_utils
 import omni.isaac.lab.utils.string as string_utils
 from omni.isaac.lab.assets.articulation import Articulation
 from omni.isaac.lab.managers.action_manager import ActionTerm, ActionTermCfg
 
+from isaac.lab.hcrl.tasks.utils.resolution import bind_ids, resolve_body_ids, resolve_joint_ids
+
+from .centroidal import body_com_offsets_w
+from .controllers import WBCController, WBCControllerCfg
+
 if TYPE_CHECKING:
     from omni.isaac.lab.envs import BaseEnv
 
 class WBCJointAction(ActionTerm):
+    r"""Whole-body control action that maps prioritized task-space commands to joint position targets.
+
+    The action is the concatenation of the relative task-space commands of the tasks in
+    :attr:`WBCJointActionCfg.controller`. Every :attr:`WBCJointActionCfg.controller_decimation` physics steps,
+    the tasks are resolved into joint position targets by the batched hierarchical :class:`WBCController`.
+    In between, the joint targets are interpolated from the previous to the new controller targets, which only
+    costs an element-wise update per physics step. All task quantities are expressed in the world frame.
+    For floating-base articulations, the task Jacobians include the base columns.
+
+    The frame pose and the task values are cached per physics step, so that they are read from the simulation
+    buffers only once when both :meth:`process_actions` and :meth:`apply_actions` need them.
+    """
+
     cfg: WBCJointActionCfg
     """The configuration of the action term."""
     _asset: Articulation
@@ -29,18 +48,81 @@ class WBCJointAction(ActionTerm):
         super().__init__(cfg, env)
 
         # resolve the joints over which the action term is applied
-        self._joint_ids, self._joint_names = self._asset.find_joints(self.cfg.joint_names)
+        self._joint_ids, self._joint_names = resolve_joint_ids(self._asset, self.cfg.joint_names)
         self._num_joints = len(self._joint_ids)
+        # parse the body index
+        body_ids, body_names = resolve_body_ids(self._asset, self.cfg.body_name)
+        if len(body_ids) != 1:
+            raise ValueError(
+                f"Expected one match for the body name: {self.cfg.body_name}. Found {len(body_ids)}: {body_names}."
+            )
+        # save only the first body index
+        self._body_idx = body_ids[0]
+        self._body_name = body_names[0]
+        # check if articulation is fixed-base
+        # if fixed-base then the jacobian for the base is not computed
+        # this means that number of bodies is one less than the articulation's number of bodies
+        # note: for floating-base articulations, the six base columns are kept for the whole-body controller
+        if self._asset.is_fixed_base:
+            self._jacobi_body_idx = self._body_idx - 1
+            self._jacobi_dof_ids = self._joint_ids
+        else:
+            self._jacobi_body_idx = self._body_idx
+            self._jacobi_dof_ids = list(range(6)) + [i + 6 for i in self._joint_ids]
         # log the resolved joint names for debugging
         carb.log_info(
             f"Resolved joint names for the action term {self.__class__.__name__}:"
             f" {self._joint_names} [{self._joint_ids}]"
         )
+        carb.log_info(
+            f"Resolved body name for the action term {self.__class__.__name__}: {self._body_name} [{self._body_idx}]"
+        )
+
+        # Avoid indexing with lists of joints for efficiency
+        # note: the joints are bound as a slice when they are contiguous and as a tensor otherwise
+        num_jacobi_dofs = self._asset.num_joints + (0 if self._asset.is_fixed_base else 6)
+        self._jacobi_dof_ids = bind_ids(self._jacobi_dof_ids, num_jacobi_dofs, self.device)
+        self._joint_ids = bind_ids(self._joint_ids, self._asset.num_joints, self.device)
+
+        # create the whole-body controller
+        self._wbc_controller = WBCController(
+            cfg=self.cfg.controller,
+            num_envs=self.num_envs,
+            num_joints=self._num_joints,
+            device=self.device,
+            floating_base=not self._asset.is_fixed_base,
+        )
+        # resolve the bodies of the controller tasks
+        self._task_body_ids = list()
+        for task in self.cfg.controller.tasks:
+            if task.task_type in ("position", "orientation", "pose") and task.body_name is not None:
+                task_body_ids, task_body_names = resolve_body_ids(self._asset, task.body_name)
+                if len(task_body_ids) != 1:
+                    raise ValueError(
+                        f"Expected one match for the body name of task '{task.name}': {task.body_name}."
+                        f" Found {len(task_body_ids)}: {task_body_names}."
+                    )
+                self._task_body_ids.append(task_body_ids[0])
+            else:
+                self._task_body_ids.append(None)
+        # resolve the gait schedule followed by the tasks
+        # note: the command manager is created before the action manager
+        self._gait_scheduler = None
+        self._gait_task_slices = list()
+        if self.cfg.gait_command_name is not None:
+            self._gait_scheduler = env.command_manager.get_term(self.cfg.gait_command_name).scheduler
+            for task, task_slice in zip(self.cfg.controller.tasks, self._wbc_controller.task_slices):
+                if task.gait_leg is not None:
+                    self._gait_task_slices.append((task_slice, task.gait_leg))
+        # -- body masses and centers of mass (in the body frames) for the center-of-mass task
+        # note: they are read again at the resets, after the randomization events (see :meth:`reset`)
+        self._has_com_task = any(task.task_type == "com" for task in self.cfg.controller.tasks)
+        self._body_masses = self._asset.root_physx_view.get_masses().to(self.device)
+        self._body_com_pos = self._asset.root_physx_view.get_coms()[..., :3].to(self.device)
+        self._total_mass = self._body_masses.sum(dim=-1, keepdim=True)
+        # note: for fixed-base articulations, the jacobian of the root body is not computed
+        self._jacobi_body_slice = slice(1, None) if self._asset.is_fixed_base else slice(None)
 
-        # Avoid indexing across all joints for efficiency
-        if self._num_joints == self._asset.num_joints:
-            self._joint_ids = slice(None)
-            
         # create tensors for raw and processed actions
         self._raw_actions = torch.zeros(self.num_envs, self.action_dim, device=self.device)
         self._processed_actions = torch.zeros_like(self.raw_actions)
@@ -65,10 +147,30 @@ class WBCJointAction(ActionTerm):
             self._offset[:, index_list] = torch.tensor(value_list, device=self.device)
         else:
             raise ValueError(f"Unsupported offset type: {type(cfg.offset)}. Supported types are float and dict.")
+        # parse the body offset
+        self._offset_pos, self._offset_rot = None, None
+        if self.cfg.body_offset is not None:
+            self.set_body_offset(
+                torch.tensor(self.cfg.body_offset.pos, device=self.device),
+                torch.tensor(self.cfg.body_offset.rot, device=self.device),
+            )
+
+        # parse the controller rate
+        if self.cfg.controller_decimation < 1:
+            raise ValueError(f"Controller decimation must be at least 1. Received: {self.cfg.controller_decimation}.")
+        # -- joint targets at the previous and next controller updates and the applied (interpolated) targets
+        self._joint_pos_target = self._asset.data.default_joint_pos[:, self._joint_ids].clone()
+        self._joint_pos_target_prev = self._joint_pos_target.clone()
+        self._joint_pos_target_next = self._joint_pos_target.clone()
+        # -- counters of the physics steps: since the last action and in total (for the caches)
+        self._substep = 0
+        self._physics_tick = 0
+        # -- per-tick caches of the frame pose and the task values
+        self._frame_pose_tick = -1
+        self._frame_pose = None
+        self._task_values_tick = -1
+        self._task_values = None
 
-    """
-    Properties.
-    """
     """
     Properties.
     """
@@ -91,74 +193,251 @@ class WBCJointAction(ActionTerm):
     def process_actions(self, actions: torch.Tensor):
         # store the raw actions
         self._raw_actions[:] = actions
-        self._processed_actions[:] = self.raw_actions * self._scale
+        self._processed_actions[:] = self.raw_actions * self._scale + self._offset
+        # hold the tasks of the legs that are scheduled in contact
+        if self._gait_scheduler is not None:
+            contact = self._gait_scheduler.contact
+            for task_slice, leg in self._gait_task_slices:
+                self._processed_actions[:, task_slice] *= ~contact[:, leg : leg + 1]
         # obtain quantities from simulation
         ee_pos_curr, ee_quat_curr = self._compute_frame_pose()
+        task_values = self._compute_task_values(ee_pos_curr, ee_quat_curr)
         # set command into controller
-        self._wbc_controller.set_command(self._processed_actions, ee_pos_curr, ee_quat_curr)
+        self._wbc_controller.set_command(self._processed_actions, task_values)
+        # restart the controller period so that the new command is resolved at the next physics step
+        self._substep = 0
 
     def apply_actions(self):
-        # obtain quantities from simulation
-        ee_pos_curr, ee_quat_curr = self._compute_frame_pose()
-        joint_pos = self._asset.data.joint_pos[:, self._joint_ids]
-        # compute the delta in joint-space
-        if ee_quat_curr.norm() != 0:
-            jacobian = self._compute_frame_jacobian()
-            joint_pos_des = self._wbc_controller.compute(ee_pos_curr, ee_quat_curr, jacobian, joint_pos)
+        controller_substep = self._substep % self.cfg.controller_decimation
+        # run the controller at the beginning of each controller period
+        if controller_substep == 0:
+            self._joint_pos_target_prev[:] = self._joint_pos_target
+            # obtain quantities from simulation
+            ee_pos_curr, ee_quat_curr = self._compute_frame_pose()
+            joint_pos = self._asset.data.joint_pos[:, self._joint_ids]
+            # compute the delta in joint-space
+            task_values = self._compute_task_values(ee_pos_curr, ee_quat_curr)
+            jacobians = self._compute_task_jacobians()
+            joint_pos_des = self._wbc_controller.compute(task_values, jacobians, joint_pos)
+            # hold the current joint positions of the environments without a valid frame pose (e.g. not simulated)
+            # note: the validity is blended per environment instead of branching, which would sync with the host
+            valid = torch.linalg.vector_norm(ee_quat_curr, dim=-1, keepdim=True) > 0.0
+            torch.where(valid, joint_pos_des, joint_pos, out=self._joint_pos_target_next)
+        # interpolate the joint targets over the controller period
+        if self.cfg.interpolate_targets:
+            weight = (controller_substep + 1) / self.cfg.controller_decimation
+            torch.lerp(self._joint_pos_target_prev, self._joint_pos_target_next, weight, out=self._joint_pos_target)
         else:
-            joint_pos_des = joint_pos.clone()
+            self._joint_pos_target[:] = self._joint_pos_target_next
         # set the joint position command
-        self._asset.set_joint_position_target(joint_pos_des, self._joint_ids) #See JointEffortAction
+        self._asset.set_joint_position_target(self._joint_pos_target, self._joint_ids) #See JointEffortAction
+        # note: the simulation is stepped after this call, which invalidates the per-tick caches
+        self._substep += 1
+        self._physics_tick += 1
+
+    def set_body_offset(
+        self, pos: torch.Tensor, rot: torch.Tensor, env_ids: Sequence[int] | torch.Tensor | None = None
+    ):
+        """Sets the offset of the target frame w.r.t. the body frame.
+
+        The offset can differ per environment, e.g. to randomize the calibration of the target frame. The offset
+        is expressed in the body frame, so it is rotated into the world frame at each controller update when the
+        Jacobian of the target frame is computed (see :meth:`_compute_frame_jacobian`).
+
+        Args:
+            pos: The translation w.r.t. the body frame. Shape is (len(env_ids), 3) or (3,).
+            rot: The quaternion rotation ``(w, x, y, z)`` w.r.t. the body frame. Shape is (len(env_ids), 4) or (4,).
+            env_ids: The environment indices. Defaults to None, in which case all environments are set.
+        """
+        # create the buffers on the first call
+        if self._offset_pos is None:
+            self._offset_pos = torch.zeros(self.num_envs, 3, device=self.device)
+            self._offset_rot = torch.zeros(self.num_envs, 4, device=self.device)
+            self._offset_rot[:, 0] = 1.0
+        if env_ids is None:
+            env_ids = slice(None)
+        self._offset_pos[env_ids] = pos
+        self._offset_rot[env_ids] = rot
+        # the frame pose changes with the offset
+        self._frame_pose_tick = -1
+        self._task_values_tick = -1
+
+    def reset(self, env_ids: Sequence[int] | None = None) -> None:
+        self._raw_actions[env_ids] = 0.0
+        self._wbc_controller.reset(env_ids)
+        if env_ids is None:
+            env_ids = slice(None)
+        # refresh the body masses and centers of mass
+        # note: the startup and reset events (e.g. mass randomization) are applied before the action terms are reset
+        if self._has_com_task:
+            self._update_body_inertials(env_ids)
+        # hold the current joint positions until the next controller update
+        joint_pos = self._asset.data.joint_pos[env_ids][:, self._joint_ids]
+        self._joint_pos_target[env_ids] = joint_pos
+        self._joint_pos_target_prev[env_ids] = joint_pos
+        self._joint_pos_target_next[env_ids] = joint_pos
+        # the reset writes new states to the simulation
+        self._frame_pose_tick = -1
+        self._task_values_tick = -1
 
     """
     Helper functions.
     """
 
     def _compute_frame_pose(self) -> tuple[torch.Tensor, torch.Tensor]:
-        """Computes the pose of the target frame in the root frame.
+        """Computes the pose of the target frame in the world frame.
+
+        The pose is cached for the current physics step.
 
         Returns:
-            A tuple of the body's position and orientation in the root frame.
+            A tuple of the body's position and orientation in the world frame.
         """
+        if self._frame_pose_tick == self._physics_tick:
+            return self._frame_pose
         # obtain quantities from simulation
         ee_pose_w = self._asset.data.body_state_w[:, self._body_idx, :7]
-        root_pose_w = self._asset.data.root_state_w[:, :7]
-        # compute the pose of the body in the root frame
-        ee_pose_b, ee_quat_b = math_utils.subtract_frame_transforms(
-            root_pose_w[:, 0:3], root_pose_w[:, 3:7], ee_pose_w[:, 0:3], ee_pose_w[:, 3:7]
-        )
+        ee_pos_w, ee_quat_w = ee_pose_w[:, 0:3], ee_pose_w[:, 3:7]
         # account for the offset
-        if self.cfg.body_offset is not None:
-            ee_pose_b, ee_quat_b = math_utils.combine_frame_transforms(
-                ee_pose_b, ee_quat_b, self._offset_pos, self._offset_rot
+        if self._offset_pos is not None:
+            ee_pos_w, ee_quat_w = math_utils.combine_frame_transforms(
+                ee_pos_w, ee_quat_w, self._offset_pos, self._offset_rot
             )
+        # update the cache
+        self._frame_pose_tick = self._physics_tick
+        self._frame_pose = (ee_pos_w, ee_quat_w)
+        return self._frame_pose
 
-        return ee_pose_b, ee_quat_b
+    def _compute_frame_jacobian(self, jacobians: torch.Tensor):
+        """Computes the geometric Jacobian of the target frame in the world frame.
 
-    def _compute_frame_jacobian(self):
-        """Computes the geometric Jacobian of the target frame in the root frame.
+        This function accounts for the target frame offset: the linear rows of the parent body Jacobian are shifted
+        by the offset rotated into the world frame, while the angular rows are unchanged since the target frame is
+        rigidly attached to the body.
 
-        This function accounts for the target frame offset and applies the necessary transformations to obtain
-        the right Jacobian from the parent body Jacobian.
+        Args:
+            jacobians: The Jacobians of all the bodies of the articulation in the world frame.
         """
         # read the parent jacobian
-        jacobian = self._asset.root_physx_view.get_jacobians()[:, self._jacobi_body_idx, :, self._joint_ids]
+        jacobian = jacobians[:, self._jacobi_body_idx, :, self._jacobi_dof_ids]
         # account for the offset
-        if self.cfg.body_offset is not None:
-            # Modify the jacobian to account for the offset
-            # -- translational part
-            # v_link = v_ee + w_ee x r_link_ee = v_J_ee * q + w_J_ee * q x r_link_ee
-            #        = (v_J_ee + w_J_ee x r_link_ee ) * q
-            #        = (v_J_ee - r_link_ee_[x] @ w_J_ee) * q
-            jacobian[:, 0:3, :] += torch.bmm(-math_utils.skew_symmetric_matrix(self._offset_pos), jacobian[:, 3:, :])
-            # -- rotational part
-            # w_link = R_link_ee @ w_ee
-            jacobian[:, 3:, :] = torch.bmm(math_utils.matrix_from_quat(self._offset_rot), jacobian[:, 3:, :])
+        if self._offset_pos is not None:
+            # the target frame is rigidly attached to the body, so it shares the angular velocity of the body and
+            # v_ee = v_link + w_link x r_link_ee = (v_J_link + w_J_link x r_link_ee) * q,
+            # where the offset r_link_ee must be expressed in the world frame like the jacobian
+            body_quat_w = self._asset.data.body_quat_w[:, self._body_idx]
+            offset_pos_w = math_utils.quat_apply(body_quat_w, self._offset_pos)
+            jacobian_ang = jacobian[:, 3:6]
+            jacobian_lin = jacobian[:, 0:3] + torch.cross(
+                jacobian_ang, offset_pos_w.unsqueeze(-1).expand_as(jacobian_ang), dim=1
+            )
+            # note: the jacobian is a view of the simulation buffer, so the result goes into a new tensor
+            jacobian = torch.cat((jacobian_lin, jacobian_ang), dim=1)
 
         return jacobian
-    
 
+    def _compute_task_values(self, ee_pos: torch.Tensor, ee_quat: torch.Tensor) -> list[torch.Tensor]:
+        """Computes the current value of each task of the controller in the world frame.
+
+        The values are cached for the current physics step.
+
+        Args:
+            ee_pos: The position of the target frame in the world frame.
+            ee_quat: The orientation of the target frame in the world frame.
+        """
+        if self._task_values_tick == self._physics_tick:
+            return self._task_values
+        task_values = list()
+        for task, body_idx in zip(self.cfg.controller.tasks, self._task_body_ids):
+            if task.task_type == "com":
+                # mass-weighted average of the body centers of mass
+                body_com_w = self._asset.data.body_pos_w + self._compute_body_com_offsets()
+                com_pos_w = torch.sum(self._body_masses.unsqueeze(-1) * body_com_w, dim=1)
+                task_values.append(com_pos_w / self._total_mass)
+            elif task.task_type == "joint":
+                task_values.append(self._asset.data.joint_pos[:, self._joint_ids])
+            else:
+                if body_idx is None:
+                    pos_w, quat_w = ee_pos, ee_quat
+                else:
+                    pos_w, quat_w = self._asset.data.body_pos_w[:, body_idx], self._asset.data.body_quat_w[:, body_idx]
+                if task.task_type == "position":
+                    task_values.append(pos_w)
+                elif task.task_type == "orientation":
+                    task_values.append(quat_w)
+                else:
+                    task_values.append(torch.cat((pos_w, quat_w), dim=-1))
+        # update the cache
+        self._task_values_tick = self._physics_tick
+        self._task_values = task_values
+        return task_values
+
+    def _update_body_inertials(self, env_ids: Sequence[int] | torch.Tensor | slice):
+        """Reads the body masses and centers of mass (in the body frames) of the center-of-mass task.
+
+        The physics view returns them for all environments on the host, so they are only read at the resets.
+
+        Args:
+            env_ids: The environment indices to update.
+        """
+        physx_view = self._asset.root_physx_view
+        self._body_masses[env_ids] = physx_view.get_masses().to(self.device)[env_ids]
+        self._body_com_pos[env_ids] = physx_view.get_coms()[..., :3].to(self.device)[env_ids]
+        self._total_mass[env_ids] = self._body_masses[env_ids].sum(dim=-1, keepdim=True)
+
+    def _compute_body_com_offsets(self) -> torch.Tensor:
+        """Computes the offsets from the body frames to the body centers of mass in the world frame.
+
+        Returns:
+            The offsets of all the bodies of the articulation. Shape is (num_envs, num_bodies, 3).
+        """
+        body_rot_w = math_utils.matrix_from_quat(self._asset.data.body_quat_w)
+        return body_com_offsets_w(body_rot_w, self._body_com_pos)
+
+    def _compute_task_jacobians(self) -> list[torch.Tensor | None]:
+        """Computes the Jacobian of each task of the controller in the world frame."""
+        # read the jacobians of all bodies once
+        jacobians = self._asset.root_physx_view.get_jacobians()
+        task_jacobians = list()
+        for task, body_idx in zip(self.cfg.controller.tasks, self._task_body_ids):
+            if task.task_type == "com":
+                # mass-weighted average of the linear jacobians of the body centers of mass
+                # note: the linear rows are given at the body frames, the centers of mass are shifted by the
+                #   offsets r as v_com = v - [r]x w, i.e. by the cross product of the angular rows with r
+                masses = self._body_masses[:, self._jacobi_body_slice, None, None]
+                mass_offsets = masses * self._compute_body_com_offsets()[:, self._jacobi_body_slice].unsqueeze(-1)
+                jacobian_lin = jacobians[:, :, 0:3, self._jacobi_dof_ids]
+                jacobian_ang = jacobians[:, :, 3:6, self._jacobi_dof_ids]
+                com_jacobian = torch.sum(
+                    masses * jacobian_lin + torch.cross(jacobian_ang, mass_offsets.expand_as(jacobian_ang), dim=2),
+                    dim=1,
+                )
+                task_jacobians.append(com_jacobian / self._total_mass.unsqueeze(-1))
+                continue
+            elif task.task_type == "joint":
+                task_jacobians.append(None)
+                continue
+            # body jacobian (or target frame if no body is specified)
+            if body_idx is None:
+                jacobian = self._compute_frame_jacobian(jacobians)
+            else:
+                jacobi_body_idx = body_idx - 1 if self._asset.is_fixed_base else body_idx
+                jacobian = jacobians[:, jacobi_body_idx, :, self._jacobi_dof_ids]
+            if task.task_type == "position":
+                task_jacobians.append(jacobian[:, 0:3])
+            elif task.task_type == "orientation":
+                task_jacobians.append(jacobian[:, 3:6])
+            else:
+                task_jacobians.append(jacobian)
+        return task_jacobians
+
+
+@configclass
 class WBCJointActionCfg(ActionTermCfg):
+    """Configuration for the whole-body control action term.
+
+    See :class:`WBCJointAction` for more details.
+    """
+
     @configclass
     class OffsetCfg:
         """The offset pose from parent frame to child frame.
@@ -182,7 +461,21 @@ class WBCJointActionCfg(ActionTermCfg):
     """Name of the body or frame for which WBC is performed."""
     body_offset: OffsetCfg | None = None
     """Offset of target frame w.r.t. to the body frame. Defaults to None, in which case no offset is applied."""
-    scale: float | tuple[float, ...] = 1.0
+    scale: float | dict[str, float] = 1.0
     """Scale factor for the action. Defaults to 1.0."""
+    offset: float | dict[str, float] = 0.0
+    """Offset factor for the action. Defaults to 0.0."""
     controller: WBCControllerCfg = MISSING
-    """The configuration for the WBC controller."""
\ No newline at end of file
+    """The configuration for the WBC controller."""
+    controller_decimation: int = 1
+    """Number of physics steps between two controller updates. Defaults to 1 (every physics step)."""
+    interpolate_targets: bool = True
+    """Whether to linearly interpolate the joint targets between two controller updates. Defaults to True.
+
+    If False, the joint targets of the last controller update are held.
+    """
+    gait_command_name: str | None = None
+    """Name of the gait command whose contact schedule is followed by the tasks. Defaults to None.
+
+    See :attr:`WBCTaskCfg.gait_leg` for how the tasks follow the schedule.
+    """
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import torch
+import weakref
+from typing import TYPE_CHECKING
+
+from omni.isaac.lab.assets import Articulation
+from omni.isaac.lab.utils.math import convert_quat, matrix_from_quat
+
+if TYPE_CHECKING:
+    from omni.isaac.lab.envs import RLTaskEnv
+
+
+class CentroidalState:
+    r"""Batched centroidal quantities of articulated robots computed from their body states.
+
+    From the masses, centers of mass and inertias of the bodies, the state computes for all environments at once:
+
+    * the center of mass (CoM) :math:`c` and its velocity :math:`\dot{c}`,
+    * the centroidal momentum :math:`h = (m \dot{c}, k)` (linear part first), where :math:`k` is the angular
+      momentum about the CoM, and its rate of change (backward finite difference between environment steps),
+    * the divergent component of motion (DCM) :math:`\xi = c + \dot{c} / \omega_0` with the natural frequency
+      :math:`\omega_0 = \sqrt{g / z_c}` of the linear inverted pendulum (LIP) at the CoM height :math:`z_c` above
+      the ground. Its horizontal components are the instantaneous capture point.
+    * the zero moment point (ZMP) on the ground from the centroidal dynamics:
+
+      .. math::
+
+          p_{x} = c_x - \frac{z_c m \ddot{c}_x + \dot{k}_y}{m (g + \ddot{c}_z)}, \quad
+          p_{y} = c_y - \frac{z_c m \ddot{c}_y - \dot{k}_x}{m (g + \ddot{c}_z)}
+
+    The velocities of the bodies are expected at their centers of mass, as in the articulation data.
+    """
+
+    def __init__(
+        self,
+        masses: torch.Tensor,
+        coms: torch.Tensor,
+        inertias: torch.Tensor,
+        gravity: float = 9.81,
+        device: str = "cpu",
+    ):
+        """Initialize the centroidal state.
+
+        Args:
+            masses: The masses of the bodies. Shape is (N, B).
+            coms: The poses of the centers of mass in the body frames as (x, y, z, qw, qx, qy, qz). Shape is (N, B, 7).
+            inertias: The inertias of the bodies about their centers of mass, in the frames of the centers of mass.
+                Shape is (N, B, 3, 3).
+            gravity: The magnitude of the gravity (in m/s^2). Defaults to 9.81.
+            device: The device on which to create the buffers. Defaults to "cpu".
+        """
+        self.num_envs, self.num_bodies = masses.shape
+        self.gravity = gravity
+        self._device = device
+        # body properties
+        self._masses = masses.to(self._device)
+        self._total_mass = self._masses.sum(dim=-1)
+        self._com_pos = coms[..., :3].to(self._device)
+        self._com_rot = matrix_from_quat(coms[..., 3:7].to(self._device))
+        self._inertias = inertias.to(self._device)
+
+        # create buffers
+        self._com_pos_w = torch.zeros(self.num_envs, 3, device=self._device)
+        self._com_vel_w = torch.zeros(self.num_envs, 3, device=self._device)
+        self._momentum = torch.zeros(self.num_envs, 6, device=self._device)
+        self._momentum_rate = torch.zeros(self.num_envs, 6, device=self._device)
+        self._natural_frequency = torch.zeros(self.num_envs, device=self._device)
+        self._dcm_w = torch.zeros(self.num_envs, 3, device=self._device)
+        self._zmp_w = torch.zeros(self.num_envs, 3, device=self._device)
+
+    @classmethod
+    def from_articulation(cls, asset: Articulation, gravity: float = 9.81) -> CentroidalState:
+        """Creates the centroidal state of an articulation from the body properties in the physics engine.
+
+        Args:
+            asset: The articulation.
+            gravity: The magnitude of the gravity (in m/s^2). Defaults to 9.81.
+
+        Returns:
+            The centroidal state of the articulation.
+        """
+        physx_view = asset.root_physx_view
+        masses = physx_view.get_masses()
+        coms = physx_view.get_coms().clone()
+        coms[..., 3:7] = convert_quat(coms[..., 3:7], to="wxyz")
+        inertias = physx_view.get_inertias().view(*masses.shape, 3, 3)
+        return cls(masses, coms, inertias, gravity, asset.device)
+
+    """
+    Properties.
+    """
+
+    @property
+    def total_mass(self) -> torch.Tensor:
+        """The total mass of the robots. Shape is (N,)."""
+        return self._total_mass
+
+    @property
+    def com_pos_w(self) -> torch.Tensor:
+        """The position of the center of mass in the world frame. Shape is (N, 3)."""
+        return self._com_pos_w
+
+    @property
+    def com_vel_w(self) -> torch.Tensor:
+        """The velocity of the center of mass in the world frame. Shape is (N, 3)."""
+        return self._com_vel_w
+
+    @property
+    def momentum(self) -> torch.Tensor:
+        """The centroidal momentum (linear momentum first) in the world frame. Shape is (N, 6)."""
+        return self._momentum
+
+    @property
+    def momentum_rate(self) -> torch.Tensor:
+        """The rate of change of the centroidal momentum (linear part first). Shape is (N, 6)."""
+        return self._momentum_rate
+
+    @property
+    def natural_frequency(self) -> torch.Tensor:
+        """The natural frequency of the linear inverted pendulum at the CoM height (in 1/s). Shape is (N,)."""
+        return self._natural_frequency
+
+    @property
+    def dcm_w(self) -> torch.Tensor:
+        """The divergent component of motion in the world frame. Shape is (N, 3)."""
+        return self._dcm_w
+
+    @property
+    def capture_point_w(self) -> torch.Tensor:
+        """The instantaneous capture point on the ground in the world frame. Shape is (N, 3)."""
+        return torch.cat((self._dcm_w[:, :2], self._zmp_w[:, 2:3]), dim=-1)
+
+    @property
+    def zmp_w(self) -> torch.Tensor:
+        """The zero moment point on the ground in the world frame. Shape is (N, 3)."""
+        return self._zmp_w
+
+    """
+    Operations.
+    """
+
+    def update(
+        self,
+        body_pos_w: torch.Tensor,
+        body_quat_w: torch.Tensor,
+        body_lin_vel_w: torch.Tensor,
+        body_ang_vel_w: torch.Tensor,
+        ground_height: torch.Tensor | float = 0.0,
+        dt: float | None = None,
+        reset_mask: torch.Tensor | None = None,
+    ):
+        """Computes the centroidal quantities from the body states.
+
+        Args:
+            body_pos_w: The positions of the body frames in the world frame. Shape is (N, B, 3).
+            body_quat_w: The orientations (w, x, y, z) of the body frames in the world frame. Shape is (N, B, 4).
+            body_lin_vel_w: The linear velocities of the body centers of mass in the world frame. Shape is (N, B, 3).
+            body_ang_vel_w: The angular velocities of the bodies in the world frame. Shape is (N, B, 3).
+            ground_height: The height of the ground below the robots. Shape is (N,) or scalar. Defaults to 0.
+            dt: The time since the previous update (in s). Defaults to None, in which case the momentum rate is not
+                updated (e.g. when the states are recomputed within the same step).
+            reset_mask: Whether the robots were reset since the previous update, in which case their momentum
+                rate is set to zero. Shape is (N,). Defaults to None.
+        """
+        masses = self._masses.unsqueeze(-1)
+        # centers of mass and inertias of the bodies in the world frame
+        body_rot = matrix_from_quat(body_quat_w)
+        body_com_w = body_pos_w + body_com_offsets_w(body_rot, self._com_pos)
+        com_rot = body_rot @ self._com_rot
+        # -- center of mass
+        torch.div((masses * body_com_w).sum(dim=1), self._total_mass.unsqueeze(-1), out=self._com_pos_w)
+        lin_momentum = (masses * body_lin_vel_w).sum(dim=1)
+        torch.div(lin_momentum, self._total_mass.unsqueeze(-1), out=self._com_vel_w)
+        # -- angular momentum about the center of mass: sum of (c_i - c) x m_i v_i + R_i I_i R_i^T w_i
+        body_ang_vel_c = com_rot.transpose(-1, -2) @ body_ang_vel_w.unsqueeze(-1)
+        spin = (com_rot @ self._inertias @ body_ang_vel_c).squeeze(-1)
+        orbital = torch.cross(body_com_w - self._com_pos_w.unsqueeze(1), masses * body_lin_vel_w, dim=-1)
+        momentum = torch.cat((lin_momentum, (orbital + spin).sum(dim=1)), dim=-1)
+        # -- momentum rate
+        if dt is not None:
+            torch.div(momentum - self._momentum, dt, out=self._momentum_rate)
+        if reset_mask is not None:
+            self._momentum_rate.masked_fill_(reset_mask.unsqueeze(-1), 0.0)
+        self._momentum[:] = momentum
+        # -- divergent component of motion
+        com_height = (self._com_pos_w[:, 2] - ground_height).clamp_min(1e-3)
+        torch.sqrt(self.gravity / com_height, out=self._natural_frequency)
+        torch.addcdiv(self._com_pos_w, self._com_vel_w, self._natural_frequency.unsqueeze(-1), out=self._dcm_w)
+        # -- zero moment point
+        mass = self._total_mass.unsqueeze(-1)
+        lin_rate, ang_rate = self._momentum_rate[:, 0:3], self._momentum_rate[:, 3:6]
+        normal_force = (mass * self.gravity + lin_rate[:, 2:3]).clamp_min(1e-3 * mass * self.gravity)
+        moments = com_height.unsqueeze(-1) * lin_rate[:, 0:2] + torch.stack((ang_rate[:, 1], -ang_rate[:, 0]), dim=-1)
+        self._zmp_w[:, 0:2] = self._com_pos_w[:, 0:2] - moments / normal_force
+        self._zmp_w[:, 2] = self._com_pos_w[:, 2] - com_height
+
+
+def body_com_offsets_w(body_rot_w: torch.Tensor, com_pos_b: torch.Tensor) -> torch.Tensor:
+    """Offsets from the origins of the body frames to the centers of mass of the bodies, in the world frame.
+
+    Args:
+        body_rot_w: The rotation matrices of the body frames in the world frame. Shape is (N, B, 3, 3).
+        com_pos_b: The positions of the centers of mass in the body frames. Shape is (N, B, 3).
+
+    Returns:
+        The offsets in the world frame. Shape is (N, B, 3).
+    """
+    return (body_rot_w @ com_pos_b.unsqueeze(-1)).squeeze(-1)
+
+
+_CENTROIDAL_STATES: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+"""Centroidal states shared by the terms of each environment, by asset name."""
+
+
+def centroidal_state(env: RLTaskEnv, asset_name: str = "robot") -> CentroidalState:
+    """Returns the centroidal state of an asset, shared by all the terms of the environment.
+
+    The state is computed at most once per environment step. It is recomputed within the same step only if the
+    body states of the asset were written in the meantime (e.g. by a reset between the reward and the observation
+    computations), which is detected from the version counters of the data buffers without synchronization.
+
+    Note:
+        The body properties are read from the physics engine when the state is first requested. Mass
+        randomizations applied afterwards are not taken into account.
+
+    Args:
+        env: The environment.
+        asset_name: The name of the articulation in the scene. Defaults to "robot".
+
+    Returns:
+        The up-to-date centroidal state of the asset.
+    """
+    states = _CENTROIDAL_STATES.setdefault(env, dict())
+    asset: Articulation = env.scene[asset_name]
+    if asset_name not in states:
+        gravity = -env.sim.cfg.gravity[2]
+        states[asset_name] = [CentroidalState.from_articulation(asset, gravity), None, None]
+    state, key, step = states[asset_name]
+    # check whether the cached state is up to date
+    new_key = (env.common_step_counter, asset.data.body_state_w._version)
+    if new_key != key:
+        new_step = env.common_step_counter
+        dt = (new_step - step) * env.step_dt if step is not None and new_step != step else None
+        state.update(
+            asset.data.body_pos_w,
+            asset.data.body_quat_w,
+            asset.data.body_lin_vel_w,
+            asset.data.body_ang_vel_w,
+            ground_height=env.scene.env_origins[:, 2],
+            dt=dt,
+            reset_mask=env.episode_length_buf == 0,
+        )
+        states[asset_name] = [state, new_key, new_step]
+    return state
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import torch
+from collections.abc import Sequence
+from dataclasses import MISSING
+from typing import TYPE_CHECKING
+
+from omni.isaac.lab.assets import Articulation
+from omni.isaac.lab.managers import CommandTerm, CommandTermCfg
+from omni.isaac.lab.utils import configclass
+from omni.isaac.lab.utils.math import quat_apply_yaw
+
+from isaac.lab.hcrl.tasks.utils.resolution import bind_ids, resolve_body_ids
+from isaac.lab.hcrl.tasks.utils.rng import random_stream
+
+from .gait import GAIT_SWING, GaitScheduler, GaitSchedulerCfg
+from .swing import SwingTrajectory, SwingTrajectoryCfg
+
+if TYPE_CHECKING:
+    from omni.isaac.lab.envs import BaseEnv
+
+
+class GaitCommand(CommandTerm):
+    """Command generator that schedules the gait of legged robots.
+
+    The command term owns a :class:`GaitScheduler` that is advanced once per environment step. Stepping is
+    requested when the norm of a velocity command exceeds a threshold (or always, if no velocity command is
+    given). The gait period of each environment is resampled uniformly from a range at every resampling.
+
+    The command is the phase of each leg as a (sin, cos) pair followed by the scheduled contact of each leg.
+    The scheduler is shared with the other terms (e.g. :class:`WBCJointAction` and the gait observations)
+    through :attr:`scheduler`.
+
+    If :attr:`GaitCommandCfg.swing` is set, the command term also generates the swing-foot references: at the
+    liftoff of each foot, a :class:`SwingTrajectory` is started from the current foot position to a touchdown
+    point that is displaced by the commanded planar velocity over one gait cycle. The references are evaluated at
+    every step in :attr:`foot_pos_ref_w` and :attr:`foot_vel_ref_w` (the current foot positions in contact).
+    """
+
+    cfg: GaitCommandCfg
+    """Configuration for the command generator."""
+
+    def __init__(self, cfg: GaitCommandCfg, env: BaseEnv):
+        """Initialize the command generator class.
+
+        Args:
+            cfg: The configuration parameters for the command generator.
+            env: The environment object.
+        """
+        # initialize the base class
+        super().__init__(cfg, env)
+
+        # create the scheduler
+        self.scheduler = GaitScheduler(self.cfg.scheduler, self.num_envs, self.device)
+        # random numbers of each environment, reproducible from the seed
+        self._rng = random_stream(env, type(self).__name__)
+        # crete buffers to store the command
+        # -- commands: (sin(2 pi phase), cos(2 pi phase)) per leg, scheduled contacts
+        self._command = torch.zeros(self.num_envs, 3 * self.scheduler.num_legs, device=self.device)
+        # -- metrics
+        self.metrics["stepping"] = torch.zeros(self.num_envs, device=self.device)
+
+        # create the swing-foot trajectories
+        if self.cfg.swing is not None:
+            if self.cfg.asset_name is None or self.cfg.foot_body_names is None:
+                raise ValueError("The asset name and the foot body names are required for the swing trajectories.")
+            self.robot: Articulation = env.scene[self.cfg.asset_name]
+            self.foot_ids, foot_names = resolve_body_ids(self.robot, self.cfg.foot_body_names, preserve_order=True)
+            if len(self.foot_ids) != self.scheduler.num_legs:
+                raise ValueError(f"Expected one foot body per leg ({self.scheduler.num_legs}). Received: {foot_names}.")
+            # note: the foot indices are bound once, since they index the body buffers at every step
+            self.foot_ids = bind_ids(self.foot_ids, self.robot.num_bodies, self.device)
+            self.swing_trajectory = SwingTrajectory(self.cfg.swing, self.num_envs, self.scheduler.num_legs, self.device)
+            # -- references: (N, num_legs, 3)
+            self.foot_pos_ref_w = torch.zeros(self.num_envs, self.scheduler.num_legs, 3, device=self.device)
+            self.foot_vel_ref_w = torch.zeros_like(self.foot_pos_ref_w)
+            self.metrics["swing_error"] = torch.zeros(self.num_envs, device=self.device)
+        else:
+            self.swing_trajectory = None
+
+    def __str__(self) -> str:
+        msg = "GaitCommand:\n"
+        msg += f"\tCommand dimension: {tuple(self.command.shape[1:])}\n"
+        msg += f"\tResampling time range: {self.cfg.resampling_time_range}\n"
+        msg += f"\tNumber of legs: {self.scheduler.num_legs}\n"
+        msg += f"\tPeriod range: {self.cfg.period_range}\n"
+        msg += f"\tDuty factor: {self.cfg.scheduler.duty_factor}"
+        return msg
+
+    """
+    Properties
+    """
+
+    @property
+    def command(self) -> torch.Tensor:
+        """The phase of the legs as (sin, cos) pairs and the scheduled contacts. Shape is (num_envs, 3 * num_legs)."""
+        return self._command
+
+    """
+    Operations.
+    """
+
+    def reset(self, env_ids: Sequence[int] | None = None) -> dict[str, float]:
+        # reset the gait to the stand-up state
+        self.scheduler.reset(env_ids)
+        return super().reset(env_ids)
+
+    """
+    Implementation specific functions.
+    """
+
+    def _resample_command(self, env_ids: Sequence[int]):
+        # sample new gait periods
+        if self.cfg.period_range is not None:
+            period = self._rng.uniform(env_ids, (), *self.cfg.period_range)
+            self.scheduler.set_period(period, env_ids)
+
+    def _update_command(self):
+        """Advance the gait by one environment step and update the command."""
+        # request stepping from the velocity command
+        if self.cfg.velocity_command_name is not None:
+            velocity_command = self._env.command_manager.get_command(self.cfg.velocity_command_name)
+            stepping = torch.linalg.vector_norm(velocity_command, dim=-1) > self.cfg.velocity_threshold
+        else:
+            stepping = None
+        self.scheduler.update(self._env.step_dt, stepping)
+        # update the command
+        num_legs = self.scheduler.num_legs
+        angle = 2.0 * torch.pi * self.scheduler.leg_phase
+        torch.sin(angle, out=self._command[:, 0:num_legs])
+        torch.cos(angle, out=self._command[:, num_legs : 2 * num_legs])
+        self._command[:, 2 * num_legs :] = self.scheduler.contact
+        # update the swing-foot references
+        if self.swing_trajectory is not None:
+            self._update_swing_references()
+
+    def _update_metrics(self):
+        # logs data
+        self.metrics["stepping"] = (self.scheduler.state == GAIT_SWING).float()
+        if self.swing_trajectory is not None:
+            foot_pos_w = self.robot.data.body_pos_w[:, self.foot_ids]
+            error = torch.linalg.vector_norm(self.foot_pos_ref_w - foot_pos_w, dim=-1)
+            swinging = ~self.scheduler.contact
+            self.metrics["swing_error"] = (error * swinging).sum(dim=-1) / swinging.sum(dim=-1).clamp_min(1)
+
+    """
+    Helper functions.
+    """
+
+    def _update_swing_references(self):
+        """Starts the swings of the feet that lift off and evaluates the swing-foot references."""
+        foot_pos_w = self.robot.data.body_pos_w[:, self.foot_ids]
+        # touchdown points: displaced by the commanded planar velocity over one gait cycle
+        touchdown_pos_w = foot_pos_w.clone()
+        if self.cfg.velocity_command_name is not None:
+            velocity_command = self._env.command_manager.get_command(self.cfg.velocity_command_name)
+            velocity_b = torch.zeros(self.num_envs, 3, device=self.device)
+            velocity_b[:, :2] = velocity_command[:, :2]
+            velocity_w = quat_apply_yaw(self.robot.data.root_quat_w, velocity_b)
+            touchdown_pos_w[..., :2] += (velocity_w[:, :2] * self.scheduler.period.unsqueeze(-1)).unsqueeze(1)
+        self.swing_trajectory.start(foot_pos_w, touchdown_pos_w, self.scheduler.swing_duration, self.scheduler.liftoff)
+        # evaluate the references (the feet in contact hold their position)
+        pos_ref, vel_ref = self.swing_trajectory.evaluate(self.scheduler.swing_phase)
+        contact = self.scheduler.contact.unsqueeze(-1)
+        torch.where(contact, foot_pos_w, pos_ref, out=self.foot_pos_ref_w)
+        torch.where(contact, torch.zeros_like(vel_ref), vel_ref, out=self.foot_vel_ref_w)
+
+
+@configclass
+class GaitCommandCfg(CommandTermCfg):
+    """Configuration for the gait command generator."""
+
+    class_type: type = GaitCommand
+
+    scheduler: GaitSchedulerCfg = MISSING
+    """Configuration of the gait scheduler."""
+
+    period_range: tuple[float, float] | None = None
+    """Range of the gait period (in s) sampled at every resampling. Defaults to None (fixed period)."""
+
+    velocity_command_name: str | None = None
+    """Name of the velocity command that requests stepping. Defaults to None (stepping is always requested)."""
+
+    velocity_threshold: float = 0.1
+    """Norm of the velocity command above which stepping is requested."""
+
+    swing: SwingTrajectoryCfg | None = None
+    """Configuration of the swing-foot trajectories. Defaults to None (no swing-foot references)."""
+
+    asset_name: str | None = None
+    """Name of the robot in the scene. Required for the swing-foot trajectories."""
+
+    foot_body_names: list[str] | None = None
+    """Names of the foot bodies in the order of the legs of the scheduler. Required for the swing-foot
+    trajectories."""
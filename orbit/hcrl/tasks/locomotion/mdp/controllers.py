@@ -1,11 +1,19 @@
 from __future__ import annotations
 
+import functools
+import time
 import torch
 from collections.abc import Sequence
 from dataclasses import MISSING
 
 from omni.isaac.lab.utils import configclass
-from omni.isaac.lab.utils.math import apply_delta_pose, compute_pose_error
+from omni.isaac.lab.utils.math import (
+    apply_delta_pose,
+    axis_angle_from_quat,
+    quat_conjugate,
+    quat_from_angle_axis,
+    quat_mul,
+)
 
 
 @configclass
@@ -71,16 +79,207 @@ class OperationSpaceControllerCfg:
     rotation_command_scale: tuple[float, float, float] = (1.0, 1.0, 1.0)
     """Scaling of the rotation command received. Used only in relative mode."""
 
+    dynamics_backend: str = "cholesky"
+    """Method used to resolve the task-space dynamics for inertial compensation: "cholesky" or "inverse".
 
-state_machine = torch.zeros(num_envs, 2)
-"""
-state ids:
-0: stand_up
-1: stance
-2: swing
-"""
+    The "cholesky" backend factorizes the mass matrix once per call and solves for the task-space wrench,
+    while the "inverse" backend explicitly inverts the mass matrix and the task-space inertia (reference path).
+    """
+
+    singularity_threshold: float = 1e-6
+    """Smallest pivot of the inverse task-space inertia :math:`J M^{-1} J^T` treated as non-singular.
+
+    Robots with a pivot below this value are solved with damped least-squares instead.
+    Note: Used only when :obj:`dynamics_backend` is "cholesky".
+    """
+
+    singularity_damping: float = 1e-2
+    """Damping added to the inverse task-space inertia for near-singular Jacobians.
+
+    Note: Used only when :obj:`dynamics_backend` is "cholesky".
+    """
+
+    mass_matrix_damping: float = 1e-4
+    """Damping added to the diagonal of the mass matrices that are not numerically positive definite.
+
+    Note: Used only when :obj:`dynamics_backend` is "cholesky".
+    """
+
+
+class OperationSpaceWorkspace:
+    """Preallocated buffers for the intermediate results of the operation-space controller.
+
+    All buffers are sized from the number of robots and degrees of freedom at construction, so that the
+    steady-state control loop writes its intermediate results in place and does not allocate new tensors.
+    """
 
+    def __init__(self, num_robots: int, num_dof: int, device: str, inertial_compensation: bool = False):
+        """Initialize the workspace.
 
+        Args:
+            num_robots: The number of robots to control.
+            num_dof: The number of degrees of freedom of the robot.
+            device: The device to use for computations.
+            inertial_compensation: Whether to allocate the buffers of the task-space dynamics. Defaults to False.
+        """
+        # -- task-space motion control
+        self.desired_ee_pos = torch.zeros(num_robots, 3, device=device)
+        self.quat_conj = torch.zeros(num_robots, 4, device=device)
+        self.quat_left = torch.zeros(num_robots, 16, device=device)
+        self.quat_error = torch.zeros(num_robots, 4, device=device)
+        self.quat_scalars = torch.zeros(3, num_robots, 1, device=device)
+        self.quat_ones = torch.ones(num_robots, 1, device=device)
+        self.angle_mask = torch.zeros(num_robots, 1, dtype=torch.bool, device=device)
+        self.pose_error = torch.zeros(num_robots, 6, device=device)
+        self.des_ee_acc = torch.zeros(num_robots, 6, device=device)
+        # -- task-space force control
+        self.des_force_wrench = torch.zeros(num_robots, 6, device=device)
+        # -- joint-space mapping
+        self.selected_wrench = torch.zeros(num_robots, 6, device=device)
+        # -- task-space dynamics
+        if inertial_compensation:
+            self.mass_matrix_chol = torch.zeros(num_robots, num_dof, num_dof, device=device)
+            self.mass_matrix_damped = torch.zeros(num_robots, num_dof, num_dof, device=device)
+            self.mass_matrix_fallback_chol = torch.zeros(num_robots, num_dof, num_dof, device=device)
+            self.mass_min_diag = torch.zeros(num_robots, device=device)
+            self.mass_fallback_diag = torch.zeros(num_robots, num_dof, device=device)
+            self.mass_chol_info = torch.zeros(num_robots, dtype=torch.int32, device=device)
+            self.mass_chol_failed = torch.zeros(num_robots, dtype=torch.bool, device=device)
+            self.mass_indefinite = torch.zeros(num_robots, dtype=torch.bool, device=device)
+            self.mass_eye = torch.eye(num_dof, device=device)
+            self.jacobian_w = torch.zeros(num_robots, num_dof, 6, device=device)
+            self.lambda_inv = torch.zeros(num_robots, 6, 6, device=device)
+            self.lambda_inv_chol = torch.zeros(num_robots, 6, 6, device=device)
+            self.singular = torch.zeros(num_robots, dtype=torch.bool, device=device)
+            self.des_motion_wrench = torch.zeros(num_robots, 6, device=device)
+
+    def memory_report(self) -> dict[str, int]:
+        """Memory held by each buffer of the workspace in bytes."""
+        return {
+            name: buffer.numel() * buffer.element_size()
+            for name, buffer in vars(self).items()
+            if isinstance(buffer, torch.Tensor)
+        }
+
+
+def task_space_wrench_inverse(
+    jacobian: torch.Tensor, mass_matrix: torch.Tensor, des_ee_acc: torch.Tensor, decoupled: bool = False
+) -> torch.Tensor:
+    """Computes the task-space wrench :math:`\\Lambda \\ddot{x}_{des}` by explicit matrix inversion.
+
+    This is the reference implementation of the operational-space dynamics. It inverts the mass matrix and
+    the inverse task-space inertia :math:`J M^{-1} J^T` for every robot.
+
+    Args:
+        jacobian: The Jacobian matrix of the end-effector. Shape is (num_robots, 6, num_dof).
+        mass_matrix: The joint-space inertial matrix. Shape is (num_robots, num_dof, num_dof).
+        des_ee_acc: The desired end-effector acceleration. Shape is (num_robots, 6).
+        decoupled: Whether to decouple the translational and rotational task-space inertia. Defaults to False.
+
+    Returns:
+        The desired end-effector wrench. Shape is (num_robots, 6).
+    """
+    mass_matrix_inv = torch.inverse(mass_matrix)
+    if decoupled:
+        # decoupled-mass matrices
+        jacobian_pos, jacobian_ori = jacobian[:, 0:3], jacobian[:, 3:6]
+        lambda_pos = torch.inverse(jacobian_pos @ mass_matrix_inv @ jacobian_pos.transpose(1, 2))
+        lambda_ori = torch.inverse(jacobian_ori @ mass_matrix_inv @ jacobian_ori.transpose(1, 2))
+        # desired end-effector wrench (from pseudo-dynamics)
+        decoupled_force = torch.bmm(lambda_pos, des_ee_acc[:, 0:3].unsqueeze(-1))
+        decoupled_torque = torch.bmm(lambda_ori, des_ee_acc[:, 3:6].unsqueeze(-1))
+        return torch.cat((decoupled_force, decoupled_torque), dim=1).squeeze(-1)
+    # coupled dynamics
+    lambda_full = torch.inverse(jacobian @ mass_matrix_inv @ jacobian.transpose(1, 2))
+    return torch.bmm(lambda_full, des_ee_acc.unsqueeze(-1)).squeeze(-1)
+
+
+def task_space_wrench_cholesky(
+    jacobian: torch.Tensor,
+    mass_matrix: torch.Tensor,
+    des_ee_acc: torch.Tensor,
+    decoupled: bool = False,
+    singularity_threshold: float = 1e-6,
+    singularity_damping: float = 1e-2,
+    mass_matrix_damping: float = 1e-4,
+    workspace: OperationSpaceWorkspace | None = None,
+) -> torch.Tensor:
+    """Computes the task-space wrench :math:`\\Lambda \\ddot{x}_{des}` using batched Cholesky solves.
+
+    The mass matrix is factorized once as :math:`M = L L^T` and the Jacobian is whitened as
+    :math:`X = L^{-1} J^T`, so that :math:`J M^{-1} J^T = X^T X`. The decoupled translational and rotational
+    inverse inertias are the diagonal blocks of the same product, so both paths reuse a single factorization.
+    The wrench is then obtained by a Cholesky solve of the (small) inverse task-space inertia.
+
+    Each matrix is factorized once, with the damping added only where it is needed, selected per robot without
+    host synchronization:
+
+    * The mass matrices with a non-positive diagonal entry are factorized with a damped diagonal,
+      :math:`M + \\epsilon I`. The few that still fail fall back to the square root of their damped diagonal.
+    * The inverse task-space inertia is factorized column by column and the pivots below the threshold are
+      damped, from the first small pivot onwards. The robots whose mass matrix is damped have all their pivots
+      damped, which is the damped least-squares inertia :math:`(J M^{-1} J^T + \\lambda^2 I)^{-1}`.
+
+    Args:
+        jacobian: The Jacobian matrix of the end-effector. Shape is (num_robots, 6, num_dof).
+        mass_matrix: The joint-space inertial matrix. Shape is (num_robots, num_dof, num_dof).
+        des_ee_acc: The desired end-effector acceleration. Shape is (num_robots, 6).
+        decoupled: Whether to decouple the translational and rotational task-space inertia. Defaults to False.
+        singularity_threshold: Smallest admissible pivot of the inverse task-space inertia. Defaults to 1e-6.
+        singularity_damping: Damping applied to near-singular robots. Defaults to 1e-2.
+        mass_matrix_damping: Damping added to the mass matrices that are not positive definite. Defaults to 1e-4.
+        workspace: Preallocated buffers to write the intermediate results into. Defaults to None,
+            in which case new tensors are allocated.
+
+    Returns:
+        The desired end-effector wrench. Shape is (num_robots, 6).
+    """
+    ws = workspace
+    num_dof = mass_matrix.shape[-1]
+    mass_eye = ws.mass_eye if ws else torch.eye(num_dof, dtype=mass_matrix.dtype, device=mass_matrix.device)
+    # damp the mass matrices that cannot be positive definite: M + eps I
+    # note: a positive definite matrix has a positive diagonal, which is checked without a factorization
+    mass_diag = mass_matrix.diagonal(dim1=1, dim2=2)
+    mass_min_diag = torch.amin(mass_diag, dim=-1, out=ws.mass_min_diag if ws else None)
+    mass_failed = torch.le(mass_min_diag, 0.0, out=ws.mass_chol_failed if ws else None)
+    mass_matrix_damped = torch.mul(mass_eye, mass_failed.view(-1, 1, 1), out=ws.mass_matrix_damped if ws else None)
+    mass_matrix_damped.mul_(mass_matrix_damping).add_(mass_matrix)
+    # factorize the mass matrix once: M = L L^T
+    # note: the errors are reported per robot in the info instead of being checked on the host
+    mass_matrix_chol, mass_info = torch.linalg.cholesky_ex(
+        mass_matrix_damped, out=(ws.mass_matrix_chol, ws.mass_chol_info) if ws else None
+    )
+    # fall back to the damped diagonal for the (indefinite) mass matrices whose factorization still fails
+    mass_indefinite = torch.gt(mass_info, 0, out=ws.mass_indefinite if ws else None)
+    mass_fallback_diag = torch.clamp_min(mass_diag, 0.0, out=ws.mass_fallback_diag if ws else None)
+    mass_fallback_diag.add_(mass_matrix_damping).sqrt_()
+    mass_matrix_fallback_chol = torch.mul(
+        mass_eye, mass_fallback_diag.unsqueeze(-1), out=ws.mass_matrix_fallback_chol if ws else None
+    )
+    torch.where(mass_indefinite.view(-1, 1, 1), mass_matrix_fallback_chol, mass_matrix_chol, out=mass_matrix_chol)
+    mass_failed.logical_or_(mass_indefinite)
+    # whiten the jacobian: X = L^-1 J^T
+    jacobian_w = torch.linalg.solve_triangular(
+        mass_matrix_chol, jacobian.transpose(1, 2), upper=False, out=ws.jacobian_w if ws else None
+    )
+    # inverse task-space inertia: J M^-1 J^T = X^T X
+    lambda_inv = torch.bmm(jacobian_w.transpose(1, 2), jacobian_w, out=ws.lambda_inv if ws else None)
+    if decoupled:
+        # keep only the translational and rotational diagonal blocks
+        lambda_inv[:, 0:3, 3:6] = 0.0
+        lambda_inv[:, 3:6, 0:3] = 0.0
+    # factorize the inverse task-space inertia once, damping the near-singular robots
+    singular = mass_failed.clone() if ws is None else ws.singular.copy_(mass_failed)
+    lambda_inv_chol = _damped_cholesky(
+        lambda_inv, singularity_threshold, singularity_damping**2, singular, out=ws.lambda_inv_chol if ws else None
+    )
+    # desired end-effector wrench: (J M^-1 J^T)^-1 * \ddot(x_des)
+    des_motion_wrench = torch.cholesky_solve(
+        des_ee_acc.unsqueeze(-1),
+        lambda_inv_chol,
+        out=ws.des_motion_wrench.unsqueeze(-1) if ws else None,
+    )
+    return des_motion_wrench.squeeze(-1)
 
 
 class OperationSpaceController:
@@ -101,41 +300,104 @@ class OperationSpaceController:
 
         Raises:
             ValueError: When invalid control command is provided.
+            ValueError: When invalid dynamics backend is provided.
         """
         # store inputs
         self.cfg = cfg
         self.num_robots = num_robots
         self.num_dof = num_dof
         self._device = device
+        # preallocated buffers for the intermediate results of the control loop
+        self._workspace = OperationSpaceWorkspace(
+            self.num_robots, self.num_dof, self._device, inertial_compensation=self.cfg.inertial_compensation
+        )
 
-        # resolve tasks-pace target dimensions
+        # resolve task-space target dimensions and compile the command layout
+        # note: the layout is fixed after construction, so the per-step path only applies pre-resolved slices
         self.target_list = list()
+        target_scales = list()
+        self._motion_target_fn = self._resolve_no_motion_target
+        self._motion_target_slice = None
+        self._force_target_slice = None
         for command_type in self.cfg.command_types:
-            if "position" in command_type:
+            start = sum(self.target_list)
+            if command_type == "position_rel":
                 self.target_list.append(3)
+                target_scales.append(list(self.cfg.position_command_scale))
+                self._motion_target_fn = self._resolve_position_rel_target
+            elif command_type == "position_abs":
+                self.target_list.append(3)
+                target_scales.append([1.0] * 3)
+                self._motion_target_fn = self._resolve_position_abs_target
             elif command_type == "pose_rel":
                 self.target_list.append(6)
+                target_scales.append(list(self.cfg.position_command_scale) + list(self.cfg.rotation_command_scale))
+                self._motion_target_fn = self._resolve_pose_rel_target
             elif command_type == "pose_abs":
                 self.target_list.append(7)
+                target_scales.append([1.0] * 7)
+                self._motion_target_fn = self._resolve_pose_abs_target
             elif command_type == "force_abs":
                 self.target_list.append(6)
+                target_scales.append([1.0] * 6)
             else:
                 raise ValueError(f"Invalid control command: {command_type}.")
+            # store the slice of the task-space target for the command
+            if command_type == "force_abs":
+                self._force_target_slice = slice(start, start + self.target_list[-1])
+            else:
+                self._motion_target_slice = slice(start, start + self.target_list[-1])
         self.target_dim = sum(self.target_list)
+        # resolve the task-space dynamics backend
+        if self.cfg.dynamics_backend == "cholesky":
+            self._task_space_wrench_fn = functools.partial(
+                task_space_wrench_cholesky,
+                decoupled=self.cfg.uncouple_motion_wrench,
+                singularity_threshold=self.cfg.singularity_threshold,
+                singularity_damping=self.cfg.singularity_damping,
+                mass_matrix_damping=self.cfg.mass_matrix_damping,
+                workspace=self._workspace,
+            )
+        elif self.cfg.dynamics_backend == "inverse":
+            self._task_space_wrench_fn = functools.partial(
+                task_space_wrench_inverse, decoupled=self.cfg.uncouple_motion_wrench
+            )
+        else:
+            raise ValueError(f"Invalid dynamics backend: {self.cfg.dynamics_backend}.")
+        # resolve the inputs required by the command layout and the compensation terms
+        self._required_inputs = list()
+        if self._motion_target_slice is not None:
+            self._required_inputs += [
+                ("ee_pose", "End-effector pose is required for motion control."),
+                ("ee_vel", "End-effector velocity is required for motion control."),
+            ]
+            if self.cfg.inertial_compensation:
+                self._required_inputs.append(("mass_matrix", "Mass matrix is required for inertial compensation."))
+        if self._force_target_slice is not None and self.cfg.force_stiffness is not None:
+            self._required_inputs.append(("ee_force", "End-effector force is required for closed-loop force control."))
+        if self.cfg.gravity_compensation:
+            self._required_inputs.append(("gravity", "Gravity vector is required for gravity compensation."))
 
         # create buffers
-        # -- selection matrices
-        self._selection_matrix_motion = torch.diag(
-            torch.tensor(self.cfg.motion_control_axes, dtype=torch.float, device=self._device)
+        # -- selection matrices (stored as their diagonals)
+        self._selection_matrix_motion = torch.tensor(
+            self.cfg.motion_control_axes, dtype=torch.float, device=self._device
+        )
+        self._selection_matrix_force = torch.tensor(
+            self.cfg.force_control_axes, dtype=torch.float, device=self._device
         )
-        self._selection_matrix_force = torch.diag(
-            torch.tensor(self.cfg.force_control_axes, dtype=torch.float, device=self._device)
+        # -- quaternion left-multiplication layout: q_1 * q_2 = L(q_1) @ q_2
+        self._quat_left_index = torch.tensor(
+            [0, 1, 2, 3, 1, 0, 3, 2, 2, 3, 0, 1, 3, 2, 1, 0], dtype=torch.long, device=self._device
         )
+        self._quat_left_sign = torch.tensor(
+            [1, -1, -1, -1, 1, 1, -1, 1, 1, 1, 1, -1, 1, -1, 1, 1], dtype=torch.float, device=self._device
+        )
+        self._quat_conj_sign = torch.tensor([1, -1, -1, -1], dtype=torch.float, device=self._device)
         # -- commands
         self._task_space_target = torch.zeros(self.num_robots, self.target_dim, device=self._device)
-        # -- scaling of command
-        self._position_command_scale = torch.diag(torch.tensor(self.cfg.position_command_scale, device=self._device))
-        self._rotation_command_scale = torch.diag(torch.tensor(self.cfg.rotation_command_scale, device=self._device))
+        # -- scaling of command (block-diagonal over the full task-space target)
+        self._command_scale = torch.diag(torch.tensor(sum(target_scales, []), dtype=torch.float, device=self._device))
         # -- motion control gains
         self._p_gains = torch.zeros(self.num_robots, 6, device=self._device)
         self._p_gains[:] = torch.tensor(self.cfg.stiffness, device=self._device)
@@ -159,7 +421,7 @@ class OperationSpaceController:
             self.cfg.damping_ratio_limits[1],
         )
         # -- storing outputs
-        self._desired_torques = torch.zeros(self.num_robots, self.num_dof, self.num_dof, device=self._device)
+        self._desired_torques = torch.zeros(self.num_robots, self.num_dof, device=self._device)
 
     """
     Properties.
@@ -193,6 +455,22 @@ class OperationSpaceController:
         """Reset the internals."""
         pass
 
+    def memory_report(self) -> dict[str, int]:
+        """Steady-state memory footprint of the controller.
+
+        Returns:
+            The memory held by each buffer of the controller and its workspace in bytes,
+            and their sum under the key ``"total"``.
+        """
+        report = {
+            name.lstrip("_"): buffer.numel() * buffer.element_size()
+            for name, buffer in vars(self).items()
+            if isinstance(buffer, torch.Tensor)
+        }
+        report.update({f"workspace.{name}": size for name, size in self._workspace.memory_report().items()})
+        report["total"] = sum(report.values())
+        return report
+
     def set_command(self, command: torch.Tensor):
         """Set target end-effector pose or force command.
 
@@ -207,14 +485,14 @@ class OperationSpaceController:
         # impedance mode
         if self.cfg.impedance_mode == "fixed":
             # joint positions
-            self._task_space_target[:] = command
+            torch.matmul(command, self._command_scale, out=self._task_space_target)
         elif self.cfg.impedance_mode == "variable_kp":
             # split input command
             task_space_command, stiffness = torch.tensor_split(command, (self.target_dim, 6), dim=-1)
             # format command
             stiffness = stiffness.clip_(min=self._p_gains_limits[0], max=self._p_gains_limits[1])
             # joint positions + stiffness
-            self._task_space_target[:] = task_space_command.squeeze(dim=-1)
+            self._task_space_target[:] = task_space_command.squeeze(dim=-1) @ self._command_scale
             self._p_gains[:] = stiffness
             self._d_gains[:] = 2 * torch.sqrt(self._p_gains)  # critically damped
         elif self.cfg.impedance_mode == "variable":
@@ -224,7 +502,7 @@ class OperationSpaceController:
             stiffness = stiffness.clip_(min=self._p_gains_limits[0], max=self._p_gains_limits[1])
             damping_ratio = damping_ratio.clip_(min=self._damping_ratio_limits[0], max=self._damping_ratio_limits[1])
             # joint positions + stiffness + damping
-            self._task_space_target[:] = task_space_command
+            self._task_space_target[:] = task_space_command @ self._command_scale
             self._p_gains[:] = stiffness
             self._d_gains[:] = 2 * torch.sqrt(self._p_gains) * damping_ratio
         else:
@@ -253,123 +531,456 @@ class OperationSpaceController:
             gravity: The joint-space gravity vector. Defaults to None.
 
         Raises:
-            ValueError: When the end-effector pose is not provided for the 'position_rel' command.
-            ValueError: When the end-effector pose is not provided for the 'position_abs' command.
-            ValueError: When the end-effector pose is not provided for the 'pose_rel' command.
-            ValueError: When an invalid command type is provided.
-            ValueError: When motion-control is enabled but the end-effector pose or velocity is not provided.
-            ValueError: When force-control is enabled but the end-effector force is not provided.
-            ValueError: When inertial compensation is enabled but the mass matrix  is not provided.
-            ValueError: When gravity compensation is enabled but the gravity vector is not provided.
+            ValueError: When an input required by the command layout or the compensation terms is not provided.
 
         Returns:
             The target joint torques commands.
         """
-        # buffers for motion/force control
-        desired_ee_pos = None
-        desired_ee_rot = None
-        desired_ee_force = None
+        # check inputs required by the compiled command layout
+        self._check_inputs(ee_pose=ee_pose, ee_vel=ee_vel, ee_force=ee_force, mass_matrix=mass_matrix, gravity=gravity)
         # resolve the commands
-        target_groups = torch.split(self._task_space_target, self.target_list)
-        for command_type, target in zip(self.cfg.command_types, target_groups):
-            if command_type == "position_rel":
-                # check input is provided
-                if ee_pose is None:
-                    raise ValueError("End-effector pose is required for 'position_rel' command.")
-                # scale command
-                target @= self._position_command_scale
-                # compute targets
-                desired_ee_pos = ee_pose[:, :3] + target
-                desired_ee_rot = ee_pose[:, 3:]
-            elif command_type == "position_abs":
-                # check input is provided
-                if ee_pose is None:
-                    raise ValueError("End-effector pose is required for 'position_abs' command.")
-                # compute targets
-                desired_ee_pos = target
-                desired_ee_rot = ee_pose[:, 3:]
-            elif command_type == "pose_rel":
-                # check input is provided
-                if ee_pose is None:
-                    raise ValueError("End-effector pose is required for 'pose_rel' command.")
-                # scale command
-                target[:, 0:3] @= self._position_command_scale
-                target[:, 3:6] @= self._rotation_command_scale
-                # compute targets
-                desired_ee_pos, desired_ee_rot = apply_delta_pose(ee_pose[:, :3], ee_pose[:, 3:], target)
-            elif command_type == "pose_abs":
-                # compute targets
-                desired_ee_pos = target[:, 0:3]
-                desired_ee_rot = target[:, 3:7]
-            elif command_type == "force_abs":
-                # compute targets
-                desired_ee_force = target
-            else:
-                raise ValueError(f"Invalid control command: {self.cfg.command_type}.")
+        desired_ee_pos, desired_ee_rot = self._motion_target_fn(self._task_space_target, ee_pose)
+        # intermediate results are written into the preallocated workspace
+        ws = self._workspace
 
         # reset desired joint torques
-        self._desired_torques[:] = 0
+        self._desired_torques.zero_()
         # compute for motion-control
-        if desired_ee_pos is not None:
-            # check input is provided
-            if ee_pose is None or ee_vel is None:
-                raise ValueError("End-effector pose and velocity are required for motion control.")
+        if self._motion_target_slice is not None:
             # -- end-effector tracking error
-            pose_error = compute_pose_error(
-                ee_pose[:, :3], ee_pose[:, 3:], desired_ee_pos, desired_ee_rot, rot_error_type="axis_angle"
-            )
-            velocity_error = -ee_vel  # zero target velocity
+            pose_error = self._compute_pose_error(ee_pose, desired_ee_pos, desired_ee_rot)
             # -- desired end-effector acceleration (spring damped system)
-            des_ee_acc = self._p_gains * pose_error + self._d_gains * velocity_error
+            # note: zero target velocity, i.e. the velocity error is -ee_vel
+            des_ee_acc = torch.mul(self._p_gains, pose_error, out=ws.des_ee_acc)
+            des_ee_acc.addcmul_(self._d_gains, ee_vel, value=-1.0)
             # -- inertial compensation
             if self.cfg.inertial_compensation:
-                # check input is provided
-                if mass_matrix is None:
-                    raise ValueError("Mass matrix is required for inertial compensation.")
                 # compute task-space dynamics quantities
                 # wrench = (J M^(-1) J^T)^(-1) * \ddot(x_des)
-                mass_matrix_inv = torch.inverse(mass_matrix)
-                if self.cfg.uncouple_motion_wrench:
-                    # decoupled-mass matrices
-                    lambda_pos = torch.inverse(jacobian[:, 0:3] @ mass_matrix_inv * jacobian[:, 0:3].T)
-                    lambda_ori = torch.inverse(jacobian[:, 3:6] @ mass_matrix_inv * jacobian[:, 3:6].T)
-                    # desired end-effector wrench (from pseudo-dynamics)
-                    decoupled_force = lambda_pos @ des_ee_acc[:, 0:3]
-                    decoupled_torque = lambda_ori @ des_ee_acc[:, 3:6]
-                    des_motion_wrench = torch.cat(decoupled_force, decoupled_torque)
-                else:
-                    # coupled dynamics
-                    lambda_full = torch.inverse(jacobian @ mass_matrix_inv * jacobian.T)
-                    # desired end-effector wrench (from pseudo-dynamics)
-                    des_motion_wrench = lambda_full @ des_ee_acc
+                des_motion_wrench = self._task_space_wrench_fn(jacobian, mass_matrix, des_ee_acc)
             else:
                 # task-space impedance control
                 # wrench = \ddot(x_des)
                 des_motion_wrench = des_ee_acc
             # -- joint-space wrench
-            self._desired_torques += jacobian.T @ self._selection_matrix_motion @ des_motion_wrench
+            torch.mul(des_motion_wrench, self._selection_matrix_motion, out=ws.selected_wrench)
+            self._desired_torques.unsqueeze(-1).baddbmm_(jacobian.transpose(1, 2), ws.selected_wrench.unsqueeze(-1))
 
         # compute for force control
-        if desired_ee_force is not None:
+        if self._force_target_slice is not None:
+            desired_ee_force = self._task_space_target[:, self._force_target_slice]
             # -- task-space wrench
-            if self.cfg.stiffness is not None:
-                # check input is provided
-                if ee_force is None:
-                    raise ValueError("End-effector force is required for closed-loop force control.")
+            if self._p_wrench_gains is not None:
                 # closed-loop control
-                des_force_wrench = desired_ee_force + self._p_wrench_gains * (desired_ee_force - ee_force)
+                des_force_wrench = torch.sub(desired_ee_force, ee_force, out=ws.des_force_wrench)
+                des_force_wrench.mul_(self._p_wrench_gains).add_(desired_ee_force)
             else:
                 # open-loop control
                 des_force_wrench = desired_ee_force
             # -- joint-space wrench
-            self._desired_torques += jacobian.T @ self._selection_matrix_force @ des_force_wrench
+            torch.mul(des_force_wrench, self._selection_matrix_force, out=ws.selected_wrench)
+            self._desired_torques.unsqueeze(-1).baddbmm_(jacobian.transpose(1, 2), ws.selected_wrench.unsqueeze(-1))
 
         # add gravity compensation (bias correction)
         if self.cfg.gravity_compensation:
-            # check input is provided
-            if gravity is None:
-                raise ValueError("Gravity vector is required for gravity compensation.")
             # add gravity compensation
-            self._desired_torques += gravity
+            self._desired_torques.add_(gravity)
+
+        return self._desired_torques
+
+    """
+    Helper functions.
+    """
+
+    def _check_inputs(self, **inputs: torch.Tensor | None):
+        """Checks that the inputs required by the compiled command layout are provided.
+
+        Raises:
+            ValueError: When a required input is not provided.
+        """
+        for name, msg in self._required_inputs:
+            if inputs[name] is None:
+                raise ValueError(msg)
+
+    def _compute_pose_error(
+        self, ee_pose: torch.Tensor, desired_ee_pos: torch.Tensor, desired_ee_rot: torch.Tensor, eps: float = 1e-6
+    ) -> torch.Tensor:
+        """Computes the position and axis-angle orientation error of the end-effector in place.
+
+        This mirrors :meth:`omni.isaac.lab.utils.math.compute_pose_error` with ``rot_error_type="axis_angle"``
+        but writes all intermediate results into the workspace.
+
+        Returns:
+            The pose error (position, axis-angle). Shape is (num_robots, 6).
+        """
+        ws = self._workspace
+        s0, s1, s2 = ws.quat_scalars
+        # position error
+        torch.sub(desired_ee_pos, ee_pose[:, 0:3], out=ws.pose_error[:, 0:3])
+        # inverse of the current orientation: q^-1 = q^* / |q|^2
+        torch.mul(ee_pose[:, 3:7], self._quat_conj_sign, out=ws.quat_conj)
+        torch.sum(torch.square(ee_pose[:, 3:7], out=ws.quat_error), dim=-1, keepdim=True, out=s0)
+        ws.quat_conj.div_(s0)
+        # orientation error: q_err = q_des * q^-1 = L(q_des) @ q^-1
+        torch.index_select(desired_ee_rot, 1, self._quat_left_index, out=ws.quat_left)
+        ws.quat_left.mul_(self._quat_left_sign)
+        torch.bmm(ws.quat_left.view(-1, 4, 4), ws.quat_conj.unsqueeze(-1), out=ws.quat_error.unsqueeze(-1))
+        # convert to axis-angle (shortest rotation)
+        quat_w = ws.quat_error[:, 0:1]
+        ws.quat_error.mul_(torch.copysign(ws.quat_ones, quat_w, out=s0))
+        torch.linalg.vector_norm(ws.quat_error[:, 1:4], dim=-1, keepdim=True, out=s1)
+        half_angle = torch.atan2(s1, quat_w, out=s1)
+        # -- sin(angle / 2) / angle with a Taylor expansion around zero
+        ratio = torch.sin(half_angle, out=s2).div_(torch.mul(half_angle, 2.0, out=s0))
+        taylor = s0.square_().mul_(-1.0 / 48.0).add_(0.5)
+        torch.where(torch.gt(half_angle, 0.5 * eps, out=ws.angle_mask), ratio, taylor, out=ratio)
+        torch.div(ws.quat_error[:, 1:4], ratio, out=ws.pose_error[:, 3:6])
+        return ws.pose_error
+
+    def _resolve_position_rel_target(
+        self, task_space_target: torch.Tensor, ee_pose: torch.Tensor
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        """Resolves the desired end-effector pose for the 'position_rel' command."""
+        target = task_space_target[:, self._motion_target_slice]
+        return torch.add(ee_pose[:, :3], target, out=self._workspace.desired_ee_pos), ee_pose[:, 3:]
+
+    def _resolve_position_abs_target(
+        self, task_space_target: torch.Tensor, ee_pose: torch.Tensor
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        """Resolves the desired end-effector pose for the 'position_abs' command."""
+        target = task_space_target[:, self._motion_target_slice]
+        return target, ee_pose[:, 3:]
+
+    def _resolve_pose_rel_target(
+        self, task_space_target: torch.Tensor, ee_pose: torch.Tensor
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        """Resolves the desired end-effector pose for the 'pose_rel' command."""
+        target = task_space_target[:, self._motion_target_slice]
+        return apply_delta_pose(ee_pose[:, :3], ee_pose[:, 3:], target)
+
+    def _resolve_pose_abs_target(
+        self, task_space_target: torch.Tensor, ee_pose: torch.Tensor
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        """Resolves the desired end-effector pose for the 'pose_abs' command."""
+        target = task_space_target[:, self._motion_target_slice]
+        return target[:, 0:3], target[:, 3:7]
+
+    def _resolve_no_motion_target(
+        self, task_space_target: torch.Tensor, ee_pose: torch.Tensor | None
+    ) -> tuple[None, None]:
+        """Resolves the desired end-effector pose when no motion command is present."""
+        return None, None
+
+
+@configclass
+class WBCTaskCfg:
+    """Configuration for a task of the whole-body controller."""
+
+    name: str = MISSING
+    """Name of the task. Used to report the per-task timings."""
+
+    task_type: str = MISSING
+    """Type of the task: "com", "position", "orientation", "pose" or "joint".
+
+    The task-space command of each type is a relative target w.r.t. the current task value:
+        - "com": center-of-mass position offset (3)
+        - "position": body position offset (3)
+        - "orientation": body orientation offset as axis-angle (3)
+        - "pose": body position and axis-angle offset (6)
+        - "joint": joint position offset (num_joints)
+    """
+
+    body_name: str | None = None
+    """Name of the body for the "position", "orientation" and "pose" tasks.
+
+    If None, the task is applied to the target frame of the action term (including its offset).
+    """
+
+    gain: float = 1.0
+    """Gain applied to the task error when resolving the joint displacement."""
+
+    gait_leg: int | None = None
+    """Index of the leg driven by the task in the gait schedule. Defaults to None (not part of the gait).
+
+    When the action term follows a gait schedule, the relative command of the task is zeroed while the leg is
+    scheduled in contact, so that the foot holds its position.
+    """
+
+
+@configclass
+class WBCControllerCfg:
+    """Configuration for the hierarchical whole-body controller."""
+
+    tasks: Sequence[WBCTaskCfg] = MISSING
+    """The tasks of the controller ordered from the highest to the lowest priority."""
+
+    damping: float = 0.05
+    """Damping of the damped least-squares pseudo-inverse used for each (projected) task Jacobian."""
+
+    profile: bool = False
+    """Whether to record the time spent on each task. Defaults to False.
+
+    Note: Reading :attr:`WBCController.task_timings` synchronizes the device.
+    """
+
+
+class WBCController:
+    r"""Hierarchical whole-body controller (stack-of-tasks) with recursive null-space projection.
+
+    The controller resolves a joint displacement :math:`\Delta q` that tracks a set of prioritized tasks.
+    For the task :math:`i` with Jacobian :math:`J_i` and error :math:`e_i`, the update is
+
+    .. math::
+
+        \hat{J}_i &= J_i N_{i-1} \\
+        \Delta q_i &= \Delta q_{i-1} + \hat{J}_i^{+} (k_i e_i - J_i \Delta q_{i-1}) \\
+        N_i &= N_{i-1} - \hat{J}_i^{+} \hat{J}_i
+
+    where :math:`N_0 = I` and :math:`(\cdot)^{+}` is the damped least-squares pseudo-inverse, computed with a
+    Cholesky solve. All environments are solved together in batched linear algebra; only the (few) tasks are
+    iterated in Python.
+
+    For floating-base robots, the task Jacobians include the six (unactuated) base velocity columns. The
+    hierarchy is then resolved over the generalized coordinates and only the joint displacement is returned,
+    so that the base motion is realized through the higher-priority (e.g. contact) tasks.
+
+    Reference:
+        [1] B. Siciliano, J.-J. Slotine, "A general framework for managing multiple tasks in highly redundant
+            robotic systems", ICAR 1991.
+    """
+
+    def __init__(
+        self, cfg: WBCControllerCfg, num_envs: int, num_joints: int, device: str, floating_base: bool = False
+    ):
+        """Initialize the whole-body controller.
+
+        Args:
+            cfg: The configuration for the whole-body controller.
+            num_envs: The number of environments.
+            num_joints: The number of controlled joints.
+            device: The device to use for computations.
+            floating_base: Whether the task Jacobians include the six floating-base columns. Defaults to False.
+
+        Raises:
+            ValueError: When an invalid task type is provided.
+        """
+        # store inputs
+        self.cfg = cfg
+        self.num_envs = num_envs
+        self.num_joints = num_joints
+        self.num_base_dofs = 6 if floating_base else 0
+        self.num_dofs = self.num_base_dofs + self.num_joints
+        self._device = device
 
-        return self._desired_torques
\ No newline at end of file
+        # resolve the task dimensions and the command layout
+        self._task_dims = list()
+        self._task_slices = list()
+        for task in self.cfg.tasks:
+            if task.task_type in ("com", "position", "orientation"):
+                dim = 3
+            elif task.task_type == "pose":
+                dim = 6
+            elif task.task_type == "joint":
+                dim = self.num_joints
+            else:
+                raise ValueError(f"Invalid task type for task '{task.name}': {task.task_type}.")
+            start = sum(self._task_dims)
+            self._task_dims.append(dim)
+            self._task_slices.append(slice(start, start + dim))
+
+        # create buffers
+        # -- desired task values (position, quaternion, pose or joint positions)
+        self._desired_task_values = list()
+        for task, dim in zip(self.cfg.tasks, self._task_dims):
+            if task.task_type in ("orientation", "pose"):
+                self._desired_task_values.append(torch.zeros(self.num_envs, dim + 1, device=self._device))
+            else:
+                self._desired_task_values.append(torch.zeros(self.num_envs, dim, device=self._device))
+        # -- identity matrices
+        self._eye_dofs = torch.eye(self.num_dofs, device=self._device)
+        self._eye_tasks = [torch.eye(dim, device=self._device) for dim in self._task_dims]
+        # -- jacobian of the joint tasks: [0 | I]
+        self._joint_task_jacobian = self._eye_dofs[self.num_base_dofs :]
+        # -- task errors of the last solve
+        self._task_errors = {
+            task.name: torch.zeros(self.num_envs, dim, device=self._device)
+            for task, dim in zip(self.cfg.tasks, self._task_dims)
+        }
+        # -- per-task timings
+        self._task_timings = {task.name: 0.0 for task in self.cfg.tasks}
+        if self.cfg.profile and torch.device(self._device).type == "cuda":
+            self._timing_events = [
+                (torch.cuda.Event(enable_timing=True), torch.cuda.Event(enable_timing=True)) for _ in self.cfg.tasks
+            ]
+        else:
+            self._timing_events = None
+
+    """
+    Properties.
+    """
+
+    @property
+    def action_dim(self) -> int:
+        """Dimension of the action space of controller."""
+        return sum(self._task_dims)
+
+    @property
+    def task_slices(self) -> list[slice]:
+        """Slice of each task in the action (command) vector."""
+        return self._task_slices
+
+    @property
+    def task_errors(self) -> dict[str, torch.Tensor]:
+        """Error of each task at the last call of :meth:`compute`. Shape of each is (num_envs, task_dim)."""
+        return self._task_errors
+
+    @property
+    def task_timings(self) -> dict[str, float]:
+        """Time spent on each task in the last call of :meth:`compute` in milliseconds.
+
+        Only recorded when :attr:`WBCControllerCfg.profile` is True. On CUDA devices, reading the timings
+        synchronizes the device.
+        """
+        if self._timing_events is not None:
+            torch.cuda.synchronize(self._device)
+            for task, (start, end) in zip(self.cfg.tasks, self._timing_events):
+                self._task_timings[task.name] = start.elapsed_time(end)
+        return self._task_timings
+
+    """
+    Operations.
+    """
+
+    def reset(self, env_ids: torch.Tensor = None):
+        """Reset the internals."""
+        pass
+
+    def set_command(self, command: torch.Tensor, task_values: Sequence[torch.Tensor]):
+        """Set the relative task-space command.
+
+        Args:
+            command: The relative task-space command. Shape is (num_envs, action_dim).
+            task_values: The current value of each task: positions (num_envs, 3), quaternions (num_envs, 4),
+                poses (num_envs, 7) or joint positions (num_envs, num_joints).
+        """
+        for task, task_slice, value, desired in zip(
+            self.cfg.tasks, self._task_slices, task_values, self._desired_task_values
+        ):
+            task_command = command[:, task_slice]
+            if task.task_type == "orientation":
+                desired[:] = _apply_delta_rotation(value, task_command)
+            elif task.task_type == "pose":
+                desired[:, 0:3] = value[:, 0:3] + task_command[:, 0:3]
+                desired[:, 3:7] = _apply_delta_rotation(value[:, 3:7], task_command[:, 3:6])
+            else:
+                desired[:] = value + task_command
+
+    def compute(
+        self, task_values: Sequence[torch.Tensor], jacobians: Sequence[torch.Tensor | None], joint_pos: torch.Tensor
+    ) -> torch.Tensor:
+        """Computes the target joint positions that track the prioritized tasks.
+
+        Args:
+            task_values: The current value of each task. See :meth:`set_command` for the shapes.
+            jacobians: The Jacobian of each task. Shape is (num_envs, task_dim, num_dofs), where the first
+                six columns are the floating-base columns (if any). For "joint" tasks, None can be passed
+                to use the joint selection matrix.
+            joint_pos: The current joint positions. Shape is (num_envs, num_joints).
+
+        Returns:
+            The target joint positions. Shape is (num_envs, num_joints).
+        """
+        # accumulated joint displacement and null-space projector of the higher-priority tasks
+        delta_dof_pos = torch.zeros(self.num_envs, self.num_dofs, device=self._device)
+        null_space = self._eye_dofs.expand(self.num_envs, -1, -1)
+        num_tasks = len(self.cfg.tasks)
+        for index, (task, value, desired, jacobian, eye_task) in enumerate(
+            zip(self.cfg.tasks, task_values, self._desired_task_values, jacobians, self._eye_tasks)
+        ):
+            if self._timing_events is not None:
+                self._timing_events[index][0].record()
+            elif self.cfg.profile:
+                start_time = time.perf_counter()
+            # -- task error
+            error = _compute_task_error(task.task_type, value, desired)
+            self._task_errors[task.name] = error
+            if jacobian is None:
+                jacobian = self._joint_task_jacobian.expand(self.num_envs, -1, -1)
+            # -- projected jacobian: J_i N_{i-1}
+            jacobian_proj = jacobian @ null_space
+            # -- damped least-squares: J^+ = J^T (J J^T + lambda^2 I)^-1
+            # note: the error flags of the factorization are not checked since it would sync with the host
+            chol, _ = torch.linalg.cholesky_ex(
+                torch.baddbmm(
+                    eye_task.expand(self.num_envs, -1, -1),
+                    jacobian_proj,
+                    jacobian_proj.transpose(1, 2),
+                    beta=self.cfg.damping**2,
+                )
+            )
+            residual = task.gain * error - torch.bmm(jacobian, delta_dof_pos.unsqueeze(-1)).squeeze(-1)
+            delta_dof_pos = delta_dof_pos + torch.bmm(
+                jacobian_proj.transpose(1, 2), torch.cholesky_solve(residual.unsqueeze(-1), chol)
+            ).squeeze(-1)
+            # -- null-space of the task: N_i = N_{i-1} - J^+ J
+            if index < num_tasks - 1:
+                null_space = null_space - jacobian_proj.transpose(1, 2) @ torch.cholesky_solve(jacobian_proj, chol)
+            if self._timing_events is not None:
+                self._timing_events[index][1].record()
+            elif self.cfg.profile:
+                self._task_timings[task.name] = (time.perf_counter() - start_time) * 1e3
+
+        # only the joint displacement can be commanded
+        return joint_pos + delta_dof_pos[:, self.num_base_dofs :]
+
+
+def _damped_cholesky(
+    matrix: torch.Tensor, threshold: float, damping: float, damped: torch.Tensor, out: torch.Tensor | None = None
+) -> torch.Tensor:
+    """Factorizes a batch of small symmetric matrices column by column, damping the small pivots per matrix.
+
+    The pivots of the matrices marked in ``damped`` and the pivots below the threshold are increased by the damping.
+    Once a pivot of a matrix is damped, all its following pivots are damped too. The factor is therefore the one of
+    :math:`A + \\lambda^2 D` with a diagonal :math:`D` of zeros followed by ones, which is :math:`A + \\lambda^2 I`
+    for the matrices marked beforehand. The matrices with a damped pivot are marked in ``damped`` (in place).
+
+    Args:
+        matrix: The matrices to factorize. Shape is (N, n, n).
+        threshold: Smallest admissible pivot. Must be positive.
+        damping: Damping added to the damped pivots.
+        damped: Whether to damp all pivots of each matrix. Updated in place. Shape is (N,).
+        out: The buffer to write the lower-triangular factors into. Defaults to None.
+
+    Returns:
+        The lower-triangular factors. Shape is (N, n, n).
+    """
+    chol = torch.zeros_like(matrix) if out is None else out.zero_()
+    for j in range(matrix.shape[-1]):
+        row = chol[:, j, :j]
+        pivot = matrix[:, j, j] - (row * row).sum(dim=-1)
+        damped.logical_or_(pivot < threshold)
+        # note: the clamping only guards against matrices that are indefinite beyond the damping
+        pivot = torch.clamp_min(pivot + damping * damped, threshold).sqrt_()
+        chol[:, j, j] = pivot
+        column = matrix[:, j + 1 :, j] - torch.bmm(chol[:, j + 1 :, :j], row.unsqueeze(-1)).squeeze(-1)
+        chol[:, j + 1 :, j] = column / pivot.unsqueeze(-1)
+    return chol
+
+
+def _apply_delta_rotation(quat: torch.Tensor, delta_rot: torch.Tensor, eps: float = 1.0e-6) -> torch.Tensor:
+    """Rotates the quaternions (w, x, y, z) by an axis-angle offset expressed in the same frame."""
+    angle = torch.linalg.vector_norm(delta_rot, dim=-1)
+    axis = delta_rot / angle.clamp_min(eps).unsqueeze(-1)
+    # note: the axis vanishes for small angles, which yields the identity rotation
+    return quat_mul(quat_from_angle_axis(angle, axis), quat)
+
+
+def _compute_task_error(task_type: str, value: torch.Tensor, desired: torch.Tensor) -> torch.Tensor:
+    """Computes the error of a task from its current and desired values."""
+    if task_type == "orientation":
+        return axis_angle_from_quat(quat_mul(desired, quat_conjugate(value)))
+    elif task_type == "pose":
+        rot_error = axis_angle_from_quat(quat_mul(desired[:, 3:7], quat_conjugate(value[:, 3:7])))
+        return torch.cat((desired[:, 0:3] - value[:, 0:3], rot_error), dim=-1)
+    else:
+        return desired - value
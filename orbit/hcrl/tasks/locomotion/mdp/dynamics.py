@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import torch
+
+from .kinematics import KinematicTree
+
+
+class RigidBodyDynamics(KinematicTree):
+    r"""Batched rigid-body dynamics of a fixed-base kinematic tree parsed from a URDF.
+
+    The algorithms are written with spatial vectors expressed in the root frame at its origin (angular part first),
+    so that all links share a single coordinate frame and the recursions over the tree reduce to sums over the
+    support (ancestors) and subtree (descendants) matrices of the links. This replaces the per-link loops of the
+    classical formulations with a few batched contractions that run for thousands of robots at once:
+
+    * :meth:`mass_matrix`: composite-rigid-body algorithm (CRBA).
+    * :meth:`inverse_dynamics` and :meth:`bias_forces`: recursive Newton-Euler algorithm (RNEA).
+    * :meth:`gravity_forces`: gravity terms from the subtree masses and centers of mass only.
+    * :meth:`centroidal_momentum_matrix`: centroidal momentum matrix from the composite inertias.
+
+    The equations of motion are :math:`M(q) \ddot{q} + b(q, \dot{q}) = \tau`. For floating-base robots, the root is
+    treated as fixed and the gravity vector must be given in the root frame (e.g. from the projected gravity).
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the dynamics model. See :class:`KinematicTree` for the arguments."""
+        super().__init__(*args, **kwargs)
+        # subtree of the links: whether a link is a descendant (or the link itself) of another
+        ancestors = torch.eye(self.num_links, device=self._device, dtype=self._support.dtype)
+        parents = self._parents.tolist()
+        for link in range(1, self.num_links):
+            ancestors[link] += ancestors[parents[link]]
+        self._subtree = ancestors.T.contiguous()
+        # joints that are ancestors of (or equal to) other joints: entry (j, i) is True if j supports i
+        self._joint_support = self._support[self._joint_links].T.bool()
+        # default gravity in the root frame
+        self._gravity = torch.tensor([0.0, 0.0, -9.81], device=self._device, dtype=self._support.dtype)
+
+    """
+    Operations.
+    """
+
+    def mass_matrix(self, joint_pos: torch.Tensor) -> torch.Tensor:
+        """Computes the joint-space mass matrix with the composite-rigid-body algorithm.
+
+        Args:
+            joint_pos: The joint positions. Shape is (N, num_joints).
+
+        Returns:
+            The mass matrix. Shape is (N, num_joints, num_joints).
+        """
+        link_pos, link_rot = self.forward_kinematics(joint_pos)
+        motion_subspaces = self._motion_subspaces(link_pos, link_rot)
+        composite_forces = self._composite_forces(link_pos, link_rot, motion_subspaces)
+        # M[j, i] = s_j . (I^c_i s_i) for joint j supporting joint i, mirrored otherwise
+        mass_matrix = motion_subspaces @ composite_forces.transpose(1, 2)
+        return torch.where(
+            self._joint_support,
+            mass_matrix,
+            torch.where(self._joint_support.T, mass_matrix.transpose(1, 2), torch.zeros_like(mass_matrix)),
+        )
+
+    def inverse_dynamics(
+        self,
+        joint_pos: torch.Tensor,
+        joint_vel: torch.Tensor,
+        joint_acc: torch.Tensor,
+        gravity: torch.Tensor | None = None,
+    ) -> torch.Tensor:
+        """Computes the joint torques that produce the joint accelerations with the recursive Newton-Euler algorithm.
+
+        Args:
+            joint_pos: The joint positions. Shape is (N, num_joints).
+            joint_vel: The joint velocities. Shape is (N, num_joints).
+            joint_acc: The joint accelerations. Shape is (N, num_joints).
+            gravity: The gravity vector in the root frame. Shape is (N, 3) or (3,). Defaults to None,
+                in which case the gravity is (0, 0, -9.81).
+
+        Returns:
+            The joint torques. Shape is (N, num_joints).
+        """
+        link_pos, link_rot = self.forward_kinematics(joint_pos)
+        motion_subspaces = self._motion_subspaces(link_pos, link_rot)
+        link_inertias = self._spatial_inertias(link_pos, link_rot)
+        # forward pass: spatial velocities of the links
+        link_vel = self._support @ (motion_subspaces * joint_vel.unsqueeze(-1))
+        # forward pass: spatial accelerations of the links (gravity as an upward acceleration of the root)
+        # note: the derivative of a motion subspace is v_child x s since it is fixed in the child link
+        subspaces_dot = _cross_motion(link_vel[:, self._joint_links], motion_subspaces)
+        joint_terms = motion_subspaces * joint_acc.unsqueeze(-1) + subspaces_dot * joint_vel.unsqueeze(-1)
+        link_acc = self._support @ joint_terms
+        gravity = self._gravity if gravity is None else gravity
+        link_acc[..., 3:6] -= gravity.view(-1, 1, 3)
+        # backward pass: net forces of the links accumulated over the subtrees
+        momenta = (link_inertias @ link_vel.unsqueeze(-1)).squeeze(-1)
+        link_forces = (link_inertias @ link_acc.unsqueeze(-1)).squeeze(-1) + _cross_force(link_vel, momenta)
+        composite_forces = self._subtree @ link_forces
+        # projection onto the joint motion subspaces
+        return (motion_subspaces * composite_forces[:, self._joint_links]).sum(dim=-1)
+
+    def bias_forces(
+        self, joint_pos: torch.Tensor, joint_vel: torch.Tensor, gravity: torch.Tensor | None = None
+    ) -> torch.Tensor:
+        """Computes the Coriolis, centrifugal and gravity torques.
+
+        Args:
+            joint_pos: The joint positions. Shape is (N, num_joints).
+            joint_vel: The joint velocities. Shape is (N, num_joints).
+            gravity: The gravity vector in the root frame. Shape is (N, 3) or (3,). Defaults to None.
+
+        Returns:
+            The bias torques. Shape is (N, num_joints).
+        """
+        return self.inverse_dynamics(joint_pos, joint_vel, torch.zeros_like(joint_vel), gravity)
+
+    def gravity_forces(self, joint_pos: torch.Tensor, gravity: torch.Tensor | None = None) -> torch.Tensor:
+        """Computes the gravity torques.
+
+        This is cheaper than :meth:`bias_forces` with zero velocities since it only needs the mass and the
+        center of mass of the subtree of each joint.
+
+        Args:
+            joint_pos: The joint positions. Shape is (N, num_joints).
+            gravity: The gravity vector in the root frame. Shape is (N, 3) or (3,). Defaults to None.
+
+        Returns:
+            The torques that compensate the gravity. Shape is (N, num_joints).
+        """
+        link_pos, link_rot = self.forward_kinematics(joint_pos)
+        link_coms = link_pos + (link_rot @ self._coms.unsqueeze(-1)).squeeze(-1)
+        gravity = (self._gravity if gravity is None else gravity).view(-1, 1, 3)
+        # gravity wrench of the subtrees at the root origin: (c x -m g, -m g)
+        subtree_moments = self._subtree @ (self._masses.unsqueeze(-1) * link_coms)
+        subtree_masses = self._subtree @ self._masses
+        forces = -subtree_masses.unsqueeze(-1) * gravity
+        torques = torch.cross(subtree_moments, -gravity.expand_as(subtree_moments), dim=-1)
+        wrenches = torch.cat((torques, forces.expand_as(torques)), dim=-1)
+        # projection onto the joint motion subspaces
+        motion_subspaces = self._motion_subspaces(link_pos, link_rot)
+        return (motion_subspaces * wrenches[:, self._joint_links]).sum(dim=-1)
+
+    def centroidal_momentum_matrix(self, joint_pos: torch.Tensor) -> torch.Tensor:
+        """Computes the centroidal momentum matrix, which maps the joint velocities to the momentum about the CoM.
+
+        Args:
+            joint_pos: The joint positions. Shape is (N, num_joints).
+
+        Returns:
+            The centroidal momentum matrix (linear momentum rows first). Shape is (N, 6, num_joints).
+        """
+        link_pos, link_rot = self.forward_kinematics(joint_pos)
+        motion_subspaces = self._motion_subspaces(link_pos, link_rot)
+        # momentum at the root origin per unit joint velocity: I^c_i s_i
+        momenta = self._composite_forces(link_pos, link_rot, motion_subspaces)
+        # shift the angular momentum to the center of mass
+        com = self.center_of_mass(joint_pos, link_pos, link_rot)
+        lin = momenta[..., 3:6]
+        ang = momenta[..., 0:3] - torch.cross(com.unsqueeze(1).expand_as(lin), lin, dim=-1)
+        return torch.cat((lin, ang), dim=-1).transpose(1, 2)
+
+    """
+    Helper functions.
+    """
+
+    def _motion_subspaces(self, link_pos: torch.Tensor, link_rot: torch.Tensor) -> torch.Tensor:
+        """Computes the spatial motion subspaces of the joints at the root origin. Shape is (N, num_joints, 6)."""
+        joint_axes, joint_origins = self._joint_frames(link_pos, link_rot)
+        revolute = self._joint_is_revolute.view(1, -1, 1)
+        # -- revolute: (a, p x a), prismatic: (0, a)
+        ang = revolute * joint_axes
+        lin = revolute * torch.cross(joint_origins, joint_axes, dim=-1) + (1.0 - revolute) * joint_axes
+        return torch.cat((ang, lin), dim=-1)
+
+    def _spatial_inertias(self, link_pos: torch.Tensor, link_rot: torch.Tensor) -> torch.Tensor:
+        """Computes the spatial inertias of the links at the root origin. Shape is (N, num_links, 6, 6)."""
+        link_coms = link_pos + (link_rot @ self._coms.unsqueeze(-1)).squeeze(-1)
+        rot_inertias = link_rot @ self._inertias @ link_rot.transpose(-1, -2)
+        masses = self._masses.view(1, -1, 1, 1)
+        # skew-symmetric matrices of the centers of mass
+        x, y, z = link_coms.unbind(-1)
+        zeros = torch.zeros_like(x)
+        com_skew = torch.stack((zeros, -z, y, z, zeros, -x, -y, x, zeros), dim=-1).view(*link_coms.shape, 3)
+        # [[I_c + m [c] [c]^T, m [c]], [m [c]^T, m 1]]
+        eye = torch.eye(3, dtype=link_pos.dtype, device=link_pos.device)
+        top = torch.cat((rot_inertias + masses * com_skew @ com_skew.transpose(-1, -2), masses * com_skew), dim=-1)
+        bottom = torch.cat((masses * com_skew.transpose(-1, -2), masses * eye), dim=-1)
+        return torch.cat((top, bottom), dim=-2)
+
+    def _composite_forces(
+        self, link_pos: torch.Tensor, link_rot: torch.Tensor, motion_subspaces: torch.Tensor
+    ) -> torch.Tensor:
+        """Computes the composite inertias of the joint subtrees times their motion subspaces.
+
+        Since all spatial inertias are expressed at the root origin, the composite inertias of the subtrees are
+        plain sums over the subtree matrix. Shape is (N, num_joints, 6).
+        """
+        link_inertias = self._spatial_inertias(link_pos, link_rot)
+        num_envs = link_inertias.shape[0]
+        composite_inertias = (self._subtree @ link_inertias.view(num_envs, self.num_links, 36)).view_as(link_inertias)
+        return (composite_inertias[:, self._joint_links] @ motion_subspaces.unsqueeze(-1)).squeeze(-1)
+
+
+def _cross_motion(v: torch.Tensor, m: torch.Tensor) -> torch.Tensor:
+    """Spatial cross product of motion vectors: v x m (angular part first)."""
+    w, u = v[..., 0:3], v[..., 3:6]
+    m_ang, m_lin = m[..., 0:3], m[..., 3:6]
+    return torch.cat(
+        (torch.cross(w, m_ang, dim=-1), torch.cross(w, m_lin, dim=-1) + torch.cross(u, m_ang, dim=-1)), dim=-1
+    )
+
+
+def _cross_force(v: torch.Tensor, f: torch.Tensor) -> torch.Tensor:
+    """Spatial cross product of a motion vector with a force vector: v x* f (angular part first)."""
+    w, u = v[..., 0:3], v[..., 3:6]
+    f_ang, f_lin = f[..., 0:3], f[..., 3:6]
+    return torch.cat(
+        (torch.cross(w, f_ang, dim=-1) + torch.cross(u, f_lin, dim=-1), torch.cross(w, f_lin, dim=-1)), dim=-1
+    )
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import torch
+from collections.abc import Sequence
+from dataclasses import MISSING
+
+from omni.isaac.lab.utils import configclass
+
+GAIT_STAND_UP = 0
+"""Gait state in which the robot stands up with all legs in contact."""
+GAIT_STANCE = 1
+"""Gait state in which the robot stands still with all legs in contact."""
+GAIT_SWING = 2
+"""Gait state in which the legs follow the periodic contact schedule (swing and stance phases)."""
+
+
+@configclass
+class GaitSchedulerCfg:
+    """Configuration for the gait scheduler."""
+
+    phase_offsets: list[float] = MISSING
+    """Phase offset of each leg in the gait cycle, in [0, 1). Defines the number and the order of the legs."""
+
+    period: float = 0.5
+    """Default duration of a gait cycle (in s). Can be changed per environment with
+    :meth:`GaitScheduler.set_period`."""
+
+    duty_factor: float = 0.6
+    """Fraction of the gait cycle that each leg spends in contact, in (0, 1)."""
+
+    stand_up_duration: float = 1.0
+    """Duration of the stand-up state after a reset (in s). Defaults to 1.0. Set to 0 to start in stance."""
+
+
+@configclass
+class DracoWalkGaitCfg(GaitSchedulerCfg):
+    """Biped walking gait of Draco (left, right)."""
+
+    phase_offsets: list[float] = [0.0, 0.5]
+    period: float = 0.8
+    duty_factor: float = 0.6
+
+
+@configclass
+class Go1TrotGaitCfg(GaitSchedulerCfg):
+    """Trotting gait of Go1 (FL, FR, RL, RR) with the diagonal legs in phase."""
+
+    phase_offsets: list[float] = [0.0, 0.5, 0.5, 0.0]
+    period: float = 0.4
+    duty_factor: float = 0.55
+    stand_up_duration: float = 0.5
+
+
+class GaitScheduler:
+    r"""Tensor-backed gait state machine and phase scheduler for a batch of legged robots.
+
+    Each environment has a state (:data:`GAIT_STAND_UP`, :data:`GAIT_STANCE` or :data:`GAIT_SWING`), a gait phase
+    :math:`\phi \in [0, 1)` and a period. In the swing state, the phase advances with the time and the leg
+    :math:`i` is scheduled in contact while :math:`(\phi + \phi_i) \bmod 1` is below the duty factor. In the other
+    states, all legs are scheduled in contact.
+
+    The state transitions are evaluated for all environments at once with masked updates:
+
+    * stand-up to stance: after :attr:`GaitSchedulerCfg.stand_up_duration`.
+    * stance to swing: when stepping is requested. The gait cycle restarts from zero.
+    * swing to stance: when stepping is not requested anymore and all legs are scheduled in contact
+      (or at the end of the cycle for gaits without a phase in which all legs are in contact).
+
+    The update has a constant number of tensor operations, independent of the number of environments.
+    """
+
+    def __init__(self, cfg: GaitSchedulerCfg, num_envs: int, device: str):
+        """Initialize the gait scheduler.
+
+        Args:
+            cfg: The configuration of the gait scheduler.
+            num_envs: The number of environments.
+            device: The device on which to create the buffers.
+
+        Raises:
+            ValueError: When the duty factor is not in (0, 1).
+        """
+        if not 0.0 < cfg.duty_factor < 1.0:
+            raise ValueError(f"The duty factor must be in (0, 1). Received: {cfg.duty_factor}.")
+        # store inputs
+        self.cfg = cfg
+        self.num_envs = num_envs
+        self.num_legs = len(cfg.phase_offsets)
+        self._device = device
+
+        # create buffers
+        # -- gait parameters
+        self._phase_offsets = torch.tensor(cfg.phase_offsets, device=self._device)
+        self._period = torch.full((self.num_envs,), cfg.period, device=self._device)
+        # -- state machine
+        self._state = torch.full((self.num_envs,), GAIT_STAND_UP, dtype=torch.long, device=self._device)
+        self._state_time = torch.zeros(self.num_envs, device=self._device)
+        self._phase = torch.zeros(self.num_envs, device=self._device)
+        # -- per-leg schedule
+        self._leg_phase = torch.zeros(self.num_envs, self.num_legs, device=self._device)
+        self._contact = torch.ones(self.num_envs, self.num_legs, dtype=torch.bool, device=self._device)
+        self._liftoff = torch.zeros_like(self._contact)
+        self._touchdown = torch.zeros_like(self._contact)
+        self._swing_phase = torch.zeros(self.num_envs, self.num_legs, device=self._device)
+        # initialize the state machine
+        self.reset()
+
+    """
+    Properties.
+    """
+
+    @property
+    def state(self) -> torch.Tensor:
+        """The gait state of each environment. Shape is (num_envs,)."""
+        return self._state
+
+    @property
+    def state_time(self) -> torch.Tensor:
+        """The time spent in the current gait state (in s). Shape is (num_envs,)."""
+        return self._state_time
+
+    @property
+    def phase(self) -> torch.Tensor:
+        """The phase of the gait cycle in [0, 1). Shape is (num_envs,)."""
+        return self._phase
+
+    @property
+    def period(self) -> torch.Tensor:
+        """The duration of the gait cycle (in s). Shape is (num_envs,)."""
+        return self._period
+
+    @property
+    def leg_phase(self) -> torch.Tensor:
+        """The phase of each leg in [0, 1): stance in [0, duty_factor), swing afterwards.
+        Shape is (num_envs, num_legs)."""
+        return self._leg_phase
+
+    @property
+    def contact(self) -> torch.Tensor:
+        """Whether each leg is scheduled in contact. Shape is (num_envs, num_legs)."""
+        return self._contact
+
+    @property
+    def swing_phase(self) -> torch.Tensor:
+        """The progress of each leg through its swing in [0, 1] (zero in contact). Shape is (num_envs, num_legs)."""
+        return self._swing_phase
+
+    @property
+    def liftoff(self) -> torch.Tensor:
+        """Whether each leg was scheduled to lift off at the last update. Shape is (num_envs, num_legs)."""
+        return self._liftoff
+
+    @property
+    def touchdown(self) -> torch.Tensor:
+        """Whether each leg was scheduled to touch down at the last update. Shape is (num_envs, num_legs)."""
+        return self._touchdown
+
+    @property
+    def swing_duration(self) -> torch.Tensor:
+        """The duration of the swing of each leg (in s). Shape is (num_envs,)."""
+        return (1.0 - self.cfg.duty_factor) * self._period
+
+    """
+    Operations.
+    """
+
+    def reset(self, env_ids: Sequence[int] | torch.Tensor | None = None):
+        """Resets the scheduler to the stand-up state.
+
+        Args:
+            env_ids: The environment indices. Defaults to None, in which case all environments are reset.
+        """
+        if env_ids is None:
+            env_ids = slice(None)
+        self._state[env_ids] = GAIT_STAND_UP if self.cfg.stand_up_duration > 0.0 else GAIT_STANCE
+        self._state_time[env_ids] = 0.0
+        self._phase[env_ids] = 0.0
+        self._leg_phase[env_ids] = 0.0
+        self._contact[env_ids] = True
+        self._liftoff[env_ids] = False
+        self._touchdown[env_ids] = False
+        self._swing_phase[env_ids] = 0.0
+
+    def set_period(self, period: torch.Tensor | float, env_ids: Sequence[int] | torch.Tensor | None = None):
+        """Sets the duration of the gait cycle.
+
+        Args:
+            period: The duration of the gait cycle (in s). Shape is (len(env_ids),) or scalar.
+            env_ids: The environment indices. Defaults to None, in which case all environments are set.
+        """
+        if env_ids is None:
+            env_ids = slice(None)
+        self._period[env_ids] = period
+
+    def update(self, dt: float, stepping: torch.Tensor | None = None):
+        """Advances the state machine and the gait phase of all environments.
+
+        Args:
+            dt: The time step (in s).
+            stepping: Whether stepping is requested in each environment. Shape is (num_envs,).
+                Defaults to None, in which case stepping is requested in all environments.
+        """
+        state, prev_state = self._state, self._state.clone()
+        # advance the phase of the stepping environments
+        swinging = state == GAIT_SWING
+        next_phase = self._phase + swinging * (dt / self._period)
+        wrapped = next_phase >= 1.0
+        self._phase[:] = torch.remainder(next_phase, 1.0)
+        self._state_time += dt
+        # schedule of the legs (before the transitions)
+        self._update_schedule(swinging)
+        # -- stand-up to stance
+        stand_up_done = (state == GAIT_STAND_UP) & (self._state_time >= self.cfg.stand_up_duration)
+        state.masked_fill_(stand_up_done, GAIT_STANCE)
+        # -- stance to swing (the cycle restarts from zero)
+        if stepping is None:
+            stepping = torch.ones_like(swinging)
+        start = (prev_state == GAIT_STANCE) & stepping
+        # -- swing to stance
+        stop = swinging & ~stepping & (self._contact.all(dim=-1) | wrapped)
+        state.masked_fill_(start, GAIT_SWING)
+        state.masked_fill_(stop, GAIT_STANCE)
+        self._phase.masked_fill_(start | stop, 0.0)
+        self._state_time.masked_fill_(stand_up_done | start | stop, 0.0)
+        # schedule of the legs (after the transitions)
+        prev_contact = self._contact.clone()
+        self._update_schedule(state == GAIT_SWING)
+        self._liftoff[:] = prev_contact & ~self._contact
+        self._touchdown[:] = ~prev_contact & self._contact
+
+    """
+    Helper functions.
+    """
+
+    def _update_schedule(self, swinging: torch.Tensor):
+        """Updates the phase and contact schedule of the legs from the gait phase."""
+        duty_factor = self.cfg.duty_factor
+        torch.remainder(self._phase.unsqueeze(-1) + self._phase_offsets, 1.0, out=self._leg_phase)
+        self._contact[:] = ~swinging.unsqueeze(-1) | (self._leg_phase < duty_factor)
+        swing_phase = (self._leg_phase - duty_factor) / (1.0 - duty_factor)
+        torch.where(self._contact, torch.zeros_like(swing_phase), swing_phase, out=self._swing_phase)
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import torch
+from collections.abc import Sequence
+from dataclasses import MISSING
+from typing import TYPE_CHECKING
+
+from omni.isaac.lab.managers import CommandTerm, CommandTermCfg, SceneEntityCfg
+from omni.isaac.lab.sensors import ContactSensor
+from omni.isaac.lab.utils import configclass
+
+from isaac.lab.hcrl.tasks.utils.resolution import bind_ids, resolve_body_ids
+
+if TYPE_CHECKING:
+    from omni.isaac.lab.envs import BaseEnv
+
+
+class GaitMetrics(CommandTerm):
+    r"""Running gait statistics of each foot, updated from the contact times of a contact sensor.
+
+    At every environment step, the touchdowns and liftoffs of the feet are detected from the contact state of the
+    sensor. At a touchdown, the duration of the swing that ended (the last air time) is averaged into the swing
+    duration of the foot, and at a liftoff, the duration of the stance that ended (the last contact time) into
+    its stance duration. Both are exponential moving averages over the completed phases, initialized with the
+    first phase of the episode. From them:
+
+    * the duty factor is the fraction of the stride in stance :math:`T_{st} / (T_{st} + T_{sw})` (the current
+      contact state until a whole stride is observed),
+    * the stride frequency is :math:`1 / (T_{st} + T_{sw})` (zero until a stride is observed),
+    * the asymmetry is the spread of the swing durations over the feet, relative to their mean
+      :math:`(\max T_{sw} - \min T_{sw}) / \bar{T}_{sw}` (zero for a symmetric gait).
+
+    The update is a fixed number of element-wise operations, and only the running statistics are stored, so the
+    memory is proportional to the number of environments and feet. The contact history is not stored.
+
+    The term does not command anything: it is a command term so that it is updated once per step and reset with
+    the episodes, and so that its statistics are logged per episode by the command manager (as
+    ``Metrics/<term>/duty_factor``, ``stride_frequency`` and ``asymmetry``). The observations and rewards read
+    the statistics through the term. The command is the duty factor followed by the stride frequency of each foot.
+
+    Note:
+        At most one touchdown and one liftoff per foot are detected per environment step.
+    """
+
+    cfg: GaitMetricsCfg
+    """Configuration for the gait metrics."""
+
+    def __init__(self, cfg: GaitMetricsCfg, env: BaseEnv):
+        """Initialize the gait metrics.
+
+        Args:
+            cfg: The configuration parameters of the gait metrics.
+            env: The environment object.
+
+        Raises:
+            RuntimeError: If the contact sensor does not track the air time.
+        """
+        # initialize the base class
+        super().__init__(cfg, env)
+
+        # resolve the feet of the sensor
+        self.sensor: ContactSensor = env.scene.sensors[self.cfg.sensor_cfg.name]
+        if not self.sensor.cfg.track_air_time:
+            raise RuntimeError(f"The contact sensor '{self.cfg.sensor_cfg.name}' must track the air time.")
+        foot_ids, self.foot_names = resolve_body_ids(self.sensor, self.cfg.sensor_cfg.body_names, preserve_order=True)
+        self.num_feet = len(foot_ids)
+        self._foot_ids = bind_ids(foot_ids, self.sensor.num_bodies, self.device)
+        # create buffers for the running statistics: (num_envs, num_feet)
+        self.stance_duration = torch.zeros(self.num_envs, self.num_feet, device=self.device)
+        self.swing_duration = torch.zeros_like(self.stance_duration)
+        self._num_stances = torch.zeros(self.num_envs, self.num_feet, dtype=torch.long, device=self.device)
+        self._num_swings = torch.zeros_like(self._num_stances)
+        self._contact = torch.zeros(self.num_envs, self.num_feet, dtype=torch.bool, device=self.device)
+        # -- commands: duty factor and stride frequency per foot
+        self._command = torch.zeros(self.num_envs, 2 * self.num_feet, device=self.device)
+        # -- metrics
+        self.metrics["duty_factor"] = torch.zeros(self.num_envs, device=self.device)
+        self.metrics["stride_frequency"] = torch.zeros(self.num_envs, device=self.device)
+        self.metrics["asymmetry"] = torch.zeros(self.num_envs, device=self.device)
+
+    def __str__(self) -> str:
+        msg = "GaitMetrics:\n"
+        msg += f"\tCommand dimension: {tuple(self.command.shape[1:])}\n"
+        msg += f"\tFeet: {self.foot_names}\n"
+        msg += f"\tSmoothing: {self.cfg.smoothing}"
+        return msg
+
+    """
+    Properties
+    """
+
+    @property
+    def command(self) -> torch.Tensor:
+        """The duty factor and the stride frequency of each foot. Shape is (num_envs, 2 * num_feet)."""
+        return self._command
+
+    @property
+    def duty_factor(self) -> torch.Tensor:
+        """The fraction of the stride in stance of each foot. Shape is (num_envs, num_feet)."""
+        return self._command[:, : self.num_feet]
+
+    @property
+    def stride_frequency(self) -> torch.Tensor:
+        """The stride frequency of each foot (in Hz). Shape is (num_envs, num_feet)."""
+        return self._command[:, self.num_feet :]
+
+    @property
+    def asymmetry(self) -> torch.Tensor:
+        """The spread of the swing durations over the feet relative to their mean. Shape is (num_envs,)."""
+        return self.metrics["asymmetry"]
+
+    """
+    Operations.
+    """
+
+    def reset(self, env_ids: Sequence[int] | None = None) -> dict[str, float]:
+        # log the metrics of the episodes before resetting the statistics
+        extras = super().reset(env_ids)
+        if env_ids is None:
+            env_ids = slice(None)
+        self.stance_duration[env_ids] = 0.0
+        self.swing_duration[env_ids] = 0.0
+        self._num_stances[env_ids] = 0
+        self._num_swings[env_ids] = 0
+        self._contact[env_ids] = False
+        self._command[env_ids] = 0.0
+        return extras
+
+    """
+    Implementation specific functions.
+    """
+
+    def _resample_command(self, env_ids: Sequence[int]):
+        pass
+
+    def _update_command(self):
+        """Detect the touchdowns and liftoffs of the feet and update the running statistics."""
+        contact = self.sensor.data.current_contact_time[:, self._foot_ids] > 0.0
+        last_air_time = self.sensor.data.last_air_time[:, self._foot_ids]
+        last_contact_time = self.sensor.data.last_contact_time[:, self._foot_ids]
+        # note: the air and contact times of the sensor are zero after a reset, so no phase is completed
+        touchdown = contact & ~self._contact & (last_air_time > 0.0)
+        liftoff = ~contact & self._contact & (last_contact_time > 0.0)
+        self._average(self.swing_duration, self._num_swings, last_air_time, touchdown)
+        self._average(self.stance_duration, self._num_stances, last_contact_time, liftoff)
+        self._contact[:] = contact
+        # derive the duty factor and the stride frequency
+        stride_duration = self.stance_duration + self.swing_duration
+        stride_observed = (self._num_stances > 0) & (self._num_swings > 0)
+        self.duty_factor[:] = torch.where(
+            stride_observed, self.stance_duration / stride_duration.clamp_min(1e-6), contact.float()
+        )
+        self.stride_frequency[:] = torch.where(stride_observed, 1.0 / stride_duration.clamp_min(1e-6), 0.0)
+        # update the metrics with the statistics
+        self.metrics["duty_factor"] = self.duty_factor.mean(dim=-1)
+        self.metrics["stride_frequency"] = self.stride_frequency.mean(dim=-1)
+        swing_spread = self.swing_duration.amax(dim=-1) - self.swing_duration.amin(dim=-1)
+        self.metrics["asymmetry"] = swing_spread / self.swing_duration.mean(dim=-1).clamp_min(1e-6)
+
+    def _update_metrics(self):
+        # note: the metrics are updated with the statistics in _update_command, which runs after this function
+        pass
+
+    def _average(self, average: torch.Tensor, count: torch.Tensor, value: torch.Tensor, mask: torch.Tensor):
+        """Averages the values of the completed phases into the running averages, in place."""
+        # note: the first phase initializes the average
+        weight = torch.where(count > 0, self.cfg.smoothing, 1.0) * mask
+        average.add_(weight * (value - average))
+        count.add_(mask.long())
+
+
+@configclass
+class GaitMetricsCfg(CommandTermCfg):
+    """Configuration for the gait metrics."""
+
+    class_type: type = GaitMetrics
+
+    resampling_time_range: tuple[float, float] = (1.0e6, 1.0e6)
+    """Time before the command is resampled (unused). Defaults to (1e6, 1e6)."""
+
+    sensor_cfg: SceneEntityCfg = MISSING
+    """Name of the contact sensor and names of its foot bodies. The sensor must track the air time."""
+
+    smoothing: float = 0.2
+    """Weight of a completed phase in the running averages of the phase durations. Defaults to 0.2."""
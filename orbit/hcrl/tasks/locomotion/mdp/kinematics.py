@@ -0,0 +1,446 @@
+from __future__ import annotations
+
+import math
+import re
+import torch
+import xml.etree.ElementTree as ET
+from collections.abc import Sequence
+
+JOINT_FIXED = 0
+"""Type identifier of fixed joints."""
+JOINT_REVOLUTE = 1
+"""Type identifier of revolute (and continuous) joints."""
+JOINT_PRISMATIC = 2
+"""Type identifier of prismatic joints."""
+
+_INERTIA_KEYS = ("ixx", "ixy", "ixz", "iyy", "iyz", "izz")
+"""Attributes of the URDF inertia tag in the order of the upper triangle."""
+
+
+class KinematicTree:
+    """Compact array-backed kinematic tree of an articulation parsed from a URDF.
+
+    The links are stored in topological order (parents before children) and grouped by their depth in the tree,
+    so that forward kinematics runs one batched update per depth level instead of one per link. Each link is
+    attached to its parent by a single joint whose origin, axis and type are stored as arrays. The child link frame
+    of a joint coincides with the joint frame, as in the URDF convention.
+
+    All quantities are expressed in the frame of the root link and are batched over the first dimension, so that
+    kinematics can be evaluated for thousands of environments without a running simulator. For floating-base
+    robots, the root pose is not part of the tree and the results must be transformed by the root pose.
+    """
+
+    def __init__(
+        self,
+        link_names: list[str],
+        joint_names: list[str],
+        parents: list[int],
+        joint_types: list[int],
+        joint_ids: list[int],
+        origin_pos: torch.Tensor,
+        origin_rot: torch.Tensor,
+        axes: torch.Tensor,
+        masses: torch.Tensor | None = None,
+        coms: torch.Tensor | None = None,
+        inertias: torch.Tensor | None = None,
+        device: str = "cpu",
+        dtype: torch.dtype = torch.float32,
+    ):
+        """Initialize the kinematic tree from its arrays.
+
+        Args:
+            link_names: The names of the links in topological order. The first link is the root.
+            joint_names: The names of the movable joints. Defines the order of the joint positions.
+            parents: The index of the parent link of each link (-1 for the root).
+            joint_types: The type of the joint attaching each link to its parent.
+            joint_ids: The index of the joint attaching each link to its parent in the joint positions
+                (-1 for the root and for fixed joints).
+            origin_pos: The position of each joint in its parent link frame. Shape is (num_links, 3).
+            origin_rot: The orientation of each joint in its parent link frame. Shape is (num_links, 3, 3).
+            axes: The axis of each joint in the joint frame. Shape is (num_links, 3).
+            masses: The mass of each link. Shape is (num_links,). Defaults to None (massless links).
+            coms: The center of mass of each link in the link frame. Shape is (num_links, 3). Defaults to None.
+            inertias: The rotational inertia of each link about its center of mass, expressed in the link frame.
+                Shape is (num_links, 3, 3). Defaults to None.
+            device: The device to store the arrays on. Defaults to "cpu".
+            dtype: The floating-point type of the arrays. Defaults to torch.float32.
+        """
+        self.link_names = link_names
+        self.joint_names = joint_names
+        self._device = device
+        # -- topology
+        self._parents = torch.tensor(parents, dtype=torch.long, device=device)
+        self._joint_types = torch.tensor(joint_types, dtype=torch.long, device=device)
+        self._joint_ids = torch.tensor(joint_ids, dtype=torch.long, device=device)
+        # -- joint geometry
+        self._origin_pos = origin_pos.to(device=device, dtype=dtype)
+        self._origin_rot = origin_rot.to(device=device, dtype=dtype)
+        self._axes = axes.to(device=device, dtype=dtype)
+        # -- link inertials
+        num_links = len(link_names)
+        masses = masses if masses is not None else torch.zeros(num_links)
+        coms = coms if coms is not None else torch.zeros(num_links, 3)
+        inertias = inertias if inertias is not None else torch.zeros(num_links, 3, 3)
+        self._masses = masses.to(device=device, dtype=dtype)
+        self._coms = coms.to(device=device, dtype=dtype)
+        self._inertias = inertias.to(device=device, dtype=dtype)
+        # -- links grouped by depth (excluding the root)
+        depths = [0] * self.num_links
+        for link in range(1, self.num_links):
+            depths[link] = depths[parents[link]] + 1
+        self._levels = list()
+        for depth in range(1, max(depths, default=0) + 1):
+            links = [link for link in range(self.num_links) if depths[link] == depth]
+            self._levels.append(
+                (
+                    torch.tensor(links, dtype=torch.long, device=device),
+                    self._parents[links],
+                    torch.tensor([joint_ids[link] for link in links], dtype=torch.long, device=device),
+                )
+            )
+        # -- child link of each movable joint
+        self._joint_links = torch.zeros(self.num_joints, dtype=torch.long, device=device)
+        for link, joint in enumerate(joint_ids):
+            if joint >= 0:
+                self._joint_links[joint] = link
+        self._joint_is_revolute = (self._joint_types[self._joint_links] == JOINT_REVOLUTE).to(dtype)
+        # -- support of the joints: whether a joint moves a link
+        support = torch.zeros(self.num_links, self.num_joints, device=device, dtype=dtype)
+        for link in range(1, self.num_links):
+            support[link] = support[parents[link]]
+            if joint_ids[link] >= 0:
+                support[link, joint_ids[link]] = 1.0
+        self._support = support
+
+    @classmethod
+    def from_urdf(cls, urdf_path: str, device: str = "cpu", dtype: torch.dtype = torch.float32) -> KinematicTree:
+        """Parses a URDF file into a kinematic tree.
+
+        Args:
+            urdf_path: The path to the URDF file.
+            device: The device to store the arrays on. Defaults to "cpu".
+            dtype: The floating-point type of the arrays. Defaults to torch.float32.
+
+        Raises:
+            ValueError: When the URDF contains an unsupported joint type or is not a tree.
+
+        Returns:
+            The kinematic tree of the URDF.
+        """
+        root = ET.parse(urdf_path).getroot()
+        # parse the link inertials
+        inertials = dict()
+        for link in root.findall("link"):
+            inertial = link.find("inertial")
+            if inertial is None:
+                continue
+            origin = inertial.find("origin")
+            inertia = inertial.find("inertia")
+            ixx, ixy, ixz, iyy, iyz, izz = (float(inertia.get(key, 0.0)) for key in _INERTIA_KEYS)
+            inertials[link.get("name")] = {
+                "mass": float(inertial.find("mass").get("value")),
+                "xyz": _parse_floats(origin.get("xyz") if origin is not None else None, 3),
+                "rpy": _parse_floats(origin.get("rpy") if origin is not None else None, 3),
+                "inertia": [[ixx, ixy, ixz], [ixy, iyy, iyz], [ixz, iyz, izz]],
+            }
+        # parse the joints
+        joints = dict()
+        for joint in root.findall("joint"):
+            joint_type = joint.get("type")
+            if joint_type in ("revolute", "continuous"):
+                joint_type = JOINT_REVOLUTE
+            elif joint_type == "prismatic":
+                joint_type = JOINT_PRISMATIC
+            elif joint_type == "fixed":
+                joint_type = JOINT_FIXED
+            else:
+                raise ValueError(f"Unsupported joint type '{joint_type}' for joint: {joint.get('name')}.")
+            origin = joint.find("origin")
+            axis = joint.find("axis")
+            child = joint.find("child").get("link")
+            joints[child] = {
+                "name": joint.get("name"),
+                "type": joint_type,
+                "parent": joint.find("parent").get("link"),
+                "xyz": _parse_floats(origin.get("xyz") if origin is not None else None, 3),
+                "rpy": _parse_floats(origin.get("rpy") if origin is not None else None, 3),
+                "axis": _parse_floats(axis.get("xyz") if axis is not None else "1 0 0", 3),
+            }
+        # resolve the root link
+        link_names = [link.get("name") for link in root.findall("link")]
+        roots = [name for name in link_names if name not in joints]
+        if len(roots) != 1:
+            raise ValueError(f"Expected a single root link in the URDF: {urdf_path}. Found: {roots}.")
+        # order the links topologically (breadth-first)
+        children = {name: list() for name in link_names}
+        for child, joint in joints.items():
+            children[joint["parent"]].append(child)
+        ordered_links = [roots[0]]
+        for link in ordered_links:
+            ordered_links.extend(children[link])
+        # build the arrays
+        link_index = {name: index for index, name in enumerate(ordered_links)}
+        joint_names = [joints[link]["name"] for link in ordered_links[1:] if joints[link]["type"] != JOINT_FIXED]
+        parents, joint_types, joint_ids = [-1], [JOINT_FIXED], [-1]
+        origin_pos = torch.zeros(len(ordered_links), 3, dtype=torch.float64)
+        origin_rot = torch.eye(3, dtype=torch.float64).repeat(len(ordered_links), 1, 1)
+        axes = torch.zeros(len(ordered_links), 3, dtype=torch.float64)
+        masses = torch.zeros(len(ordered_links), dtype=torch.float64)
+        coms = torch.zeros(len(ordered_links), 3, dtype=torch.float64)
+        inertias = torch.zeros(len(ordered_links), 3, 3, dtype=torch.float64)
+        for index, link in enumerate(ordered_links):
+            if link in inertials:
+                inertial = inertials[link]
+                # rotate the inertia from the inertial frame to the link frame
+                rot = _matrix_from_rpy(*inertial["rpy"])
+                masses[index] = inertial["mass"]
+                coms[index] = torch.tensor(inertial["xyz"], dtype=torch.float64)
+                inertias[index] = rot @ torch.tensor(inertial["inertia"], dtype=torch.float64) @ rot.T
+        for index, link in enumerate(ordered_links[1:], start=1):
+            joint = joints[link]
+            parents.append(link_index[joint["parent"]])
+            joint_types.append(joint["type"])
+            joint_ids.append(joint_names.index(joint["name"]) if joint["type"] != JOINT_FIXED else -1)
+            origin_pos[index] = torch.tensor(joint["xyz"], dtype=torch.float64)
+            origin_rot[index] = _matrix_from_rpy(*joint["rpy"])
+            axes[index] = torch.nn.functional.normalize(torch.tensor(joint["axis"], dtype=torch.float64), dim=0)
+        return cls(
+            ordered_links,
+            joint_names,
+            parents,
+            joint_types,
+            joint_ids,
+            origin_pos,
+            origin_rot,
+            axes,
+            masses=masses,
+            coms=coms,
+            inertias=inertias,
+            device=device,
+            dtype=dtype,
+        )
+
+    """
+    Properties.
+    """
+
+    @property
+    def num_links(self) -> int:
+        """Number of links in the tree (including the root)."""
+        return len(self.link_names)
+
+    @property
+    def num_joints(self) -> int:
+        """Number of movable joints in the tree."""
+        return len(self.joint_names)
+
+    @property
+    def total_mass(self) -> float:
+        """Total mass of the links."""
+        return self._masses.sum().item()
+
+    @property
+    def device(self) -> str:
+        """Device on which the arrays are stored."""
+        return self._device
+
+    """
+    Operations.
+    """
+
+    def find_links(self, name_keys: str | Sequence[str]) -> list[int]:
+        """Finds the indices of the links matching the regular expressions, in the order of the keys."""
+        name_keys = [name_keys] if isinstance(name_keys, str) else name_keys
+        return [
+            index for key in name_keys for index, name in enumerate(self.link_names) if re.fullmatch(key, name)
+        ]
+
+    def find_joints(self, name_keys: str | Sequence[str]) -> list[int]:
+        """Finds the indices of the joints matching the regular expressions, in the order of the keys.
+
+        This is useful to reorder joint positions from the simulator ordering to the URDF ordering.
+        """
+        name_keys = [name_keys] if isinstance(name_keys, str) else name_keys
+        return [
+            index for key in name_keys for index, name in enumerate(self.joint_names) if re.fullmatch(key, name)
+        ]
+
+    def forward_kinematics(self, joint_pos: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor]:
+        """Computes the poses of all links in the root frame.
+
+        Args:
+            joint_pos: The joint positions in the order of :attr:`joint_names`. Shape is (N, num_joints).
+
+        Returns:
+            A tuple of the link positions of shape (N, num_links, 3) and rotation matrices of shape
+            (N, num_links, 3, 3).
+        """
+        num_envs = joint_pos.shape[0]
+        link_pos = torch.zeros(num_envs, self.num_links, 3, dtype=joint_pos.dtype, device=joint_pos.device)
+        link_rot = torch.eye(3, dtype=joint_pos.dtype, device=joint_pos.device).repeat(num_envs, self.num_links, 1, 1)
+        # pad the joint positions so that fixed joints read a zero displacement
+        joint_pos = torch.cat((joint_pos, torch.zeros_like(joint_pos[:, :1])), dim=-1)
+        for links, parents, joint_ids in self._levels:
+            parent_pos, parent_rot = link_pos[:, parents], link_rot[:, parents]
+            q = joint_pos[:, joint_ids]
+            types = self._joint_types[links]
+            axes = self._axes[links]
+            # -- pose of the joint frame: T_parent @ T_origin
+            joint_rot = parent_rot @ self._origin_rot[links]
+            joint_pos_w = parent_pos + (parent_rot @ self._origin_pos[links].unsqueeze(-1)).squeeze(-1)
+            # -- joint motion in the joint frame
+            revolute = (types == JOINT_REVOLUTE).to(q.dtype)
+            prismatic = (types == JOINT_PRISMATIC).to(q.dtype)
+            motion_rot = _matrix_from_axis_angle(axes, q * revolute)
+            motion_pos = axes * (q * prismatic).unsqueeze(-1)
+            link_rot[:, links] = joint_rot @ motion_rot
+            link_pos[:, links] = joint_pos_w + (joint_rot @ motion_pos.unsqueeze(-1)).squeeze(-1)
+        return link_pos, link_rot
+
+    def center_of_mass(
+        self, joint_pos: torch.Tensor, link_pos: torch.Tensor | None = None, link_rot: torch.Tensor | None = None
+    ) -> torch.Tensor:
+        """Computes the center of mass of the tree in the root frame.
+
+        Args:
+            joint_pos: The joint positions. Shape is (N, num_joints).
+            link_pos: The link positions from :meth:`forward_kinematics`. Defaults to None (recomputed).
+            link_rot: The link rotations from :meth:`forward_kinematics`. Defaults to None (recomputed).
+
+        Returns:
+            The center of mass. Shape is (N, 3).
+        """
+        if link_pos is None or link_rot is None:
+            link_pos, link_rot = self.forward_kinematics(joint_pos)
+        link_coms = link_pos + (link_rot @ self._coms.unsqueeze(-1)).squeeze(-1)
+        return (self._masses.unsqueeze(-1) * link_coms).sum(dim=1) / self._masses.sum()
+
+    def frame_jacobians(
+        self,
+        joint_pos: torch.Tensor,
+        frame_ids: Sequence[int],
+        link_pos: torch.Tensor | None = None,
+        link_rot: torch.Tensor | None = None,
+    ) -> torch.Tensor:
+        """Computes the geometric Jacobians of the requested link frames in the root frame.
+
+        Args:
+            joint_pos: The joint positions. Shape is (N, num_joints).
+            frame_ids: The indices of the links for which the Jacobians are computed.
+            link_pos: The link positions from :meth:`forward_kinematics`. Defaults to None (recomputed).
+            link_rot: The link rotations from :meth:`forward_kinematics`. Defaults to None (recomputed).
+
+        Returns:
+            The Jacobians (linear rows first). Shape is (N, len(frame_ids), 6, num_joints).
+        """
+        if link_pos is None or link_rot is None:
+            link_pos, link_rot = self.forward_kinematics(joint_pos)
+        joint_axes, joint_origins = self._joint_frames(link_pos, link_rot)
+        return self._jacobians(link_pos[:, frame_ids], joint_axes, joint_origins, self._support[frame_ids])
+
+    def frame_jacobian_derivatives(
+        self,
+        joint_pos: torch.Tensor,
+        joint_vel: torch.Tensor,
+        frame_ids: Sequence[int],
+        link_pos: torch.Tensor | None = None,
+        link_rot: torch.Tensor | None = None,
+    ) -> torch.Tensor:
+        """Computes the time-derivatives of the geometric Jacobians of the requested link frames.
+
+        Args:
+            joint_pos: The joint positions. Shape is (N, num_joints).
+            joint_vel: The joint velocities. Shape is (N, num_joints).
+            frame_ids: The indices of the links for which the Jacobian derivatives are computed.
+            link_pos: The link positions from :meth:`forward_kinematics`. Defaults to None (recomputed).
+            link_rot: The link rotations from :meth:`forward_kinematics`. Defaults to None (recomputed).
+
+        Returns:
+            The Jacobian time-derivatives (linear rows first). Shape is (N, len(frame_ids), 6, num_joints).
+        """
+        if link_pos is None or link_rot is None:
+            link_pos, link_rot = self.forward_kinematics(joint_pos)
+        joint_axes, joint_origins = self._joint_frames(link_pos, link_rot)
+        # velocities of the joint child links and of the frames
+        joint_link_jacobians = self._jacobians(
+            link_pos[:, self._joint_links], joint_axes, joint_origins, self._support[self._joint_links]
+        )
+        frame_jacobians = self._jacobians(link_pos[:, frame_ids], joint_axes, joint_origins, self._support[frame_ids])
+        joint_link_vel = (joint_link_jacobians @ joint_vel[:, None, :, None]).squeeze(-1)
+        frame_lin_vel = (frame_jacobians[:, :, 0:3] @ joint_vel[:, None, :, None]).squeeze(-1)
+        # derivative of the joint axes: a_dot = w x a
+        axes_dot = torch.cross(joint_link_vel[..., 3:6], joint_axes, dim=-1)
+        # derivative of the lever arms: p_frame_dot - p_joint_dot
+        lever = link_pos[:, frame_ids].unsqueeze(2) - joint_origins.unsqueeze(1)
+        lever_dot = frame_lin_vel.unsqueeze(2) - joint_link_vel[..., 0:3].unsqueeze(1)
+        revolute = self._joint_is_revolute.view(1, 1, -1, 1)
+        axes_dot_b = axes_dot.unsqueeze(1).expand_as(lever)
+        axes_b = joint_axes.unsqueeze(1).expand_as(lever)
+        # -- revolute: d/dt (a x r) = a_dot x r + a x r_dot, d/dt a = a_dot
+        # -- prismatic: d/dt a = a_dot, no angular part
+        lin = revolute * (torch.cross(axes_dot_b, lever, dim=-1) + torch.cross(axes_b, lever_dot, dim=-1))
+        lin = lin + (1.0 - revolute) * axes_dot_b
+        ang = revolute * axes_dot_b
+        support = self._support[frame_ids].view(1, len(frame_ids), -1, 1)
+        return (torch.cat((lin, ang), dim=-1) * support).transpose(2, 3)
+
+    """
+    Helper functions.
+    """
+
+    def _joint_frames(self, link_pos: torch.Tensor, link_rot: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor]:
+        """Computes the axes and origins of the movable joints in the root frame."""
+        joint_rot = link_rot[:, self._joint_links]
+        joint_axes = (joint_rot @ self._axes[self._joint_links].unsqueeze(-1)).squeeze(-1)
+        joint_origins = link_pos[:, self._joint_links]
+        return joint_axes, joint_origins
+
+    def _jacobians(
+        self, frame_pos: torch.Tensor, joint_axes: torch.Tensor, joint_origins: torch.Tensor, support: torch.Tensor
+    ) -> torch.Tensor:
+        """Computes the geometric Jacobians of points given the joint axes and origins in the root frame."""
+        lever = frame_pos.unsqueeze(2) - joint_origins.unsqueeze(1)
+        axes = joint_axes.unsqueeze(1).expand_as(lever)
+        revolute = self._joint_is_revolute.view(1, 1, -1, 1)
+        # -- revolute: (a x r, a), prismatic: (a, 0)
+        lin = revolute * torch.cross(axes, lever, dim=-1) + (1.0 - revolute) * axes
+        ang = revolute * axes
+        return (torch.cat((lin, ang), dim=-1) * support.unsqueeze(0).unsqueeze(-1)).transpose(2, 3)
+
+
+def _parse_floats(text: str | None, size: int) -> list[float]:
+    """Parses a whitespace-separated list of floats from a URDF attribute."""
+    if text is None:
+        return [0.0] * size
+    return [float(value) for value in text.split()]
+
+
+def _matrix_from_rpy(roll: float, pitch: float, yaw: float) -> torch.Tensor:
+    """Converts URDF roll-pitch-yaw angles (fixed axes X-Y-Z) to a rotation matrix."""
+    cr, sr = math.cos(roll), math.sin(roll)
+    cp, sp = math.cos(pitch), math.sin(pitch)
+    cy, sy = math.cos(yaw), math.sin(yaw)
+    return torch.tensor([
+        [cy * cp, cy * sp * sr - sy * cr, cy * sp * cr + sy * sr],
+        [sy * cp, sy * sp * sr + cy * cr, sy * sp * cr - cy * sr],
+        [-sp, cp * sr, cp * cr],
+    ], dtype=torch.float64)
+
+
+def _matrix_from_axis_angle(axes: torch.Tensor, angles: torch.Tensor) -> torch.Tensor:
+    """Computes rotation matrices about unit axes with Rodrigues' formula.
+
+    Args:
+        axes: The unit rotation axes. Shape is (K, 3).
+        angles: The rotation angles. Shape is (N, K).
+
+    Returns:
+        The rotation matrices. Shape is (N, K, 3, 3).
+    """
+    x, y, z = axes.unbind(-1)
+    zeros = torch.zeros_like(x)
+    skew = torch.stack((zeros, -z, y, z, zeros, -x, -y, x, zeros), dim=-1).view(-1, 3, 3)
+    sin = torch.sin(angles)[..., None, None]
+    cos = torch.cos(angles)[..., None, None]
+    eye = torch.eye(3, dtype=angles.dtype, device=angles.device)
+    return eye + sin * skew + (1.0 - cos) * (skew @ skew)
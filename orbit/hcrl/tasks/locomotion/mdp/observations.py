@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import torch
+from typing import TYPE_CHECKING
+
+from omni.isaac.lab.assets import Articulation
+from omni.isaac.lab.managers import SceneEntityCfg
+from omni.isaac.lab.utils.math import quat_rotate_inverse, yaw_quat
+
+from .centroidal import centroidal_state
+from .gait import GAIT_SWING
+
+if TYPE_CHECKING:
+    from omni.isaac.lab.envs import RLTaskEnv
+
+    from .centroidal import CentroidalState
+    from .commands import GaitCommand
+    from .gait_metrics import GaitMetrics
+
+
+def gait_phase(env: RLTaskEnv, command_name: str) -> torch.Tensor:
+    """The phase of each leg in the gait cycle as (sin, cos) pairs."""
+    term: GaitCommand = env.command_manager.get_term(command_name)
+    return term.command[:, : 2 * term.scheduler.num_legs]
+
+
+def gait_contact_schedule(env: RLTaskEnv, command_name: str) -> torch.Tensor:
+    """The scheduled contact of each leg (1 in contact, 0 in swing)."""
+    term: GaitCommand = env.command_manager.get_term(command_name)
+    return term.command[:, 2 * term.scheduler.num_legs :]
+
+
+def gait_stepping(env: RLTaskEnv, command_name: str) -> torch.Tensor:
+    """Whether the gait follows the periodic contact schedule (1) or all legs are in contact (0)."""
+    term: GaitCommand = env.command_manager.get_term(command_name)
+    return (term.scheduler.state == GAIT_SWING).float().unsqueeze(-1)
+
+
+def swing_foot_reference_error(env: RLTaskEnv, command_name: str) -> torch.Tensor:
+    """The swing-foot reference positions relative to the current foot positions, in the yaw frame of the robot.
+
+    The error is zero for the feet in contact. Requires the swing trajectories of the gait command.
+    """
+    term: GaitCommand = env.command_manager.get_term(command_name)
+    error_w = term.foot_pos_ref_w - term.robot.data.body_pos_w[:, term.foot_ids]
+    heading_quat = yaw_quat(term.robot.data.root_quat_w).unsqueeze(1).expand(-1, error_w.shape[1], -1)
+    error_b = quat_rotate_inverse(heading_quat.reshape(-1, 4), error_w.reshape(-1, 3))
+    return error_b.view(env.num_envs, -1)
+
+
+def gait_duty_factor(env: RLTaskEnv, command_name: str) -> torch.Tensor:
+    """The measured fraction of the stride in stance of each foot. Requires the gait metrics term."""
+    term: GaitMetrics = env.command_manager.get_term(command_name)
+    return term.duty_factor
+
+
+def gait_stride_frequency(env: RLTaskEnv, command_name: str) -> torch.Tensor:
+    """The measured stride frequency of each foot (in Hz). Requires the gait metrics term."""
+    term: GaitMetrics = env.command_manager.get_term(command_name)
+    return term.stride_frequency
+
+
+def capture_point(env: RLTaskEnv, asset_cfg: SceneEntityCfg = SceneEntityCfg("robot")) -> torch.Tensor:
+    """The instantaneous capture point relative to the ground projection of the CoM, in the yaw frame of the robot."""
+    state = centroidal_state(env, asset_cfg.name)
+    return _yaw_frame(env, asset_cfg, state.capture_point_w - _com_ground_projection(state))[:, :2]
+
+
+def zero_moment_point(env: RLTaskEnv, asset_cfg: SceneEntityCfg = SceneEntityCfg("robot")) -> torch.Tensor:
+    """The zero moment point relative to the ground projection of the CoM, in the yaw frame of the robot."""
+    state = centroidal_state(env, asset_cfg.name)
+    return _yaw_frame(env, asset_cfg, state.zmp_w - _com_ground_projection(state))[:, :2]
+
+
+def centroidal_momentum(env: RLTaskEnv, asset_cfg: SceneEntityCfg = SceneEntityCfg("robot")) -> torch.Tensor:
+    """The centroidal momentum per unit mass (linear part first), in the yaw frame of the robot."""
+    state = centroidal_state(env, asset_cfg.name)
+    momentum = state.momentum / state.total_mass.unsqueeze(-1)
+    lin_momentum = _yaw_frame(env, asset_cfg, momentum[:, 0:3])
+    ang_momentum = _yaw_frame(env, asset_cfg, momentum[:, 3:6])
+    return torch.cat((lin_momentum, ang_momentum), dim=-1)
+
+
+def _com_ground_projection(state: CentroidalState) -> torch.Tensor:
+    """The projection of the CoM on the ground in the world frame."""
+    return torch.cat((state.com_pos_w[:, :2], state.zmp_w[:, 2:3]), dim=-1)
+
+
+def _yaw_frame(env: RLTaskEnv, asset_cfg: SceneEntityCfg, vec_w: torch.Tensor) -> torch.Tensor:
+    """Rotates world-frame vectors into the yaw frame of the root of the asset."""
+    asset: Articulation = env.scene[asset_cfg.name]
+    return quat_rotate_inverse(yaw_quat(asset.data.root_quat_w), vec_w)
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import torch
+
+from omni.isaac.lab.utils import configclass
+
+
+@configclass
+class BatchedQPSolverCfg:
+    """Configuration for the batched quadratic program solver."""
+
+    num_iterations: int = 25
+    """Fixed number of ADMM iterations per solve. Keeps the step latency predictable."""
+
+    rho: float = 0.1
+    """Step size (penalty) of the ADMM iterations."""
+
+    sigma: float = 1e-6
+    """Regularization of the primal variables. Keeps the linear system positive definite."""
+
+    fallback_sigma: float = 1e-3
+    """Regularization of the primal variables of the problems whose linear system is not numerically positive
+    definite with :attr:`sigma` (e.g. with a singular cost matrix and few constraints)."""
+
+    alpha: float = 1.6
+    """Over-relaxation parameter of the ADMM iterations. Should be in (0, 2)."""
+
+    warm_start: bool = True
+    """Whether to warm-start the solver from the solution of the previous call. Defaults to True."""
+
+
+class BatchedQPSolver:
+    r"""Batched quadratic program solver based on the alternating direction method of multipliers (ADMM).
+
+    The solver solves a batch of small convex quadratic programs of the form
+
+    .. math::
+
+        \min_x \frac{1}{2} x^T P x + q^T x \quad \text{s.t.} \quad l \leq A x \leq u
+
+    in parallel with the operator-splitting iterations of OSQP [1]. The KKT matrix :math:`P + \sigma I + \rho A^T A`
+    is factorized once per call with a batched Cholesky decomposition and each iteration is a pair of triangular
+    solves followed by a projection onto the box constraints, so that all problems share the same control flow.
+    The problems whose factorization fails are regularized with :attr:`BatchedQPSolverCfg.fallback_sigma`
+    instead, selected per problem on the device without host synchronization.
+    The solver runs a fixed number of iterations and warm-starts the primal and dual variables from the previous
+    call, which is effective when consecutive problems (e.g. WBC QPs of successive physics steps) are similar.
+
+    Equality constraints are expressed with :math:`l_i = u_i` and one-sided constraints with infinite bounds.
+
+    Reference:
+        [1] B. Stellato et al., "OSQP: an operator splitting solver for quadratic programs",
+            Mathematical Programming Computation, 2020.
+    """
+
+    def __init__(self, cfg: BatchedQPSolverCfg, num_problems: int, num_vars: int, num_constraints: int, device: str):
+        """Initialize the solver.
+
+        Args:
+            cfg: The configuration for the solver.
+            num_problems: The number of problems solved in parallel (e.g. number of environments).
+            num_vars: The number of decision variables of each problem.
+            num_constraints: The number of (two-sided) constraints of each problem.
+            device: The device to use for computations.
+        """
+        # store inputs
+        self.cfg = cfg
+        self.num_problems = num_problems
+        self.num_vars = num_vars
+        self.num_constraints = num_constraints
+        self._device = device
+
+        # create buffers
+        # -- primal, constraint and dual variables (warm-start)
+        self._x = torch.zeros(self.num_problems, self.num_vars, device=self._device)
+        self._z = torch.zeros(self.num_problems, self.num_constraints, device=self._device)
+        self._y = torch.zeros(self.num_problems, self.num_constraints, device=self._device)
+        # -- regularization of the linear system
+        self._sigma_eye = self.cfg.sigma * torch.eye(self.num_vars, device=self._device)
+        self._fallback_eye = (self.cfg.fallback_sigma - self.cfg.sigma) * torch.eye(self.num_vars, device=self._device)
+
+    """
+    Properties.
+    """
+
+    @property
+    def solution(self) -> torch.Tensor:
+        """The primal solution of the last call. Shape is (num_problems, num_vars)."""
+        return self._x
+
+    @property
+    def dual_solution(self) -> torch.Tensor:
+        """The dual solution of the last call. Shape is (num_problems, num_constraints)."""
+        return self._y
+
+    """
+    Operations.
+    """
+
+    def reset(self, problem_ids: torch.Tensor | None = None):
+        """Resets the warm-start of the solver.
+
+        Args:
+            problem_ids: The problems to reset. Defaults to None, in which case all problems are reset.
+        """
+        if problem_ids is None:
+            problem_ids = slice(None)
+        self._x[problem_ids] = 0.0
+        self._z[problem_ids] = 0.0
+        self._y[problem_ids] = 0.0
+
+    def solve(
+        self, P: torch.Tensor, q: torch.Tensor, A: torch.Tensor, l: torch.Tensor, u: torch.Tensor
+    ) -> torch.Tensor:
+        """Solves the batch of quadratic programs.
+
+        Args:
+            P: The (positive semi-definite) cost matrices. Shape is (num_problems, num_vars, num_vars).
+            q: The cost vectors. Shape is (num_problems, num_vars).
+            A: The constraint matrices. Shape is (num_problems, num_constraints, num_vars).
+            l: The lower bounds of the constraints. Shape is (num_problems, num_constraints).
+            u: The upper bounds of the constraints. Shape is (num_problems, num_constraints).
+
+        Returns:
+            The primal solution. Shape is (num_problems, num_vars).
+        """
+        rho, sigma, alpha = self.cfg.rho, self.cfg.sigma, self.cfg.alpha
+        # initial iterate
+        if not self.cfg.warm_start:
+            self.reset()
+        x, z, y = self._x, self._z, self._y
+        A_t = A.transpose(1, 2)
+        # factorize the linear system once: P + sigma I + rho A^T A
+        # note: the errors are reported per problem in the info instead of being checked on the host
+        kkt = torch.baddbmm(P + self._sigma_eye, A_t, A, alpha=rho)
+        kkt_chol, info = torch.linalg.cholesky_ex(kkt)
+        # regularize the problems whose factorization failed, with the same sigma in the iterations
+        failed = (info > 0).unsqueeze(-1)
+        kkt_fallback_chol, _ = torch.linalg.cholesky_ex(kkt + self._fallback_eye)
+        kkt_chol = torch.where(failed.unsqueeze(-1), kkt_fallback_chol, kkt_chol)
+        sigma = torch.where(failed, self.cfg.fallback_sigma, sigma)
+        # iterate with a fixed budget
+        for _ in range(self.cfg.num_iterations):
+            # -- solve the equality-constrained subproblem
+            rhs = sigma * x - q + torch.bmm(A_t, (rho * z - y).unsqueeze(-1)).squeeze(-1)
+            x_tilde = torch.cholesky_solve(rhs.unsqueeze(-1), kkt_chol).squeeze(-1)
+            z_tilde = torch.bmm(A, x_tilde.unsqueeze(-1)).squeeze(-1)
+            # -- over-relaxation
+            x = alpha * x_tilde + (1.0 - alpha) * x
+            z_relaxed = alpha * z_tilde + (1.0 - alpha) * z
+            # -- projection onto the constraint set and dual update
+            z_next = torch.clamp(z_relaxed + y / rho, min=l, max=u)
+            y = y + rho * (z_relaxed - z_next)
+            z = z_next
+        # store the iterate for warm-starting
+        self._x[:] = x
+        self._z[:] = z
+        self._y[:] = y
+        return self._x
+
+    def residuals(self, P: torch.Tensor, q: torch.Tensor, A: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor]:
+        """Computes the primal and dual residuals of the current iterate.
+
+        Args:
+            P: The cost matrices. Shape is (num_problems, num_vars, num_vars).
+            q: The cost vectors. Shape is (num_problems, num_vars).
+            A: The constraint matrices. Shape is (num_problems, num_constraints, num_vars).
+
+        Returns:
+            A tuple of the infinity-norms of the primal residual :math:`A x - z` and the dual residual
+            :math:`P x + q + A^T y`. Shape of each is (num_problems,).
+        """
+        x, z, y = self._x.unsqueeze(-1), self._z, self._y.unsqueeze(-1)
+        primal = (torch.bmm(A, x).squeeze(-1) - z).abs().amax(dim=-1)
+        dual = (torch.bmm(P, x).squeeze(-1) + q + torch.bmm(A.transpose(1, 2), y).squeeze(-1)).abs().amax(dim=-1)
+        return primal, dual
+
+
+def friction_pyramid_constraints(
+    friction_coeff: float, num_contacts: int, device: str
+) -> tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    r"""Constraints of the linearized (pyramidal) friction cones of point contacts.
+
+    For each contact force :math:`f = (f_x, f_y, f_z)` expressed in the contact frame, the constraints
+    :math:`|f_x| \leq \mu f_z`, :math:`|f_y| \leq \mu f_z` and :math:`f_z \geq 0` are written as
+    :math:`0 \leq C f \leq \infty` with five rows per contact.
+
+    Args:
+        friction_coeff: The friction coefficient :math:`\mu`.
+        num_contacts: The number of point contacts.
+        device: The device to create the tensors on.
+
+    Returns:
+        A tuple of the constraint matrix of shape (5 * num_contacts, 3 * num_contacts) and its lower and
+        upper bounds of shape (5 * num_contacts,).
+    """
+    mu = friction_coeff
+    cone = torch.tensor(
+        [[-1.0, 0.0, mu], [1.0, 0.0, mu], [0.0, -1.0, mu], [0.0, 1.0, mu], [0.0, 0.0, 1.0]], device=device
+    )
+    C = torch.block_diag(*([cone] * num_contacts))
+    lower = torch.zeros(5 * num_contacts, device=device)
+    upper = torch.full((5 * num_contacts,), float("inf"), device=device)
+    return C, lower, upper
@@ -5,35 +5,77 @@ from typing import TYPE_CHECKING
 
 from omni.isaac.lab.assets import Articulation
 from omni.isaac.lab.managers import SceneEntityCfg
-from omni.isaac.lab.utils.math import sample_uniform
+from omni.isaac.lab.utils.math import quat_from_euler_xyz, quat_mul
+
+from isaac.lab.hcrl.tasks.utils.rng import random_stream
 
 if TYPE_CHECKING:
     from omni.isaac.lab.envs.rl_env import RLEnv
 
+    from .actions import WBCJointAction
+
 def reset_in_range(
         env: RLEnv, 
-        env_ids: torch.Tensor, 
+        env_ids: torch.Tensor | None, 
         asset_cfg: SceneEntityCfg, 
         position_range: tuple[float, float],
         velocity_range: tuple[float, float],
         ):
+    """Reset the joints to uniformly sampled offsets from their default state, within the soft joint limits.
+
+    The samples are drawn from the random stream of the term, so that the resets are reproducible from the seed.
+    """
     # extract the used quantities (to enable type-hinting)
     asset: Articulation = env.scene[asset_cfg.name]
+    rng = random_stream(env, f"reset_in_range/{asset_cfg.name}")
+    if env_ids is None:
+        env_ids = torch.arange(env.num_envs, device=env.device)
     # get default joint states
+    # note: the bounds are new tensors, so that the in-place clipping below never writes to the asset data
+    joint_pos_lim = asset.data.soft_joint_pos_limits[env_ids]
     joint_pos_min = asset.data.default_joint_pos[env_ids] + position_range[0]
     joint_pos_max = asset.data.default_joint_pos[env_ids] + position_range[1]
+    abs_joint_vel_lim = asset.data.soft_joint_vel_limits[env_ids]
     joint_vel_min = asset.data.default_joint_vel[env_ids] + velocity_range[0]
     joint_vel_max = asset.data.default_joint_vel[env_ids] + velocity_range[1]
     # clip position to range
-    joint_pos_lim = asset.data.soft_joint_pos_limits[env_ids, ...]
-    joint_pos_min = torch.clamp(joint_pos_min, min=joint_pos_lim[..., 0], max=joint_pos_lim[..., 1])
-    joint_pos_max = torch.clamp(joint_pos_max, min=joint_pos_lim[..., 0], max=joint_pos_lim[..., 1])
-    abs_joint_vel_lim = asset.data.soft_joint_vel_limits[env_ids]
+    joint_pos_min.clamp_(min=joint_pos_lim[..., 0], max=joint_pos_lim[..., 1])
+    joint_pos_max.clamp_(min=joint_pos_lim[..., 0], max=joint_pos_lim[..., 1])
     # clip velocity to range
-    joint_vel_min = torch.clamp(joint_vel_min, min=-abs_joint_vel_lim, max=abs_joint_vel_lim)
-    joint_vel_max = torch.clamp(joint_vel_max, min=-abs_joint_vel_lim, max=abs_joint_vel_lim)
+    joint_vel_min.clamp_(min=-abs_joint_vel_lim, max=abs_joint_vel_lim)
+    joint_vel_max.clamp_(min=-abs_joint_vel_lim, max=abs_joint_vel_lim)
     # apply uniform random sample
-    joint_pos = sample_uniform(joint_pos_min, joint_pos_max, joint_pos_min.shape, joint_pos_min.device)
-    joint_vel = sample_uniform(joint_vel_min, joint_vel_max, joint_vel_min.shape, joint_vel_min.device)
+    samples = rng.uniform(env_ids, (2, asset.num_joints))
+    joint_pos = joint_pos_min.lerp_(joint_pos_max, samples[:, 0])
+    joint_vel = joint_vel_min.lerp_(joint_vel_max, samples[:, 1])
     # write to the simulation
-    asset.write_joint_state_to_sim(joint_pos, joint_vel, env_ids=env_ids)
\ No newline at end of file
+    asset.write_joint_state_to_sim(joint_pos, joint_vel, env_ids=env_ids)
+
+
+def randomize_body_offset(
+    env: RLEnv,
+    env_ids: torch.Tensor | None,
+    action_name: str,
+    position_range: tuple[float, float],
+    rotation_range: tuple[float, float] = (0.0, 0.0),
+):
+    """Randomize the target frame offset of a whole-body control action term around its nominal value.
+
+    This emulates calibration errors of the target frame. The position is offset uniformly per axis and the
+    orientation is rotated by uniformly sampled XYZ Euler angles (in radians).
+    """
+    # extract the used quantities (to enable type-hinting)
+    term: WBCJointAction = env.action_manager.get_term(action_name)
+    rng = random_stream(env, f"randomize_body_offset/{action_name}")
+    if env_ids is None:
+        env_ids = torch.arange(env.num_envs, device=env.device)
+    # nominal offset
+    body_offset = term.cfg.body_offset if term.cfg.body_offset is not None else term.cfg.OffsetCfg()
+    nominal_pos = torch.tensor(body_offset.pos, device=env.device)
+    nominal_rot = torch.tensor(body_offset.rot, device=env.device)
+    # apply uniform random sample
+    pos = nominal_pos + rng.uniform(env_ids, (3,), *position_range)
+    euler = rng.uniform(env_ids, (3,), *rotation_range)
+    rot = quat_mul(nominal_rot.expand(len(env_ids), 4), quat_from_euler_xyz(*euler.unbind(-1)))
+    # set into the action term
+    term.set_body_offset(pos, rot, env_ids)
@@ -3,12 +3,18 @@ from __future__ import annotations
 import torch
 from typing import TYPE_CHECKING
 
+from omni.isaac.lab.assets import Articulation
 from omni.isaac.lab.managers import SceneEntityCfg
 from omni.isaac.lab.sensors import ContactSensor
 
+from .centroidal import centroidal_state
+
 if TYPE_CHECKING:
     from omni.isaac.lab.envs import RLTaskEnv
 
+    from .commands import GaitCommand
+    from .gait_metrics import GaitMetrics
+
 
 def feet_air_time(env: RLTaskEnv, command_name: str, sensor_cfg: SceneEntityCfg, threshold: float) -> torch.Tensor:
     """Reward long steps taken by the feet using L2-kernel.
@@ -48,5 +54,57 @@ def feet_air_time_positive_biped(env, command_name: str, sensor_cfg: SceneEntity
     reward *= torch.norm(env.command_manager.get_command(command_name)[:, :2], dim=1) > 0.1
     return reward
 
+
+def swing_foot_tracking_exp(env: RLTaskEnv, command_name: str, std: float) -> torch.Tensor:
+    """Reward tracking of the swing-foot reference positions using exponential kernel.
+
+    The squared position errors are summed over the feet in swing (the feet in contact do not contribute).
+    Requires the swing trajectories of the gait command.
+    """
+    term: GaitCommand = env.command_manager.get_term(command_name)
+    error = term.foot_pos_ref_w - term.robot.data.body_pos_w[:, term.foot_ids]
+    swinging = ~term.scheduler.contact
+    squared_error = torch.sum(torch.sum(torch.square(error), dim=-1) * swinging, dim=1)
+    return torch.exp(-squared_error / std**2)
+
+
+def gait_duty_factor_l2(env: RLTaskEnv, command_name: str, target: float) -> torch.Tensor:
+    """Penalize the deviation of the measured duty factors of the feet from a target using L2-kernel.
+
+    Requires the gait metrics term.
+    """
+    term: GaitMetrics = env.command_manager.get_term(command_name)
+    return torch.sum(torch.square(term.duty_factor - target), dim=1)
+
+
+def gait_asymmetry_l1(env: RLTaskEnv, command_name: str) -> torch.Tensor:
+    """Penalize the spread of the measured swing durations over the feet.
+
+    Requires the gait metrics term.
+    """
+    term: GaitMetrics = env.command_manager.get_term(command_name)
+    return term.asymmetry
+
+
+def capture_point_support_l2(
+    env: RLTaskEnv, feet_cfg: SceneEntityCfg, asset_cfg: SceneEntityCfg = SceneEntityCfg("robot")
+) -> torch.Tensor:
+    """Penalize the horizontal distance between the capture point and the center of the feet using L2-kernel.
+
+    A capture point that stays close to the support keeps the robot capturable, i.e. it can come to rest
+    without taking additional steps.
+    """
+    asset: Articulation = env.scene[asset_cfg.name]
+    state = centroidal_state(env, asset_cfg.name)
+    support_center = asset.data.body_pos_w[:, feet_cfg.body_ids, :2].mean(dim=1)
+    return torch.sum(torch.square(state.capture_point_w[:, :2] - support_center), dim=1)
+
+
+def centroidal_angular_momentum_l2(env: RLTaskEnv, asset_cfg: SceneEntityCfg = SceneEntityCfg("robot")) -> torch.Tensor:
+    """Penalize the centroidal angular momentum per unit mass using L2-kernel."""
+    state = centroidal_state(env, asset_cfg.name)
+    angular_momentum = state.momentum[:, 3:6] / state.total_mass.unsqueeze(-1)
+    return torch.sum(torch.square(angular_momentum), dim=1)
+
 def height(env: RLTaskEnv, threshold: float):
     return torch.clamp(env.scene["robot"].data.root_pos_w[:, 2], 0, threshold)
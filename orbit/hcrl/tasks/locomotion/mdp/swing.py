@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import torch
+
+from omni.isaac.lab.utils import configclass
+
+
+@configclass
+class SwingTrajectoryCfg:
+    """Configuration for the swing-foot trajectories."""
+
+    apex_height: float = 0.08
+    """Height of the apex of the swing above the higher of the liftoff and touchdown points (in m)."""
+
+
+class SwingTrajectory:
+    r"""Batched swing-foot trajectories between liftoff and touchdown points.
+
+    Each swing is a polynomial in the normalized swing time :math:`s \in [0, 1]` with zero velocity at liftoff and
+    touchdown. The horizontal axes follow the cubic :math:`p_0 + (p_1 - p_0)(3 s^2 - 2 s^3)` and the vertical axis
+    follows the quartic that additionally reaches the apex height at :math:`s = 0.5`:
+
+    .. math::
+
+        z(s) = z_0 + (16 e - 5 d) s^2 + (14 d - 32 e) s^3 + (16 e - 8 d) s^4
+
+    where :math:`d = z_1 - z_0` and :math:`e = z_{apex} - z_0`. The polynomial coefficients are computed once at
+    liftoff (:meth:`start`) and stored per foot, so that evaluating the references at any time (e.g. at every
+    physics step) is a Horner evaluation of a few fused multiply-adds for all feet of all environments.
+    """
+
+    def __init__(self, cfg: SwingTrajectoryCfg, num_envs: int, num_feet: int, device: str):
+        """Initialize the swing trajectories.
+
+        Args:
+            cfg: The configuration of the swing trajectories.
+            num_envs: The number of environments.
+            num_feet: The number of feet per environment.
+            device: The device on which to create the buffers.
+        """
+        # store inputs
+        self.cfg = cfg
+        self.num_envs = num_envs
+        self.num_feet = num_feet
+        self._device = device
+
+        # create buffers
+        # -- polynomial coefficients in increasing powers of s: (N, F, 3, 5)
+        self._coefficients = torch.zeros(self.num_envs, self.num_feet, 3, 5, device=self._device)
+        # -- derivative coefficients w.r.t. the time (divided by the duration): (N, F, 3, 4)
+        self._vel_coefficients = torch.zeros(self.num_envs, self.num_feet, 3, 4, device=self._device)
+        self._powers = torch.arange(1, 5, device=self._device, dtype=torch.float)
+        # -- duration of the swings
+        self._duration = torch.ones(self.num_envs, self.num_feet, device=self._device)
+
+    """
+    Properties.
+    """
+
+    @property
+    def coefficients(self) -> torch.Tensor:
+        """The polynomial coefficients in increasing powers of the normalized time. Shape is (N, F, 3, 5)."""
+        return self._coefficients
+
+    @property
+    def duration(self) -> torch.Tensor:
+        """The duration of the swings (in s). Shape is (N, F)."""
+        return self._duration
+
+    """
+    Operations.
+    """
+
+    def start(
+        self,
+        liftoff_pos: torch.Tensor,
+        touchdown_pos: torch.Tensor,
+        duration: torch.Tensor,
+        mask: torch.Tensor,
+    ):
+        """Computes the coefficients of the swings that start now.
+
+        Only the feet selected by the mask are updated. The others keep their current swing.
+
+        Args:
+            liftoff_pos: The liftoff points. Shape is (N, F, 3).
+            touchdown_pos: The touchdown points. Shape is (N, F, 3).
+            duration: The duration of the swings (in s). Shape is (N, F) or (N,).
+            mask: Whether a swing starts for each foot. Shape is (N, F).
+        """
+        if duration.dim() == 1:
+            duration = duration.unsqueeze(-1).expand(-1, self.num_feet)
+        delta = touchdown_pos - liftoff_pos
+        # -- horizontal axes: cubic with zero end velocities
+        coefficients = torch.zeros_like(self._coefficients)
+        coefficients[..., 0] = liftoff_pos
+        coefficients[..., 2] = 3.0 * delta
+        coefficients[..., 3] = -2.0 * delta
+        # -- vertical axis: quartic with zero end velocities and the apex at mid-swing
+        d = delta[..., 2]
+        e = torch.maximum(liftoff_pos[..., 2], touchdown_pos[..., 2]) + self.cfg.apex_height - liftoff_pos[..., 2]
+        coefficients[..., 2, 2] = 16.0 * e - 5.0 * d
+        coefficients[..., 2, 3] = 14.0 * d - 32.0 * e
+        coefficients[..., 2, 4] = 16.0 * e - 8.0 * d
+        # update the masked feet
+        torch.where(mask[..., None, None], coefficients, self._coefficients, out=self._coefficients)
+        torch.where(mask, duration, self._duration, out=self._duration)
+        # derivative w.r.t. the time: d/dt = d/ds / T
+        vel_coefficients = self._coefficients[..., 1:] * self._powers
+        torch.div(vel_coefficients, self._duration[..., None, None], out=self._vel_coefficients)
+
+    def evaluate(self, phase: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor]:
+        """Evaluates the position and velocity references of the swings.
+
+        Args:
+            phase: The normalized swing time in [0, 1] of each foot (clamped). Shape is (N, F).
+
+        Returns:
+            A tuple of the position and velocity references. Shape of each is (N, F, 3).
+        """
+        s = phase.clamp(0.0, 1.0).unsqueeze(-1)
+        # Horner evaluation of the polynomials
+        pos = self._coefficients[..., 4]
+        for k in (3, 2, 1, 0):
+            pos = pos * s + self._coefficients[..., k]
+        vel = self._vel_coefficients[..., 3]
+        for k in (2, 1, 0):
+            vel = vel * s + self._vel_coefficients[..., k]
+        return pos, vel
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import math
+import os
 from dataclasses import MISSING
 
 import omni.isaac.lab.sim as sim_utils
@@ -21,6 +22,7 @@ from omni.isaac.lab.utils.noise import AdditiveUniformNoiseCfg as Unoise
 
 import omni.isaac.lab.envs.mdp as mdp
 import isaac.lab.hcrl.tasks.navigation.mdp as hcrl_mdp
+from isaac.lab.hcrl import EXT_DIR
 
 ##
 # Pre-defined configs
@@ -41,6 +43,17 @@ class BumpybotFlatEnvCfg(LocomotionNavigationFlatEnvCfg):
         self.scene.robot = BUMPYBOT_CFG.replace(prim_path="{ENV_REGEX_NS}/Robot")
         self.scene.terrain = HOSPITAL_CFG.replace(prim_path="{ENV_REGEX_NS}/ground")
 
+        # sample the goals on the free floor of the hospital
+        self.commands.se2_pose.goal_sampler = hcrl_mdp.OccupancyGoalSamplerCfg(
+            grid=hcrl_mdp.OccupancyGridCfg(
+                prim_path="/World/envs/env_0/ground",
+                cache_path=os.path.join(EXT_DIR, "resources", "occupancy", "hospital.pt"),
+            ),
+            distance_range=(1.0, 7.0),
+        )
+        # track the goals along the geodesic around the walls
+        self.rewards.pose_tracking_exp.func = hcrl_mdp.geodesic_tracking_exp
+
         # turn off contact sensors
         self.scene.contactf_forces = None
 
@@ -62,6 +75,8 @@ class BumpybotFlatEnvCfg_PLAY(BumpybotFlatEnvCfg):
 
         # disable randomization for play
         self.observations.policy.enable_corruption = False
+        # evaluate on the full goal distances
+        self.curriculum.goal_distance = None
         # remove random pushing
         #self.randomization.base_external_force_torque = None
         #self.randomization.push_robot = None
@@ -192,7 +192,11 @@ class TerminationsCfg:
 @configclass
 class CurriculumCfg:
     """Curriculum terms for the MDP."""
-    pass
+
+    goal_distance = CurrTerm(
+        func=hcrl_mdp.goal_distance_levels,
+        params={"curriculum_cfg": hcrl_mdp.GoalDistanceCurriculumCfg(command_name="se2_pose", threshold=0.2)},
+    )
 
 ##
 # Environment configuration
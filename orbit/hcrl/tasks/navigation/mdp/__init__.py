@@ -5,4 +5,6 @@ from .rewards import *  # noqa: F401, F403
 from .commands import *  # noqa: F401, F403
 from .actions import *  # noqa: F401, F403
 from .terminations import * # noqa: F401, F403
-from .observations import * # noqa: F401, F403
\ No newline at end of file
+from .observations import * # noqa: F401, F403
+from .se2 import *  # noqa: F401, F403
+from .occupancy import *  # noqa: F401, F403
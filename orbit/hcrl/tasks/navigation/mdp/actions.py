@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import torch
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Literal
 from dataclasses import MISSING
 
 import carb
@@ -9,7 +9,10 @@ import carb
 from omni.isaac.lab.utils import configclass
 from omni.isaac.lab.managers.action_manager import ActionTerm, ActionTermCfg
 from omni.isaac.lab.assets.articulation import Articulation
-from omni.isaac.lab.utils.math import euler_xyz_from_quat
+
+from isaac.lab.hcrl.tasks.utils.resolution import bind_ids, resolve_body_ids, resolve_joint_ids
+
+from .se2 import heading_from_quat, planar_rotate
 
 if TYPE_CHECKING:
     from omni.isaac.lab.envs import BaseEnv
@@ -25,12 +28,14 @@ class HolonomicAction(ActionTerm):
 
     .. math::
 
-        \dot{q}_{0, des} &= v_{B,x} \cos(\theta) + v_{B,y} \sin(\theta) \\
+        \dot{q}_{0, des} &= v_{B,x} \cos(\theta) - v_{B,y} \sin(\theta) \\
         \dot{q}_{1, des} &= v_{B,x} \sin(\theta) + v_{B,y} \cos(\theta) \\
         \dot{q}_{2, des} &= \omega_{B,z}
 
     where :math:`\theta` is the yaw of the 2-D base. Since the base is simulated as a dummy joint, the yaw is directly
-    the value of the revolute joint along z, i.e., :math:`q_2 = \theta`.
+    the value of the revolute joint along z, i.e., :math:`q_2 = \theta`. By default, the heading is read from the
+    joint state (see :attr:`HolonomicActionCfg.heading_source`). The planar velocity is rotated into the world frame
+    with a single batched rotation at every physics step, while the yaw rate target is set once per environment step.
 
     .. note::
         The current implementation assumes that the base is simulated with three dummy joints (prismatic joints along x
@@ -60,25 +65,25 @@ class HolonomicAction(ActionTerm):
 
         # parse the joint information
         # -- x joint
-        x_joint_id, x_joint_name = self._asset.find_joints(self.cfg.x_joint_name)
+        x_joint_id, x_joint_name = resolve_joint_ids(self._asset, self.cfg.x_joint_name)
         if len(x_joint_id) != 1:
             raise ValueError(
                 f"Expected a single joint match for the x joint name: {self.cfg.x_joint_name}, got {len(x_joint_id)}"
             )
         # -- y joint
-        y_joint_id, y_joint_name = self._asset.find_joints(self.cfg.y_joint_name)
+        y_joint_id, y_joint_name = resolve_joint_ids(self._asset, self.cfg.y_joint_name)
         if len(y_joint_id) != 1:
             raise ValueError(
                 f"Expected a single joint match for the y joint name: {self.cfg.y_joint_name}, got {len(y_joint_id)}"
             )
         # -- yaw joint
-        yaw_joint_id, yaw_joint_name = self._asset.find_joints(self.cfg.yaw_joint_name)
+        yaw_joint_id, yaw_joint_name = resolve_joint_ids(self._asset, self.cfg.yaw_joint_name)
         if len(yaw_joint_id) != 1:
             raise ValueError(
                 f"Expected a single joint match for the yaw joint name: {self.cfg.yaw_joint_name}, got {len(yaw_joint_id)}"
             )
         # -- body link
-        self._body_idx, self._body_name = self._asset.find_bodies(self.cfg.body_name)
+        self._body_idx, self._body_name = resolve_body_ids(self._asset, self.cfg.body_name)
         if len(self._body_idx) != 1:
             raise ValueError(f"Found more than one body match for the body name: {self.cfg.body_name}")
 
@@ -93,11 +98,14 @@ class HolonomicAction(ActionTerm):
         carb.log_info(
             f"Resolved body name for the action term {self.__class__.__name__}: {self._body_name} [{self._body_idx}]"
         )
+        # bind the joint indices of the velocity targets as a slice or a tensor
+        self._joint_index = bind_ids(self._joint_ids, self._asset.num_joints, self.device)
 
         # create tensors for raw and processed actions
         self._raw_actions = torch.zeros(self.num_envs, self.action_dim, device=self.device)
         self._processed_actions = torch.zeros_like(self.raw_actions)
         self._joint_vel_command = torch.zeros(self.num_envs, 3, device=self.device)
+        self._planar_vel_w = torch.zeros(self.num_envs, 2, device=self.device)
 
         # save the scale and offset as tensors
         self._scale = torch.tensor(self.cfg.scale, device=self.device).unsqueeze(0)
@@ -126,18 +134,30 @@ class HolonomicAction(ActionTerm):
     def process_actions(self, actions):
         # store the raw actions
         self._raw_actions[:] = actions
-        self._processed_actions = self.raw_actions * self._scale + self._offset
+        torch.addcmul(self._offset, self._raw_actions, self._scale, out=self._processed_actions)
+        # the yaw rate target does not depend on the heading
+        self._joint_vel_command[:, 2] = self._processed_actions[:, 2]
 
     def apply_actions(self):
         # obtain current heading
-        quat_w = self._asset.data.body_quat_w[:, self._body_idx].squeeze(1)
-        yaw_w = euler_xyz_from_quat(quat_w)[2]
-        # compute joint velocities targets
-        self._joint_vel_command[:, 0] = torch.cos(yaw_w) * self.processed_actions[:, 0] + torch.sin(yaw_w) * self.processed_actions[:, 1]  # x
-        self._joint_vel_command[:, 1] = torch.sin(yaw_w) * self.processed_actions[:, 0] + torch.cos(yaw_w) * self.processed_actions[:, 1]  # y
-        self._joint_vel_command[:, 2] = self.processed_actions[:, 2]  # yaw
+        cos_yaw, sin_yaw = self._heading()
+        # rotate the planar velocity into the world frame
+        planar_rotate(self._processed_actions[:, :2], cos_yaw, sin_yaw, out=self._planar_vel_w)
+        self._joint_vel_command[:, :2] = self._planar_vel_w
         # set the joint velocity targets
-        self._asset.set_joint_velocity_target(self._joint_vel_command, joint_ids=self._joint_ids)
+        self._asset.set_joint_velocity_target(self._joint_vel_command, joint_ids=self._joint_index)
+
+    """
+    Helper functions.
+    """
+
+    def _heading(self) -> tuple[torch.Tensor, torch.Tensor]:
+        """Returns the cosine and the sine of the yaw of the base. Shape of each is (num_envs,)."""
+        if self.cfg.heading_source == "joint":
+            yaw = self._asset.data.joint_pos[:, self._joint_ids[2]]
+            return torch.cos(yaw), torch.sin(yaw)
+        # yaw-only fast path: project the x-axis of the body onto the ground plane
+        return heading_from_quat(self._asset.data.body_quat_w[:, self._body_idx[0]])
 
 @configclass
 class HolonomicActionCfg(ActionTermCfg):
@@ -156,7 +176,13 @@ class HolonomicActionCfg(ActionTermCfg):
     """The dummy joint name in the y direction."""
     yaw_joint_name: str = MISSING
     """The dummy joint name in the yaw direction."""
-    scale: tuple[float, float] = (1.0, 1.0)
-    """Scale factor for the action. Defaults to (1.0, 1.0)."""
-    offset: tuple[float, float] = (0.0, 0.0)
-    """Offset factor for the action. Defaults to (0.0, 0.0)."""
\ No newline at end of file
+    scale: tuple[float, float, float] = (1.0, 1.0, 1.0)
+    """Scale factor for the action. Defaults to (1.0, 1.0, 1.0)."""
+    offset: tuple[float, float, float] = (0.0, 0.0, 0.0)
+    """Offset factor for the action. Defaults to (0.0, 0.0, 0.0)."""
+    heading_source: Literal["joint", "body"] = "joint"
+    """Source of the heading of the base. Defaults to "joint".
+
+    * ``"joint"``: the position of the dummy yaw joint.
+    * ``"body"``: the yaw of the body orientation, computed without the full Euler angle conversion.
+    """
\ No newline at end of file
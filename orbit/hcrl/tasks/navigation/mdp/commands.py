@@ -11,15 +11,23 @@ from omni.isaac.lab.assets import Articulation
 from omni.isaac.lab.managers import CommandTerm
 from omni.isaac.lab.markers import VisualizationMarkers, VisualizationMarkersCfg
 from omni.isaac.lab.markers.config import CUBOID_MARKER_CFG, BLUE_ARROW_X_MARKER_CFG, GREEN_ARROW_X_MARKER_CFG
-from omni.isaac.lab.utils.math import (
-    quat_rotate_inverse, wrap_to_pi, yaw_quat,
-    quat_from_euler_xyz, euler_xyz_from_quat,
-    quat_apply_yaw,
-)
+
+from isaac.lab.hcrl.tasks.utils.resolution import resolve_body_ids
+from isaac.lab.hcrl.tasks.utils.rng import random_stream
+
+from .occupancy import DistanceFieldCache, OccupancyGoalSampler, OccupancyGoalSamplerCfg
+from .se2 import quat_from_yaw, relative_pose_2d
 
 if TYPE_CHECKING:
     from omni.isaac.lab.envs import BaseEnv
 
+MAX_SAMPLED_WAYPOINTS = 64
+"""Maximum capacity of the waypoint queues with a goal sampler.
+
+The sampled waypoints are chained one after the other at the resampling, since each one is constrained by the
+distance to the previous one, which costs a few kernel launches per waypoint.
+"""
+
 class TrajectoryCommand(CommandTerm):
     """Command generator that generates position commands based on box constraints.
 
@@ -43,10 +51,12 @@ class TrajectoryCommand(CommandTerm):
         # obtain the robot and terrain assets
         # -- robot
         self.robot: Articulation = env.scene[cfg.asset_name]
-        self.body_id = self.robot.find_bodies(self.cfg.body_name)[0][0]
+        self.body_id = resolve_body_ids(self.robot, self.cfg.body_name)[0][0]
         if self.cfg.normalized: 
             # only normalize x-y pos
             self.norm = torch.tensor([self.cfg.ranges.pos_x[1], self.cfg.ranges.pos_y[1], 1.0], device=self.device)
+            # ranges with a zero maximum are left unnormalized to avoid dividing by zero
+            self._command_scale = 1.0 / torch.where(self.norm == 0.0, torch.ones_like(self.norm), self.norm)
 
         # crete buffers to store the command
         # -- commands: (x, y, z, heading)
@@ -54,16 +64,53 @@ class TrajectoryCommand(CommandTerm):
         self.heading_command_w = torch.zeros(self.num_envs, device=self.device) #yaw
         self.pos_command_b = torch.zeros_like(self.pos_command_w)
         self.heading_command_b = torch.zeros_like(self.heading_command_w)
+        # -- command in the base frame: (x, y, heading), updated in place once per step
+        self._command = torch.zeros(self.num_envs, 3, device=self.device)
+        self._command_version = 0
         self.switch = torch.tensor([-1, 1], device=self.device)
+        self._offset_low = torch.tensor([self.cfg.ranges.pos_x[0], self.cfg.ranges.pos_y[0]], device=self.device)
+        self._offset_high = torch.tensor([self.cfg.ranges.pos_x[1], self.cfg.ranges.pos_y[1]], device=self.device)
+        # -- scale of the goal distances of each environment (e.g. set by a curriculum)
+        self.goal_distance_scale = torch.ones(self.num_envs, device=self.device)
+        # -- waypoint queues: ring buffers of (x, y, z) positions and headings
+        self.waypoints_w = torch.zeros(self.num_envs, self.cfg.num_waypoints, 3, device=self.device)
+        self.waypoint_headings_w = torch.zeros(self.num_envs, self.cfg.num_waypoints, device=self.device)
+        self._queue_head = torch.zeros(self.num_envs, dtype=torch.long, device=self.device)
+        self._queue_depth = torch.full((self.num_envs,), self.cfg.num_waypoints, dtype=torch.long, device=self.device)
+        self._queue_progress = torch.zeros(self.num_envs, dtype=torch.long, device=self.device)
+        self._env_ids = torch.arange(self.num_envs, device=self.device)
+        # -- random numbers of each environment, reproducible from the seed
+        self._rng = random_stream(env, f"{type(self).__name__}/{cfg.asset_name}/{cfg.body_name}")
+        # -- goal sampler on the free cells of the scene
+        self.goal_sampler: OccupancyGoalSampler | None = None
+        if self.cfg.goal_sampler is not None:
+            if self.cfg.num_waypoints > MAX_SAMPLED_WAYPOINTS:
+                raise ValueError(
+                    f"The waypoint queues hold at most {MAX_SAMPLED_WAYPOINTS} waypoints with a goal sampler, got"
+                    f" {self.cfg.num_waypoints}. Refill the queues (TrajectoryCommandCfg.refill_waypoints) instead."
+                )
+            self.goal_sampler = OccupancyGoalSampler.from_cfg(self.cfg.goal_sampler, env.scene.env_origins[0])
+        # -- geodesic distances to the current waypoints (created on demand)
+        self.distance_fields: DistanceFieldCache | None = None
+        self._geodesic_distance = torch.zeros(self.num_envs, device=self.device)
+        self._geodesic_key = None
+        # note: the version only changes when waypoints are written, and the mask marks the written waypoints
+        self._waypoint_version = 0
+        self._stale_waypoints = torch.ones(self.num_envs, self.cfg.num_waypoints, dtype=torch.bool, device=self.device)
         # -- metrics
         self.metrics["error_pos"] = torch.zeros(self.num_envs, device=self.device)
         self.metrics["error_heading"] = torch.zeros(self.num_envs, device=self.device)
+        self.metrics["queue_depth"] = torch.zeros(self.num_envs, device=self.device)
+        self.metrics["waypoints_reached"] = torch.zeros(self.num_envs, device=self.device)
 
     def __str__(self) -> str:
         msg = "TrajectoryCommand:\n"
         msg += f"\tCommand dimension: {tuple(self.command.shape[1:])}\n"
         msg += f"\tResampling time range: {self.cfg.resampling_time_range}\n"
-        msg += f"\tStanding probability: {self.cfg.rel_standing_envs}"
+        msg += f"\tStanding probability: {self.cfg.rel_standing_envs}\n"
+        msg += f"\tWaypoints per queue: {self.cfg.num_waypoints} (refill: {self.cfg.refill_waypoints})"
+        if self.goal_sampler is not None:
+            msg += f"\n\tGoal sampler: {self.goal_sampler.num_free_cells} free cells"
         return msg
 
     """
@@ -72,56 +119,118 @@ class TrajectoryCommand(CommandTerm):
 
     @property
     def command(self) -> torch.Tensor:
-        """The desired base position in base frame. Shape is (num_envs, 3)."""
-        command = torch.cat((self.pos_command_b[:, :2], self.heading_command_b.view(-1, 1)), dim=-1)
-        #TODO fix numerical issues with divide by zero
-        if self.cfg.normalized:
-            command /= self.norm
-        return command
+        """The desired base position and heading in base frame. Shape is (num_envs, 3).
+
+        This is a persistent buffer that is updated in place once per step. Consumers must not modify it.
+        """
+        return self._command
+
+    @property
+    def command_version(self) -> int:
+        """The number of updates of :attr:`command`. Consumers can compare it to tell whether the command changed."""
+        return self._command_version
+
+    """
+    Operations.
+    """
+
+    def geodesic_distance(self) -> torch.Tensor:
+        """The geodesic distance from the body to the current waypoint on the occupancy grid. Shape is (num_envs,).
+
+        The distance fields to the waypoints are cached per goal cell (see :class:`DistanceFieldCache`). The
+        distances are computed at most once per step, unless the body states or the waypoints change in the
+        meantime (e.g. at a reset), so that several terms can share them.
+
+        The fields of all the waypoints of the queues are kept in the cache. They are only set for the waypoints
+        written since the last call (at the resampling, or by the refill), which synchronizes with the device once
+        to check whether their fields are cached. Advancing along a queue only selects another field on the device.
+        With the refill, the waypoints may be written at any step, so that the check runs at every step.
+
+        Raises:
+            RuntimeError: If the command has no goal sampler, and therefore no occupancy grid.
+        """
+        if self.goal_sampler is None:
+            raise RuntimeError("The geodesic distance requires an occupancy grid (TrajectoryCommandCfg.goal_sampler).")
+        if self.distance_fields is None:
+            factor = max(round(self.cfg.goal_sampler.field_resolution / self.goal_sampler.grid.resolution), 1)
+            self.distance_fields = DistanceFieldCache(
+                self.goal_sampler.grid.coarsen(factor),
+                self.num_envs,
+                self.cfg.goal_sampler.field_capacity,
+                self.cfg.num_waypoints,
+            )
+        # check whether the cached distances are up to date
+        key = (self._env.common_step_counter, self.robot.data.body_state_w._version, self._waypoint_version)
+        if key != self._geodesic_key:
+            env_origins = self._env.scene.env_origins[:, :2]
+            if self._geodesic_key is None or key[2] != self._geodesic_key[2]:
+                waypoints = self.waypoints_w[..., :2] - env_origins.unsqueeze(1)
+                self.distance_fields.set_goals(waypoints, self._stale_waypoints)
+                self._stale_waypoints.zero_()
+            body_pos = self.robot.data.body_pos_w[:, self.body_id, :2] - env_origins
+            self._geodesic_distance[:] = self.distance_fields.distance(body_pos, self._queue_head)
+            self._geodesic_key = key
+        return self._geodesic_distance
 
     """
     Implementation specific functions.
     """
 
     def _resample_command(self, env_ids: Sequence[int]):
-        # sample new position targets from the terrain
-        r = torch.empty(len(env_ids), device=self.device)
-        self.pos_command_w[env_ids, 0] = r.uniform_(*self.cfg.ranges.pos_x) * self.switch[torch.randint(2,(len(env_ids),))]
-        self.pos_command_w[env_ids, 1] = r.uniform_(*self.cfg.ranges.pos_y) * self.switch[torch.randint(2,(len(env_ids),))]
-        # offset the position command by the current root position
-        self.pos_command_w[env_ids, :2] += self.robot.data.body_pos_w[env_ids, self.body_id, :2]
-
-        if self.cfg.simple_heading:
-            # set heading command to point towards target
-            target_vec = self.pos_command_w[env_ids]# - self.robot.data.body_pos_w[env_ids, self.body_id]
-            target_direction = torch.atan2(target_vec[:, 1], target_vec[:, 0])
-            #_,_,yaw = euler_xyz_from_quat(self.robot.data.body_quat_w[env_ids, self.body_id, :])
-            self.heading_command_w[env_ids] = wrap_to_pi(target_direction)
-            #flipped_heading = wrap_to_pi(target_direction + torch.pi)
-
-            #self.heading_command_w[env_ids] = torch.where(
-            #    wrap_to_pi(target_direction - yaw).abs()
-            #    < wrap_to_pi(flipped_heading - yaw).abs(),
-            #    target_direction,
-            #    flipped_heading,
-            #)
+        # sample a new queue of waypoints chained from the current body position
+        num_waypoints = self.cfg.num_waypoints
+        start_pos = self.robot.data.body_pos_w[env_ids, self.body_id, :2]
+        if self.goal_sampler is None:
+            offsets = self._sample_offsets(env_ids, num_waypoints)
+            waypoints = start_pos.unsqueeze(1) + torch.cumsum(offsets, dim=1)
         else:
-            # random heading command
-            r = torch.empty(len(env_ids), device=self.device)
-            self.heading_command_w[env_ids] = r.uniform_(*self.cfg.ranges.heading)
+            # sample the waypoints on the free cells, each one from the previous one for the distance constraints
+            # note: the chain is sequential, so the capacity of the queues is capped (see MAX_SAMPLED_WAYPOINTS)
+            env_origins = self._env.scene.env_origins[env_ids, :2]
+            waypoints = torch.empty(len(env_ids), num_waypoints, 2, device=self.device)
+            previous = start_pos
+            for index in range(num_waypoints):
+                waypoints[:, index] = self.goal_sampler.sample(
+                    previous, env_origins, self._rng, env_ids, self.goal_distance_scale[env_ids]
+                )
+                previous = waypoints[:, index]
+            offsets = torch.diff(waypoints, dim=1, prepend=start_pos.unsqueeze(1))
+        self.waypoints_w[env_ids, :, :2] = waypoints
+        self.waypoint_headings_w[env_ids] = self._sample_headings(env_ids, offsets)
+        # reset the queues
+        self._queue_head[env_ids] = 0
+        self._queue_depth[env_ids] = num_waypoints
+        self._queue_progress[env_ids] = 0
+        # set the current waypoint as position command
+        self.pos_command_w[env_ids] = self.waypoints_w[env_ids, 0]
+        self.heading_command_w[env_ids] = self.waypoint_headings_w[env_ids, 0]
+        self._stale_waypoints[env_ids] = True
+        self._waypoint_version += 1
 
     def _update_command(self):
-        """Re-target the position command to the current body position and heading."""
-        target_vec = self.pos_command_w - self.robot.data.body_pos_w[:, self.body_id, :]
-        target_vec[:, 2] = 0
-        self.pos_command_b[:] = quat_apply_yaw(self.robot.data.body_quat_w[:, self.body_id, :], target_vec)
-        _,_,yaw = euler_xyz_from_quat(self.robot.data.body_quat_w[:, self.body_id, :])
-        self.heading_command_b[:] = wrap_to_pi(self.heading_command_w - yaw)
+        """Advance the waypoint queues and re-target the position command to the current body position and heading."""
+        self._advance_queues()
+        pos_command_b, heading_command_b = relative_pose_2d(
+            self.robot.data.body_pos_w[:, self.body_id],
+            self.robot.data.body_quat_w[:, self.body_id],
+            self.pos_command_w,
+            self.heading_command_w,
+        )
+        self.pos_command_b[:, :2] = pos_command_b
+        self.heading_command_b[:] = heading_command_b
+        # update the command buffer
+        self._command[:, :2] = self.pos_command_b[:, :2]
+        self._command[:, 2] = self.heading_command_b
+        if self.cfg.normalized:
+            self._command.mul_(self._command_scale)
+        self._command_version += 1
 
     def _update_metrics(self):
         # logs data
         self.metrics["error_pos"] = torch.norm(self.pos_command_b[:, :2], dim=1)
         self.metrics["error_heading"] = torch.abs(self.heading_command_b)
+        self.metrics["queue_depth"] = self._queue_depth.float()
+        self.metrics["waypoints_reached"] = self._queue_progress.float()
 
     def _set_debug_vis_impl(self, debug_vis: bool):
         # create markers if necessary for the first tome
@@ -183,12 +292,71 @@ class TrajectoryCommand(CommandTerm):
     Internal helpers.
     """
 
+    def _advance_queues(self):
+        """Moves the queues to their next waypoint where the body is within the threshold of the current one.
+
+        The advance is a masked update of all the queues at once. If the waypoints are refilled, the consumed slot
+        of the ring receives a new waypoint chained after the last one of the queue. The candidates are sampled for
+        all the queues and only written into the queues that advance, so that the update does not synchronize with
+        the device. Otherwise, the queue keeps its last waypoint once all the others are reached.
+        """
+        distance = torch.linalg.vector_norm(
+            self.pos_command_w[:, :2] - self.robot.data.body_pos_w[:, self.body_id, :2], dim=-1
+        )
+        reached = distance < self.cfg.threshold
+        if self.cfg.refill_waypoints:
+            # chain a new waypoint after the tail of the queue into the consumed slot, for the queues that advance
+            head = self._queue_head
+            tail = torch.remainder(head - 1, self.cfg.num_waypoints)
+            tail_waypoints = self.waypoints_w[self._env_ids, tail, :2]
+            if self.goal_sampler is None:
+                new_waypoints = tail_waypoints + self._sample_offsets(None, 1).squeeze(1)
+            else:
+                new_waypoints = self.goal_sampler.sample(
+                    tail_waypoints, self._env.scene.env_origins[:, :2], self._rng, None, self.goal_distance_scale
+                )
+            new_headings = self._sample_headings(None, (new_waypoints - tail_waypoints).unsqueeze(1)).squeeze(1)
+            self.waypoints_w[self._env_ids, head, :2] = torch.where(
+                reached.unsqueeze(-1), new_waypoints, self.waypoints_w[self._env_ids, head, :2]
+            )
+            self.waypoint_headings_w[self._env_ids, head] = torch.where(
+                reached, new_headings, self.waypoint_headings_w[self._env_ids, head]
+            )
+            self._stale_waypoints[self._env_ids, head] |= reached
+            # note: the host does not know whether a waypoint was written, so the version changes at every step
+            self._waypoint_version += 1
+        else:
+            reached &= self._queue_depth > 1
+            self._queue_depth -= reached.long()
+        self._queue_head[:] = torch.remainder(self._queue_head + reached.long(), self.cfg.num_waypoints)
+        self._queue_progress += reached.long()
+        # set the current waypoint as position command
+        self.pos_command_w[:] = self.waypoints_w[self._env_ids, self._queue_head]
+        self.heading_command_w[:] = self.waypoint_headings_w[self._env_ids, self._queue_head]
+
+    def _sample_offsets(self, env_ids: Sequence[int] | None, num_waypoints: int) -> torch.Tensor:
+        """Samples planar offsets between consecutive waypoints from the ranges with a random sign per axis.
+
+        The ranges are scaled by the goal distance scale of each environment.
+        Shape is (N, K, 2), with the K waypoints of the N environments (all of them if None).
+        """
+        offsets = self._rng.uniform(env_ids, (num_waypoints, 2), self._offset_low, self._offset_high)
+        scale = self.goal_distance_scale if env_ids is None else self.goal_distance_scale[env_ids]
+        offsets.mul_(scale.view(-1, 1, 1))
+        return offsets * self.switch[self._rng.randint(env_ids, (num_waypoints, 2), 2)]
+
+    def _sample_headings(self, env_ids: Sequence[int] | None, offsets: torch.Tensor) -> torch.Tensor:
+        """Samples the heading commands at the waypoints reached through the given offsets. Shape is (N, K)."""
+        if self.cfg.simple_heading:
+            # point towards the waypoint from the previous one
+            return torch.atan2(offsets[..., 1], offsets[..., 0])
+        # random heading command
+        return self._rng.uniform(env_ids, offsets.shape[1:-1], *self.cfg.ranges.heading)
+
     def _resolve_heading_to_arrow(self) -> torch.Tensor:
         """Converts the heading command to arrow direction rotation."""
         # arrow-direction
-        zeros = torch.zeros_like(self.heading_command_b)
-        arrow_quat = quat_from_euler_xyz(zeros, zeros, self.heading_command_b)
-        return arrow_quat
+        return quat_from_yaw(self.heading_command_b)
     
 @configclass
 class TrajectoryCommandCfg(CommandTermCfg):
@@ -211,7 +379,36 @@ class TrajectoryCommandCfg(CommandTermCfg):
     """Whether to normalize the command by the max range."""
 
     threshold: float = MISSING
-    """Threshold at which point to resample trajectory waypoints."""
+    """Distance (in m) to the current waypoint below which the queue advances to the next waypoint."""
+
+    num_waypoints: int = 1
+    """Capacity of the waypoint queue of each environment. Defaults to 1 (a single goal per resampling).
+
+    The queue is filled at every resampling with waypoints chained from the current body position, so that
+    thousands of waypoints per environment can be generated at once for long navigation episodes.
+
+    Note:
+        With a :attr:`goal_sampler`, the waypoints are sampled one after the other and the capacity is capped at
+        :data:`MAX_SAMPLED_WAYPOINTS`. Long episodes refill the queues instead (see :attr:`refill_waypoints`).
+    """
+
+    refill_waypoints: bool = False
+    """Whether to refill the queues with a new waypoint whenever one is reached. Defaults to False.
+
+    If False, the queue keeps its last waypoint once all the others are reached.
+
+    Note:
+        The refill samples a new waypoint for all the environments at every step and only writes it where the
+        current waypoint is reached, which does not synchronize with the device. The geodesic distance fields (if
+        used) are only computed for the written waypoints.
+    """
+
+    goal_sampler: OccupancyGoalSamplerCfg | None = None
+    """Configuration of the goal sampler on the occupancy grid of the scene. Defaults to None, in which case the
+    waypoints are sampled in the :attr:`ranges` around the previous waypoint.
+
+    If set, the waypoints are sampled uniformly on the free cells of the scene and the position ranges are unused.
+    """
 
     @configclass
     class Ranges:
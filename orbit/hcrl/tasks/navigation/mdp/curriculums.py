@@ -1,10 +1,17 @@
 from __future__ import annotations
 
+import torch
+from dataclasses import MISSING
 from typing import TYPE_CHECKING, Sequence
 
+from omni.isaac.lab.managers import CurriculumTermCfg, ManagerTermBase
+from omni.isaac.lab.utils import configclass
+
 if TYPE_CHECKING:
     from omni.isaac.lab.envs import RLTaskEnv
 
+    from .commands import TrajectoryCommand
+
 
 def modify_reward_weight(env: RLTaskEnv, env_ids: Sequence[int], term_name: str, weight: float, num_steps: int):
     """Curriculum that modifies a reward weight a given number of steps.
@@ -21,4 +28,118 @@ def modify_reward_weight(env: RLTaskEnv, env_ids: Sequence[int], term_name: str,
         term_cfg = env.reward_manager.get_term_cfg(term_name)
         # update term settings
         term_cfg.weight = weight
-        env.reward_manager.set_term_cfg(term_name, term_cfg)
\ No newline at end of file
+        env.reward_manager.set_term_cfg(term_name, term_cfg)
+
+
+@configclass
+class GoalDistanceCurriculumCfg:
+    """Configuration of the per-environment curriculum on the goal distances (see :class:`goal_distance_levels`)."""
+
+    command_name: str = MISSING
+    """Name of the trajectory command whose goal distances are scaled."""
+
+    threshold: float = 0.5
+    """Distance to the goal under which an episode is successful (in m). Defaults to 0.5.
+
+    It should match the goal termination of the environment.
+    """
+
+    num_levels: int = 5
+    """Number of levels of the curriculum. Defaults to 5."""
+
+    min_scale: float = 0.2
+    """Scale of the goal distances at the first level, which increases linearly to 1 at the last level.
+    Must be positive. Defaults to 0.2."""
+
+    initial_level: int = 0
+    """Level of the environments at the start of the training. Defaults to 0."""
+
+    smoothing: float = 0.2
+    """Weight of an episode in the running success rate and time to goal of its environment. Defaults to 0.2."""
+
+    min_episodes: int = 4
+    """Number of episodes of an environment at its level before it can change level. Defaults to 4."""
+
+    promotion_rate: float = 0.8
+    """Success rate above which an environment moves to the next level. Defaults to 0.8."""
+
+    demotion_rate: float = 0.3
+    """Success rate below which an environment moves to the previous level. Defaults to 0.3."""
+
+    max_time_to_goal: float = 0.75
+    """Time to goal (as a fraction of the episode length) under which an environment can move to the next level.
+    Defaults to 0.75."""
+
+
+class goal_distance_levels(ManagerTermBase):
+    """Curriculum that adapts the goal distances of each environment to its performance.
+
+    Each environment has a level, which sets the scale of its goal distances in
+    :attr:`TrajectoryCommand.goal_distance_scale`: the position ranges of the command, or the distance range of
+    its goal sampler. When episodes end, the running success rate and time to goal (as a fraction of the episode
+    length, over the successful episodes) of their environments are updated. An environment moves to the next
+    level when it reaches its goals often and fast enough, and to the previous level when it rarely reaches them,
+    once it has run enough episodes at its level.
+
+    The curriculum runs before the commands are resampled at the reset, so that the new goals use the new levels.
+    The statistics are updated on the device with masked operations over all the environments, without host
+    synchronizations. The returned state (the mean level and the fraction of the environments at each level) is
+    logged by the curriculum manager.
+    """
+
+    def __init__(self, cfg: CurriculumTermCfg, env: RLTaskEnv):
+        # initialize the base class
+        super().__init__(cfg, env)
+        self.curriculum_cfg: GoalDistanceCurriculumCfg = cfg.params["curriculum_cfg"]
+        self.command: TrajectoryCommand = env.command_manager.get_term(self.curriculum_cfg.command_name)
+        num_levels = self.curriculum_cfg.num_levels
+        # scale of the goal distances at each level
+        self._level_scales = torch.linspace(self.curriculum_cfg.min_scale, 1.0, num_levels, device=self.device)
+        # create buffers for the levels and the running statistics
+        initial_level = min(max(self.curriculum_cfg.initial_level, 0), num_levels - 1)
+        self.levels = torch.full((self.num_envs,), initial_level, dtype=torch.long, device=self.device)
+        self.success_rate = torch.full((self.num_envs,), 0.5, device=self.device)
+        self.time_to_goal = torch.zeros(self.num_envs, device=self.device)
+        self._num_episodes = torch.zeros(self.num_envs, dtype=torch.long, device=self.device)
+        self._reset_mask = torch.zeros(self.num_envs, dtype=torch.bool, device=self.device)
+        self._level_counts = torch.zeros(num_levels, device=self.device)
+        self._ones = torch.ones(self.num_envs, device=self.device)
+        # apply the initial levels
+        self.command.goal_distance_scale[:] = self._level_scales[self.levels]
+
+    def __call__(
+        self, env: RLTaskEnv, env_ids: Sequence[int], curriculum_cfg: GoalDistanceCurriculumCfg
+    ) -> dict[str, torch.Tensor]:
+        cfg = self.curriculum_cfg
+        # mark the environments whose episodes ended
+        # note: the first reset of the environment (with empty episodes) is not counted
+        self._reset_mask.zero_()
+        self._reset_mask[env_ids] = True
+        self._reset_mask &= env.episode_length_buf > 0
+        # outcome of the episodes: the command and the episode lengths are those of their last step
+        success = torch.linalg.vector_norm(self.command.pos_command_b[:, :2], dim=-1) < cfg.threshold
+        time_to_goal = env.episode_length_buf.float() / env.max_episode_length
+        # update the running statistics
+        weight = self._reset_mask.float() * cfg.smoothing
+        self.success_rate.add_(weight * (success.float() - self.success_rate))
+        self.time_to_goal.add_(weight * success * (time_to_goal - self.time_to_goal))
+        self._num_episodes.add_(self._reset_mask.long())
+        # move the environments with enough episodes to the next or previous level
+        ready = self._reset_mask & (self._num_episodes >= cfg.min_episodes)
+        promote = ready & (self.success_rate > cfg.promotion_rate) & (self.time_to_goal < cfg.max_time_to_goal)
+        demote = ready & (self.success_rate < cfg.demotion_rate)
+        self.levels.add_(promote.long() - demote.long()).clamp_(0, cfg.num_levels - 1)
+        # restart the statistics at the new level
+        changed = promote | demote
+        self._num_episodes.masked_fill_(changed, 0)
+        self.success_rate.masked_fill_(changed, 0.5 * (cfg.promotion_rate + cfg.demotion_rate))
+        # scale the goal distances of the next episodes
+        self.command.goal_distance_scale[:] = self._level_scales[self.levels]
+        # distribution of the levels
+        # note: the counts are accumulated into a fixed buffer, unlike bincount whose size depends on the levels
+        self._level_counts.zero_().scatter_add_(0, self.levels, self._ones)
+        fractions = self._level_counts / self.num_envs
+        state = {"mean_level": self.levels.float().mean(), "success_rate": self.success_rate.mean()}
+        for level in range(cfg.num_levels):
+            state[f"level_{level}"] = fractions[level]
+        return state
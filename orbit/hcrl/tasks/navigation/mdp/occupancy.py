@@ -0,0 +1,680 @@
+from __future__ import annotations
+
+import math
+import numpy as np
+import os
+import torch
+from collections.abc import Sequence
+from dataclasses import MISSING
+from typing import TYPE_CHECKING
+
+import carb
+import omni.isaac.core.utils.stage as stage_utils
+from omni.isaac.lab.utils import configclass
+from omni.isaac.lab.utils.warp import convert_to_warp_mesh, raycast_mesh
+from pxr import Usd, UsdGeom
+
+if TYPE_CHECKING:
+    from isaac.lab.hcrl.tasks.utils.rng import RandomStream
+
+
+@configclass
+class OccupancyGridCfg:
+    """Configuration for the 2D occupancy grid of a scene."""
+
+    prim_path: str = MISSING
+    """Path of the prim of the scene in the first environment (e.g. "/World/envs/env_0/ground").
+
+    All the meshes below the prim are rasterized in the frame of the environment origin. The grid is shared by all
+    the environments, which are expected to spawn the same scene at their origin.
+    """
+
+    resolution: float = 0.1
+    """Size of the cells of the grid (in m). Defaults to 0.1."""
+
+    bounds: tuple[float, float, float, float] | None = None
+    """Bounds (x_min, x_max, y_min, y_max) of the grid in the environment frame (in m). Defaults to None, in which
+    case the bounds of the meshes of the scene are used."""
+
+    floor_height: float = 0.0
+    """Height of the floor in the environment frame (in m). Defaults to 0."""
+
+    obstacle_height_range: tuple[float, float] = (0.1, 1.5)
+    """Heights above the floor between which a surface is an obstacle (in m). Defaults to (0.1, 1.5).
+
+    Surfaces below the range are floor, surfaces above it (e.g. the ceiling) are ignored. Cells without any surface
+    below the range are outside of the scene and are occupied.
+    """
+
+    clearance: float = 0.3
+    """Distance to the obstacles below which the cells are occupied, e.g. the radius of the robot (in m).
+    Defaults to 0.3."""
+
+    cache_path: str | None = None
+    """Path of the file in which the grid is cached. Defaults to None, in which case the grid is not cached.
+
+    The grid is loaded from the file if its settings match this configuration. Otherwise, the scene is rasterized
+    and the file is (over)written.
+    """
+
+
+class OccupancyGrid:
+    r"""2D occupancy grid of a scene in the frame of the environment origins.
+
+    The cell :math:`(i, j)` covers the square of the given resolution with its lower corner at
+    :math:`o + (i, j) \cdot r`, where :math:`o` is the origin of the grid, i.e. the rows follow the x-axis and the
+    columns follow the y-axis.
+    """
+
+    def __init__(self, free: torch.Tensor, origin: tuple[float, float], resolution: float):
+        """Initialize the occupancy grid.
+
+        Args:
+            free: Whether the cells are free. Shape is (H, W).
+            origin: The position (x, y) of the lower corner of the grid in the environment frame (in m).
+            resolution: The size of the cells (in m).
+        """
+        self.free = free
+        self.origin = origin
+        self.resolution = resolution
+        self.device = free.device
+        self._origin = torch.tensor(origin, device=self.device)
+
+    @classmethod
+    def from_cfg(cls, cfg: OccupancyGridCfg, env_origin: torch.Tensor) -> OccupancyGrid:
+        """Loads the grid from the cache file or rasterizes the scene.
+
+        Args:
+            cfg: The configuration of the grid.
+            env_origin: The origin of the environment in which the scene prim is spawned. Shape is (3,).
+
+        Returns:
+            The occupancy grid.
+        """
+        settings = cls._settings(cfg)
+        if cfg.cache_path is not None and os.path.isfile(cfg.cache_path):
+            data = torch.load(cfg.cache_path, map_location=env_origin.device)
+            if data.get("settings") == settings:
+                carb.log_info(f"Loaded the occupancy grid of '{cfg.prim_path}' from: {cfg.cache_path}")
+                return cls(data["free"], tuple(data["origin"]), data["resolution"])
+            carb.log_warn(f"The occupancy grid cached in '{cfg.cache_path}' does not match the settings.")
+        grid = cls.from_stage(cfg, env_origin)
+        if cfg.cache_path is not None:
+            grid.save(cfg.cache_path, settings)
+        return grid
+
+    @classmethod
+    def from_stage(cls, cfg: OccupancyGridCfg, env_origin: torch.Tensor) -> OccupancyGrid:
+        """Rasterizes the meshes of the scene with vertical rays cast at the centers of the cells.
+
+        Args:
+            cfg: The configuration of the grid.
+            env_origin: The origin of the environment in which the scene prim is spawned. Shape is (3,).
+
+        Returns:
+            The occupancy grid.
+        """
+        device = str(env_origin.device)
+        points, triangles = _collect_meshes(cfg.prim_path)
+        points -= env_origin.cpu().numpy()
+        carb.log_info(f"Rasterizing {len(triangles)} triangles of '{cfg.prim_path}' into an occupancy grid.")
+        # resolve the cells
+        if cfg.bounds is None:
+            x_min, y_min = points[:, :2].min(axis=0)
+            x_max, y_max = points[:, :2].max(axis=0)
+        else:
+            x_min, x_max, y_min, y_max = cfg.bounds
+        num_x = max(math.ceil((x_max - x_min) / cfg.resolution), 1)
+        num_y = max(math.ceil((y_max - y_min) / cfg.resolution), 1)
+        # cast the rays downwards from the top of the obstacle height range
+        x = x_min + (torch.arange(num_x, device=device) + 0.5) * cfg.resolution
+        y = y_min + (torch.arange(num_y, device=device) + 0.5) * cfg.resolution
+        ray_starts = torch.zeros(num_x, num_y, 3, device=device)
+        ray_starts[..., 0] = x.unsqueeze(1)
+        ray_starts[..., 1] = y.unsqueeze(0)
+        ray_starts[..., 2] = cfg.floor_height + cfg.obstacle_height_range[1]
+        ray_directions = torch.zeros_like(ray_starts)
+        ray_directions[..., 2] = -1.0
+        mesh = convert_to_warp_mesh(points, triangles, device=device)
+        ray_hits = raycast_mesh(ray_starts.view(1, -1, 3), ray_directions.view(1, -1, 3), mesh)[0]
+        hit_height = ray_hits.view(num_x, num_y, 3)[..., 2] - cfg.floor_height
+        # free cells: floor below the obstacle height range
+        free = torch.isfinite(hit_height) & (hit_height < cfg.obstacle_height_range[0])
+        # inflate the obstacles by the clearance with a disk
+        radius = math.ceil(cfg.clearance / cfg.resolution)
+        if radius > 0:
+            offsets = torch.arange(-radius, radius + 1, device=device, dtype=torch.float) * cfg.resolution
+            disk = (offsets.view(-1, 1).square() + offsets.view(1, -1).square() <= cfg.clearance**2).float()
+            occupied = torch.nn.functional.conv2d((~free).float()[None, None], disk[None, None], padding=radius)[0, 0]
+            free &= occupied == 0.0
+        return cls(free, (float(x_min), float(y_min)), cfg.resolution)
+
+    """
+    Properties.
+    """
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """The number of cells along the x and y axes."""
+        return tuple(self.free.shape)
+
+    """
+    Operations.
+    """
+
+    def save(self, path: str, settings: dict | None = None):
+        """Saves the grid to a file.
+
+        Args:
+            path: The path of the file.
+            settings: The settings with which the grid was computed. Defaults to None.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        data = {"free": self.free.cpu(), "origin": self.origin, "resolution": self.resolution, "settings": settings}
+        torch.save(data, path)
+        carb.log_info(f"Saved the occupancy grid to: {path}")
+
+    def coarsen(self, factor: int) -> OccupancyGrid:
+        """Returns a coarser grid in which a cell is free if most of the cells it covers are free.
+
+        Args:
+            factor: The number of cells of this grid along each axis of a coarse cell.
+
+        Returns:
+            The coarse occupancy grid.
+        """
+        free_ratio = torch.nn.functional.avg_pool2d(self.free.float()[None, None], factor, ceil_mode=True)
+        return OccupancyGrid(free_ratio[0, 0] >= 0.5, self.origin, factor * self.resolution)
+
+    def cell_index(self, pos: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor]:
+        """Returns the cells that contain the positions, clamped to the grid.
+
+        Args:
+            pos: The positions (x, y) in the environment frame. Shape is (..., 2).
+
+        Returns:
+            The indices of the cells along the x and y axes. Shape of each is (...).
+        """
+        cells = torch.floor((pos - self._origin) / self.resolution).long()
+        return cells[..., 0].clamp(0, self.free.shape[0] - 1), cells[..., 1].clamp(0, self.free.shape[1] - 1)
+
+    def cell_center(self, cells: torch.Tensor) -> torch.Tensor:
+        """Returns the centers of cells in the environment frame.
+
+        Args:
+            cells: The indices of the cells along the x and y axes. Shape is (..., 2).
+
+        Returns:
+            The positions (x, y) of the centers. Shape is (..., 2).
+        """
+        return self._origin + (cells + 0.5) * self.resolution
+
+    """
+    Helper functions.
+    """
+
+    @staticmethod
+    def _settings(cfg: OccupancyGridCfg) -> dict:
+        """Returns the settings that determine the grid, to validate the cache file."""
+        return {
+            "prim_path": cfg.prim_path,
+            "resolution": cfg.resolution,
+            "bounds": cfg.bounds,
+            "floor_height": cfg.floor_height,
+            "obstacle_height_range": cfg.obstacle_height_range,
+            "clearance": cfg.clearance,
+        }
+
+
+def distance_field(
+    free: torch.Tensor, sources: torch.Tensor, resolution: float = 1.0, check_interval: int = 16
+) -> torch.Tensor:
+    """Computes the geodesic distances from source cells to all the cells of an occupancy grid.
+
+    The distances are shortest paths on the 8-connected free cells, computed for all the sources at once with
+    Bellman-Ford relaxations (one shifted minimum per neighbor). The relaxation stops once the distances no longer
+    change, which is checked every few iterations to limit the synchronizations with the device.
+
+    Args:
+        free: Whether the cells are free. Shape is (H, W).
+        sources: The indices of the source cells. Shape is (B, 2).
+        resolution: The size of the cells. Defaults to 1.0.
+        check_interval: The number of relaxations between the convergence checks. Defaults to 16.
+
+    Returns:
+        The distances from each source to each cell, infinite for the cells that are occupied or not reachable.
+        The source cells are passable even if they are occupied. Shape is (B, H, W).
+    """
+    num_x, num_y = free.shape
+    batch_ids = torch.arange(len(sources), device=free.device)
+    blocked = (~free).expand(len(sources), num_x, num_y).clone()
+    blocked[batch_ids, sources[:, 0], sources[:, 1]] = False
+    dist = torch.full((len(sources), num_x, num_y), float("inf"), device=free.device)
+    dist[batch_ids, sources[:, 0], sources[:, 1]] = 0.0
+    neighbors = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx != 0 or dy != 0]
+    costs = [resolution * math.hypot(dx, dy) for dx, dy in neighbors]
+    # the distances converge after at most one relaxation per cell of the longest path
+    for iteration in range(num_x * num_y):
+        padded = torch.nn.functional.pad(dist, (1, 1, 1, 1), value=float("inf"))
+        new_dist = dist.clone()
+        for (dx, dy), cost in zip(neighbors, costs):
+            torch.minimum(new_dist, padded[:, 1 + dx : 1 + dx + num_x, 1 + dy : 1 + dy + num_y] + cost, out=new_dist)
+        new_dist.masked_fill_(blocked, float("inf"))
+        if iteration % check_interval == 0 and torch.equal(new_dist, dist):
+            break
+        dist = new_dist
+    return dist
+
+
+class DistanceFieldCache:
+    """Least recently used (LRU) cache of the geodesic distance fields to the goal cells of an occupancy grid.
+
+    The fields are stored in a single buffer with a slot per goal cell. The slots of the cells are tracked in a
+    dense table on the device, so that finding the fields of the goals of all the environments is a gather. The
+    fields of the goals that are not cached are computed in a batch (see :func:`distance_field`) into the least
+    recently used slots that no environment currently needs. The buffer grows if there are not enough of them.
+
+    Each environment can hold several goals (e.g. the waypoints of a queue), whose fields are all kept in the
+    cache. The lookups select the current goal of each environment on the device, so that moving to another held
+    goal does not require setting the goals again.
+    """
+
+    def __init__(self, grid: OccupancyGrid, num_envs: int, capacity: int = 2048, num_goals: int = 1):
+        """Initialize the cache.
+
+        Args:
+            grid: The occupancy grid on which the distance fields are computed.
+            num_envs: The number of environments.
+            capacity: The initial number of cached fields. Defaults to 2048.
+            num_goals: The number of goals held by each environment. Defaults to 1.
+        """
+        self.grid = grid
+        self.num_envs = num_envs
+        self.num_goals = num_goals
+        self.device = grid.device
+        self.num_cells = grid.free.numel()
+        # cached fields and their goal cells
+        self._fields = torch.full((capacity, self.num_cells), float("inf"), device=self.device)
+        self._slot_of_cell = torch.full((self.num_cells,), -1, dtype=torch.long, device=self.device)
+        self._cell_of_slot = torch.full((capacity,), -1, dtype=torch.long, device=self.device)
+        self._last_used = torch.zeros(capacity, dtype=torch.long, device=self.device)
+        self._clock = 0
+        # goals of the environments
+        self._env_slots = torch.zeros(num_envs, num_goals, dtype=torch.long, device=self.device)
+        self._env_goal_pos = torch.zeros(num_envs, num_goals, 2, device=self.device)
+        self._env_goal_cell = torch.zeros(num_envs, num_goals, 2, dtype=torch.long, device=self.device)
+        self._env_ids = torch.arange(num_envs, device=self.device)
+        self._first_goal = torch.zeros(num_envs, dtype=torch.long, device=self.device)
+        # 3x3 neighborhood of the cells
+        offsets = torch.arange(-1, 2, device=self.device)
+        self._neighbors = torch.stack(torch.meshgrid(offsets, offsets, indexing="ij"), dim=-1).view(1, 9, 2)
+
+    """
+    Properties.
+    """
+
+    @property
+    def capacity(self) -> int:
+        """The number of fields that can be cached."""
+        return len(self._fields)
+
+    @property
+    def num_cached(self) -> int:
+        """The number of cached fields."""
+        return int((self._cell_of_slot >= 0).sum())
+
+    """
+    Operations.
+    """
+
+    def set_goals(self, goal_pos: torch.Tensor, mask: torch.Tensor | None = None):
+        """Sets the goals of the environments and computes the fields that are not cached yet.
+
+        This synchronizes with the device once to check whether all the fields are cached. The other updates are
+        masked operations on the device.
+
+        Args:
+            goal_pos: The goal positions (x, y) in the frame of the grid. Shape is (N, G, 2), or (N, 2) if the
+                environments hold a single goal.
+            mask: The goals to set. Shape is (N, G), or (N,) if the environments hold a single goal. Defaults to
+                None, in which case all the goals are set.
+        """
+        goal_pos = goal_pos.view(self.num_envs, self.num_goals, 2)
+        mask = torch.ones_like(self._env_slots, dtype=torch.bool) if mask is None else mask.view_as(self._env_slots)
+        goal_cell = torch.stack(self.grid.cell_index(goal_pos), dim=-1)
+        keys = goal_cell[..., 0] * self.grid.shape[1] + goal_cell[..., 1]
+        slots = self._slot_of_cell[keys]
+        missing = mask & (slots < 0)
+        if missing.any():
+            # note: the fields of the goals that are kept or already cached must not be evicted
+            used_slots = torch.where(mask, slots, self._env_slots)
+            self._compute_fields(torch.unique(keys[missing]), used_slots[used_slots >= 0])
+            slots = self._slot_of_cell[keys]
+        # mark the fields of the new goals as used (the other entries keep their time)
+        self._clock += 1
+        self._last_used.scatter_reduce_(0, slots.clamp_min(0).view(-1), (mask * self._clock).view(-1), "amax")
+        self._env_slots[:] = torch.where(mask, slots, self._env_slots)
+        self._env_goal_pos[:] = torch.where(mask.unsqueeze(-1), goal_pos, self._env_goal_pos)
+        self._env_goal_cell[:] = torch.where(mask.unsqueeze(-1), goal_cell, self._env_goal_cell)
+
+    def distance(self, pos: torch.Tensor, goal_ids: torch.Tensor | None = None) -> torch.Tensor:
+        """Looks up the geodesic distances from positions to the current goals of the environments.
+
+        The distance is the smallest sum of the field at one of the 3x3 neighbor cells of the position and of the
+        straight-line distance to its center. Next to the goal cell, or if no neighbor cell reaches the goal, the
+        straight-line distance to the goal is used.
+
+        Args:
+            pos: The positions (x, y) in the frame of the grid. Shape is (N, 2).
+            goal_ids: The index of the current goal of each environment among its goals. Shape is (N,).
+                Defaults to None, in which case the first goal is used.
+
+        Returns:
+            The geodesic distances to the goals. Shape is (N,).
+        """
+        if goal_ids is None:
+            goal_ids = self._first_goal
+        env_slots = self._env_slots[self._env_ids, goal_ids]
+        env_goal_pos = self._env_goal_pos[self._env_ids, goal_ids]
+        env_goal_cell = self._env_goal_cell[self._env_ids, goal_ids]
+        num_x, num_y = self.grid.shape
+        cell = torch.floor((pos - self.grid._origin) / self.grid.resolution).long()
+        neighbors = cell.unsqueeze(1) + self._neighbors
+        inside = (neighbors >= 0).all(dim=-1) & (neighbors[..., 0] < num_x) & (neighbors[..., 1] < num_y)
+        flat = neighbors[..., 0].clamp(0, num_x - 1) * num_y + neighbors[..., 1].clamp(0, num_y - 1)
+        # gather the fields of the goals at the neighbor cells
+        values = self._fields.view(-1)[env_slots.unsqueeze(1) * self.num_cells + flat]
+        offsets = torch.linalg.vector_norm(self.grid.cell_center(neighbors) - pos.unsqueeze(1), dim=-1)
+        geodesic = (values + offsets).masked_fill_(~inside, float("inf")).amin(dim=1)
+        direct = torch.linalg.vector_norm(env_goal_pos - pos, dim=-1)
+        near_goal = (cell - env_goal_cell).abs().amax(dim=-1) <= 1
+        return torch.where(near_goal | torch.isinf(geodesic), direct, geodesic)
+
+    """
+    Helper functions.
+    """
+
+    def _compute_fields(self, keys: torch.Tensor, used_slots: torch.Tensor):
+        """Computes the fields of new goal cells into the least recently used slots.
+
+        Args:
+            keys: The flat indices of the new goal cells. Shape is (K,).
+            used_slots: The slots of the cached fields that are used by the environments. Shape is (M,).
+        """
+        in_use = torch.zeros(self.capacity, dtype=torch.bool, device=self.device)
+        in_use[used_slots] = True
+        num_available = self.capacity - int(in_use.sum())
+        if len(keys) > num_available:
+            self._grow(self.capacity + len(keys) - num_available)
+            in_use = torch.cat((in_use, torch.zeros(self.capacity - len(in_use), dtype=torch.bool, device=self.device)))
+        # least recently used slots first, the empty slots have never been used
+        priority = self._last_used.masked_fill(in_use, torch.iinfo(torch.long).max)
+        slots = torch.topk(priority, len(keys), largest=False).indices
+        # evict the previous goal cells of the slots
+        evicted = self._cell_of_slot[slots]
+        self._slot_of_cell[evicted[evicted >= 0]] = -1
+        self._slot_of_cell[keys] = slots
+        self._cell_of_slot[slots] = keys
+        # compute the fields in chunks to bound the memory
+        sources = torch.stack((keys // self.grid.shape[1], keys % self.grid.shape[1]), dim=-1)
+        chunk_size = max(2**24 // self.num_cells, 1)
+        for start in range(0, len(keys), chunk_size):
+            fields = distance_field(self.grid.free, sources[start : start + chunk_size], self.grid.resolution)
+            self._fields[slots[start : start + chunk_size]] = fields.view(len(fields), -1)
+
+    def _grow(self, capacity: int):
+        """Grows the buffer of the fields to a new capacity."""
+        carb.log_warn(
+            f"Growing the distance field cache from {self.capacity} to {capacity} fields. Increase its capacity to"
+            " avoid the reallocation."
+        )
+        num_new = capacity - self.capacity
+        self._fields = torch.cat((self._fields, self._fields.new_full((num_new, self.num_cells), float("inf"))))
+        self._cell_of_slot = torch.cat((self._cell_of_slot, self._cell_of_slot.new_full((num_new,), -1)))
+        self._last_used = torch.cat((self._last_used, self._last_used.new_zeros(num_new)))
+
+
+@configclass
+class OccupancyGoalSamplerCfg:
+    """Configuration for the goal sampler on the free cells of an occupancy grid."""
+
+    grid: OccupancyGridCfg = MISSING
+    """Configuration of the occupancy grid of the scene."""
+
+    distance_range: tuple[float, float] = (0.0, float("inf"))
+    """Range of the geodesic distances between consecutive goals (in m). Defaults to (0, inf), i.e. no constraint.
+
+    The geodesic distances are looked up in a table of the shortest paths between the cells of a coarser grid (see
+    :attr:`geodesic_resolution`), which is computed once and stored in the cache file of the grid.
+    """
+
+    geodesic_resolution: float = 0.5
+    """Size of the cells of the coarse grid of the geodesic distance table (in m). Defaults to 0.5.
+
+    A coarse cell is free if most of its cells in the occupancy grid are free.
+    """
+
+    num_candidates: int = 16
+    """Number of goals sampled per environment to satisfy the distance constraints. Defaults to 16.
+
+    The first candidate within the distance range is kept. If none is, the candidate closest to the range is kept.
+    """
+
+    field_resolution: float = 0.5
+    """Size of the cells of the geodesic distance fields to the goals (in m). Defaults to 0.5.
+
+    The fields are computed on demand, e.g. by the geodesic reward terms, and cached per goal cell (see
+    :class:`DistanceFieldCache`).
+    """
+
+    field_capacity: int = 2048
+    """Initial number of distance fields in the cache. Defaults to 2048."""
+
+
+class OccupancyGoalSampler:
+    """Samples goals uniformly on the free cells of an occupancy grid.
+
+    The free cells are indexed once, so that sampling a goal is a random index into the free cells for all the
+    environments at once. The goals are uniformly distributed within their cells.
+    """
+
+    def __init__(self, cfg: OccupancyGoalSamplerCfg, grid: OccupancyGrid):
+        """Initialize the goal sampler.
+
+        Args:
+            cfg: The configuration of the goal sampler.
+            grid: The occupancy grid of the scene.
+
+        Raises:
+            ValueError: If the occupancy grid has no free cell.
+        """
+        self.cfg = cfg
+        self.grid = grid
+        self.device = grid.device
+        # index of the free cells
+        self._free_cells = torch.nonzero(grid.free)
+        if len(self._free_cells) == 0:
+            raise ValueError(f"The occupancy grid of '{cfg.grid.prim_path}' has no free cell.")
+        # geodesic distances between the coarse cells
+        self._constrained = cfg.distance_range[0] > 0.0 or math.isfinite(cfg.distance_range[1])
+        if self._constrained:
+            self._coarse_cell_of_cell, self._geodesic = self._geodesic_table()
+
+    @classmethod
+    def from_cfg(cls, cfg: OccupancyGoalSamplerCfg, env_origin: torch.Tensor) -> OccupancyGoalSampler:
+        """Creates the goal sampler with the occupancy grid loaded from the cache file or rasterized from the scene.
+
+        Args:
+            cfg: The configuration of the goal sampler.
+            env_origin: The origin of the environment in which the scene prim is spawned. Shape is (3,).
+
+        Returns:
+            The goal sampler.
+        """
+        return cls(cfg, OccupancyGrid.from_cfg(cfg.grid, env_origin))
+
+    """
+    Properties.
+    """
+
+    @property
+    def num_free_cells(self) -> int:
+        """The number of free cells of the grid."""
+        return len(self._free_cells)
+
+    """
+    Operations.
+    """
+
+    def sample(
+        self,
+        start_pos_w: torch.Tensor,
+        env_origins: torch.Tensor,
+        rng: RandomStream | None = None,
+        env_ids: Sequence[int] | None = None,
+        distance_scale: torch.Tensor | None = None,
+    ) -> torch.Tensor:
+        """Samples a goal per environment.
+
+        Args:
+            start_pos_w: The positions (x, y) from which the goals are reached, in the world frame. Shape is (N, 2).
+            env_origins: The origins (x, y) of the environments in the world frame. Shape is (N, 2).
+            rng: The random stream of the environments. Defaults to None, in which case the global generator of
+                PyTorch is used.
+            env_ids: The environments of the samples in the random stream. Defaults to None (all the environments).
+            distance_scale: The scale of the distance range of each environment. Shape is (N,). Defaults to None,
+                in which case the distance range is not scaled.
+
+        Returns:
+            The goals (x, y) in the world frame. Shape is (N, 2).
+        """
+        num_envs = len(start_pos_w)
+        num_candidates = self.cfg.num_candidates if self._constrained else 1
+        if rng is None:
+            indices = torch.randint(len(self._free_cells), (num_envs, num_candidates), device=self.device)
+            jitter = torch.rand(num_envs, num_candidates, 2, device=self.device)
+        else:
+            indices = rng.randint(env_ids, (num_candidates,), len(self._free_cells))
+            jitter = rng.uniform(env_ids, (num_candidates, 2))
+        cells = self._free_cells[indices]
+        jitter = (jitter - 0.5) * self.grid.resolution
+        goals = self.grid.cell_center(cells) + jitter
+        if self._constrained:
+            # keep the first candidate within the distance range, or else the one closest to it
+            distance = self.geodesic_distance(start_pos_w - env_origins, cells)
+            low, high = self.cfg.distance_range
+            if distance_scale is not None:
+                low, high = low * distance_scale.unsqueeze(1), high * distance_scale.unsqueeze(1)
+            violation = (low - distance).clamp_min(0.0) + (distance - high).clamp_min(0.0)
+            choice = violation.argmin(dim=1)
+            goals = goals[torch.arange(num_envs, device=self.device), choice]
+        else:
+            goals = goals.squeeze(1)
+        return goals + env_origins
+
+    def geodesic_distance(self, pos: torch.Tensor, cells: torch.Tensor) -> torch.Tensor:
+        """Looks up the geodesic distances from positions to cells in the coarse distance table.
+
+        Args:
+            pos: The positions (x, y) in the environment frame. Shape is (N, 2).
+            cells: The indices of the target cells. Shape is (N, C, 2).
+
+        Returns:
+            The geodesic distances, or the straight-line distances if the positions are not in a free coarse cell.
+            Shape is (N, C).
+        """
+        start = self._coarse_cell_of_cell[self.grid.cell_index(pos)]
+        target = self._coarse_cell_of_cell[cells[..., 0], cells[..., 1]]
+        geodesic = self._geodesic[start.clamp_min(0).unsqueeze(1), target.clamp_min(0)].float()
+        euclidean = torch.linalg.vector_norm(self.grid.cell_center(cells) - pos.unsqueeze(1), dim=-1)
+        valid = (start >= 0).unsqueeze(1) & (target >= 0)
+        return torch.where(valid, geodesic, euclidean)
+
+    """
+    Helper functions.
+    """
+
+    def _geodesic_table(self) -> tuple[torch.Tensor, torch.Tensor]:
+        """Computes the coarse cell of each cell and the geodesic distances between the free coarse cells.
+
+        The table is stored in the cache file of the grid, next to the grid.
+        """
+        factor = max(round(self.cfg.geodesic_resolution / self.grid.resolution), 1)
+        cache_path = self.cfg.grid.cache_path
+        key = {"grid": OccupancyGrid._settings(self.cfg.grid), "factor": factor}
+        data = torch.load(cache_path, map_location=self.device) if cache_path and os.path.isfile(cache_path) else {}
+        if data.get("geodesic_settings") == key:
+            geodesic = data["geodesic"]
+            coarse_free = data["geodesic_free"]
+        else:
+            coarse_grid = self.grid.coarsen(factor)
+            coarse_free = coarse_grid.free
+            carb.log_info(f"Computing the geodesic distance table of the occupancy grid at {coarse_grid.resolution} m.")
+            sources = torch.nonzero(coarse_free)
+            geodesic = torch.empty(len(sources), len(sources), dtype=torch.half, device=self.device)
+            # bound the memory of the distance fields
+            chunk_size = max(2**24 // coarse_free.numel(), 1)
+            for start in range(0, len(sources), chunk_size):
+                fields = distance_field(coarse_free, sources[start : start + chunk_size], coarse_grid.resolution)
+                geodesic[start : start + chunk_size] = fields[:, sources[:, 0], sources[:, 1]].half()
+            if cache_path is not None and data:
+                data.update({"geodesic_settings": key, "geodesic": geodesic.cpu(), "geodesic_free": coarse_free.cpu()})
+                torch.save(data, cache_path)
+        # index of the free coarse cells, -1 for the occupied ones
+        coarse_index = torch.full(coarse_free.shape, -1, dtype=torch.long, device=self.device)
+        coarse_index[coarse_free] = torch.arange(int(coarse_free.sum()), device=self.device)
+        rows = torch.arange(self.grid.shape[0], device=self.device) // factor
+        cols = torch.arange(self.grid.shape[1], device=self.device) // factor
+        return coarse_index[rows.unsqueeze(1), cols.unsqueeze(0)], geodesic
+
+
+"""
+Helper functions.
+"""
+
+
+def _collect_meshes(prim_path: str) -> tuple[np.ndarray, np.ndarray]:
+    """Collects the triangles of all the meshes below a prim in the world frame.
+
+    Args:
+        prim_path: The path of the prim.
+
+    Returns:
+        The vertices, shape is (V, 3), and the vertex indices of the triangles, shape is (T, 3).
+
+    Raises:
+        ValueError: If the prim is not valid or has no mesh.
+    """
+    stage = stage_utils.get_current_stage()
+    prim = stage.GetPrimAtPath(prim_path)
+    if not prim.IsValid():
+        raise ValueError(f"Invalid prim path for the occupancy grid: {prim_path}")
+    xform_cache = UsdGeom.XformCache()
+    all_points, all_triangles, num_points = list(), list(), 0
+    for child in Usd.PrimRange(prim, Usd.TraverseInstanceProxies()):
+        if not child.IsA(UsdGeom.Mesh):
+            continue
+        mesh = UsdGeom.Mesh(child)
+        points = mesh.GetPointsAttr().Get()
+        counts = mesh.GetFaceVertexCountsAttr().Get()
+        if points is None or counts is None or len(points) == 0:
+            continue
+        points = np.asarray(points, dtype=np.float64)
+        counts = np.asarray(counts)
+        indices = np.asarray(mesh.GetFaceVertexIndicesAttr().Get())
+        # transform the vertices to the world frame (row-vector convention)
+        transform = np.array(xform_cache.GetLocalToWorldTransform(child))
+        points = points @ transform[:3, :3] + transform[3, :3]
+        # fan triangulation of the polygons
+        starts = np.cumsum(counts) - counts
+        num_triangles = np.clip(counts - 2, 0, None)
+        faces = np.repeat(np.arange(len(counts)), num_triangles)
+        corners = np.arange(num_triangles.sum()) - np.repeat(np.cumsum(num_triangles) - num_triangles, num_triangles)
+        first = starts[faces]
+        triangles = np.stack((indices[first], indices[first + corners + 1], indices[first + corners + 2]), axis=-1)
+        all_points.append(points)
+        all_triangles.append(triangles + num_points)
+        num_points += len(points)
+    if len(all_points) == 0:
+        raise ValueError(f"No mesh found below the prim of the occupancy grid: {prim_path}")
+    return np.concatenate(all_points).astype(np.float32), np.concatenate(all_triangles).astype(np.int32)
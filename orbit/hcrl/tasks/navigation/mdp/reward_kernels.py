@@ -0,0 +1,34 @@
+"""Kernels of the fused navigation rewards.
+
+They only depend on PyTorch, so that they can be wrapped with :func:`torch.compile` and tested without launching
+the simulator.
+"""
+
+from __future__ import annotations
+
+import torch
+
+
+def _navigation_rewards(
+    command: torch.Tensor,
+    joint_vel: torch.Tensor,
+    joint_ids: slice | torch.Tensor,
+    joint_thresholds: torch.Tensor,
+    joint_penalties: torch.Tensor,
+    goal_threshold: float,
+    goal_bonus: float,
+    pose_variance: float,
+    heading_variance: float,
+) -> torch.Tensor:
+    """Computes the unweighted components of the navigation rewards.
+
+    The expressions are those of the separate terms, so that the results match them.
+    """
+    goal_pose_b = command[:, :2]
+    goal_reached = torch.where(torch.linalg.norm(goal_pose_b, dim=-1) < goal_threshold, goal_bonus, 0.0)
+    pose_tracking = torch.exp(-torch.sum(goal_pose_b.abs(), dim=-1) / pose_variance)
+    heading_tracking = torch.exp(-command[:, 2].abs() / heading_variance)
+    # velocity penalties of all the joints, summed per penalty
+    excess = (joint_vel[:, joint_ids].abs() - joint_thresholds).clamp_min(0.0)
+    penalties = torch.square(excess) @ joint_penalties
+    return torch.cat((torch.stack((goal_reached, pose_tracking, heading_tracking), dim=-1), penalties), dim=-1)
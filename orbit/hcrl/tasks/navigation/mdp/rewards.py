@@ -1,16 +1,25 @@
 from __future__ import annotations
 
 import torch
+import weakref
+from dataclasses import MISSING
 from typing import TYPE_CHECKING, Any
 
 from omni.isaac.lab.sensors import ContactSensor
 import omni.isaac.lab.utils.math as math_utils
 from omni.isaac.lab.assets import Articulation
 from omni.isaac.lab.managers import ManagerTermBase, RewardTermCfg, SceneEntityCfg
+from omni.isaac.lab.utils import configclass
+
+from isaac.lab.hcrl.tasks.utils.resolution import bind_ids, resolve_body_ids, resolve_joint_ids
+
+from .reward_kernels import _navigation_rewards
 
 if TYPE_CHECKING:
     from omni.isaac.lab.envs import RLTaskEnv
 
+    from .commands import TrajectoryCommand
+
 def pose_tracking_exp_l2(env: RLTaskEnv, command_name: str, std: float = 1.0) -> torch.Tensor:
     """
     Reward pose command tracking
@@ -71,13 +80,13 @@ class pose_potential_tracking(ManagerTermBase):
     def __init__(self, env: RLTaskEnv, cfg: RewardTermCfg):
         # initialize the base class
         super().__init__(cfg, env)
+        # resolve the body once
+        asset: Articulation = env.scene["robot"]
+        self.body_id = resolve_body_ids(asset, cfg.params["body_name"])[0][0]
         # create history buffer
         self.last_distance_to_goal = torch.zeros(env.num_envs, device=env.device)
 
     def reset(self, env_ids: torch.Tensor):
-        # extract the used quantities (to enable type-hinting)
-        asset: Articulation = self._env.scene["robot"]
-        self.body_id = asset.find_bodies(self.cfg.params["body_name"])[0][0]
         # compute projection of current heading to desired heading vector
         goal_pose = torch.linalg.norm(self._env.command_manager.get_command(self.cfg.params["command_name"])[env_ids, :2], dim=-1)
         #distance_to_goal = torch.linalg.norm(goal_pose - asset.data.body_pos_w[env_ids, self.body_id, :2], dim=-1)
@@ -104,6 +113,44 @@ class pose_potential_tracking(ManagerTermBase):
         # reward terms
         return torch.clamp(potential, -1, 1)
 
+def geodesic_tracking_exp(env: RLTaskEnv, command_name: str, std: float = 1.0) -> torch.Tensor:
+    """Reward the geodesic distance to the goal on the occupancy grid of the scene.
+
+    The geodesic counterpart of :func:`pose_tracking_exp_l1`, which uses the straight-line distance through the
+    obstacles. The command must be a :class:`TrajectoryCommand` with a goal sampler.
+    """
+    command: TrajectoryCommand = env.command_manager.get_term(command_name)
+    return torch.exp(-command.geodesic_distance() / std**2)
+
+
+class geodesic_potential_tracking(ManagerTermBase):
+    """Reward for making progress towards the goal along the geodesic on the occupancy grid of the scene.
+
+    The geodesic counterpart of :class:`pose_potential_tracking`. There is no progress at the steps where the goal
+    changes, i.e. after a reset or when the next waypoint of the queue becomes the goal.
+    """
+
+    def __init__(self, env: RLTaskEnv, cfg: RewardTermCfg):
+        # initialize the base class
+        super().__init__(cfg, env)
+        # create history buffers
+        self.last_distance_to_goal = torch.zeros(env.num_envs, device=env.device)
+        self.last_goal = torch.full((env.num_envs, 3), float("nan"), device=env.device)
+
+    def __call__(self, env: RLTaskEnv, command_name: str, threshold: float = 0.01) -> torch.Tensor:
+        command: TrajectoryCommand = env.command_manager.get_term(command_name)
+        distance = command.geodesic_distance()
+        # progress towards the goal, normalized by the distance travelled at the current speed
+        vel_norm = torch.linalg.norm(command.robot.data.body_lin_vel_w[:, command.body_id, :2], dim=-1)
+        progress = self.last_distance_to_goal - distance
+        potential = torch.where(vel_norm > threshold, progress / (vel_norm * env.step_dt), 0)
+        potential.masked_fill_((command.pos_command_w != self.last_goal).any(dim=-1), 0.0)
+        # update the history
+        self.last_distance_to_goal[:] = distance
+        self.last_goal[:] = command.pos_command_w
+        return torch.clamp(potential, -1, 1)
+
+
 def joint_velocity_limit(env: RLTaskEnv, asset_cfg: SceneEntityCfg, threshold: float) -> torch.Tensor:
     # extract the used quantities (to enable type-hinting)
     asset: Articulation = env.scene[asset_cfg.name]
@@ -112,4 +159,219 @@ def joint_velocity_limit(env: RLTaskEnv, asset_cfg: SceneEntityCfg, threshold: f
         speed - threshold,
         0,
     )
-    return torch.sum(torch.square(velocity_penalty), dim=1)
\ No newline at end of file
+    return torch.sum(torch.square(velocity_penalty), dim=1)
+
+
+##
+# Fused navigation rewards
+##
+
+
+@configclass
+class NavigationRewardsCfg:
+    """Configuration of the navigation rewards that are computed in one pass by :class:`NavigationRewards`.
+
+    The parameters are those of the separate terms :func:`position_goal_reached_bonus`,
+    :func:`pose_tracking_exp_l1`, :func:`heading_tracking_exp_l1` and :func:`joint_velocity_limit`.
+    """
+
+    command_name: str = MISSING
+    """Name of the pose command."""
+
+    asset_name: str = "robot"
+    """Name of the articulation of the joint velocity penalties. Defaults to "robot"."""
+
+    goal_threshold: float = 0.5
+    """Distance to the goal under which the goal is reached (in m). Defaults to 0.5."""
+
+    goal_bonus: float = 1.0
+    """Reward when the goal is reached. Defaults to 1.0."""
+
+    pose_std: float = 1.0
+    """Standard deviation of the position tracking kernel. Defaults to 1.0."""
+
+    heading_std: float = 1.0
+    """Standard deviation of the heading tracking kernel. Defaults to 1.0."""
+
+    joint_velocity_limits: dict[str, tuple[str | list[str], float]] = dict()
+    """Joint velocity penalties by component name: the joint names and the velocity threshold. Defaults to none."""
+
+    compile: bool = False
+    """Whether to compile the fused computation with :func:`torch.compile`. Defaults to False."""
+
+
+class NavigationRewards:
+    """Navigation rewards of an environment that are computed in one pass.
+
+    The separate reward terms each read the command and the joint velocities and launch their own kernels. Here,
+    the goal bonus, the position and heading tracking rewards and the joint velocity penalties (components) are
+    computed together at most once per environment step, and the terms :class:`fused_navigation_reward` read
+    their component. The reward manager still weights and sums each component as a separate term.
+
+    The components are the unweighted values of the separate terms, in the order of :attr:`component_names`.
+    """
+
+    COMPONENTS = ("goal_reached", "pose_tracking", "heading_tracking")
+    """Names of the command tracking components, followed by the joint velocity penalties."""
+
+    def __init__(self, cfg: NavigationRewardsCfg, env: RLTaskEnv):
+        """Initializes the navigation rewards.
+
+        Args:
+            cfg: The configuration of the rewards.
+            env: The environment.
+        """
+        self.cfg = cfg
+        self._env = env
+        self.asset: Articulation = env.scene[cfg.asset_name]
+        # resolve the joints of the velocity penalties
+        # note: the joints of all the penalties are gathered at once, and summed per penalty with a matrix product
+        self.component_names = list(self.COMPONENTS)
+        joint_ids, thresholds, penalty_ids = list(), list(), list()
+        for penalty_id, (name, (joint_names, threshold)) in enumerate(cfg.joint_velocity_limits.items()):
+            ids, _ = resolve_joint_ids(self.asset, joint_names)
+            joint_ids += ids
+            thresholds += [threshold] * len(ids)
+            penalty_ids += [penalty_id] * len(ids)
+            self.component_names.append(name)
+        self._joint_ids = bind_ids(joint_ids, self.asset.num_joints, env.device)
+        self._joint_thresholds = torch.tensor(thresholds, device=env.device)
+        self._joint_penalties = torch.zeros(len(joint_ids), len(cfg.joint_velocity_limits), device=env.device)
+        self._joint_penalties[torch.arange(len(joint_ids)), torch.tensor(penalty_ids, dtype=torch.long)] = 1.0
+        # select the kernel
+        self._kernel = torch.compile(_navigation_rewards, dynamic=False) if cfg.compile else _navigation_rewards
+        # create buffers
+        self._values = torch.zeros(env.num_envs, len(self.component_names), device=env.device)
+        self._key = None
+
+    """
+    Properties.
+    """
+
+    @property
+    def values(self) -> torch.Tensor:
+        """Up-to-date unweighted values of the components. Shape is (num_envs, num_components)."""
+        # check whether the cached values are up to date
+        command = self._env.command_manager.get_command(self.cfg.command_name)
+        key = (self._env.common_step_counter, command._version, self.asset.data.joint_vel._version)
+        if key != self._key:
+            self._values = self._kernel(
+                command,
+                self.asset.data.joint_vel,
+                self._joint_ids,
+                self._joint_thresholds,
+                self._joint_penalties,
+                self.cfg.goal_threshold,
+                self.cfg.goal_bonus,
+                self.cfg.pose_std**2,
+                self.cfg.heading_std**2,
+            )
+            self._key = key
+        return self._values
+
+    """
+    Operations.
+    """
+
+    def component_index(self, name: str) -> int:
+        """Returns the index of a component in :attr:`values`.
+
+        Args:
+            name: The name of the component.
+
+        Raises:
+            ValueError: If the component does not exist.
+        """
+        if name not in self.component_names:
+            raise ValueError(f"Unknown navigation reward component: '{name}'. Available: {self.component_names}.")
+        return self.component_names.index(name)
+
+
+_NAVIGATION_REWARDS: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+"""Navigation rewards shared by the terms of each environment, by command name."""
+
+
+def navigation_rewards(env: RLTaskEnv, cfg: NavigationRewardsCfg) -> NavigationRewards:
+    """Returns the navigation rewards of a command, shared by all the terms of the environment.
+
+    Args:
+        env: The environment.
+        cfg: The configuration of the rewards.
+
+    Raises:
+        ValueError: If the rewards of the command were created with a different configuration.
+    """
+    rewards = _NAVIGATION_REWARDS.setdefault(env, dict())
+    if cfg.command_name not in rewards:
+        rewards[cfg.command_name] = NavigationRewards(cfg, env)
+    elif rewards[cfg.command_name].cfg != cfg:
+        raise ValueError(f"The fused navigation rewards of the command '{cfg.command_name}' have different settings.")
+    return rewards[cfg.command_name]
+
+
+class fused_navigation_reward(ManagerTermBase):
+    """Component of the navigation rewards that are computed in one pass (see :class:`NavigationRewards`).
+
+    The terms that share the same command share the same computation. Use :func:`fuse_navigation_rewards` to
+    replace the separate terms of a reward configuration.
+    """
+
+    def __init__(self, cfg: RewardTermCfg, env: RLTaskEnv):
+        # initialize the base class
+        super().__init__(cfg, env)
+        # resolve the component once
+        self.rewards = navigation_rewards(env, cfg.params["rewards_cfg"])
+        self.index = self.rewards.component_index(cfg.params["component"])
+
+    def __call__(self, env: RLTaskEnv, rewards_cfg: NavigationRewardsCfg, component: str) -> torch.Tensor:
+        return self.rewards.values[:, self.index]
+
+
+def fuse_navigation_rewards(rewards_cfg: object, compile: bool = False) -> list[str]:
+    """Replaces the separate navigation reward terms of a configuration by the components of the fused rewards.
+
+    The terms :func:`position_goal_reached_bonus`, :func:`pose_tracking_exp_l1`, :func:`heading_tracking_exp_l1`
+    (at most one of each) and :func:`joint_velocity_limit` keep their names and weights, so that their episode
+    sums are still reported separately. The other terms are left unchanged.
+
+    Args:
+        rewards_cfg: The configuration of the reward terms.
+        compile: Whether to compile the fused computation. Defaults to False.
+
+    Returns:
+        The names of the fused terms.
+
+    Raises:
+        ValueError: If the tracking terms do not follow the same command.
+    """
+    terms = {name: term for name, term in rewards_cfg.__dict__.items() if isinstance(term, RewardTermCfg)}
+    # -- command tracking terms
+    components = {
+        position_goal_reached_bonus: ("goal_reached", {"threshold": "goal_threshold", "bonus": "goal_bonus"}),
+        pose_tracking_exp_l1: ("pose_tracking", {"std": "pose_std"}),
+        heading_tracking_exp_l1: ("heading_tracking", {"std": "heading_std"}),
+    }
+    fused, settings = dict(), dict()
+    for name, term in terms.items():
+        if term.func in components and components[term.func][0] not in fused.values():
+            component, params = components[term.func]
+            fused[name] = component
+            settings.update({key: term.params[param] for param, key in params.items() if param in term.params})
+    if len(fused) == 0:
+        return list()
+    command_names = {terms[name].params["command_name"] for name in fused}
+    if len(command_names) != 1:
+        raise ValueError(f"The navigation reward terms follow different commands: {command_names}.")
+    cfg = NavigationRewardsCfg(command_name=command_names.pop(), compile=compile, **settings)
+    # -- joint velocity penalties
+    for name, term in terms.items():
+        asset_cfg = term.params.get("asset_cfg")
+        if term.func is joint_velocity_limit and asset_cfg is not None and asset_cfg.name == cfg.asset_name:
+            joint_names = asset_cfg.joint_names if asset_cfg.joint_names is not None else ".*"
+            cfg.joint_velocity_limits[name] = (joint_names, term.params["threshold"])
+            fused[name] = name
+    # replace the terms
+    for name, component in fused.items():
+        terms[name].func = fused_navigation_reward
+        terms[name].params = {"rewards_cfg": cfg, "component": component}
+    return list(fused)
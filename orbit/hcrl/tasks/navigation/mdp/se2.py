@@ -0,0 +1,126 @@
+"""Planar (SE(2)) kernels for the navigation environments.
+
+The navigation terms only need the yaw of the bodies. These kernels compute it directly from the quaternion
+components, without the full Euler angle conversion or the 3D quaternion rotations of the generic math utilities.
+They are plain tensor expressions, so that they can be wrapped with :func:`torch.compile`.
+"""
+
+from __future__ import annotations
+
+import math
+import torch
+
+
+def wrap_angle(angle: torch.Tensor) -> torch.Tensor:
+    """Wraps angles (in rad) to the range [-pi, pi).
+
+    Args:
+        angle: The angles. Shape is (...).
+
+    Returns:
+        The wrapped angles. Shape is (...).
+    """
+    return torch.remainder(angle + math.pi, 2.0 * math.pi) - math.pi
+
+
+def heading_from_quat(quat: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor]:
+    """Computes the cosine and the sine of the yaw from orientations.
+
+    The x-axis of the rotated frame is projected onto the ground plane. Only the first row of the rotation matrix
+    is computed.
+
+    Args:
+        quat: The orientations (w, x, y, z). Shape is (..., 4).
+
+    Returns:
+        The cosine and the sine of the yaw. Shape of each is (...).
+    """
+    w, x, y, z = quat.unbind(-1)
+    heading_x = 1.0 - 2.0 * (y * y + z * z)
+    heading_y = 2.0 * (x * y + w * z)
+    norm = torch.hypot(heading_x, heading_y).clamp_min(1e-6)
+    return heading_x / norm, heading_y / norm
+
+
+def yaw_from_quat(quat: torch.Tensor) -> torch.Tensor:
+    """Computes the yaw (in rad) from orientations.
+
+    Args:
+        quat: The orientations (w, x, y, z). Shape is (..., 4).
+
+    Returns:
+        The yaw in the range [-pi, pi]. Shape is (...).
+    """
+    w, x, y, z = quat.unbind(-1)
+    return torch.atan2(2.0 * (x * y + w * z), 1.0 - 2.0 * (y * y + z * z))
+
+
+def quat_from_yaw(yaw: torch.Tensor) -> torch.Tensor:
+    """Computes the orientations (w, x, y, z) of pure rotations about the z-axis.
+
+    Args:
+        yaw: The yaw (in rad). Shape is (...).
+
+    Returns:
+        The orientations (w, x, y, z). Shape is (..., 4).
+    """
+    half_yaw = 0.5 * yaw
+    zeros = torch.zeros_like(yaw)
+    return torch.stack((torch.cos(half_yaw), zeros, zeros, torch.sin(half_yaw)), dim=-1)
+
+
+def planar_rotate(
+    vec: torch.Tensor, cos_yaw: torch.Tensor, sin_yaw: torch.Tensor, out: torch.Tensor | None = None
+) -> torch.Tensor:
+    """Rotates planar vectors by the yaw, e.g. from the yaw frame of a body to the world frame.
+
+    Args:
+        vec: The planar vectors (x, y). Shape is (..., 2).
+        cos_yaw: The cosine of the yaw. Shape is (...).
+        sin_yaw: The sine of the yaw. Shape is (...).
+        out: The output buffer. Shape is (..., 2). Defaults to None, in which case a new tensor is returned.
+
+    Returns:
+        The rotated vectors. Shape is (..., 2).
+    """
+    x, y = vec.unbind(-1)
+    return torch.stack((cos_yaw * x - sin_yaw * y, sin_yaw * x + cos_yaw * y), dim=-1, out=out)
+
+
+def planar_rotate_inverse(
+    vec: torch.Tensor, cos_yaw: torch.Tensor, sin_yaw: torch.Tensor, out: torch.Tensor | None = None
+) -> torch.Tensor:
+    """Rotates planar vectors by the opposite of the yaw, e.g. from the world frame to the yaw frame of a body.
+
+    Args:
+        vec: The planar vectors (x, y). Shape is (..., 2).
+        cos_yaw: The cosine of the yaw. Shape is (...).
+        sin_yaw: The sine of the yaw. Shape is (...).
+        out: The output buffer. Shape is (..., 2). Defaults to None, in which case a new tensor is returned.
+
+    Returns:
+        The rotated vectors. Shape is (..., 2).
+    """
+    x, y = vec.unbind(-1)
+    return torch.stack((cos_yaw * x + sin_yaw * y, cos_yaw * y - sin_yaw * x), dim=-1, out=out)
+
+
+def relative_pose_2d(
+    pos_w: torch.Tensor, quat_w: torch.Tensor, target_pos_w: torch.Tensor, target_yaw_w: torch.Tensor
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """Computes planar target poses in the yaw frames of bodies.
+
+    Args:
+        pos_w: The positions of the bodies in the world frame. Shape is (..., 2) or (..., 3).
+        quat_w: The orientations (w, x, y, z) of the bodies in the world frame. Shape is (..., 4).
+        target_pos_w: The target positions in the world frame. Shape is (..., 2) or (..., 3).
+        target_yaw_w: The target headings in the world frame (in rad). Shape is (...).
+
+    Returns:
+        A tuple containing the planar target positions (x, y) in the yaw frames of the bodies, shape is (..., 2),
+        and the target headings relative to the yaw of the bodies in the range [-pi, pi), shape is (...).
+    """
+    cos_yaw, sin_yaw = heading_from_quat(quat_w)
+    pos_b = planar_rotate_inverse(target_pos_w[..., :2] - pos_w[..., :2], cos_yaw, sin_yaw)
+    yaw_b = wrap_angle(target_yaw_w - torch.atan2(sin_yaw, cos_yaw))
+    return pos_b, yaw_b
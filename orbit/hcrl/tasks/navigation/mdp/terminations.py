@@ -4,6 +4,9 @@ import torch
 from typing import TYPE_CHECKING
 
 from omni.isaac.lab.assets import Articulation
+from omni.isaac.lab.managers import ManagerTermBase, TerminationTermCfg
+
+from isaac.lab.hcrl.tasks.utils.resolution import resolve_body_ids
 
 if TYPE_CHECKING:
     from omni.isaac.lab.envs import RLTaskEnv
@@ -21,13 +24,18 @@ def position_goal_reached(
     goal_pose_body = env.command_manager.get_command(command_name)[:, :2] # body pose command
     return torch.linalg.norm(goal_pose_body,dim=-1) < threshold
 
-def velocity_limit(
-        env: RLTaskEnv, 
-        body_name: str,
-        threshold: float = 2.0,
-    ) -> torch.Tensor:
-    """Terminate the episode when the robot violates the speed limit."""
-    # extract the used quantities (to enable type-hinting)
-    asset: Articulation = env.scene["robot"]
-    body_id = asset.find_bodies(body_name)[0][0]
-    return torch.linalg.norm(asset.data.body_lin_vel_w[:, body_id, :2], dim=-1) > threshold
\ No newline at end of file
+class velocity_limit(ManagerTermBase):
+    """Terminate the episode when the robot violates the speed limit.
+
+    The body is resolved once when the term is constructed.
+    """
+
+    def __init__(self, cfg: TerminationTermCfg, env: RLTaskEnv):
+        # initialize the base class
+        super().__init__(cfg, env)
+        # extract the used quantities (to enable type-hinting)
+        self.asset: Articulation = env.scene["robot"]
+        self.body_id = resolve_body_ids(self.asset, cfg.params["body_name"])[0][0]
+
+    def __call__(self, env: RLTaskEnv, body_name: str, threshold: float = 2.0) -> torch.Tensor:
+        return torch.linalg.norm(self.asset.data.body_lin_vel_w[:, self.body_id, :2], dim=-1) > threshold
\ No newline at end of file
@@ -0,0 +1,6 @@
+"""Sub-module with utilities for names, random streams, debugging and profiling of the environments of this package."""
+
+from .debug import *  # noqa: F401, F403
+from .profiling import *  # noqa: F401, F403
+from .resolution import *  # noqa: F401, F403
+from .rng import *  # noqa: F401, F403
@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import functools
+import os
+import torch
+import traceback
+import warnings
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+import carb
+import omni.isaac.lab.utils.string as string_utils
+
+if TYPE_CHECKING:
+    from omni.isaac.lab.envs import BaseEnv
+
+__all__ = ["HostSyncDetector", "NameResolutionDetector", "wrap_package_terms"]
+
+PACKAGE_NAME = "isaac.lab.hcrl"
+"""Name of the package whose terms are instrumented."""
+
+
+class _TermProxy:
+    """Callable proxy of a class-based term that forwards the other attributes (e.g. ``reset``) to the term."""
+
+    def __init__(self, term: Any, call: Callable):
+        self._term = term
+        self._call = call
+
+    def __call__(self, *args, **kwargs):
+        return self._call(*args, **kwargs)
+
+    def __getattr__(self, name: str):
+        return getattr(self._term, name)
+
+
+def wrap_package_terms(
+    env: BaseEnv, wrapper: Callable[[str, Callable], Callable], package: str | None = PACKAGE_NAME
+) -> list[str]:
+    """Wraps the callables of the terms defined in a package with a decorator.
+
+    The action (:meth:`process_actions` and :meth:`apply_actions`), command (:meth:`compute`), observation,
+    reward, termination, event and curriculum terms of the environment managers are wrapped in place. Terms
+    defined outside of the package are left untouched.
+
+    Args:
+        env: The environment whose managers are instrumented.
+        wrapper: A function that takes the qualified name of a term (e.g. ``"reward/track_lin_vel"``)
+            and its callable, and returns the wrapped callable.
+        package: The package whose terms are wrapped. Defaults to this package. If None, all the terms are wrapped.
+
+    Returns:
+        The qualified names of the wrapped terms.
+    """
+    names = list()
+
+    def _in_package(obj: Any) -> bool:
+        return package is None or (getattr(obj, "__module__", None) or "").startswith(package)
+
+    def _wrap_cfg(name: str, term_cfg: Any):
+        func = term_cfg.func
+        # note: class-based terms are instances of ManagerTermBase, which have a reset method
+        is_class_term = hasattr(func, "reset")
+        if not _in_package(type(func) if is_class_term else func):
+            return
+        if is_class_term:
+            # keep the other methods of the term reachable by the manager
+            term_cfg.func = _TermProxy(func, wrapper(name, func.__call__))
+        else:
+            term_cfg.func = wrapper(name, func)
+        names.append(name)
+
+    # -- action terms
+    if hasattr(env, "action_manager"):
+        for term_name in env.action_manager.active_terms:
+            term = env.action_manager.get_term(term_name)
+            if not _in_package(type(term)):
+                continue
+            for method in ("process_actions", "apply_actions"):
+                name = f"action/{term_name}.{method}"
+                setattr(term, method, wrapper(name, getattr(term, method)))
+                names.append(name)
+    # -- command terms
+    if hasattr(env, "command_manager"):
+        for term_name in env.command_manager.active_terms:
+            term = env.command_manager.get_term(term_name)
+            if not _in_package(type(term)):
+                continue
+            name = f"command/{term_name}.compute"
+            term.compute = wrapper(name, term.compute)
+            names.append(name)
+    # -- observation terms
+    if hasattr(env, "observation_manager"):
+        for group_name, term_cfgs in env.observation_manager._group_obs_term_cfgs.items():
+            term_names = env.observation_manager.active_terms[group_name]
+            for term_name, term_cfg in zip(term_names, term_cfgs):
+                _wrap_cfg(f"observation/{group_name}/{term_name}", term_cfg)
+    # -- reward and termination terms
+    for prefix, manager_name in (("reward", "reward_manager"), ("termination", "termination_manager")):
+        manager = getattr(env, manager_name, None)
+        if manager is None:
+            continue
+        for term_name in manager.active_terms:
+            _wrap_cfg(f"{prefix}/{term_name}", manager.get_term_cfg(term_name))
+    # -- event terms (randomization terms in the previous versions)
+    manager = getattr(env, "event_manager", None) or getattr(env, "randomization_manager", None)
+    if manager is not None:
+        for mode, term_cfgs in manager._mode_term_cfgs.items():
+            for term_name, term_cfg in zip(manager._mode_term_names[mode], term_cfgs):
+                _wrap_cfg(f"event/{mode}/{term_name}", term_cfg)
+    # -- curriculum terms
+    manager = getattr(env, "curriculum_manager", None)
+    if manager is not None:
+        for term_name, term_cfg in zip(manager._term_names, manager._term_cfgs):
+            _wrap_cfg(f"curriculum/{term_name}", term_cfg)
+    return names
+
+
+class HostSyncDetector:
+    """Detects implicit host synchronizations triggered inside the MDP terms of this package.
+
+    Each term of the package is wrapped so that it runs with PyTorch's CUDA synchronization debug mode
+    enabled (see :func:`torch.cuda.set_sync_debug_mode`). Synchronizing operations, such as branching on the
+    value of a tensor, calling :meth:`torch.Tensor.item` or copying to the host, are attributed to the term in
+    which they happen and reported once per term. In the "error" mode, the first synchronization raises an
+    error with the offending stack trace instead.
+
+    This is meant for debugging only: the wrapping adds a small Python overhead to every term call.
+    """
+
+    def __init__(self, env: BaseEnv, mode: str = "warn"):
+        """Initialize the detector and instrument the terms of the environment.
+
+        Args:
+            env: The environment to instrument.
+            mode: The detection mode: "warn" (record and report) or "error" (raise). Defaults to "warn".
+
+        Raises:
+            ValueError: When an invalid mode is provided.
+        """
+        if mode not in ("warn", "error"):
+            raise ValueError(f"Invalid host synchronization debug mode: {mode}. Expected 'warn' or 'error'.")
+        self.mode = mode
+        self._counts: dict[str, int] = dict()
+        self._messages: dict[str, str] = dict()
+        # the synchronization debug mode only applies to CUDA devices
+        self._enabled = torch.device(env.device).type == "cuda"
+        if not self._enabled:
+            carb.log_warn("Host synchronization detection is only available for CUDA devices. Skipping.")
+            self.term_names = list()
+        else:
+            self.term_names = wrap_package_terms(env, self._wrap)
+            carb.log_info(f"Detecting host synchronizations in the terms: {self.term_names}")
+
+    """
+    Properties.
+    """
+
+    @property
+    def counts(self) -> dict[str, int]:
+        """Number of host synchronizations detected per term."""
+        return self._counts
+
+    """
+    Operations.
+    """
+
+    def report(self) -> str:
+        """Returns a summary of the detected host synchronizations."""
+        if len(self._counts) == 0:
+            return "No host synchronization detected in the instrumented terms."
+        lines = ["Host synchronizations detected per term:"]
+        for name, count in sorted(self._counts.items(), key=lambda item: -item[1]):
+            lines.append(f"\t{name:<60} {count:>8} | {self._messages[name]}")
+        return "\n".join(lines)
+
+    """
+    Helper functions.
+    """
+
+    def _wrap(self, name: str, func: Callable) -> Callable:
+        """Wraps a term so that it runs with the synchronization debug mode enabled."""
+
+        @functools.wraps(func)
+        def wrapped(*args, **kwargs):
+            previous_mode = torch.cuda.get_sync_debug_mode()
+            torch.cuda.set_sync_debug_mode(self.mode)
+            try:
+                with warnings.catch_warnings(record=True) as records:
+                    warnings.simplefilter("always")
+                    output = func(*args, **kwargs)
+            finally:
+                torch.cuda.set_sync_debug_mode(previous_mode)
+            # attribute the synchronizations to the term
+            syncs = [record for record in records if "synchroniz" in str(record.message)]
+            if len(syncs) > 0:
+                if name not in self._counts:
+                    self._counts[name] = 0
+                    self._messages[name] = f"{syncs[0].filename}:{syncs[0].lineno}: {syncs[0].message}"
+                    carb.log_warn(f"Host synchronization in term '{name}': {self._messages[name]}")
+                self._counts[name] += len(syncs)
+            # forward the other warnings
+            for record in records:
+                if record not in syncs:
+                    warnings.showwarning(record.message, record.category, record.filename, record.lineno)
+            return output
+
+        return wrapped
+
+
+class NameResolutionDetector:
+    """Detects the resolutions of names (regular expression matching of body, joint or other names).
+
+    Within the context, the name matching functions of :mod:`omni.isaac.lab.utils.string`, which are used by
+    :meth:`Articulation.find_bodies`, :meth:`Articulation.find_joints` and the resolution of the scene entity
+    configurations, are instrumented. Each call is attributed to the first caller outside of Isaac Lab. The
+    terms are expected to resolve their names when they are constructed, so that no resolution happens in the
+    steady-state step loop.
+
+    Example:
+
+    .. code-block:: python
+
+        with NameResolutionDetector() as detector:
+            for _ in range(100):
+                env.step(actions)
+        assert detector.total == 0, detector.report()
+    """
+
+    _FUNCTION_NAMES = ("resolve_matching_names", "resolve_matching_names_values")
+    """Names of the instrumented functions of :mod:`omni.isaac.lab.utils.string`."""
+
+    def __init__(self):
+        self._counts: dict[str, int] = dict()
+        self._originals: dict[str, Callable] = dict()
+
+    def __enter__(self) -> NameResolutionDetector:
+        for name in self._FUNCTION_NAMES:
+            self._originals[name] = getattr(string_utils, name)
+            setattr(string_utils, name, self._wrap(self._originals[name]))
+        return self
+
+    def __exit__(self, *args):
+        for name, func in self._originals.items():
+            setattr(string_utils, name, func)
+        self._originals.clear()
+
+    """
+    Properties.
+    """
+
+    @property
+    def counts(self) -> dict[str, int]:
+        """Number of name resolutions per caller (file and line)."""
+        return self._counts
+
+    @property
+    def total(self) -> int:
+        """Total number of name resolutions."""
+        return sum(self._counts.values())
+
+    """
+    Operations.
+    """
+
+    def report(self) -> str:
+        """Returns a summary of the detected name resolutions."""
+        if len(self._counts) == 0:
+            return "No name resolution detected."
+        lines = ["Name resolutions detected per caller:"]
+        for caller, count in sorted(self._counts.items(), key=lambda item: -item[1]):
+            lines.append(f"\t{caller:<80} {count:>8}")
+        return "\n".join(lines)
+
+    """
+    Helper functions.
+    """
+
+    def _wrap(self, func: Callable) -> Callable:
+        """Wraps a name matching function so that its calls are counted per caller."""
+
+        @functools.wraps(func)
+        def wrapped(*args, **kwargs):
+            caller = "<unknown>"
+            for frame in reversed(traceback.extract_stack()[:-1]):
+                if os.path.join("omni", "isaac", "lab", "") not in frame.filename:
+                    caller = f"{frame.filename}:{frame.lineno} ({frame.name})"
+                    break
+            self._counts[caller] = self._counts.get(caller, 0) + 1
+            return func(*args, **kwargs)
+
+        return wrapped
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import collections
+import functools
+import json
+import os
+import time
+import torch
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+import carb
+
+from .debug import wrap_package_terms
+
+if TYPE_CHECKING:
+    from omni.isaac.lab.envs import BaseEnv
+
+__all__ = ["TermProfiler"]
+
+
+class TermProfiler:
+    """Measures the latency of the terms of the environment managers.
+
+    The terms are wrapped with :func:`wrap_package_terms` (all of them, or only those of a package). On CUDA
+    devices, each call is enclosed by a pair of CUDA events, which time the kernels of the term on the device
+    without synchronizing the host. The events are read once they have completed, when the latencies are
+    requested or when too many are pending. On the CPU, the calls are timed on the host.
+
+    The latencies are averaged over a rolling window of calls per term. Optionally, the calls are recorded as
+    a trace that can be opened in ``chrome://tracing`` or Perfetto.
+
+    Since the terms are only wrapped when the profiler is created, the environment runs without overhead when
+    profiling is off.
+
+    Example:
+
+    .. code-block:: python
+
+        profiler = TermProfiler(env, trace=True)
+        for _ in range(100):
+            env.step(actions)
+        print(profiler.report())
+        profiler.export_chrome_trace("terms.json")
+    """
+
+    MAX_PENDING_CALLS = 4096
+    """Number of pending timed calls above which the completed events are read."""
+
+    def __init__(
+        self,
+        env: BaseEnv,
+        window: int = 1000,
+        trace: bool = False,
+        max_trace_events: int = 1_000_000,
+        package: str | None = None,
+    ):
+        """Initialize the profiler and instrument the terms of the environment.
+
+        Args:
+            env: The environment to instrument.
+            window: Number of calls over which the latencies of each term are averaged. Defaults to 1000.
+            trace: Whether to record the calls for :meth:`export_chrome_trace`. Defaults to False.
+            max_trace_events: Maximum number of recorded calls. The next calls are not recorded. Defaults to 1e6.
+            package: The package whose terms are profiled. Defaults to None, in which case all the terms are.
+        """
+        self.window = window
+        self.trace = trace
+        self.max_trace_events = max_trace_events
+        self._cuda = torch.device(env.device).type == "cuda"
+        # rolling latencies (in ms) and trace events per term
+        self._latencies: dict[str, collections.deque] = dict()
+        self._trace_events: list[dict] = list()
+        # timed calls whose events have not completed yet, and events that can be reused
+        self._pending: list[tuple[str, torch.cuda.Event, torch.cuda.Event]] = list()
+        self._free_events: list[tuple[torch.cuda.Event, torch.cuda.Event]] = list()
+        # reference of the timestamps of the trace
+        if self._cuda:
+            self._origin = torch.cuda.Event(enable_timing=True)
+            self._origin.record()
+        else:
+            self._origin = time.perf_counter_ns()
+        self.term_names = wrap_package_terms(env, self._wrap, package=package)
+        carb.log_info(f"Profiling the terms: {self.term_names}")
+
+    """
+    Properties.
+    """
+
+    @property
+    def latencies(self) -> dict[str, float]:
+        """Mean latency of the terms over the rolling window (in ms), for the terms that were called."""
+        self._collect()
+        return {name: sum(values) / len(values) for name, values in self._latencies.items() if len(values) > 0}
+
+    """
+    Operations.
+    """
+
+    def report(self) -> str:
+        """Returns the mean latencies of the terms, from the most to the least expensive."""
+        latencies = self.latencies
+        if len(latencies) == 0:
+            return "No term call was timed."
+        lines = [f"Mean latency of the terms over the last {self.window} calls (ms):"]
+        for name, latency in sorted(latencies.items(), key=lambda item: -item[1]):
+            lines.append(f"\t{name:<60} {latency:>10.4f}")
+        return "\n".join(lines)
+
+    def export_chrome_trace(self, path: str):
+        """Writes the recorded calls in the Chrome trace format.
+
+        This waits for the pending calls to complete.
+
+        Args:
+            path: The path of the JSON file.
+        """
+        if self._cuda:
+            torch.cuda.synchronize()
+        self._collect()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self._trace_events, "displayTimeUnit": "ms"}, f)
+        carb.log_info(f"Exported {len(self._trace_events)} term calls to the trace: {path}")
+
+    """
+    Helper functions.
+    """
+
+    def _wrap(self, name: str, func: Callable) -> Callable:
+        """Wraps a term so that its calls are timed."""
+        self._latencies[name] = collections.deque(maxlen=self.window)
+
+        if self._cuda:
+
+            @functools.wraps(func)
+            def wrapped(*args, **kwargs):
+                start, end = self._free_events.pop() if len(self._free_events) > 0 else self._new_events()
+                start.record()
+                output = func(*args, **kwargs)
+                end.record()
+                self._pending.append((name, start, end))
+                if len(self._pending) > self.MAX_PENDING_CALLS:
+                    self._collect()
+                return output
+
+        else:
+
+            @functools.wraps(func)
+            def wrapped(*args, **kwargs):
+                start = time.perf_counter_ns()
+                output = func(*args, **kwargs)
+                end = time.perf_counter_ns()
+                self._add(name, (start - self._origin) * 1e-6, (end - start) * 1e-6)
+                return output
+
+        return wrapped
+
+    def _collect(self):
+        """Reads the events of the timed calls that have completed, without synchronizing."""
+        # note: the events are recorded on the same stream, so they complete in order
+        num_completed = 0
+        for name, start, end in self._pending:
+            if not end.query():
+                break
+            self._add(name, self._origin.elapsed_time(start), start.elapsed_time(end))
+            self._free_events.append((start, end))
+            num_completed += 1
+        del self._pending[:num_completed]
+
+    def _add(self, name: str, start: float, duration: float):
+        """Records a call of a term, with its start time and duration (in ms)."""
+        self._latencies[name].append(duration)
+        if self.trace and len(self._trace_events) < self.max_trace_events:
+            manager = name.split("/")[0]
+            event = {"name": name, "ph": "X", "ts": start * 1e3, "dur": duration * 1e3, "pid": 0, "tid": manager}
+            self._trace_events.append(event)
+
+    @staticmethod
+    def _new_events() -> tuple[torch.cuda.Event, torch.cuda.Event]:
+        """Creates a pair of timing events."""
+        return torch.cuda.Event(enable_timing=True), torch.cuda.Event(enable_timing=True)
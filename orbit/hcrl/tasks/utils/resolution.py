@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import torch
+import weakref
+from collections.abc import Sequence
+from typing import Literal
+
+from omni.isaac.lab.assets import Articulation, RigidObject
+
+__all__ = ["bind_ids", "resolve_body_ids", "resolve_joint_ids"]
+
+_RESOLVED_NAMES: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+"""Resolved body and joint names per asset, by kind, name keys and ordering."""
+
+
+def resolve_body_ids(
+    asset: Articulation | RigidObject, name_keys: str | Sequence[str], preserve_order: bool = False
+) -> tuple[list[int], list[str]]:
+    """Finds the bodies of an asset that match the name keys, resolving each set of keys only once.
+
+    The regular expressions are matched against the body names the first time a set of keys is requested for the
+    asset. The result is shared by all the terms that request the same keys afterwards. The terms should resolve
+    their names when they are constructed and keep the indices (see :func:`bind_ids`), so that no name resolution
+    happens while stepping the environment.
+
+    Args:
+        asset: The asset.
+        name_keys: A regular expression or a list of regular expressions to match the body names.
+        preserve_order: Whether to preserve the order of the name keys in the output. Defaults to False.
+
+    Returns:
+        A tuple of lists containing the body indices and names.
+    """
+    return _resolve(asset, "body", name_keys, preserve_order)
+
+
+def resolve_joint_ids(
+    asset: Articulation, name_keys: str | Sequence[str], preserve_order: bool = False
+) -> tuple[list[int], list[str]]:
+    """Finds the joints of an articulation that match the name keys, resolving each set of keys only once.
+
+    See :func:`resolve_body_ids` for more details.
+
+    Args:
+        asset: The articulation.
+        name_keys: A regular expression or a list of regular expressions to match the joint names.
+        preserve_order: Whether to preserve the order of the name keys in the output. Defaults to False.
+
+    Returns:
+        A tuple of lists containing the joint indices and names.
+    """
+    return _resolve(asset, "joint", name_keys, preserve_order)
+
+
+def bind_ids(ids: Sequence[int], num_total: int, device: str) -> slice | torch.Tensor:
+    """Converts indices into the cheapest index of the data buffers.
+
+    Indexing with a list of integers copies the list to the device at every call. Consecutive increasing
+    indices are bound as a slice, which also indexes the buffers as views, and the others as a tensor.
+
+    Args:
+        ids: The indices.
+        num_total: The number of entries of the indexed dimension.
+        device: The device of the data buffers.
+
+    Returns:
+        The slice or the tensor of indices.
+    """
+    ids = list(ids)
+    if ids == list(range(num_total)):
+        return slice(None)
+    if len(ids) > 0 and ids == list(range(ids[0], ids[-1] + 1)):
+        return slice(ids[0], ids[-1] + 1)
+    return torch.tensor(ids, dtype=torch.long, device=device)
+
+
+def _resolve(
+    asset: Articulation | RigidObject,
+    kind: Literal["body", "joint"],
+    name_keys: str | Sequence[str],
+    preserve_order: bool,
+) -> tuple[list[int], list[str]]:
+    """Returns the cached indices and names of the bodies or joints of an asset that match the name keys."""
+    resolved = _RESOLVED_NAMES.setdefault(asset, dict())
+    key = (kind, name_keys if isinstance(name_keys, str) else tuple(name_keys), preserve_order)
+    if key not in resolved:
+        find = asset.find_bodies if kind == "body" else asset.find_joints
+        ids, names = find(name_keys, preserve_order=preserve_order)
+        resolved[key] = (tuple(ids), tuple(names))
+    ids, names = resolved[key]
+    # return copies, so that the callers can modify them
+    return list(ids), list(names)
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import torch
+import weakref
+import zlib
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from omni.isaac.lab.envs import BaseEnv
+
+__all__ = ["RandomStream", "random_stream"]
+
+_MASK32 = 0xFFFFFFFF
+"""Mask of the lower 32 bits."""
+
+
+def _hash32(x: torch.Tensor | int) -> torch.Tensor | int:
+    """Mixes the lower 32 bits of integers into 32 uniformly distributed bits (lowbias32 hash).
+
+    The integers are held in int64 tensors (or Python integers), so that the products of two 32-bit values keep
+    their lower 32 bits when they overflow.
+    """
+    x = x & _MASK32
+    x = x ^ (x >> 16)
+    x = (x * 0x7FEB352D) & _MASK32
+    x = x ^ (x >> 15)
+    x = (x * 0x846CA68B) & _MASK32
+    return x ^ (x >> 16)
+
+
+class RandomStream:
+    """Counter-based random numbers of each environment.
+
+    The random numbers are hashes of the key of the stream, the index of the environment, the number of draws
+    of the environment (its counter) and the position of the number in the draw. The stream only stores one
+    counter per environment, and the numbers of any batch of environments are computed on the device in a fixed
+    number of element-wise operations, without host-side tensors or transfers.
+
+    Since the numbers of an environment only depend on the key and its own draws, they are reproducible from the
+    seed regardless of which other environments are drawn in the same batch (e.g. which environments are reset
+    together), unlike the global generator of PyTorch.
+
+    Streams are usually obtained with :func:`random_stream`, which derives their key from the seed of the
+    environment and the name of the stream.
+    """
+
+    def __init__(self, key: int, num_envs: int, device: str):
+        """Initialize the stream.
+
+        Args:
+            key: The key of the stream (e.g. derived from a seed and a name). Only its lower 32 bits are used.
+            num_envs: The number of environments.
+            device: The device on which the numbers are generated.
+        """
+        self.key = key & _MASK32
+        self.num_envs = num_envs
+        self.device = device
+        # number of draws of each environment
+        self.counters = torch.zeros(num_envs, dtype=torch.long, device=device)
+        self._all_env_ids = torch.arange(num_envs, device=device)
+
+    """
+    Operations.
+    """
+
+    def bits(self, env_ids: Sequence[int] | torch.Tensor | None, shape: Sequence[int] = ()) -> torch.Tensor:
+        """Draws 32 random bits per number for each environment, and advances their counters.
+
+        Args:
+            env_ids: The environments. Defaults to all the environments if None.
+            shape: The shape of the numbers drawn for each environment. Defaults to a single number.
+
+        Returns:
+            The random bits as integers in [0, 2^32). Shape is (len(env_ids), *shape).
+        """
+        if env_ids is None:
+            env_ids = self._all_env_ids
+        elif not isinstance(env_ids, torch.Tensor):
+            env_ids = torch.tensor(env_ids, dtype=torch.long, device=self.device)
+        # key of the draw of each environment
+        counters = self.counters[env_ids]
+        draw_keys = _hash32(_hash32(env_ids + self.key) ^ counters)
+        self.counters[env_ids] = counters + 1
+        # number of each position in the draw
+        num_numbers = 1
+        for size in shape:
+            num_numbers *= size
+        positions = _hash32(torch.arange(num_numbers, device=self.device) + 0x9E3779B9)
+        numbers = _hash32(draw_keys.unsqueeze(-1) ^ positions)
+        return numbers.view(len(draw_keys), *shape)
+
+    def uniform(
+        self,
+        env_ids: Sequence[int] | torch.Tensor | None,
+        shape: Sequence[int] = (),
+        low: float | torch.Tensor = 0.0,
+        high: float | torch.Tensor = 1.0,
+    ) -> torch.Tensor:
+        """Draws numbers uniformly in [low, high) for each environment, and advances their counters.
+
+        Args:
+            env_ids: The environments. Defaults to all the environments if None.
+            shape: The shape of the numbers drawn for each environment. Defaults to a single number.
+            low: The lower bounds, broadcastable to the output. Defaults to 0.
+            high: The upper bounds, broadcastable to the output. Defaults to 1.
+
+        Returns:
+            The random numbers. Shape is (len(env_ids), *shape).
+        """
+        # note: the upper 24 bits are exactly representable in single precision
+        numbers = (self.bits(env_ids, shape) >> 8).float().mul_(2.0**-24)
+        if isinstance(low, torch.Tensor) or isinstance(high, torch.Tensor) or low != 0.0 or high != 1.0:
+            numbers = numbers.mul_(high - low).add_(low)
+        return numbers
+
+    def randint(
+        self, env_ids: Sequence[int] | torch.Tensor | None, shape: Sequence[int] = (), high: int = 2
+    ) -> torch.Tensor:
+        """Draws integers uniformly in [0, high) for each environment, and advances their counters.
+
+        Args:
+            env_ids: The environments. Defaults to all the environments if None.
+            shape: The shape of the numbers drawn for each environment. Defaults to a single number.
+            high: The upper bound, at most 2^31. Defaults to 2.
+
+        Returns:
+            The random integers. Shape is (len(env_ids), *shape).
+        """
+        # note: multiply-shift of the 32 random bits, the product fits in 63 bits
+        return (self.bits(env_ids, shape) * high) >> 32
+
+
+_RANDOM_STREAMS: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+"""Random streams of each environment, by name."""
+
+
+def random_stream(env: BaseEnv, name: str) -> RandomStream:
+    """Returns a random stream of the environment, reproducible from its seed.
+
+    The key of the stream is derived from the seed of the environment configuration (or the current seed of
+    PyTorch, if it is not set) and the name of the stream. The terms that use the same name share the stream, so
+    the terms should use different names (e.g. from their type and their asset).
+
+    Args:
+        env: The environment.
+        name: The name of the stream.
+
+    Returns:
+        The random stream.
+    """
+    streams = _RANDOM_STREAMS.setdefault(env, dict())
+    if name not in streams:
+        seed = env.cfg.seed if env.cfg.seed is not None else torch.initial_seed()
+        seed_key = _hash32(seed) ^ _hash32(seed >> 32)
+        streams[name] = RandomStream(_hash32(seed_key ^ zlib.crc32(name.encode())), env.num_envs, env.device)
+    return streams[name]
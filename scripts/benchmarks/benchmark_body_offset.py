@@ -0,0 +1,106 @@
+"""Script to check the body-offset transform of the target frame Jacobian in the WBC action term against the
+explicit world-frame expression and to benchmark it against the previous constant transform."""
+
+from __future__ import annotations
+
+"""Launch Isaac Sim Simulator first."""
+
+
+import argparse
+
+from omni.isaac.lab.app import AppLauncher
+
+# add argparse arguments
+parser = argparse.ArgumentParser(description="Benchmark the body-offset Jacobian transform.")
+parser.add_argument("--task", type=str, default="HCRL-WBC-v0", help="Name of the task.")
+parser.add_argument("--num_envs", type=int, default=4096, help="Number of environments.")
+parser.add_argument("--num_iters", type=int, default=200, help="Number of timed iterations.")
+parser.add_argument("--cpu", action="store_true", default=False, help="Use CPU pipeline.")
+parser.add_argument("--tolerance", type=float, default=1e-5, help="Tolerance on the errors against the expression.")
+# append AppLauncher cli args
+AppLauncher.add_app_launcher_args(parser)
+args_cli = parser.parse_args()
+args_cli.headless = True
+
+# launch omniverse app
+app_launcher = AppLauncher(args_cli)
+simulation_app = app_launcher.app
+
+"""Rest everything follows."""
+
+import gymnasium as gym
+import time
+import torch
+
+import isaac.lab.hcrl  # noqa: F401
+import omni.isaac.lab.utils.math as math_utils
+import omni.isaac.lab_tasks  # noqa: F401
+from omni.isaac.lab_tasks.utils import parse_env_cfg
+
+
+def world_frame_transform(jacobian: torch.Tensor, body_quat_w: torch.Tensor, offset_pos: torch.Tensor) -> torch.Tensor:
+    """Reference: shifts the linear rows by the skew-symmetric matrix of the offset rotated into the world frame."""
+    offset_pos_w = math_utils.quat_apply(body_quat_w, offset_pos)
+    jacobian = jacobian.clone()
+    jacobian[:, 0:3, :] -= torch.bmm(math_utils.skew_symmetric_matrix(offset_pos_w), jacobian[:, 3:, :])
+    return jacobian
+
+
+def per_call_transform(jacobian: torch.Tensor, offset_pos: torch.Tensor, offset_rot: torch.Tensor) -> torch.Tensor:
+    """Previous implementation: applies the body-frame offset transform to the world-frame jacobian."""
+    jacobian = jacobian.clone()
+    jacobian[:, 0:3, :] += torch.bmm(-math_utils.skew_symmetric_matrix(offset_pos), jacobian[:, 3:, :])
+    jacobian[:, 3:, :] = torch.bmm(math_utils.matrix_from_quat(offset_rot), jacobian[:, 3:, :])
+    return jacobian
+
+
+def timeit(fn, device: str) -> float:
+    """Returns the average time of a function in microseconds."""
+    fn()
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(args_cli.num_iters):
+        fn()
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) / args_cli.num_iters * 1e6
+
+
+def main():
+    """Compare the action term with the world-frame expression for per-environment (randomized) offsets."""
+    env_cfg = parse_env_cfg(args_cli.task, use_gpu=not args_cli.cpu, num_envs=args_cli.num_envs)
+    env = gym.make(args_cli.task, cfg=env_cfg)
+    env.reset()
+    term = env.unwrapped.action_manager.get_term("joint_pos")
+    device, n = env.unwrapped.device, env.unwrapped.num_envs
+    jacobians = term._asset.root_physx_view.get_jacobians()
+    parent_jacobian = jacobians[:, term._jacobi_body_idx, :, term._jacobi_dof_ids]
+    # set random offsets in all environments, then in half of them
+    offset_pos = 0.05 * torch.randn(n, 3, device=device)
+    offset_rot = math_utils.random_orientation(n, device)
+    term.set_body_offset(offset_pos, offset_rot)
+    env_ids = torch.arange(0, n, 2, device=device)
+    offset_pos[env_ids] = 0.05 * torch.randn(len(env_ids), 3, device=device)
+    offset_rot[env_ids] = math_utils.random_orientation(len(env_ids), device)
+    term.set_body_offset(offset_pos[env_ids], offset_rot[env_ids], env_ids)
+    # check
+    body_quat_w = term._asset.data.body_quat_w[:, term._body_idx]
+    expected = world_frame_transform(parent_jacobian, body_quat_w, offset_pos)
+    error = (term._compute_frame_jacobian(jacobians) - expected).abs().max().item()
+    print(f"[INFO] max difference: {error:.2e}")
+    assert error < args_cli.tolerance, f"The target frame jacobians differ from the expression by {error:.2e}."
+    # time
+    t_old = timeit(lambda: per_call_transform(parent_jacobian, offset_pos, offset_rot), device)
+    t_new = timeit(lambda: term._compute_frame_jacobian(jacobians), device)
+    print(
+        f"[INFO] envs: {n} | previous body-frame transform: {t_old:.1f} us | world-frame offset: {t_new:.1f} us"
+    )
+    env.close()
+
+
+if __name__ == "__main__":
+    # run the main function
+    main()
+    # close sim app
+    simulation_app.close()
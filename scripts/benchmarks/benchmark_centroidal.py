@@ -0,0 +1,155 @@
+"""Script to check and benchmark the batched centroidal quantities (CoM, momentum, DCM and ZMP)."""
+
+from __future__ import annotations
+
+"""Launch Isaac Sim Simulator first."""
+
+
+import argparse
+
+from omni.isaac.lab.app import AppLauncher
+
+# add argparse arguments
+parser = argparse.ArgumentParser(description="Check and benchmark the batched centroidal quantities.")
+parser.add_argument("--num_envs", type=int, nargs="+", default=[1024, 4096], help="Batch sizes to benchmark.")
+parser.add_argument("--num_bodies", type=int, default=27, help="Number of bodies of the robot.")
+parser.add_argument("--num_terms", type=int, default=3, help="Number of terms that use the centroidal quantities.")
+parser.add_argument("--num_iters", type=int, default=200, help="Number of timed updates per batch size.")
+parser.add_argument("--cuda", action="store_true", default=False, help="Run on the GPU instead of the CPU.")
+# append AppLauncher cli args
+AppLauncher.add_app_launcher_args(parser)
+args_cli = parser.parse_args()
+args_cli.headless = True
+
+# launch omniverse app
+app_launcher = AppLauncher(args_cli)
+simulation_app = app_launcher.app
+
+"""Rest everything follows."""
+
+import math
+import time
+import torch
+
+from omni.isaac.lab.utils.math import matrix_from_quat
+
+from isaac.lab.hcrl.tasks.locomotion.mdp.centroidal import CentroidalState
+
+
+def random_quat(shape: tuple[int, ...], device: str) -> torch.Tensor:
+    """Samples random unit quaternions (w, x, y, z)."""
+    return torch.nn.functional.normalize(torch.randn(*shape, 4, device=device), dim=-1)
+
+
+def random_bodies(num_envs: int, num_bodies: int, device: str):
+    """Samples random body masses, centers of mass and inertias."""
+    masses = torch.empty(num_envs, num_bodies, device=device).uniform_(0.5, 5.0)
+    com_pos = 0.05 * torch.randn(num_envs, num_bodies, 3, device=device)
+    coms = torch.cat((com_pos, random_quat((num_envs, num_bodies), device)), dim=-1)
+    principal = torch.empty(num_envs, num_bodies, 3, device=device).uniform_(0.01, 0.1)
+    inertias = torch.diag_embed(principal)
+    return masses, coms, inertias
+
+
+def check_lip(device: str, dt: float = 1e-3, duration: float = 0.5):
+    """Checks the DCM and the ZMP of a point mass that follows the linear inverted pendulum (LIP) analytically."""
+    num_envs, height, gravity = 64, 0.8, 9.81
+    omega = math.sqrt(gravity / height)
+    state = CentroidalState(
+        torch.full((num_envs, 1), 30.0, device=device),
+        torch.tensor([0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0], device=device).repeat(num_envs, 1, 1),
+        torch.zeros(num_envs, 1, 3, 3, device=device),
+        gravity,
+        device,
+    )
+    # initial states and constant ZMPs on the ground
+    x0 = 0.1 * torch.randn(num_envs, 2, device=device)
+    v0 = 0.3 * torch.randn(num_envs, 2, device=device)
+    zmp = 0.1 * torch.randn(num_envs, 2, device=device)
+    dcm0 = x0 + v0 / omega
+    quat = torch.tensor([1.0, 0.0, 0.0, 0.0], device=device).repeat(num_envs, 1, 1)
+    dcm_error, zmp_error = 0.0, 0.0
+    for k in range(int(duration / dt) + 1):
+        t = k * dt
+        # analytic LIP solution: x(t) = p + (x0 - p) cosh(w t) + v0 / w sinh(w t)
+        pos = zmp + (x0 - zmp) * math.cosh(omega * t) + v0 / omega * math.sinh(omega * t)
+        vel = (x0 - zmp) * omega * math.sinh(omega * t) + v0 * math.cosh(omega * t)
+        body_pos = torch.cat((pos, torch.full((num_envs, 1), height, device=device)), -1).unsqueeze(1)
+        body_vel = torch.cat((vel, torch.zeros(num_envs, 1, device=device)), -1).unsqueeze(1)
+        state.update(body_pos, quat, body_vel, torch.zeros_like(body_vel), 0.0, dt if k > 0 else None)
+        # the DCM diverges from the ZMP: xi(t) = p + (xi0 - p) exp(w t)
+        dcm = zmp + (dcm0 - zmp) * math.exp(omega * t)
+        dcm_error = max(dcm_error, (state.dcm_w[:, :2] - dcm).abs().max().item())
+        if k > 0:
+            zmp_error = max(zmp_error, (state.zmp_w[:, :2] - zmp).abs().max().item())
+    print(f"[INFO] LIP: max DCM error {dcm_error:.2e} m | max ZMP error {zmp_error:.2e} m (dt = {dt:.0e} s)")
+    assert dcm_error < 1e-4, "The DCM does not match the analytic LIP solution."
+    assert zmp_error < 5e-3, "The ZMP does not match the analytic LIP solution."
+
+
+def check_rigid_composite(device: str):
+    """Checks the centroidal momentum of random bodies that move as a single rigid body."""
+    num_envs, num_bodies = 64, args_cli.num_bodies
+    masses, coms, inertias = random_bodies(num_envs, num_bodies, device)
+    state = CentroidalState(masses, coms, inertias, device=device)
+    body_pos = torch.randn(num_envs, num_bodies, 3, device=device)
+    body_quat = random_quat((num_envs, num_bodies), device)
+    body_rot = matrix_from_quat(body_quat)
+    # rigid motion: common angular velocity and the linear velocity of the composite CoM
+    ang_vel = torch.randn(num_envs, 3, device=device)
+    lin_vel = torch.randn(num_envs, 3, device=device)
+    body_com = body_pos + (body_rot @ coms[..., :3].unsqueeze(-1)).squeeze(-1)
+    com = (masses.unsqueeze(-1) * body_com).sum(1) / masses.sum(1, keepdim=True)
+    offsets = body_com - com.unsqueeze(1)
+    body_lin_vel = lin_vel.unsqueeze(1) + torch.cross(ang_vel.unsqueeze(1).expand_as(offsets), offsets, dim=-1)
+    state.update(body_pos, body_quat, body_lin_vel, ang_vel.unsqueeze(1).expand_as(offsets).contiguous())
+    # reference: composite inertia about the CoM (parallel axis theorem)
+    com_rot = body_rot @ matrix_from_quat(coms[..., 3:7])
+    eye = torch.eye(3, device=device)
+    parallel = (offsets * offsets).sum(-1)[..., None, None] * eye - offsets.unsqueeze(-1) @ offsets.unsqueeze(-2)
+    composite = (com_rot @ inertias @ com_rot.transpose(-1, -2) + masses[..., None, None] * parallel).sum(1)
+    ang_momentum = (composite @ ang_vel.unsqueeze(-1)).squeeze(-1)
+    errors = {
+        "CoM position": (state.com_pos_w - com).abs().max().item(),
+        "CoM velocity": (state.com_vel_w - lin_vel).abs().max().item(),
+        "angular momentum": (state.momentum[:, 3:6] - ang_momentum).abs().max().item(),
+    }
+    for name, error in errors.items():
+        print(f"[INFO] rigid composite: max error of the {name}: {error:.2e}")
+        assert error < 1e-3, f"The {name} does not match the rigid-body reference."
+
+
+def main():
+    """Check the centroidal quantities and time their update versus the batch size."""
+    device = "cuda:0" if args_cli.cuda else "cpu"
+    check_lip(device)
+    check_rigid_composite(device)
+    num_terms = args_cli.num_terms
+    print(f"{'envs':>6} {'bodies':>7} {'shared [us]':>12} {f'ad hoc x{num_terms} [us]':>18}")
+    for num_envs in args_cli.num_envs:
+        num_bodies = args_cli.num_bodies
+        state = CentroidalState(*random_bodies(num_envs, num_bodies, device), device=device)
+        body_state = (
+            torch.randn(num_envs, num_bodies, 3, device=device),
+            random_quat((num_envs, num_bodies), device),
+            torch.randn(num_envs, num_bodies, 3, device=device),
+            torch.randn(num_envs, num_bodies, 3, device=device),
+        )
+        state.update(*body_state, dt=0.02)
+        if device.startswith("cuda"):
+            torch.cuda.synchronize()
+        start = time.perf_counter()
+        for _ in range(args_cli.num_iters):
+            state.update(*body_state, dt=0.02)
+        if device.startswith("cuda"):
+            torch.cuda.synchronize()
+        elapsed = (time.perf_counter() - start) / args_cli.num_iters * 1e6
+        # terms that compute the quantities ad hoc each pay for an update, while the shared state is updated once
+        print(f"{num_envs:>6} {num_bodies:>7} {elapsed:>12.1f} {elapsed * num_terms:>18.1f}")
+
+
+if __name__ == "__main__":
+    # run the main function
+    main()
+    # close sim app
+    simulation_app.close()
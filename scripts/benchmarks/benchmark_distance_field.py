@@ -0,0 +1,144 @@
+"""Script to check and benchmark the cached geodesic distance fields of the navigation rewards."""
+
+from __future__ import annotations
+
+"""Launch Isaac Sim Simulator first."""
+
+
+import argparse
+
+from omni.isaac.lab.app import AppLauncher
+
+# add argparse arguments
+parser = argparse.ArgumentParser(description="Check and benchmark the cached geodesic distance fields.")
+parser.add_argument("--num_envs", type=int, default=4096, help="Number of environments for the lookups.")
+parser.add_argument("--num_goals", type=int, nargs="+", default=[1, 64, 512], help="Numbers of fields to compute.")
+parser.add_argument("--num_iters", type=int, default=200, help="Number of timed lookups.")
+parser.add_argument("--resolution", type=float, default=0.5, help="Resolution of the distance fields.")
+parser.add_argument("--cuda", action="store_true", default=False, help="Run on the GPU instead of the CPU.")
+# append AppLauncher cli args
+AppLauncher.add_app_launcher_args(parser)
+args_cli = parser.parse_args()
+args_cli.headless = True
+
+# launch omniverse app
+app_launcher = AppLauncher(args_cli)
+simulation_app = app_launcher.app
+
+"""Rest everything follows."""
+
+import time
+import torch
+
+from isaac.lab.hcrl.tasks.navigation.mdp.occupancy import DistanceFieldCache, OccupancyGrid
+
+
+def floor_plan(resolution: float, device: str) -> OccupancyGrid:
+    """Creates a 40 m x 30 m floor plan with outer walls and a wall across the middle with a 1.5 m door."""
+    num_x, num_y = round(40.0 / resolution), round(30.0 / resolution)
+    wall = max(round(0.2 / resolution), 1)
+    free = torch.ones(num_x, num_y, dtype=torch.bool, device=device)
+    free[:wall], free[-wall:], free[:, :wall], free[:, -wall:] = False, False, False, False
+    middle, door = num_x // 2, round(1.5 / resolution)
+    free[middle - wall // 2 : middle + wall - wall // 2, : num_y - door - wall] = False
+    return OccupancyGrid(free, (-20.0, -15.0), resolution)
+
+
+def synchronize(device: str):
+    """Waits for the kernels on the device."""
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+
+
+def check(device: str):
+    """Checks the distances on an empty grid and around the wall, and the reuse of the cached fields."""
+    resolution = args_cli.resolution
+    num_envs = 1024
+    # -- empty grid: the geodesic distance is the straight-line distance, up to the 8-connected metric
+    empty = OccupancyGrid(torch.ones(80, 60, dtype=torch.bool, device=device), (-20.0, -15.0), resolution)
+    cache = DistanceFieldCache(empty, num_envs, capacity=64)
+    goals = (torch.rand(num_envs, 2, device=device) - 0.5) * torch.tensor([36.0, 26.0], device=device)
+    pos = (torch.rand(num_envs, 2, device=device) - 0.5) * torch.tensor([36.0, 26.0], device=device)
+    cache.set_goals(goals)
+    straight = torch.linalg.vector_norm(goals - pos, dim=-1)
+    # tolerance: the 8-connected metric overestimates by up to 8.2% and the goals are not at the cell centers
+    excess = ((cache.distance(pos) - straight).abs() - 0.083 * straight).max().item()
+    print(f"[INFO] empty grid: max error vs. the straight-line distance beyond the metric error: {excess:.3f} m")
+    assert excess < resolution, "The geodesic distance on an empty grid does not match the straight-line distance."
+    print(f"[INFO] cached fields: {cache.num_cached} (capacity grown to {cache.capacity})")
+    # -- cached fields are reused
+    fields = cache._fields.clone()
+    cache.set_goals(goals)
+    assert torch.equal(fields, cache._fields), "The cached fields were recomputed."
+    # -- several goals per environment: selecting a goal matches a cache with that goal only
+    queue = DistanceFieldCache(empty, num_envs, capacity=64, num_goals=2)
+    other_goals = goals.flip(0)
+    queue.set_goals(torch.stack((other_goals, goals), dim=1))
+    second = torch.ones(num_envs, dtype=torch.long, device=device)
+    assert torch.equal(queue.distance(pos, second), cache.distance(pos)), "The selected goals do not match."
+    # -- masked update: only the marked goals change
+    mask = torch.zeros(num_envs, 2, dtype=torch.bool, device=device)
+    mask[: num_envs // 2, 0] = True
+    queue.set_goals(torch.stack((goals, other_goals), dim=1), mask)
+    first = torch.zeros_like(second)
+    updated = torch.arange(num_envs, device=device) < num_envs // 2
+    reference = DistanceFieldCache(empty, num_envs, capacity=64)
+    reference.set_goals(torch.where(updated.unsqueeze(-1), goals, other_goals))
+    assert torch.equal(queue.distance(pos, first), reference.distance(pos)), "The masked update changed other goals."
+    assert torch.equal(queue.distance(pos, second), cache.distance(pos)), "The masked update changed other goals."
+    # -- wall: the distance between both sides far from the door goes around the wall through the door
+    grid = floor_plan(resolution, device)
+    cache = DistanceFieldCache(grid, 1)
+    cache.set_goals(torch.tensor([[-5.0, -10.0]], device=device))
+    door = torch.tensor([0.0, 13.5], device=device)
+    pos = torch.tensor([[5.0, -10.0]], device=device)
+    reference = (torch.linalg.vector_norm(door - pos) + torch.linalg.vector_norm(door - cache._env_goal_pos)).item()
+    distance = cache.distance(pos).item()
+    print(f"[INFO] wall: geodesic distance {distance:.2f} m | through the door {reference:.2f} m | straight 10.00 m")
+    assert abs(distance - reference) < 0.1 * reference, "The geodesic distance does not go through the door."
+
+
+def main():
+    """Check the distance fields and time their computation and the per-step lookup."""
+    device = "cuda:0" if args_cli.cuda else "cpu"
+    check(device)
+    grid = floor_plan(args_cli.resolution, device)
+    num_envs = args_cli.num_envs
+    print(f"[INFO] grid of {grid.shape[0]} x {grid.shape[1]} cells at {grid.resolution} m")
+    # -- computation of new fields
+    free_cells = torch.nonzero(grid.free)
+    print(f"{'goals':>6} {'compute [ms]':>13} {'per field [ms]':>15}")
+    for num_goals in args_cli.num_goals:
+        cache = DistanceFieldCache(grid, num_envs, capacity=max(args_cli.num_goals))
+        cells = free_cells[torch.randperm(len(free_cells), device=device)[:num_goals]]
+        goals = grid.cell_center(cells)[torch.arange(num_envs, device=device) % num_goals]
+        synchronize(device)
+        start = time.perf_counter()
+        cache.set_goals(goals)
+        synchronize(device)
+        elapsed = (time.perf_counter() - start) * 1e3
+        print(f"{num_goals:>6} {elapsed:>13.1f} {elapsed / num_goals:>15.2f}")
+    # -- per-step lookup with cached fields
+    pos = grid.cell_center(free_cells[torch.randint(len(free_cells), (num_envs,), device=device)])
+    timings = dict()
+    for name, func in (
+        ("straight line", lambda: torch.linalg.vector_norm(goals - pos, dim=-1)),
+        ("geodesic lookup", lambda: cache.distance(pos)),
+        ("set goals + lookup", lambda: (cache.set_goals(goals), cache.distance(pos))),
+    ):
+        func()
+        synchronize(device)
+        start = time.perf_counter()
+        for _ in range(args_cli.num_iters):
+            func()
+        synchronize(device)
+        timings[name] = (time.perf_counter() - start) / args_cli.num_iters * 1e6
+    for name, timing in timings.items():
+        print(f"[INFO] {num_envs} envs: {name}: {timing:.1f} us per step")
+
+
+if __name__ == "__main__":
+    # run the main function
+    main()
+    # close sim app
+    simulation_app.close()
@@ -0,0 +1,122 @@
+"""Script to check the batched rigid-body dynamics of the HCRL robots against the simulator and to benchmark them."""
+
+from __future__ import annotations
+
+"""Launch Isaac Sim Simulator first."""
+
+
+import argparse
+
+from omni.isaac.lab.app import AppLauncher
+
+# add argparse arguments
+parser = argparse.ArgumentParser(description="Check and benchmark the batched rigid-body dynamics.")
+parser.add_argument("--robot", type=str, default="go1", choices=["draco", "go1"], help="Robot to check.")
+parser.add_argument("--num_envs", type=int, default=4096, help="Batch size of the benchmark.")
+parser.add_argument("--num_iters", type=int, default=20, help="Number of timed iterations.")
+parser.add_argument("--cuda", action="store_true", default=False, help="Run on the GPU instead of the CPU.")
+parser.add_argument("--tolerance", type=float, default=1e-3, help="Tolerance on the errors against the simulator.")
+# append AppLauncher cli args
+AppLauncher.add_app_launcher_args(parser)
+args_cli = parser.parse_args()
+args_cli.headless = True
+
+# launch omniverse app
+app_launcher = AppLauncher(args_cli)
+simulation_app = app_launcher.app
+
+"""Rest everything follows."""
+
+import os
+import time
+import torch
+
+import omni.isaac.lab.sim as sim_utils
+from omni.isaac.lab.scene import InteractiveScene, InteractiveSceneCfg
+from omni.isaac.lab.utils import configclass
+
+from isaac.lab.hcrl import EXT_DIR
+from isaac.lab.hcrl.assets import DRACO_CFG, GO1_CFG
+from isaac.lab.hcrl.tasks.locomotion.mdp.dynamics import RigidBodyDynamics
+
+ROBOTS = {
+    "draco": ("resources/hcrl_robots/draco/draco.urdf", DRACO_CFG),
+    "go1": ("resources/hcrl_robots/go1/go1.urdf", GO1_CFG),
+}
+"""URDF path and articulation configuration of the robots."""
+
+
+def timeit(fn, device: str) -> float:
+    """Returns the average time of a function in milliseconds."""
+    fn()
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(args_cli.num_iters):
+        fn()
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) / args_cli.num_iters * 1e3
+
+
+def compare_simulator(model: RigidBodyDynamics, cfg, device: str):
+    """Compares the values and the cost of the model against the simulator query path (fixed base)."""
+
+    @configclass
+    class RobotSceneCfg(InteractiveSceneCfg):
+        robot = cfg.replace(prim_path="{ENV_REGEX_NS}/Robot", spawn=cfg.spawn.replace(fix_base=True))
+
+    sim = sim_utils.SimulationContext(sim_utils.SimulationCfg(device=device))
+    scene = InteractiveScene(RobotSceneCfg(num_envs=args_cli.num_envs, env_spacing=2.0))
+    sim.reset()
+    robot = scene["robot"]
+    # move the joints to random positions within their limits and read the state after a physics step
+    limits = robot.data.soft_joint_pos_limits
+    joint_pos = limits[..., 0] + torch.rand_like(limits[..., 0]) * (limits[..., 1] - limits[..., 0])
+    robot.write_joint_state_to_sim(joint_pos, torch.zeros_like(joint_pos))
+    sim.step(render=False)
+    scene.update(sim.get_physics_dt())
+    # map the simulator joint ordering to the model ordering
+    joint_ids = model.find_joints(robot.joint_names)
+    q = robot.data.joint_pos[:, torch.argsort(torch.tensor(joint_ids, device=device))]
+
+    def simulator_query():
+        return robot.root_physx_view.get_mass_matrices(), robot.root_physx_view.get_generalized_gravity_forces()
+
+    sim_mass_matrix, sim_gravity = simulator_query()
+    mass_matrix = model.mass_matrix(q)[:, joint_ids][:, :, joint_ids]
+    gravity = model.gravity_forces(q)[:, joint_ids]
+    mass_error = (mass_matrix - sim_mass_matrix).abs().max().item()
+    gravity_error = (gravity - sim_gravity).abs().max().item()
+    print(f"[INFO] {args_cli.robot} | mass matrix error: {mass_error:.2e} | gravity error: {gravity_error:.2e}")
+    assert mass_error < args_cli.tolerance, f"The mass matrices differ from the simulator by {mass_error:.2e}."
+    assert gravity_error < args_cli.tolerance, f"The gravity forces differ from the simulator by {gravity_error:.2e}."
+    print(f"\t{'simulator query':>22}: {timeit(simulator_query, device):.3f} ms ({args_cli.num_envs} envs)")
+
+
+def main():
+    """Compare the dynamics against the simulator (fixed base) and time them at the requested batch size."""
+    device = "cuda:0" if args_cli.cuda else "cpu"
+    path, cfg = ROBOTS[args_cli.robot]
+    path = os.path.join(EXT_DIR, path)
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"URDF not found at {path}.")
+    model = RigidBodyDynamics.from_urdf(path, device=device)
+    q = torch.rand(args_cli.num_envs, model.num_joints, device=device)
+    qd = torch.randn_like(q)
+    candidates = {
+        "mass matrix (CRBA)": lambda: model.mass_matrix(q),
+        "bias forces (RNEA)": lambda: model.bias_forces(q, qd),
+        "gravity forces": lambda: model.gravity_forces(q),
+        "centroidal momentum": lambda: model.centroidal_momentum_matrix(q),
+    }
+    for label, fn in candidates.items():
+        print(f"\t{label:>22}: {timeit(fn, device):.3f} ms ({args_cli.num_envs} envs)")
+    compare_simulator(model, cfg, device)
+
+
+if __name__ == "__main__":
+    # run the main function
+    main()
+    # close sim app
+    simulation_app.close()
@@ -0,0 +1,119 @@
+"""Script to check the fused navigation rewards against the separate terms and to time the reward manager."""
+
+from __future__ import annotations
+
+"""Launch Isaac Sim Simulator first."""
+
+
+import argparse
+
+from omni.isaac.lab.app import AppLauncher
+
+# add argparse arguments
+parser = argparse.ArgumentParser(description="Check and benchmark the fused navigation rewards.")
+parser.add_argument("--task", type=str, default="Bumpybot-v0", help="Name of the task.")
+parser.add_argument("--num_envs", type=int, default=4096, help="Number of environments to simulate.")
+parser.add_argument("--num_steps", type=int, default=50, help="Number of checked environment steps.")
+parser.add_argument("--num_iters", type=int, default=500, help="Number of timed reward computations.")
+parser.add_argument("--compile", action="store_true", default=False, help="Compile the fused rewards.")
+parser.add_argument("--cpu", action="store_true", default=False, help="Use CPU pipeline.")
+# append AppLauncher cli args
+AppLauncher.add_app_launcher_args(parser)
+args_cli = parser.parse_args()
+args_cli.headless = True
+
+# launch omniverse app
+app_launcher = AppLauncher(args_cli)
+simulation_app = app_launcher.app
+
+"""Rest everything follows."""
+
+import copy
+import gymnasium as gym
+import time
+import torch
+
+import isaac.lab.hcrl  # noqa: F401
+import omni.isaac.lab_tasks  # noqa: F401
+from omni.isaac.lab_tasks.utils import parse_env_cfg
+
+from isaac.lab.hcrl.tasks.navigation.mdp import fuse_navigation_rewards
+
+
+def timed(func, num_iters: int, device: str) -> float:
+    """Returns the mean duration of a function call (in us)."""
+    func()
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(num_iters):
+        func()
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) / num_iters * 1e6
+
+
+def main():
+    """Compare the fused and the separate reward terms, and time the reward manager with both."""
+    env_cfg = parse_env_cfg(args_cli.task, use_gpu=not args_cli.cpu, num_envs=args_cli.num_envs)
+    fused_rewards_cfg = copy.deepcopy(env_cfg.rewards)
+    fused_names = fuse_navigation_rewards(fused_rewards_cfg, compile=args_cli.compile)
+    print(f"[INFO] fused reward terms: {fused_names}")
+    env = gym.make(args_cli.task, cfg=env_cfg)
+    env.reset()
+    unwrapped = env.unwrapped
+    manager = unwrapped.reward_manager
+    # create the fused terms next to the separate terms of the reward manager
+    separate_cfgs = {name: manager.get_term_cfg(name) for name in fused_names}
+    fused_cfgs = {name: getattr(fused_rewards_cfg, name) for name in fused_names}
+    for term_cfg in fused_cfgs.values():
+        term_cfg.func = term_cfg.func(cfg=term_cfg, env=unwrapped)
+    rewards = next(iter(fused_cfgs.values())).func.rewards
+    # -- equivalence over random rollouts
+    errors = dict.fromkeys(fused_names, 0.0)
+    for _ in range(args_cli.num_steps):
+        actions = 2.0 * torch.rand(unwrapped.num_envs, unwrapped.action_manager.total_action_dim) - 1.0
+        env.step(actions.to(unwrapped.device))
+        for name in fused_names:
+            separate = separate_cfgs[name].func(unwrapped, **separate_cfgs[name].params)
+            fused = fused_cfgs[name].func(unwrapped, **fused_cfgs[name].params)
+            scale = separate.abs().max().clamp_min(1.0)
+            errors[name] = max(errors[name], ((fused - separate).abs().max() / scale).item())
+    for name, error in errors.items():
+        print(f"[INFO] {name}: max relative difference of the fused component: {error:.2e}")
+        assert error < 1e-5, f"The fused component of the term {name} does not match the separate term."
+    # -- reward manager time per step
+    term_ids = [manager.active_terms.index(name) for name in fused_names]
+    separate_list = list(manager._term_cfgs)
+    fused_list = list(manager._term_cfgs)
+    for term_id, name in zip(term_ids, fused_names):
+        fused_list[term_id] = fused_cfgs[name]
+
+    def compute_fused():
+        # invalidate the fused values, as in a new environment step
+        rewards._key = None
+        manager.compute(dt=unwrapped.step_dt)
+
+    actions = torch.zeros(unwrapped.num_envs, unwrapped.action_manager.total_action_dim, device=unwrapped.device)
+    timings = dict()
+    for name, term_cfgs, compute in (
+        ("separate", separate_list, lambda: manager.compute(dt=unwrapped.step_dt)),
+        ("fused", fused_list, compute_fused),
+    ):
+        manager._term_cfgs = term_cfgs
+        timings[name] = (
+            timed(compute, args_cli.num_iters, unwrapped.device),
+            timed(lambda: env.step(actions), args_cli.num_iters // 10, unwrapped.device),
+        )
+    manager._term_cfgs = separate_list
+    print(f"{'terms':>10} {'reward manager [us]':>20} {'env step [us]':>14}")
+    for name, (reward_time, step_time) in timings.items():
+        print(f"{name:>10} {reward_time:>20.1f} {step_time:>14.1f}")
+    env.close()
+
+
+if __name__ == "__main__":
+    # run the main function
+    main()
+    # close sim app
+    simulation_app.close()
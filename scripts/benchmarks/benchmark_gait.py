@@ -0,0 +1,52 @@
+"""Script to benchmark the update of the vectorized gait scheduler.
+
+The scheduler only depends on PyTorch, so the script runs without launching the simulator. Its state transitions
+and duty factor are checked in ``test/test_gait.py``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+import torch
+
+# load the pure-torch modules from their files, without registering the environments (see test/standalone.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "test"))
+from standalone import load_module  # noqa: E402
+
+gait = load_module("tasks/locomotion/mdp/gait.py")
+
+# add argparse arguments
+parser = argparse.ArgumentParser(description="Benchmark the vectorized gait scheduler.")
+parser.add_argument("--num_envs", type=int, nargs="+", default=[1024, 4096, 8192], help="Batch sizes to benchmark.")
+parser.add_argument("--num_iters", type=int, default=1000, help="Number of timed updates per batch size.")
+parser.add_argument("--dt", type=float, default=0.02, help="Environment step (in s).")
+parser.add_argument("--cuda", action="store_true", default=False, help="Run on the GPU instead of the CPU.")
+args_cli = parser.parse_args()
+
+
+def main():
+    """Time the scheduler update versus the batch size."""
+    device = "cuda:0" if args_cli.cuda else "cpu"
+    print(f"{'envs':>6} {'legs':>5} {'update [us]':>12}")
+    for num_envs in args_cli.num_envs:
+        for cfg in (gait.DracoWalkGaitCfg(), gait.Go1TrotGaitCfg()):
+            scheduler = gait.GaitScheduler(cfg, num_envs, device)
+            stepping = torch.rand(num_envs, device=device) > 0.2
+            scheduler.update(args_cli.dt, stepping)
+            if device.startswith("cuda"):
+                torch.cuda.synchronize()
+            start = time.perf_counter()
+            for _ in range(args_cli.num_iters):
+                scheduler.update(args_cli.dt, stepping)
+            if device.startswith("cuda"):
+                torch.cuda.synchronize()
+            elapsed = (time.perf_counter() - start) / args_cli.num_iters * 1e6
+            print(f"{num_envs:>6} {scheduler.num_legs:>5} {elapsed:>12.1f}")
+
+
+if __name__ == "__main__":
+    # run the main function
+    main()
@@ -0,0 +1,103 @@
+"""Script to check the running gait metrics against the recorded contacts and to time their update."""
+
+from __future__ import annotations
+
+"""Launch Isaac Sim Simulator first."""
+
+
+import argparse
+
+from omni.isaac.lab.app import AppLauncher
+
+# add argparse arguments
+parser = argparse.ArgumentParser(description="Check and benchmark the running gait metrics.")
+parser.add_argument("--task", type=str, default="HCRL-WBC-v0", help="Name of the task.")
+parser.add_argument("--num_envs", type=int, default=256, help="Number of environments to simulate.")
+parser.add_argument("--num_steps", type=int, default=500, help="Number of recorded environment steps.")
+parser.add_argument("--num_iters", type=int, default=1000, help="Number of timed updates.")
+parser.add_argument("--command_name", type=str, default="gait_metrics", help="Name of the gait metrics term.")
+parser.add_argument("--cpu", action="store_true", default=False, help="Use CPU pipeline.")
+# append AppLauncher cli args
+AppLauncher.add_app_launcher_args(parser)
+args_cli = parser.parse_args()
+args_cli.headless = True
+
+# launch omniverse app
+app_launcher = AppLauncher(args_cli)
+simulation_app = app_launcher.app
+
+"""Rest everything follows."""
+
+import gymnasium as gym
+import time
+import torch
+
+import isaac.lab.hcrl  # noqa: F401
+import omni.isaac.lab_tasks  # noqa: F401
+from omni.isaac.lab_tasks.utils import parse_env_cfg
+
+from isaac.lab.hcrl.tasks.locomotion.mdp import GaitMetrics
+
+
+def offline_duty_factor(contacts: torch.Tensor) -> torch.Tensor:
+    """Fraction of the recorded steps in contact, between the first and the last touchdown of each foot.
+
+    Args:
+        contacts: The recorded contact states. Shape is (num_steps, num_envs, num_feet).
+
+    Returns:
+        The duty factors, NaN for the feet without two touchdowns. Shape is (num_envs, num_feet).
+    """
+    touchdowns = contacts[1:] & ~contacts[:-1]
+    steps = torch.arange(1, contacts.shape[0], device=contacts.device).view(-1, 1, 1)
+    first = torch.where(touchdowns, steps, contacts.shape[0]).amin(dim=0)
+    last = torch.where(touchdowns, steps, -1).amax(dim=0)
+    window = (steps >= first) & (steps < last)
+    duty_factor = (contacts[1:] & window).sum(dim=0) / window.sum(dim=0).clamp_min(1)
+    return torch.where(last > first, duty_factor.float(), float("nan"))
+
+
+def main():
+    """Compare the running duty factors with those of the recorded contacts, and time the update."""
+    env_cfg = parse_env_cfg(args_cli.task, use_gpu=not args_cli.cpu, num_envs=args_cli.num_envs)
+    # keep the episodes running for the whole recording
+    env_cfg.episode_length_s = 1.0e3
+    env = gym.make(args_cli.task, cfg=env_cfg)
+    env.reset()
+    term: GaitMetrics = env.unwrapped.command_manager.get_term(args_cli.command_name)
+    actions = torch.zeros(env.unwrapped.num_envs, env.unwrapped.action_manager.total_action_dim)
+    actions = actions.to(env.unwrapped.device)
+    # -- record the contacts (only for the check: the term does not store them)
+    contacts = list()
+    for _ in range(args_cli.num_steps):
+        env.step(actions)
+        contacts.append(term._contact.clone())
+    reference = offline_duty_factor(torch.stack(contacts))
+    valid = ~reference.isnan()
+    # note: the running averages weight the recent strides more, so they only match on steady gaits
+    error = (term.duty_factor - reference).abs()[valid]
+    print(f"[INFO] feet with at least one stride: {100.0 * valid.float().mean().item():.1f}%")
+    duty_factor, recorded = term.duty_factor[valid].mean().item(), reference[valid].mean().item()
+    print(f"[INFO] duty factor: mean {duty_factor:.3f} | recorded {recorded:.3f}")
+    print(f"[INFO] median difference to the recorded duty factor: {error.median().item():.3f}")
+    print(f"[INFO] stride frequency: {term.stride_frequency[valid].mean().item():.2f} Hz")
+    print(f"[INFO] asymmetry: {term.asymmetry.mean().item():.3f}")
+    assert error.median().item() < 0.1, "The running duty factors do not match the recorded contacts."
+    # -- time of the update
+    if env.unwrapped.device.startswith("cuda"):
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(args_cli.num_iters):
+        term._update_command()
+    if env.unwrapped.device.startswith("cuda"):
+        torch.cuda.synchronize()
+    elapsed = (time.perf_counter() - start) / args_cli.num_iters * 1e6
+    print(f"[INFO] {env.unwrapped.num_envs} envs x {term.num_feet} feet: update in {elapsed:.1f} us")
+    env.close()
+
+
+if __name__ == "__main__":
+    # run the main function
+    main()
+    # close sim app
+    simulation_app.close()
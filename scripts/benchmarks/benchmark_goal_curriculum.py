@@ -0,0 +1,79 @@
+"""Script to check the goal distance curriculum for host synchronizations and to time its update."""
+
+from __future__ import annotations
+
+"""Launch Isaac Sim Simulator first."""
+
+
+import argparse
+
+from omni.isaac.lab.app import AppLauncher
+
+# add argparse arguments
+parser = argparse.ArgumentParser(description="Check and benchmark the goal distance curriculum.")
+parser.add_argument("--task", type=str, default="Bumpybot-v0", help="Name of the task.")
+parser.add_argument("--num_envs", type=int, default=4096, help="Number of environments to simulate.")
+parser.add_argument("--num_steps", type=int, default=500, help="Number of environment steps.")
+parser.add_argument("--num_iters", type=int, default=1000, help="Number of timed updates.")
+parser.add_argument("--term_name", type=str, default="goal_distance", help="Name of the curriculum term.")
+# append AppLauncher cli args
+AppLauncher.add_app_launcher_args(parser)
+args_cli = parser.parse_args()
+args_cli.headless = True
+
+# launch omniverse app
+app_launcher = AppLauncher(args_cli)
+simulation_app = app_launcher.app
+
+"""Rest everything follows."""
+
+import gymnasium as gym
+import time
+import torch
+
+import isaac.lab.hcrl  # noqa: F401
+import omni.isaac.lab_tasks  # noqa: F401
+from omni.isaac.lab_tasks.utils import parse_env_cfg
+
+from isaac.lab.hcrl.tasks.navigation.mdp import goal_distance_levels
+from isaac.lab.hcrl.tasks.utils import HostSyncDetector
+
+
+def main():
+    """Run the environment with the curriculum, check that it does not synchronize, and time its update."""
+    env_cfg = parse_env_cfg(args_cli.task, use_gpu=True, num_envs=args_cli.num_envs)
+    env = gym.make(args_cli.task, cfg=env_cfg)
+    env.reset()
+    term_cfg = env.unwrapped.curriculum_manager._term_cfgs[
+        env.unwrapped.curriculum_manager.active_terms.index(args_cli.term_name)
+    ]
+    term: goal_distance_levels = term_cfg.func
+    detector = HostSyncDetector(env.unwrapped, mode="warn")
+    # -- run the episodes with random actions
+    num_envs, device = env.unwrapped.num_envs, env.unwrapped.device
+    for _ in range(args_cli.num_steps):
+        actions = 2.0 * torch.rand(num_envs, env.unwrapped.action_manager.total_action_dim, device=device) - 1.0
+        env.step(actions)
+    name = f"curriculum/{args_cli.term_name}"
+    print(f"[INFO] host synchronizations in the curriculum: {detector.counts.get(name, 0)}")
+    assert detector.counts.get(name, 0) == 0, detector.report()
+    levels = torch.bincount(term.levels, minlength=term.curriculum_cfg.num_levels).tolist()
+    print(f"[INFO] environments per level: {levels}")
+    print(f"[INFO] mean success rate: {term.success_rate.mean().item():.3f}")
+    # -- time of the update for a quarter of the environments
+    env_ids = torch.randperm(num_envs, device=device)[: num_envs // 4]
+    torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(args_cli.num_iters):
+        term(env.unwrapped, env_ids, **term_cfg.params)
+    torch.cuda.synchronize()
+    elapsed = (time.perf_counter() - start) / args_cli.num_iters * 1e6
+    print(f"[INFO] {num_envs} envs: curriculum update in {elapsed:.1f} us")
+    env.close()
+
+
+if __name__ == "__main__":
+    # run the main function
+    main()
+    # close sim app
+    simulation_app.close()
@@ -0,0 +1,129 @@
+"""Script to check and benchmark the goal sampler on the free cells of an occupancy grid."""
+
+from __future__ import annotations
+
+"""Launch Isaac Sim Simulator first."""
+
+
+import argparse
+
+from omni.isaac.lab.app import AppLauncher
+
+# add argparse arguments
+parser = argparse.ArgumentParser(description="Check and benchmark the occupancy grid goal sampler.")
+parser.add_argument("--num_envs", type=int, nargs="+", default=[4096, 65536], help="Batch sizes to benchmark.")
+parser.add_argument("--num_iters", type=int, default=100, help="Number of timed samplings per batch size.")
+parser.add_argument("--resolution", type=float, default=0.1, help="Resolution of the synthetic floor plan.")
+parser.add_argument("--cuda", action="store_true", default=False, help="Run on the GPU instead of the CPU.")
+# append AppLauncher cli args
+AppLauncher.add_app_launcher_args(parser)
+args_cli = parser.parse_args()
+args_cli.headless = True
+
+# launch omniverse app
+app_launcher = AppLauncher(args_cli)
+simulation_app = app_launcher.app
+
+"""Rest everything follows."""
+
+import math
+import time
+import torch
+
+from isaac.lab.hcrl.tasks.navigation.mdp.occupancy import (
+    OccupancyGoalSampler,
+    OccupancyGoalSamplerCfg,
+    OccupancyGrid,
+    OccupancyGridCfg,
+    distance_field,
+)
+
+
+def floor_plan(resolution: float, device: str) -> OccupancyGrid:
+    """Creates a 40 m x 30 m floor plan with outer walls and a wall across the middle with a 1.5 m door."""
+    num_x, num_y = round(40.0 / resolution), round(30.0 / resolution)
+    wall = max(round(0.2 / resolution), 1)
+    free = torch.ones(num_x, num_y, dtype=torch.bool, device=device)
+    free[:wall], free[-wall:], free[:, :wall], free[:, -wall:] = False, False, False, False
+    middle, door = num_x // 2, round(1.5 / resolution)
+    free[middle - wall // 2 : middle + wall - wall // 2, : num_y - door - wall] = False
+    return OccupancyGrid(free, (-20.0, -15.0), resolution)
+
+
+def sampler_cfg(distance_range: tuple[float, float]) -> OccupancyGoalSamplerCfg:
+    """Returns the configuration of a goal sampler on the synthetic floor plan."""
+    grid_cfg = OccupancyGridCfg(prim_path="/World/synthetic", resolution=args_cli.resolution)
+    return OccupancyGoalSamplerCfg(grid=grid_cfg, distance_range=distance_range)
+
+
+def check(device: str):
+    """Checks the distance fields and the sampled goals."""
+    # -- distance field on an empty grid: octile distances
+    free = torch.ones(32, 24, dtype=torch.bool, device=device)
+    sources = torch.tensor([[0, 0], [31, 23], [10, 5]], device=device)
+    field = distance_field(free, sources, resolution=0.5)
+    cells = torch.stack(torch.meshgrid(torch.arange(32), torch.arange(24), indexing="ij"), dim=-1).to(device)
+    delta = (cells.unsqueeze(0) - sources.view(-1, 1, 1, 2)).abs().float()
+    octile = 0.5 * (delta.amax(-1) + (math.sqrt(2.0) - 1.0) * delta.amin(-1))
+    error = (field - octile).abs().max().item()
+    print(f"[INFO] max error of the distance field vs. the octile distance: {error:.2e} m")
+    assert error < 1e-4, "The distance field does not match the octile distance."
+    # -- the sampled goals are free and satisfy the distance constraints
+    grid = floor_plan(args_cli.resolution, device)
+    distance_range = (2.0, 6.0)
+    sampler = OccupancyGoalSampler(sampler_cfg(distance_range), grid)
+    num_envs = 4096
+    env_origins = torch.randn(num_envs, 2, device=device) * 100.0
+    start = sampler.sample(torch.zeros(num_envs, 2, device=device), torch.zeros(num_envs, 2, device=device))
+    goals = sampler.sample(start + env_origins, env_origins)
+    goal_cells = torch.stack(grid.cell_index(goals - env_origins), dim=-1)
+    assert grid.free[goal_cells[:, 0], goal_cells[:, 1]].all(), "Goals were sampled on occupied cells."
+    distance = sampler.geodesic_distance(start, goal_cells.unsqueeze(1)).squeeze(1)
+    inside = ((distance >= distance_range[0]) & (distance <= distance_range[1])).float().mean().item()
+    euclidean = torch.linalg.vector_norm(goals - env_origins - start, dim=-1)
+    detour = (distance / euclidean.clamp_min(1e-3)).max().item()
+    print(f"[INFO] {sampler.num_free_cells} free cells | goals within the distance range: {100.0 * inside:.1f}%")
+    print(f"[INFO] largest ratio of the geodesic to the straight-line distance: {detour:.2f}")
+    assert inside > 0.95, "Too few goals satisfy the distance constraints."
+
+
+def timed(func, num_iters: int, device: str) -> float:
+    """Returns the mean duration of a function call (in us)."""
+    func()
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(num_iters):
+        func()
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) / num_iters * 1e6
+
+
+def main():
+    """Check the goal sampler and time the sampling versus the batch size."""
+    device = "cuda:0" if args_cli.cuda else "cpu"
+    check(device)
+    grid = floor_plan(args_cli.resolution, device)
+    start = time.perf_counter()
+    constrained = OccupancyGoalSampler(sampler_cfg((2.0, 6.0)), grid)
+    print(f"[INFO] geodesic distance table computed in {time.perf_counter() - start:.2f} s")
+    unconstrained = OccupancyGoalSampler(sampler_cfg((0.0, float("inf"))), grid)
+    print(f"{'envs':>6} {'box [us]':>10} {'free cells [us]':>16} {'geodesic [us]':>14}")
+    for num_envs in args_cli.num_envs:
+        start_pos = torch.zeros(num_envs, 2, device=device)
+        env_origins = torch.zeros(num_envs, 2, device=device)
+        timings = [
+            # reference: uniform box around the start position, as without the goal sampler
+            timed(lambda: start_pos + 10.0 * torch.rand(num_envs, 2, device=device) - 5.0, args_cli.num_iters, device),
+            timed(lambda: unconstrained.sample(start_pos, env_origins), args_cli.num_iters, device),
+            timed(lambda: constrained.sample(start_pos, env_origins), args_cli.num_iters, device),
+        ]
+        print(f"{num_envs:>6} {timings[0]:>10.1f} {timings[1]:>16.1f} {timings[2]:>14.1f}")
+
+
+if __name__ == "__main__":
+    # run the main function
+    main()
+    # close sim app
+    simulation_app.close()
@@ -0,0 +1,118 @@
+"""Script to check and benchmark the heading sources of the holonomic base action of Bumpybot."""
+
+from __future__ import annotations
+
+"""Launch Isaac Sim Simulator first."""
+
+
+import argparse
+
+from omni.isaac.lab.app import AppLauncher
+
+# add argparse arguments
+parser = argparse.ArgumentParser(description="Benchmark the holonomic base action of Bumpybot.")
+parser.add_argument("--task", type=str, default="Bumpybot-v0", help="Name of the task.")
+parser.add_argument("--num_envs", type=int, nargs="+", default=[4096, 65536], help="Numbers of environments.")
+parser.add_argument("--num_iters", type=int, default=500, help="Number of timed action applications.")
+parser.add_argument("--cpu", action="store_true", default=False, help="Use CPU pipeline.")
+parser.add_argument("--tolerance", type=float, default=1e-4, help="Tolerance on the errors against the Euler path.")
+# append AppLauncher cli args
+AppLauncher.add_app_launcher_args(parser)
+args_cli = parser.parse_args()
+args_cli.headless = True
+
+# launch omniverse app
+app_launcher = AppLauncher(args_cli)
+simulation_app = app_launcher.app
+
+"""Rest everything follows."""
+
+import gymnasium as gym
+import time
+import torch
+
+import isaac.lab.hcrl  # noqa: F401
+import omni.isaac.lab_tasks  # noqa: F401
+from omni.isaac.lab.utils.math import euler_xyz_from_quat, wrap_to_pi
+from omni.isaac.lab_tasks.utils import parse_env_cfg
+
+from isaac.lab.hcrl.tasks.navigation.mdp import HolonomicAction
+
+
+def legacy_apply(term: HolonomicAction):
+    """The previous implementation (with the corrected rotation): Euler angle conversion and elementwise expressions."""
+    quat_w = term._asset.data.body_quat_w[:, term._body_idx].squeeze(1)
+    yaw_w = euler_xyz_from_quat(quat_w)[2]
+    actions = term.processed_actions
+    term._joint_vel_command[:, 0] = torch.cos(yaw_w) * actions[:, 0] - torch.sin(yaw_w) * actions[:, 1]
+    term._joint_vel_command[:, 1] = torch.sin(yaw_w) * actions[:, 0] + torch.cos(yaw_w) * actions[:, 1]
+    term._joint_vel_command[:, 2] = actions[:, 2]
+    term._asset.set_joint_velocity_target(term._joint_vel_command, joint_ids=term._joint_ids)
+
+
+def timed(func, num_iters: int, device: str) -> float:
+    """Returns the mean duration of a function call (in us)."""
+    func()
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(num_iters):
+        func()
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) / num_iters * 1e6
+
+
+def run(num_envs: int):
+    """Checks that the heading sources agree and times the action application."""
+    env_cfg = parse_env_cfg(args_cli.task, use_gpu=not args_cli.cpu, num_envs=num_envs)
+    env = gym.make(args_cli.task, cfg=env_cfg)
+    device = env.unwrapped.device
+    term: HolonomicAction = env.unwrapped.action_manager.get_term("velocity")
+    # step with random actions so that the headings differ across the environments
+    env.reset()
+    actions = torch.zeros(num_envs, env.unwrapped.action_manager.total_action_dim, device=device)
+    for _ in range(10):
+        env.step(2.0 * torch.rand_like(actions) - 1.0)
+    # -- the heading sources agree with the Euler angle conversion
+    quat_w = term._asset.data.body_quat_w[:, term._body_idx[0]]
+    yaw_euler = euler_xyz_from_quat(quat_w)[2]
+    commands = dict()
+    for source in ("joint", "body"):
+        term.cfg.heading_source = source
+        cos_yaw, sin_yaw = term._heading()
+        error = wrap_to_pi(torch.atan2(sin_yaw, cos_yaw) - yaw_euler).abs().max().item()
+        term.apply_actions()
+        commands[source] = term._joint_vel_command.clone()
+        print(f"[INFO] {num_envs} envs: max heading error of the {source} source vs. Euler angles: {error:.2e} rad")
+        assert error < args_cli.tolerance, f"The heading of the {source} source differs by {error:.2e} rad."
+    # -- the joint velocity targets agree with the Euler path
+    legacy_apply(term)
+    for source, command in commands.items():
+        error = (command - term._joint_vel_command).abs().max().item()
+        print(f"[INFO] {num_envs} envs: max joint velocity target difference of the {source} source: {error:.2e}")
+        assert error < args_cli.tolerance, f"The targets of the {source} source differ by {error:.2e}."
+    # -- timing of the action application
+    timings = {"euler (legacy)": timed(lambda: legacy_apply(term), args_cli.num_iters, device)}
+    for source in ("body", "joint"):
+        term.cfg.heading_source = source
+        timings[source] = timed(term.apply_actions, args_cli.num_iters, device)
+    timings["process_actions"] = timed(lambda: term.process_actions(actions), args_cli.num_iters, device)
+    env.close()
+    return timings
+
+
+def main():
+    """Benchmark the action application at several numbers of environments."""
+    results = {num_envs: run(num_envs) for num_envs in args_cli.num_envs}
+    names = list(next(iter(results.values())).keys())
+    print(f"{'envs':>6} " + " ".join(f"{name + ' [us]':>20}" for name in names))
+    for num_envs, timings in results.items():
+        print(f"{num_envs:>6} " + " ".join(f"{timings[name]:>20.1f}" for name in names))
+
+
+if __name__ == "__main__":
+    # run the main function
+    main()
+    # close sim app
+    simulation_app.close()
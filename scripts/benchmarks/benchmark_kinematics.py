@@ -0,0 +1,128 @@
+"""Script to check the pure-torch kinematics of the HCRL robots against the simulator and to benchmark them."""
+
+from __future__ import annotations
+
+"""Launch Isaac Sim Simulator first."""
+
+
+import argparse
+
+from omni.isaac.lab.app import AppLauncher
+
+# add argparse arguments
+parser = argparse.ArgumentParser(description="Check and benchmark the pure-torch URDF kinematics.")
+parser.add_argument("--robot", type=str, default="go1", choices=["draco", "go1", "bumpybot"], help="Robot to check.")
+parser.add_argument("--num_envs", type=int, default=4096, help="Batch size of the benchmark.")
+parser.add_argument("--num_iters", type=int, default=20, help="Number of timed iterations.")
+parser.add_argument("--cuda", action="store_true", default=False, help="Run on the GPU instead of the CPU.")
+parser.add_argument("--tolerance", type=float, default=1e-3, help="Tolerance on the errors against the simulator.")
+# append AppLauncher cli args
+AppLauncher.add_app_launcher_args(parser)
+args_cli = parser.parse_args()
+args_cli.headless = True
+
+# launch omniverse app
+app_launcher = AppLauncher(args_cli)
+simulation_app = app_launcher.app
+
+"""Rest everything follows."""
+
+import os
+import re
+import time
+import torch
+
+import omni.isaac.lab.sim as sim_utils
+from omni.isaac.lab.scene import InteractiveScene, InteractiveSceneCfg
+from omni.isaac.lab.utils import configclass
+from omni.isaac.lab.utils.math import matrix_from_quat
+
+from isaac.lab.hcrl import EXT_DIR
+from isaac.lab.hcrl.assets import BUMPYBOT_CFG, DRACO_CFG, GO1_CFG
+from isaac.lab.hcrl.tasks.locomotion.mdp.kinematics import KinematicTree
+
+ROBOTS = {
+    "draco": ("resources/hcrl_robots/draco/draco.urdf", DRACO_CFG),
+    "go1": ("resources/hcrl_robots/go1/go1.urdf", GO1_CFG),
+    "bumpybot": ("resources/hcrl_robots/bumpybot/bumpybot.urdf", BUMPYBOT_CFG),
+}
+"""URDF path and articulation configuration of the robots."""
+
+
+def timeit(fn, device: str) -> float:
+    """Returns the average time of a function in milliseconds."""
+    fn()
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(args_cli.num_iters):
+        fn()
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) / args_cli.num_iters * 1e3
+
+
+def main():
+    """Compare the link poses and Jacobians against the simulator (fixed base) and time both paths."""
+    device = "cuda:0" if args_cli.cuda else "cpu"
+    path, cfg = ROBOTS[args_cli.robot]
+    path = os.path.join(EXT_DIR, path)
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"URDF not found at {path}.")
+    tree = KinematicTree.from_urdf(path, device=device)
+
+    @configclass
+    class RobotSceneCfg(InteractiveSceneCfg):
+        robot = cfg.replace(prim_path="{ENV_REGEX_NS}/Robot", spawn=cfg.spawn.replace(fix_base=True))
+
+    sim = sim_utils.SimulationContext(sim_utils.SimulationCfg(device=device))
+    scene = InteractiveScene(RobotSceneCfg(num_envs=args_cli.num_envs, env_spacing=2.0))
+    sim.reset()
+    robot = scene["robot"]
+    # move the joints to random positions within their limits and read the state after a physics step
+    limits = robot.data.soft_joint_pos_limits
+    joint_pos = limits[..., 0] + torch.rand_like(limits[..., 0]) * (limits[..., 1] - limits[..., 0])
+    robot.write_joint_state_to_sim(joint_pos, torch.zeros_like(joint_pos))
+    sim.step(render=False)
+    scene.update(sim.get_physics_dt())
+    # map the simulator orderings to the model orderings
+    # note: the jacobians of a fixed-base articulation exclude the root body
+    joint_ids = tree.find_joints(robot.joint_names)
+    body_ids = [index for index, name in enumerate(robot.body_names[1:], start=1) if tree.find_links(re.escape(name))]
+    link_ids = [tree.find_links(re.escape(robot.body_names[index]))[0] for index in body_ids]
+    q = robot.data.joint_pos[:, torch.argsort(torch.tensor(joint_ids, device=device))]
+    # -- link poses in the root frame
+    root_pos_w, root_rot_w = robot.data.root_pos_w, matrix_from_quat(robot.data.root_quat_w)
+    body_pos_b = (robot.data.body_pos_w[:, body_ids] - root_pos_w.unsqueeze(1)) @ root_rot_w
+    link_pos, _ = tree.forward_kinematics(q)
+    pos_error = (link_pos[:, link_ids] - body_pos_b).abs().max().item()
+    # -- jacobians in the world frame
+    sim_jacobians = robot.root_physx_view.get_jacobians()[:, [index - 1 for index in body_ids]]
+    jacobians = tree.frame_jacobians(q, link_ids)[..., joint_ids]
+    jacobians = torch.cat(
+        (root_rot_w.unsqueeze(1) @ jacobians[:, :, 0:3], root_rot_w.unsqueeze(1) @ jacobians[:, :, 3:6]), dim=2
+    )
+    jac_error = (jacobians - sim_jacobians).abs().max().item()
+    print(
+        f"[INFO] {args_cli.robot}: {len(body_ids)} bodies"
+        f" | position error: {pos_error:.2e} | jacobian error: {jac_error:.2e}"
+    )
+    assert pos_error < args_cli.tolerance, f"The link positions differ from the simulator by {pos_error:.2e}."
+    assert jac_error < args_cli.tolerance, f"The jacobians differ from the simulator by {jac_error:.2e}."
+    # -- timing
+    frame_ids = list(range(tree.num_links))
+    candidates = {
+        "forward kinematics": lambda: tree.forward_kinematics(q),
+        "all frame jacobians": lambda: tree.frame_jacobians(q, frame_ids),
+        "jacobian derivatives": lambda: tree.frame_jacobian_derivatives(q, torch.ones_like(q), frame_ids),
+        "simulator query": lambda: robot.root_physx_view.get_jacobians(),
+    }
+    for label, fn in candidates.items():
+        print(f"\t{label:>22}: {timeit(fn, device):.3f} ms ({args_cli.num_envs} envs)")
+
+
+if __name__ == "__main__":
+    # run the main function
+    main()
+    # close sim app
+    simulation_app.close()
@@ -0,0 +1,83 @@
+"""Script to check that no body or joint names are resolved in the step loop and to time the resolution cache."""
+
+from __future__ import annotations
+
+"""Launch Isaac Sim Simulator first."""
+
+
+import argparse
+
+from omni.isaac.lab.app import AppLauncher
+
+# add argparse arguments
+parser = argparse.ArgumentParser(description="Check the name resolutions in the step loop of an environment.")
+parser.add_argument("--task", type=str, default="Bumpybot-v0", help="Name of the task.")
+parser.add_argument("--num_envs", type=int, default=1024, help="Number of environments to simulate.")
+parser.add_argument("--num_steps", type=int, default=200, help="Number of checked environment steps.")
+parser.add_argument("--num_iters", type=int, default=1000, help="Number of timed name resolutions.")
+parser.add_argument("--asset_name", type=str, default="robot", help="Name of the asset for the timed resolutions.")
+parser.add_argument("--cpu", action="store_true", default=False, help="Use CPU pipeline.")
+# append AppLauncher cli args
+AppLauncher.add_app_launcher_args(parser)
+args_cli = parser.parse_args()
+args_cli.headless = True
+
+# launch omniverse app
+app_launcher = AppLauncher(args_cli)
+simulation_app = app_launcher.app
+
+"""Rest everything follows."""
+
+import gymnasium as gym
+import time
+import torch
+
+import isaac.lab.hcrl  # noqa: F401
+import omni.isaac.lab_tasks  # noqa: F401
+from omni.isaac.lab_tasks.utils import parse_env_cfg
+
+from isaac.lab.hcrl.tasks.utils import NameResolutionDetector, resolve_body_ids
+
+
+def timed(func, num_iters: int) -> float:
+    """Returns the mean duration of a function call (in us)."""
+    func()
+    start = time.perf_counter()
+    for _ in range(num_iters):
+        func()
+    return (time.perf_counter() - start) / num_iters * 1e6
+
+
+def main():
+    """Check the step loop for name resolutions and time a resolution with and without the cache."""
+    env_cfg = parse_env_cfg(args_cli.task, use_gpu=not args_cli.cpu, num_envs=args_cli.num_envs)
+    env = gym.make(args_cli.task, cfg=env_cfg)
+    env.reset()
+    num_envs, device = env.unwrapped.num_envs, env.unwrapped.device
+    actions = torch.zeros(num_envs, env.unwrapped.action_manager.total_action_dim, device=device)
+    # warm up: the terms that are constructed lazily are created in the first steps
+    for _ in range(10):
+        env.step(actions)
+    # -- steady-state step loop (including the resets of the terminated environments)
+    with NameResolutionDetector() as detector:
+        for _ in range(args_cli.num_steps):
+            env.step(actions)
+    print(f"[INFO] {args_cli.num_steps} steps of {args_cli.task}: {detector.total} name resolutions")
+    print(detector.report())
+    assert detector.total == 0, "Names were resolved in the step loop."
+    # -- cost of a resolution of all the bodies of the asset
+    asset = env.unwrapped.scene[args_cli.asset_name]
+    timings = {
+        "find_bodies": timed(lambda: asset.find_bodies(".*"), args_cli.num_iters),
+        "resolve_body_ids (cached)": timed(lambda: resolve_body_ids(asset, ".*"), args_cli.num_iters),
+    }
+    for name, timing in timings.items():
+        print(f"[INFO] {asset.num_bodies} bodies: {name}: {timing:.2f} us per call")
+    env.close()
+
+
+if __name__ == "__main__":
+    # run the main function
+    main()
+    # close sim app
+    simulation_app.close()
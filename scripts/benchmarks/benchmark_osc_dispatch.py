@@ -0,0 +1,79 @@
+"""Script to benchmark the per-call overhead of the operation-space controller.
+
+The controller only depends on PyTorch, so the script runs without launching the simulator.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+import torch
+
+# load the pure-torch modules from their files, without registering the environments (see test/standalone.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "test"))
+from standalone import load_module  # noqa: E402
+
+controllers = load_module("tasks/locomotion/mdp/controllers.py")
+
+# add argparse arguments
+parser = argparse.ArgumentParser(description="Benchmark the per-call overhead of the operation-space controller.")
+parser.add_argument("--num_envs", type=int, nargs="+", default=[1, 64, 4096], help="Batch sizes to benchmark.")
+parser.add_argument("--num_dof", type=int, default=27, help="Number of degrees of freedom (27 for Draco).")
+parser.add_argument("--num_iters", type=int, default=200, help="Number of timed iterations per batch size.")
+parser.add_argument("--cuda", action="store_true", default=False, help="Run on the GPU instead of the CPU.")
+parser.add_argument("--compile", action="store_true", default=False, help="Also benchmark the torch.compile'd call.")
+args_cli = parser.parse_args()
+
+
+def timeit(fn, num_iters: int, device: str) -> float:
+    """Returns the mean wall-clock time of a call in microseconds."""
+    for _ in range(3):
+        fn()
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(num_iters):
+        fn()
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) / num_iters * 1e6
+
+
+def main():
+    """Time a call to the controller for the command layouts with pre-resolved dispatch."""
+    device = "cuda:0" if args_cli.cuda else "cpu"
+    layouts = {
+        "pose_abs": ["pose_abs"],
+        "pose_rel": ["pose_rel"],
+        "position_rel+force_abs": ["position_rel", "force_abs"],
+    }
+    header = f"{'layout':>24} {'envs':>6} {'memory [KiB]':>13} {'eager [us]':>11}"
+    print(header + (f" {'compiled [us]':>14}" if args_cli.compile else ""))
+    for name, command_types in layouts.items():
+        cfg = controllers.OperationSpaceControllerCfg(
+            command_types=command_types,
+            impedance_mode="fixed",
+            stiffness=100.0,
+            damping_ratio=1.0,
+            force_control_axes=(1, 1, 1, 0, 0, 0) if "force_abs" in command_types else (0, 0, 0, 0, 0, 0),
+        )
+        for num_envs in args_cli.num_envs:
+            controller = controllers.OperationSpaceController(cfg, num_envs, args_cli.num_dof, device)
+            controller.set_command(torch.zeros(num_envs, controller.num_actions, device=device))
+            jacobian = torch.randn(num_envs, 6, args_cli.num_dof, device=device)
+            ee_pose = torch.zeros(num_envs, 7, device=device)
+            ee_pose[:, 3] = 1.0
+            ee_vel = torch.zeros(num_envs, 6, device=device)
+            msg = f"{name:>24} {num_envs:>6} {controller.memory_report()['total'] / 1024:>13.1f} "
+            msg += f"{timeit(lambda: controller.compute(jacobian, ee_pose, ee_vel), args_cli.num_iters, device):>11.1f}"
+            if args_cli.compile:
+                compute = torch.compile(controller.compute)
+                msg += f" {timeit(lambda: compute(jacobian, ee_pose, ee_vel), args_cli.num_iters, device):>14.1f}"
+            print(msg)
+
+
+if __name__ == "__main__":
+    # run the main function
+    main()
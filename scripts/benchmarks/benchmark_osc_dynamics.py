@@ -0,0 +1,79 @@
+"""Script to benchmark the operational-space dynamics backends of the operation-space controller.
+
+The backends only depend on PyTorch, so the script runs on the CPU without launching the simulator.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+import torch
+
+# load the pure-torch modules from their files, without registering the environments (see test/standalone.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "test"))
+from standalone import load_module  # noqa: E402
+
+controllers = load_module("tasks/locomotion/mdp/controllers.py")
+
+# add argparse arguments
+parser = argparse.ArgumentParser(description="Benchmark the operational-space dynamics backends.")
+parser.add_argument("--num_envs", type=int, nargs="+", default=[1, 64, 1024, 4096], help="Batch sizes to benchmark.")
+parser.add_argument("--num_dof", type=int, default=27, help="Number of degrees of freedom (27 for Draco).")
+parser.add_argument("--num_iters", type=int, default=50, help="Number of timed iterations per batch size.")
+args_cli = parser.parse_args()
+
+
+def random_problem(num_envs: int, num_dof: int) -> tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    """Samples random Draco-sized operational-space problems on the CPU."""
+    a = torch.randn(num_envs, num_dof, num_dof)
+    mass_matrix = a @ a.transpose(1, 2) / num_dof + 0.1 * torch.eye(num_dof)
+    jacobian = torch.randn(num_envs, 6, num_dof)
+    des_ee_acc = torch.randn(num_envs, 6)
+    return jacobian, mass_matrix, des_ee_acc
+
+
+def timeit(fn, num_iters: int) -> float:
+    """Returns the mean wall-clock time of a call in milliseconds."""
+    fn()
+    start = time.perf_counter()
+    for _ in range(num_iters):
+        fn()
+    return (time.perf_counter() - start) / num_iters * 1e3
+
+
+def main():
+    """Compare the throughput and numerical error of the dynamics backends."""
+    print(
+        f"{'envs':>6} {'decoupled':>9} {'inverse [ms]':>13} {'cholesky [ms]':>14} {'workspace [ms]':>15}"
+        f" {'speedup':>8} {'inv err':>9} {'chol err':>9}"
+    )
+    for num_envs in args_cli.num_envs:
+        jacobian, mass_matrix, des_ee_acc = random_problem(num_envs, args_cli.num_dof)
+        workspace = controllers.OperationSpaceWorkspace(num_envs, args_cli.num_dof, "cpu", inertial_compensation=True)
+        for decoupled in (False, True):
+            # reference solution in double precision
+            reference = controllers.task_space_wrench_inverse(
+                jacobian.double(), mass_matrix.double(), des_ee_acc.double(), decoupled
+            )
+            # timings in single precision
+            problem = (jacobian, mass_matrix, des_ee_acc, decoupled)
+            t_inv = timeit(lambda: controllers.task_space_wrench_inverse(*problem), args_cli.num_iters)
+            t_chol = timeit(lambda: controllers.task_space_wrench_cholesky(*problem), args_cli.num_iters)
+            t_ws = timeit(
+                lambda: controllers.task_space_wrench_cholesky(*problem, workspace=workspace), args_cli.num_iters
+            )
+            # relative errors against the reference
+            scale = reference.norm(dim=-1).clamp_min(1e-12)
+            err_inv = (controllers.task_space_wrench_inverse(*problem).double() - reference).norm(dim=-1) / scale
+            err_chol = (controllers.task_space_wrench_cholesky(*problem).double() - reference).norm(dim=-1) / scale
+            print(
+                f"{num_envs:>6} {str(decoupled):>9} {t_inv:>13.3f} {t_chol:>14.3f} {t_ws:>15.3f}"
+                f" {t_inv / t_chol:>7.2f}x {err_inv.max().item():>9.2e} {err_chol.max().item():>9.2e}"
+            )
+
+
+if __name__ == "__main__":
+    # run the main function
+    main()
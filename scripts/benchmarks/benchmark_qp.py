@@ -0,0 +1,68 @@
+"""Script to benchmark the throughput of the batched QP solver used for contact-constrained whole-body control.
+
+The solver only depends on PyTorch, so the script runs without launching the simulator. Its accuracy against a
+reference solver is checked in ``test/test_qp.py``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+import torch
+
+# load the pure-torch modules from their files, without registering the environments (see test/standalone.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "test"))
+from standalone import load_module  # noqa: E402
+
+qp = load_module("tasks/locomotion/mdp/qp.py")
+
+# add argparse arguments
+parser = argparse.ArgumentParser(description="Benchmark the batched QP solver.")
+parser.add_argument("--num_envs", type=int, nargs="+", default=[1, 64, 1024, 4096], help="Batch sizes to benchmark.")
+parser.add_argument("--num_vars", type=int, default=12, help="Number of decision variables (e.g. 4 contact forces).")
+parser.add_argument("--num_constraints", type=int, default=20, help="Number of two-sided constraints.")
+parser.add_argument("--num_iters", type=int, default=20, help="Number of timed solves per batch size.")
+parser.add_argument("--cuda", action="store_true", default=False, help="Run on the GPU instead of the CPU.")
+args_cli = parser.parse_args()
+
+
+def random_feasible_problems(num_problems: int, num_vars: int, num_constraints: int, device: str):
+    """Samples random strictly convex QPs whose constraints are feasible by construction."""
+    M = torch.randn(num_problems, num_vars, num_vars, device=device)
+    P = M @ M.transpose(1, 2) / num_vars + 0.1 * torch.eye(num_vars, device=device)
+    q = torch.randn(num_problems, num_vars, device=device)
+    A = torch.randn(num_problems, num_constraints, num_vars, device=device)
+    # the bounds contain a random (feasible) point
+    Ax0 = torch.bmm(A, torch.randn(num_problems, num_vars, 1, device=device)).squeeze(-1)
+    l = Ax0 - torch.rand(num_problems, num_constraints, device=device)
+    u = Ax0 + torch.rand(num_problems, num_constraints, device=device)
+    return P, q, A, l, u
+
+
+def main():
+    """Time a warm-started solve versus the batch size."""
+    device = "cuda:0" if args_cli.cuda else "cpu"
+    n, m = args_cli.num_vars, args_cli.num_constraints
+    cfg = qp.BatchedQPSolverCfg()
+    print(f"[INFO] {n} variables | {m} constraints | {cfg.num_iterations} ADMM iterations per solve")
+    print(f"{'envs':>6} {'solve [ms]':>11} {'solves/s':>12}")
+    for num_envs in args_cli.num_envs:
+        problem = random_feasible_problems(num_envs, n, m, device)
+        solver = qp.BatchedQPSolver(cfg, num_envs, n, m, device)
+        solver.solve(*problem)
+        if device.startswith("cuda"):
+            torch.cuda.synchronize()
+        start = time.perf_counter()
+        for _ in range(args_cli.num_iters):
+            solver.solve(*problem)
+        if device.startswith("cuda"):
+            torch.cuda.synchronize()
+        elapsed = (time.perf_counter() - start) / args_cli.num_iters
+        print(f"{num_envs:>6} {elapsed * 1e3:>11.3f} {num_envs / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    # run the main function
+    main()
@@ -0,0 +1,130 @@
+"""Script to check the reproducible resets of the environments and to time the reset path."""
+
+from __future__ import annotations
+
+"""Launch Isaac Sim Simulator first."""
+
+
+import argparse
+
+from omni.isaac.lab.app import AppLauncher
+
+# add argparse arguments
+parser = argparse.ArgumentParser(description="Check and benchmark the resets of the environments.")
+parser.add_argument("--task", type=str, default="Bumpybot-v0", help="Name of the task.")
+parser.add_argument("--num_envs", type=int, default=4096, help="Number of environments to simulate.")
+parser.add_argument("--num_iters", type=int, default=200, help="Number of timed resets.")
+parser.add_argument("--command_name", type=str, default="se2_pose", help="Name of the trajectory command.")
+parser.add_argument("--event_name", type=str, default="reset_robot_joints", help="Name of the joint reset term.")
+parser.add_argument("--seed", type=int, default=42, help="Seed of the environments.")
+parser.add_argument("--cpu", action="store_true", default=False, help="Use CPU pipeline.")
+# append AppLauncher cli args
+AppLauncher.add_app_launcher_args(parser)
+args_cli = parser.parse_args()
+args_cli.headless = True
+
+# launch omniverse app
+app_launcher = AppLauncher(args_cli)
+simulation_app = app_launcher.app
+
+"""Rest everything follows."""
+
+import gymnasium as gym
+import time
+import torch
+
+import isaac.lab.hcrl  # noqa: F401
+import omni.isaac.lab_tasks  # noqa: F401
+from omni.isaac.lab.utils.math import sample_uniform
+from omni.isaac.lab_tasks.utils import parse_env_cfg
+
+from isaac.lab.hcrl.tasks.navigation.mdp import TrajectoryCommand
+
+
+def legacy_reset_in_range(env, env_ids, asset_cfg, position_range, velocity_range):
+    """The previous implementation of :func:`reset_in_range`, on the global generator of PyTorch."""
+    asset = env.scene[asset_cfg.name]
+    joint_pos_min = asset.data.default_joint_pos[env_ids] + position_range[0]
+    joint_pos_max = asset.data.default_joint_pos[env_ids] + position_range[1]
+    joint_vel_min = asset.data.default_joint_vel[env_ids] + velocity_range[0]
+    joint_vel_max = asset.data.default_joint_vel[env_ids] + velocity_range[1]
+    joint_pos_lim = asset.data.soft_joint_pos_limits[env_ids, ...]
+    joint_pos_min = torch.clamp(joint_pos_min, min=joint_pos_lim[..., 0], max=joint_pos_lim[..., 1])
+    joint_pos_max = torch.clamp(joint_pos_max, min=joint_pos_lim[..., 0], max=joint_pos_lim[..., 1])
+    abs_joint_vel_lim = asset.data.soft_joint_vel_limits[env_ids]
+    joint_vel_min = torch.clamp(joint_vel_min, min=-abs_joint_vel_lim, max=abs_joint_vel_lim)
+    joint_vel_max = torch.clamp(joint_vel_max, min=-abs_joint_vel_lim, max=abs_joint_vel_lim)
+    joint_pos = sample_uniform(joint_pos_min, joint_pos_max, joint_pos_min.shape, joint_pos_min.device)
+    joint_vel = sample_uniform(joint_vel_min, joint_vel_max, joint_vel_min.shape, joint_vel_min.device)
+    asset.write_joint_state_to_sim(joint_pos, joint_vel, env_ids=env_ids)
+
+
+def timed(func, num_iters: int, device: str) -> float:
+    """Returns the mean duration of a call (in us)."""
+    func()
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(num_iters):
+        func()
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) / num_iters * 1e6
+
+
+def check_waypoints(env):
+    """Check that the waypoints of the environments are resampled identically from the same counters."""
+    term: TrajectoryCommand = env.unwrapped.command_manager.get_term(args_cli.command_name)
+    counters = term._rng.counters.clone()
+    env_ids = torch.arange(term.num_envs, device=term.device)
+    term._resample_command(env_ids)
+    waypoints = term.waypoints_w.clone()
+    # resample the same environments in another order, from the same counters
+    term._rng.counters[:] = counters
+    term._resample_command(env_ids.flip(0))
+    assert torch.equal(term.waypoints_w, waypoints), "The waypoints are not reproducible."
+    print("[INFO] waypoints reproducible from the counters")
+    time_resample = timed(lambda: term._resample_command(env_ids), args_cli.num_iters, term.device)
+    print(f"[INFO] {term.num_envs} envs: waypoint resampling in {time_resample:.1f} us")
+
+
+def benchmark_reset(env):
+    """Check that the joint reset term leaves the asset data intact, and time it and the env reset."""
+    env_ids = torch.arange(env.unwrapped.num_envs, device=env.unwrapped.device)
+    device = env.unwrapped.device
+    if args_cli.event_name in env.unwrapped.event_manager.active_terms.get("reset", list()):
+        term_cfg = env.unwrapped.event_manager.get_term_cfg(args_cli.event_name)
+        params = term_cfg.params
+        # the reset must not write to the default state and the limits of the asset
+        data = env.unwrapped.scene[params["asset_cfg"].name].data
+        buffers = (data.default_joint_pos, data.default_joint_vel)
+        buffers += (data.soft_joint_pos_limits, data.soft_joint_vel_limits)
+        expected = [buffer.clone() for buffer in buffers]
+        for ids in (None, env_ids):
+            term_cfg.func(env.unwrapped, ids, **params)
+            for buffer, value in zip(buffers, expected):
+                assert torch.equal(buffer, value), "The joint reset modified the data of the asset."
+        time_legacy = timed(lambda: legacy_reset_in_range(env.unwrapped, env_ids, **params), args_cli.num_iters, device)
+        time_stream = timed(lambda: term_cfg.func(env.unwrapped, env_ids, **params), args_cli.num_iters, device)
+        print(f"[INFO] joint reset: global generator {time_legacy:.1f} us | random stream {time_stream:.1f} us")
+    time_env = timed(lambda: env.unwrapped._reset_idx(env_ids), args_cli.num_iters, device)
+    print(f"[INFO] {env.unwrapped.num_envs} envs: reset in {time_env:.1f} us")
+
+
+def main():
+    """Check the waypoints and the joint reset of the task, and time its reset path."""
+    env_cfg = parse_env_cfg(args_cli.task, use_gpu=not args_cli.cpu, num_envs=args_cli.num_envs)
+    env_cfg.seed = args_cli.seed
+    env = gym.make(args_cli.task, cfg=env_cfg)
+    env.reset()
+    if args_cli.command_name in env.unwrapped.command_manager.active_terms:
+        check_waypoints(env)
+    benchmark_reset(env)
+    env.close()
+
+
+if __name__ == "__main__":
+    # run the main function
+    main()
+    # close sim app
+    simulation_app.close()
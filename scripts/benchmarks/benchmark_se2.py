@@ -0,0 +1,121 @@
+"""Script to benchmark the planar (SE(2)) kernels against the generic math utilities.
+
+The kernels only depend on PyTorch and the math utilities of Isaac Lab, so the script runs without launching the
+simulator. Their agreement with the generic utilities is checked in ``test/test_se2.py``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import sys
+import time
+import torch
+
+from omni.isaac.lab.utils.math import (
+    euler_xyz_from_quat,
+    quat_apply_yaw,
+    quat_from_euler_xyz,
+    quat_rotate_inverse,
+    wrap_to_pi,
+    yaw_quat,
+)
+
+# load the pure-torch modules from their files, without registering the environments (see test/standalone.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "test"))
+from standalone import load_module  # noqa: E402
+
+se2 = load_module("tasks/navigation/mdp/se2.py")
+
+# add argparse arguments
+parser = argparse.ArgumentParser(description="Benchmark the planar kernels of the navigation environments.")
+parser.add_argument("--batch_sizes", type=int, nargs="+", default=[65536, 1048576], help="Batch sizes to benchmark.")
+parser.add_argument("--num_iters", type=int, default=50, help="Number of timed calls per kernel and batch size.")
+parser.add_argument("--compile", action="store_true", default=False, help="Also benchmark the torch.compile'd kernels.")
+parser.add_argument("--cuda", action="store_true", default=False, help="Run on the GPU instead of the CPU.")
+args_cli = parser.parse_args()
+
+
+def generic_relative_pose(pos_w, quat_w, target_pos_w, target_yaw_w):
+    """Target poses in the yaw frames of the bodies with the generic 3D utilities."""
+    target_vec = target_pos_w - pos_w
+    target_vec[:, 2] = 0.0
+    pos_b = quat_rotate_inverse(yaw_quat(quat_w), target_vec)[:, :2]
+    yaw_b = wrap_to_pi(target_yaw_w - euler_xyz_from_quat(quat_w)[2])
+    return pos_b, yaw_b
+
+
+def generic_quat_from_yaw(yaw):
+    """Yaw rotations with the generic Euler angle conversion."""
+    zeros = torch.zeros_like(yaw)
+    return quat_from_euler_xyz(zeros, zeros, yaw)
+
+
+def random_inputs(batch_size: int, device: str) -> dict[str, torch.Tensor]:
+    """Samples random poses with small roll and pitch, as for mobile bases, and random targets."""
+    roll_pitch = 0.2 * torch.randn(2, batch_size, device=device)
+    yaw = (2.0 * torch.rand(batch_size, device=device) - 1.0) * math.pi
+    return {
+        "quat": quat_from_euler_xyz(roll_pitch[0], roll_pitch[1], yaw),
+        "angle": 20.0 * torch.randn(batch_size, device=device),
+        "pos": torch.randn(batch_size, 3, device=device),
+        "target_pos": torch.randn(batch_size, 3, device=device),
+        "target_yaw": (2.0 * torch.rand(batch_size, device=device) - 1.0) * math.pi,
+        "vec": torch.randn(batch_size, 3, device=device),
+    }
+
+
+def kernels(inputs: dict[str, torch.Tensor]) -> dict[str, tuple]:
+    """Returns the generic and the planar implementation of each kernel with their arguments."""
+    quat, vec = inputs["quat"], inputs["vec"]
+    cos_yaw, sin_yaw = se2.heading_from_quat(quat)
+    pose_args = (inputs["pos"], quat, inputs["target_pos"], inputs["target_yaw"])
+    return {
+        "yaw_from_quat": (lambda q: euler_xyz_from_quat(q)[2], se2.yaw_from_quat, (quat,)),
+        "quat_from_yaw": (generic_quat_from_yaw, se2.quat_from_yaw, (inputs["target_yaw"],)),
+        "wrap_angle": (wrap_to_pi, se2.wrap_angle, (inputs["angle"],)),
+        "planar_rotate": (
+            lambda q, v: quat_apply_yaw(q, v)[:, :2],
+            lambda q, v: se2.planar_rotate(v[:, :2], cos_yaw, sin_yaw),
+            (quat, vec),
+        ),
+        "planar_rotate_inverse": (
+            lambda q, v: quat_rotate_inverse(yaw_quat(q), v)[:, :2],
+            lambda q, v: se2.planar_rotate_inverse(v[:, :2], cos_yaw, sin_yaw),
+            (quat, vec),
+        ),
+        "relative_pose_2d": (generic_relative_pose, se2.relative_pose_2d, pose_args),
+    }
+
+
+def timed(func, args: tuple, num_iters: int, device: str) -> float:
+    """Returns the mean duration of a function call (in us)."""
+    func(*args)
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(num_iters):
+        func(*args)
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) / num_iters * 1e6
+
+
+def main():
+    """Time the planar kernels against the generic utilities versus the batch size."""
+    device = "cuda:0" if args_cli.cuda else "cpu"
+    columns = ["generic [us]", "planar [us]", "speedup"] + (["compiled [us]"] if args_cli.compile else [])
+    print(f"{'kernel':>22} {'batch':>8} " + " ".join(f"{column:>14}" for column in columns))
+    for batch_size in args_cli.batch_sizes:
+        for name, (generic, planar, args) in kernels(random_inputs(batch_size, device)).items():
+            timings = [timed(func, args, args_cli.num_iters, device) for func in (generic, planar)]
+            timings.append(timings[0] / timings[1])
+            if args_cli.compile:
+                timings.append(timed(torch.compile(planar, dynamic=False), args, args_cli.num_iters, device))
+            print(f"{name:>22} {batch_size:>8} " + " ".join(f"{timing:>14.2f}" for timing in timings))
+
+
+if __name__ == "__main__":
+    # run the main function
+    main()
@@ -0,0 +1,77 @@
+"""Script to report the latency of the manager terms of a task and the overhead of the term profiler."""
+
+from __future__ import annotations
+
+"""Launch Isaac Sim Simulator first."""
+
+
+import argparse
+
+from omni.isaac.lab.app import AppLauncher
+
+# add argparse arguments
+parser = argparse.ArgumentParser(description="Profile the manager terms of an environment.")
+parser.add_argument("--task", type=str, default="Bumpybot-v0", help="Name of the task.")
+parser.add_argument("--num_envs", type=int, default=4096, help="Number of environments to simulate.")
+parser.add_argument("--num_steps", type=int, default=200, help="Number of timed environment steps.")
+parser.add_argument("--trace", type=str, default=None, help="Path of a Chrome trace of the term calls.")
+parser.add_argument("--cpu", action="store_true", default=False, help="Use CPU pipeline.")
+# append AppLauncher cli args
+AppLauncher.add_app_launcher_args(parser)
+args_cli = parser.parse_args()
+args_cli.headless = True
+
+# launch omniverse app
+app_launcher = AppLauncher(args_cli)
+simulation_app = app_launcher.app
+
+"""Rest everything follows."""
+
+import gymnasium as gym
+import time
+import torch
+
+import isaac.lab.hcrl  # noqa: F401
+import omni.isaac.lab_tasks  # noqa: F401
+from omni.isaac.lab_tasks.utils import parse_env_cfg
+
+from isaac.lab.hcrl.tasks.utils import TermProfiler
+
+
+def timed_steps(env, actions: torch.Tensor, num_steps: int) -> float:
+    """Returns the mean duration of an environment step (in us)."""
+    env.step(actions)
+    if env.unwrapped.device.startswith("cuda"):
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(num_steps):
+        env.step(actions)
+    if env.unwrapped.device.startswith("cuda"):
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) / num_steps * 1e6
+
+
+def main():
+    """Time the environment step without and with the profiler, and report the latency of the terms."""
+    env_cfg = parse_env_cfg(args_cli.task, use_gpu=not args_cli.cpu, num_envs=args_cli.num_envs)
+    env = gym.make(args_cli.task, cfg=env_cfg)
+    env.reset()
+    num_envs, device = env.unwrapped.num_envs, env.unwrapped.device
+    actions = torch.zeros(num_envs, env.unwrapped.action_manager.total_action_dim, device=device)
+    step_time = timed_steps(env, actions, args_cli.num_steps)
+    profiler = TermProfiler(env.unwrapped, trace=args_cli.trace is not None)
+    profiled_step_time = timed_steps(env, actions, args_cli.num_steps)
+    print(f"[INFO] {len(profiler.term_names)} profiled terms")
+    print(profiler.report())
+    overhead = profiled_step_time / step_time - 1.0
+    print(f"[INFO] env step: {step_time:.1f} us | profiled: {profiled_step_time:.1f} us ({100.0 * overhead:+.1f}%)")
+    if args_cli.trace is not None:
+        profiler.export_chrome_trace(args_cli.trace)
+    env.close()
+
+
+if __name__ == "__main__":
+    # run the main function
+    main()
+    # close sim app
+    simulation_app.close()
@@ -0,0 +1,149 @@
+"""Script to check the buffered trajectory command against the previous implementation and to count the allocations
+and time of its consumers per environment step."""
+
+from __future__ import annotations
+
+"""Launch Isaac Sim Simulator first."""
+
+
+import argparse
+
+from omni.isaac.lab.app import AppLauncher
+
+# add argparse arguments
+parser = argparse.ArgumentParser(description="Benchmark the trajectory command of the navigation environments.")
+parser.add_argument("--task", type=str, default="Bumpybot-v0", help="Name of the task.")
+parser.add_argument("--num_envs", type=int, default=4096, help="Number of environments to simulate.")
+parser.add_argument("--num_steps", type=int, default=200, help="Number of timed environment steps.")
+parser.add_argument("--command_name", type=str, default="se2_pose", help="Name of the trajectory command.")
+parser.add_argument("--num_waypoints", type=int, default=1, help="Capacity of the waypoint queue of each env.")
+parser.add_argument("--refill_waypoints", action="store_true", default=False, help="Refill the waypoint queues.")
+parser.add_argument("--cpu", action="store_true", default=False, help="Use CPU pipeline.")
+parser.add_argument("--tolerance", type=float, default=1e-5, help="Tolerance on the errors against the legacy command.")
+# append AppLauncher cli args
+AppLauncher.add_app_launcher_args(parser)
+args_cli = parser.parse_args()
+args_cli.headless = True
+
+# launch omniverse app
+app_launcher = AppLauncher(args_cli)
+simulation_app = app_launcher.app
+
+"""Rest everything follows."""
+
+import gymnasium as gym
+import time
+import torch
+
+import isaac.lab.hcrl  # noqa: F401
+import omni.isaac.lab_tasks  # noqa: F401
+from omni.isaac.lab_tasks.utils import parse_env_cfg
+
+from isaac.lab.hcrl.tasks.navigation.mdp import TrajectoryCommand
+
+ORIGINAL_COMMAND = TrajectoryCommand.command
+"""The buffered implementation of the command."""
+
+
+def legacy_command(self: TrajectoryCommand) -> torch.Tensor:
+    """The previous implementation of :attr:`TrajectoryCommand.command`: a new tensor on every access."""
+    command = torch.cat((self.pos_command_b[:, :2], self.heading_command_b.view(-1, 1)), dim=-1)
+    if self.cfg.normalized:
+        command /= self.norm
+    return command
+
+
+def count_allocations(func, num_calls: int) -> float:
+    """Returns the mean number of tensor allocations per call."""
+    with torch.profiler.profile(profile_memory=True) as prof:
+        for _ in range(num_calls):
+            func()
+    allocations = [e for e in prof.events() if e.name == "[memory]" and e.cpu_memory_usage + e.cuda_memory_usage > 0]
+    return len(allocations) / num_calls
+
+
+def check_command(term: TrajectoryCommand):
+    """Checks that the buffered command agrees with the legacy command, which is computed from the current state."""
+    error = (legacy_command(term) - ORIGINAL_COMMAND.fget(term)).abs().max().item()
+    print(f"[INFO] max difference between the legacy and the buffered command: {error:.2e}")
+    assert error < args_cli.tolerance, f"The buffered command differs from the legacy command by {error:.2e}."
+
+
+def run(env, legacy: bool) -> tuple[float, float, float]:
+    """Returns the allocations of the command reads, their time and the time of the environment step."""
+    command_manager = env.unwrapped.command_manager
+    # count the readers of the command in the managers (observations, rewards and terminations)
+    cfgs = list()
+    for manager in (env.unwrapped.reward_manager, env.unwrapped.termination_manager):
+        cfgs += [manager.get_term_cfg(name) for name in manager.active_terms]
+    for group_cfgs in env.unwrapped.observation_manager._group_obs_term_cfgs.values():
+        cfgs += group_cfgs
+    num_readers = sum(cfg.params.get("command_name") == args_cli.command_name for cfg in cfgs)
+    # switch the implementation of the command
+    TrajectoryCommand.command = property(legacy_command) if legacy else ORIGINAL_COMMAND
+
+    def read_commands():
+        for _ in range(num_readers):
+            command_manager.get_command(args_cli.command_name)
+
+    device = env.unwrapped.device
+    allocations = count_allocations(read_commands, 10)
+    # time the reads and the environment step
+    actions = torch.zeros(env.unwrapped.num_envs, env.unwrapped.action_manager.total_action_dim, device=device)
+    timings = list()
+    for func in (read_commands, lambda: env.step(actions)):
+        func()
+        if device.startswith("cuda"):
+            torch.cuda.synchronize()
+        start = time.perf_counter()
+        for _ in range(args_cli.num_steps):
+            func()
+        if device.startswith("cuda"):
+            torch.cuda.synchronize()
+        timings.append((time.perf_counter() - start) / args_cli.num_steps * 1e6)
+    print(f"[INFO] {'legacy' if legacy else 'buffered'}: {num_readers} readers of the command per step")
+    return allocations, timings[0], timings[1]
+
+
+def main():
+    """Compare the legacy and the buffered command."""
+    env_cfg = parse_env_cfg(args_cli.task, use_gpu=not args_cli.cpu, num_envs=args_cli.num_envs)
+    command_cfg = getattr(env_cfg.commands, args_cli.command_name)
+    command_cfg.num_waypoints = args_cli.num_waypoints
+    command_cfg.refill_waypoints = args_cli.refill_waypoints
+    env = gym.make(args_cli.task, cfg=env_cfg)
+    env.reset()
+    term: TrajectoryCommand = env.unwrapped.command_manager.get_term(args_cli.command_name)
+    # time the generation of the waypoint queues of all the environments
+    env_ids = torch.arange(env.unwrapped.num_envs, device=env.unwrapped.device)
+    if env.unwrapped.device.startswith("cuda"):
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    term._resample_command(env_ids)
+    if env.unwrapped.device.startswith("cuda"):
+        torch.cuda.synchronize()
+    elapsed = (time.perf_counter() - start) * 1e3
+    print(f"[INFO] generated {args_cli.num_waypoints} waypoints for {len(env_ids)} envs in {elapsed:.2f} ms")
+    # check that both implementations agree, before and after the timed steps
+    check_command(term)
+    command_version = term.command_version
+    results = {name: run(env, legacy) for name, legacy in (("legacy", True), ("buffered", False))}
+    print(f"{'command':>10} {'allocs/step':>12} {'reads [us]':>11} {'env step [us]':>14}")
+    for name, (allocations, read_time, step_time) in results.items():
+        print(f"{name:>10} {allocations:>12.1f} {read_time:>11.1f} {step_time:>14.1f}")
+    check_command(term)
+    assert term.command_version > command_version, "The buffered command was not updated during the steps."
+    assert results["buffered"][0] == 0.0, "The reads of the buffered command allocate tensors."
+    # progress along the waypoint queues
+    depth, reached = term.metrics["queue_depth"], term.metrics["waypoints_reached"]
+    print(f"[INFO] mean queue depth: {depth.mean().item():.1f} | mean waypoints reached: {reached.mean().item():.2f}")
+    depth = term._queue_depth
+    assert ((depth >= 1) & (depth <= args_cli.num_waypoints)).all(), "The queue depths are out of the queue capacity."
+    env.close()
+
+
+if __name__ == "__main__":
+    # run the main function
+    main()
+    # close sim app
+    simulation_app.close()
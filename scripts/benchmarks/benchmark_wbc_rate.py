@@ -0,0 +1,133 @@
+"""Script to check the schedule of the WBC controller and to report the throughput and tracking error of the WBC
+environment at several controller rates."""
+
+from __future__ import annotations
+
+"""Launch Isaac Sim Simulator first."""
+
+
+import argparse
+
+from omni.isaac.lab.app import AppLauncher
+
+# add argparse arguments
+parser = argparse.ArgumentParser(description="Benchmark the WBC action term at several controller rates.")
+parser.add_argument("--task", type=str, default="HCRL-WBC-v0", help="Name of the task.")
+parser.add_argument("--num_envs", type=int, default=4096, help="Number of environments to simulate.")
+parser.add_argument("--num_steps", type=int, default=200, help="Number of environment steps per controller rate.")
+parser.add_argument(
+    "--controller_decimations", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="Controller decimations to test."
+)
+parser.add_argument("--no_interpolation", action="store_true", default=False, help="Hold the joint targets.")
+parser.add_argument("--cpu", action="store_true", default=False, help="Use CPU pipeline.")
+# append AppLauncher cli args
+AppLauncher.add_app_launcher_args(parser)
+args_cli = parser.parse_args()
+args_cli.headless = True
+
+# launch omniverse app
+app_launcher = AppLauncher(args_cli)
+simulation_app = app_launcher.app
+
+"""Rest everything follows."""
+
+import gymnasium as gym
+import time
+import torch
+
+import isaac.lab.hcrl  # noqa: F401
+import omni.isaac.lab_tasks  # noqa: F401
+from omni.isaac.lab_tasks.utils import parse_env_cfg
+
+
+def check_schedule(env, actions: torch.Tensor, controller_decimation: int):
+    """Checks the joint targets applied at each physics step of one environment step against the schedule.
+
+    The controller runs at the first physics step of each controller period and the applied targets are linearly
+    interpolated from the previous to the new controller targets (or held). With a decimation of 1, the applied
+    targets are the controller output at every physics step, as without the controller rate.
+    """
+    term = env.unwrapped.action_manager.get_term("joint_pos")
+    controller = term._wbc_controller
+    records = list()
+    num_calls = 0
+    apply_actions, compute = term.apply_actions, controller.compute
+
+    def recorded_compute(*args, **kwargs):
+        nonlocal num_calls
+        num_calls += 1
+        return compute(*args, **kwargs)
+
+    def recorded_apply_actions():
+        target_prev = term._joint_pos_target.clone()
+        substep = term._substep
+        apply_actions()
+        records.append((substep, target_prev, term._joint_pos_target_next.clone(), term._joint_pos_target.clone()))
+
+    term.apply_actions, controller.compute = recorded_apply_actions, recorded_compute
+    env.step(actions)
+    term.apply_actions, controller.compute = apply_actions, compute
+    # the controller runs once per controller period of the environment step
+    num_substeps = env.unwrapped.cfg.decimation
+    expected_calls = -(-num_substeps // controller_decimation)
+    assert len(records) == num_substeps, f"Expected {num_substeps} physics steps, got {len(records)}."
+    assert num_calls == expected_calls, f"Expected {expected_calls} controller calls, got {num_calls}."
+    # the applied targets follow the interpolation from the targets at the start of the period
+    start = None
+    for substep, target_prev, target_next, target in records:
+        k = substep % controller_decimation
+        if k == 0:
+            start = target_prev
+        if args_cli.no_interpolation:
+            expected = target_next
+        else:
+            expected = torch.lerp(start, target_next, (k + 1) / controller_decimation)
+        error = (target - expected).abs().max().item()
+        assert error < 1e-5, f"The joint targets at physics step {substep} deviate by {error:.2e}."
+    # without decimation, the applied targets are the controller output
+    if controller_decimation == 1:
+        error = max((target - target_next).abs().max().item() for _, _, target_next, target in records)
+        assert error == 0.0, f"The joint targets differ from the controller output by {error:.2e}."
+
+
+def run(controller_decimation: int) -> tuple[float, dict[str, float]]:
+    """Runs the environment with random actions and returns the env-steps/s and the mean task errors."""
+    env_cfg = parse_env_cfg(args_cli.task, use_gpu=not args_cli.cpu, num_envs=args_cli.num_envs)
+    env_cfg.actions.joint_pos.controller_decimation = controller_decimation
+    env_cfg.actions.joint_pos.interpolate_targets = not args_cli.no_interpolation
+    env = gym.make(args_cli.task, cfg=env_cfg)
+    controller = env.unwrapped.action_manager.get_term("joint_pos")._wbc_controller
+    # warm-up
+    env.reset()
+    actions = torch.zeros(
+        env.unwrapped.num_envs, env.unwrapped.action_manager.total_action_dim, device=env.unwrapped.device
+    )
+    env.step(actions)
+    check_schedule(env, 2.0 * torch.rand_like(actions) - 1.0, controller_decimation)
+    # timed rollout (the task errors are accumulated on the device and read once at the end)
+    errors = {name: torch.zeros((), device=env.unwrapped.device) for name in controller.task_errors}
+    start = time.perf_counter()
+    for _ in range(args_cli.num_steps):
+        env.step(2.0 * torch.rand_like(actions) - 1.0)
+        for name, error in controller.task_errors.items():
+            errors[name] += torch.linalg.vector_norm(error, dim=-1).mean()
+    errors = {name: error.item() / args_cli.num_steps for name, error in errors.items()}
+    elapsed = time.perf_counter() - start
+    env.close()
+    return args_cli.num_steps * args_cli.num_envs / elapsed, errors
+
+
+def main():
+    """Sweep the controller rates."""
+    results = {k: run(k) for k in args_cli.controller_decimations}
+    names = list(next(iter(results.values()))[1].keys())
+    print(f"{'decimation':>10} {'env-steps/s':>12} " + " ".join(f"{name:>18}" for name in names))
+    for k, (throughput, errors) in results.items():
+        print(f"{k:>10} {throughput:>12.0f} " + " ".join(f"{errors[name]:>18.4f}" for name in names))
+
+
+if __name__ == "__main__":
+    # run the main function
+    main()
+    # close sim app
+    simulation_app.close()
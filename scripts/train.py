@@ -23,6 +23,26 @@ parser.add_argument("--cpu", action="store_true", default=False, help="Use CPU p
 parser.add_argument("--num_envs", type=int, default=None, help="Number of environments to simulate.")
 parser.add_argument("--task", type=str, default=None, help="Name of the task.")
 parser.add_argument("--seed", type=int, default=None, help="Seed used for the environment")
+parser.add_argument(
+    "--debug_host_sync",
+    type=str,
+    default=None,
+    choices=["warn", "error"],
+    help="Detect host synchronizations inside the terms of this package (warn: report, error: raise).",
+)
+parser.add_argument(
+    "--fused_rewards",
+    type=str,
+    default=None,
+    choices=["eager", "compile"],
+    help="Compute the navigation rewards in one pass (compile: with torch.compile).",
+)
+parser.add_argument(
+    "--profile_terms", action="store_true", default=False, help="Log the latency of the manager terms."
+)
+parser.add_argument(
+    "--profile_trace", type=str, default=None, help="Path of a Chrome trace of the term calls (with --profile_terms)."
+)
 # append RSL-RL cli arguments
 cli_args.add_rsl_rl_args(parser)
 # append AppLauncher cli args
@@ -55,6 +75,8 @@ from omni.isaac.lab.utils.dict import print_dict
 from omni.isaac.lab.utils.io import dump_pickle, dump_yaml
 
 import isaac.lab.hcrl  # noqa: F401
+from isaac.lab.hcrl.tasks.navigation.mdp import fuse_navigation_rewards
+from isaac.lab.hcrl.tasks.utils import HostSyncDetector, TermProfiler
 import omni.isaac.contrib_tasks  # noqa: F401
 import omni.isaac.lab_tasks  # noqa: F401
 from omni.isaac.lab_tasks.utils import get_checkpoint_path, parse_env_cfg
@@ -70,6 +92,12 @@ def main():
     # parse configuration
     env_cfg: RLTaskEnvCfg = parse_env_cfg(args_cli.task, use_gpu=not args_cli.cpu, num_envs=args_cli.num_envs)
     agent_cfg: RslRlOnPolicyRunnerCfg = cli_args.parse_rsl_rl_cfg(args_cli.task, args_cli)
+    # fuse the navigation reward terms
+    if args_cli.fused_rewards:
+        fused_terms = fuse_navigation_rewards(env_cfg.rewards, compile=args_cli.fused_rewards == "compile")
+        print(f"[INFO] Fused reward terms: {fused_terms}")
+    # seed the random streams of the terms (the environment is reset before it is seeded below)
+    env_cfg.seed = agent_cfg.seed
 
     # specify directory for logging experiments
     log_root_path = os.path.join("logs", "rsl_rl", agent_cfg.experiment_name)
@@ -95,11 +123,27 @@ def main():
         print_dict(video_kwargs, nesting=4)
         env.metadata["render_fps"] = 1.0 / env.unwrapped.step_dt
         env = gym.wrappers.RecordVideo(env, **video_kwargs)
+    # instrument the terms to detect host synchronizations
+    if args_cli.debug_host_sync:
+        host_sync_detector = HostSyncDetector(env.unwrapped, mode=args_cli.debug_host_sync)
+    # instrument the terms to measure their latency
+    if args_cli.profile_terms:
+        term_profiler = TermProfiler(env.unwrapped, trace=args_cli.profile_trace is not None)
     # wrap around environment for rsl-rl
     env = RslRlVecEnvWrapper(env)
 
     # create runner from rsl-rl
     runner = OnPolicyRunner(env, agent_cfg.to_dict(), log_dir=log_dir, device=agent_cfg.device)
+    # log the latency of the terms with the other metrics of the runner
+    if args_cli.profile_terms:
+        runner_log = runner.log
+
+        def log_with_term_latencies(locs: dict, *args, **kwargs):
+            runner_log(locs, *args, **kwargs)
+            for name, latency in term_profiler.latencies.items():
+                runner.writer.add_scalar(f"Perf/terms/{name}", latency, locs["it"])
+
+        runner.log = log_with_term_latencies
     # write git state to logs
     runner.add_git_repo_to_log(__file__)
     # save resume path before creating a new log_dir
@@ -121,6 +165,12 @@ def main():
 
     # run training
     runner.learn(num_learning_iterations=agent_cfg.max_iterations, init_at_random_ep_len=True)
+    if args_cli.debug_host_sync:
+        print(f"[INFO] {host_sync_detector.report()}")
+    if args_cli.profile_terms:
+        print(f"[INFO] {term_profiler.report()}")
+        if args_cli.profile_trace is not None:
+            term_profiler.export_chrome_trace(args_cli.profile_trace)
 
     # close the simulator
     env.close()
@@ -0,0 +1,95 @@
+"""Robot descriptions shared by the tests of the kinematics and the dynamics."""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import tempfile
+from collections.abc import Iterator
+
+from standalone import EXT_DIR
+
+ROBOT_URDFS = {
+    "draco": (os.path.join(EXT_DIR, "resources/hcrl_robots/draco/draco.urdf"), [".*_ankle_ie_link", "torso_link"]),
+    "go1": (os.path.join(EXT_DIR, "resources/hcrl_robots/go1/go1.urdf"), [".*_foot"]),
+    "bumpybot": (os.path.join(EXT_DIR, "resources/hcrl_robots/bumpybot/bumpybot.urdf"), [".*"]),
+}
+"""URDF path and frames of interest of the robots of the extension."""
+
+PLANAR_ARM_URDF = """
+<robot name="planar_arm">
+  <link name="base"/> <link name="link_1"/> <link name="link_2"/> <link name="slider"/> <link name="tip"/>
+  <joint name="joint_1" type="revolute">
+    <parent link="base"/> <child link="link_1"/> <axis xyz="0 0 1"/>
+  </joint>
+  <joint name="joint_2" type="continuous">
+    <parent link="link_1"/> <child link="link_2"/> <origin xyz="0.5 0 0"/> <axis xyz="0 0 1"/>
+  </joint>
+  <joint name="joint_3" type="prismatic">
+    <parent link="link_2"/> <child link="slider"/> <origin xyz="0.3 0 0"/> <axis xyz="1 0 0"/>
+  </joint>
+  <joint name="tip_joint" type="fixed">
+    <parent link="slider"/> <child link="tip"/> <origin xyz="0.1 0 0" rpy="0 0 1.5707963267948966"/>
+  </joint>
+</robot>
+"""
+"""Planar arm with two revolute joints, a prismatic joint and a fixed tip with known closed-form kinematics."""
+
+BRANCHED_URDF = """
+<robot name="branched">
+  <link name="base">
+    <inertial> <mass value="3.0"/> <origin xyz="0 0 0.05"/> <inertia ixx="0.03" iyy="0.04" izz="0.05"/> </inertial>
+  </link>
+  <link name="hip">
+    <inertial>
+      <mass value="1.2"/> <origin xyz="0.02 -0.01 0.03" rpy="0.1 0.2 0.3"/>
+      <inertia ixx="0.010" ixy="0.001" ixz="-0.002" iyy="0.012" iyz="0.0005" izz="0.008"/>
+    </inertial>
+  </link>
+  <link name="thigh">
+    <inertial> <mass value="0.8"/> <origin xyz="0 0 -0.1"/> <inertia ixx="0.006" iyy="0.006" izz="0.001"/> </inertial>
+  </link>
+  <link name="shin">
+    <inertial>
+      <mass value="0.4"/> <origin xyz="0 0.01 -0.12"/> <inertia ixx="0.003" iyy="0.003" izz="0.0005"/>
+    </inertial>
+  </link>
+  <link name="foot"/>
+  <link name="arm">
+    <inertial> <mass value="0.6"/> <origin xyz="0.1 0 0"/> <inertia ixx="0.001" iyy="0.004" izz="0.004"/> </inertial>
+  </link>
+  <link name="slider">
+    <inertial> <mass value="0.3"/> <origin xyz="0.05 0 0"/> <inertia ixx="0.0005" iyy="0.001" izz="0.001"/> </inertial>
+  </link>
+  <joint name="hip_joint" type="revolute">
+    <parent link="base"/> <child link="hip"/> <origin xyz="0.1 0.05 -0.02" rpy="0.3 0 0"/> <axis xyz="1 0 0"/>
+  </joint>
+  <joint name="thigh_joint" type="revolute">
+    <parent link="hip"/> <child link="thigh"/> <origin xyz="0 0.08 0" rpy="0 -0.2 0.1"/> <axis xyz="0 1 0"/>
+  </joint>
+  <joint name="shin_joint" type="continuous">
+    <parent link="thigh"/> <child link="shin"/> <origin xyz="0 0 -0.2"/> <axis xyz="0 0.6 0.8"/>
+  </joint>
+  <joint name="foot_joint" type="fixed">
+    <parent link="shin"/> <child link="foot"/> <origin xyz="0 0 -0.25" rpy="0.5 0.1 -0.4"/>
+  </joint>
+  <joint name="arm_joint" type="revolute">
+    <parent link="base"/> <child link="arm"/> <origin xyz="-0.1 0 0.15" rpy="0 0.4 0"/> <axis xyz="0 0 1"/>
+  </joint>
+  <joint name="slider_joint" type="prismatic">
+    <parent link="arm"/> <child link="slider"/> <origin xyz="0.2 0 0" rpy="0 0 0.7"/> <axis xyz="1 1 0"/>
+  </joint>
+</robot>
+"""
+"""Branched tree with rotated joint origins, oblique axes, a prismatic joint and rotated link inertials."""
+
+
+@contextlib.contextmanager
+def urdf_file(description: str) -> Iterator[str]:
+    """Writes a robot description to a temporary URDF file and yields its path."""
+    with tempfile.NamedTemporaryFile("w", suffix=".urdf", delete=False) as file:
+        file.write(description)
+    try:
+        yield file.name
+    finally:
+        os.remove(file.name)
@@ -0,0 +1,43 @@
+"""Loading of the pure-torch modules of the extension without launching the simulator.
+
+Importing a module through the package (``isaac.lab.hcrl``) registers the environments, which imports the
+simulation modules of Isaac Lab and requires a running Isaac Sim app. The modules that only depend on PyTorch
+(and on :mod:`omni.isaac.lab.utils`) are loaded from their files instead, so their tests run as plain scripts.
+"""
+
+from __future__ import annotations
+
+import importlib
+import os
+import sys
+from types import ModuleType
+
+EXT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+"""Path to the extension directory."""
+
+PACKAGE_DIR = os.path.join(EXT_DIR, "orbit", "hcrl")
+"""Path to the sources of the extension package."""
+
+_PACKAGE_NAME = "hcrl_standalone"
+"""Name under which the modules loaded from their files are registered."""
+
+
+def load_module(path: str) -> ModuleType:
+    """Loads a module of the extension from its file, without running the ``__init__`` of its parent packages.
+
+    The directory of the module is registered as an empty package, so that the relative imports of the module
+    (e.g. ``from .kinematics import KinematicTree``) load the sibling modules from their files as well.
+
+    Args:
+        path: The path of the module file relative to the package directory (e.g. ``"tasks/utils/rng.py"``).
+
+    Returns:
+        The loaded module.
+    """
+    directory, filename = os.path.split(path)
+    package_name = ".".join([_PACKAGE_NAME] + [name for name in directory.split("/") if name])
+    if package_name not in sys.modules:
+        package = ModuleType(package_name)
+        package.__path__ = [os.path.join(PACKAGE_DIR, directory)]
+        sys.modules[package_name] = package
+    return importlib.import_module(f"{package_name}.{os.path.splitext(filename)[0]}")
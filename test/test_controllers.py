@@ -0,0 +1,324 @@
+"""Tests of the task-space controllers against their reference implementations.
+
+They run without launching the simulator.
+"""
+
+from __future__ import annotations
+
+import torch
+import unittest
+
+import omni.isaac.lab.utils.math as math_utils
+
+from standalone import load_module
+
+controllers = load_module("tasks/locomotion/mdp/controllers.py")
+
+
+def random_osc_problem(num_robots: int, num_dof: int, device: str):
+    """Samples random well-conditioned operational-space problems."""
+    a = torch.randn(num_robots, num_dof, num_dof, device=device)
+    mass_matrix = a @ a.transpose(1, 2) / num_dof + 0.1 * torch.eye(num_dof, device=device)
+    jacobian = torch.randn(num_robots, 6, num_dof, device=device)
+    des_ee_acc = torch.randn(num_robots, 6, device=device)
+    return jacobian, mass_matrix, des_ee_acc
+
+
+def reference_osc_torques(cfg, command, jacobian, ee_pose, ee_vel, ee_force=None, mass_matrix=None) -> torch.Tensor:
+    """Joint torques of the operation-space controller with a fixed impedance, from the per-command loop.
+
+    This is the expression of the controller before its command layout was resolved at construction.
+    """
+    desired_ee_pos, desired_ee_rot, desired_ee_force = None, None, None
+    position_scale = torch.tensor(cfg.position_command_scale, device=command.device)
+    rotation_scale = torch.tensor(cfg.rotation_command_scale, device=command.device)
+    start = 0
+    for command_type in cfg.command_types:
+        if command_type == "position_rel":
+            target = command[:, start : start + 3] * position_scale
+            desired_ee_pos, desired_ee_rot = ee_pose[:, :3] + target, ee_pose[:, 3:]
+            start += 3
+        elif command_type == "position_abs":
+            desired_ee_pos, desired_ee_rot = command[:, start : start + 3], ee_pose[:, 3:]
+            start += 3
+        elif command_type == "pose_rel":
+            target = command[:, start : start + 6] * torch.cat((position_scale, rotation_scale))
+            desired_ee_pos, desired_ee_rot = math_utils.apply_delta_pose(ee_pose[:, :3], ee_pose[:, 3:], target)
+            start += 6
+        elif command_type == "pose_abs":
+            desired_ee_pos, desired_ee_rot = command[:, start : start + 3], command[:, start + 3 : start + 7]
+            start += 7
+        elif command_type == "force_abs":
+            desired_ee_force = command[:, start : start + 6]
+            start += 6
+    torques = torch.zeros(jacobian.shape[0], jacobian.shape[2], device=jacobian.device)
+    if desired_ee_pos is not None:
+        pos_error, rot_error = math_utils.compute_pose_error(
+            ee_pose[:, :3], ee_pose[:, 3:], desired_ee_pos, desired_ee_rot, rot_error_type="axis_angle"
+        )
+        p_gains = torch.tensor(cfg.stiffness, device=command.device)
+        d_gains = 2 * torch.sqrt(p_gains) * torch.tensor(cfg.damping_ratio, device=command.device)
+        des_ee_acc = p_gains * torch.cat((pos_error, rot_error), dim=-1) - d_gains * ee_vel
+        if cfg.inertial_compensation:
+            wrench = controllers.task_space_wrench_inverse(
+                jacobian, mass_matrix, des_ee_acc, cfg.uncouple_motion_wrench
+            )
+        else:
+            wrench = des_ee_acc
+        wrench = wrench * torch.tensor(cfg.motion_control_axes, device=command.device)
+        torques += torch.bmm(jacobian.transpose(1, 2), wrench.unsqueeze(-1)).squeeze(-1)
+    if desired_ee_force is not None:
+        wrench = desired_ee_force
+        if cfg.force_stiffness is not None:
+            wrench = wrench + torch.tensor(cfg.force_stiffness, device=command.device) * (desired_ee_force - ee_force)
+        wrench = wrench * torch.tensor(cfg.force_control_axes, device=command.device)
+        torques += torch.bmm(jacobian.transpose(1, 2), wrench.unsqueeze(-1)).squeeze(-1)
+    return torques
+
+
+def reference_wbc_displacement(cfg, errors, jacobians) -> torch.Tensor:
+    """Generalized displacement of the stack of tasks with explicit damped pseudo-inverses in double precision."""
+    num_envs, _, num_dofs = jacobians[0].shape
+    delta_dof_pos = torch.zeros(num_envs, num_dofs, dtype=torch.double, device=jacobians[0].device)
+    null_space = torch.eye(num_dofs, dtype=torch.double, device=jacobians[0].device).expand(num_envs, -1, -1)
+    for task, error, jacobian in zip(cfg.tasks, errors, jacobians):
+        jacobian = jacobian.double()
+        jacobian_proj = jacobian @ null_space
+        eye = torch.eye(jacobian.shape[1], dtype=torch.double, device=jacobian.device)
+        jacobian_pinv = jacobian_proj.transpose(1, 2) @ torch.linalg.inv(
+            jacobian_proj @ jacobian_proj.transpose(1, 2) + cfg.damping**2 * eye
+        )
+        residual = task.gain * error.double() - (jacobian @ delta_dof_pos.unsqueeze(-1)).squeeze(-1)
+        delta_dof_pos = delta_dof_pos + (jacobian_pinv @ residual.unsqueeze(-1)).squeeze(-1)
+        null_space = null_space - jacobian_pinv @ jacobian_proj
+    return delta_dof_pos
+
+
+class TestTaskSpaceDynamics(unittest.TestCase):
+    """Test fixture for the backends of the operational-space dynamics."""
+
+    def setUp(self):
+        """Samples Draco-sized problems."""
+        torch.manual_seed(0)
+        self.device = "cuda:0" if torch.cuda.is_available() else "cpu"
+        self.num_robots, self.num_dof = 64, 27
+        self.problem = random_osc_problem(self.num_robots, self.num_dof, self.device)
+
+    def test_cholesky_matches_inverse(self):
+        """Test that the Cholesky backend matches the inverse backend in double precision."""
+        for decoupled in (False, True):
+            with self.subTest(decoupled=decoupled):
+                reference = controllers.task_space_wrench_inverse(*(t.double() for t in self.problem), decoupled)
+                # -- single precision, relative to the norm of the reference
+                wrench = controllers.task_space_wrench_cholesky(*self.problem, decoupled)
+                error = (wrench.double() - reference).norm(dim=-1) / reference.norm(dim=-1).clamp_min(1e-12)
+                self.assertLess(error.max().item(), 1e-3)
+                # -- double precision
+                wrench = controllers.task_space_wrench_cholesky(*(t.double() for t in self.problem), decoupled)
+                torch.testing.assert_close(wrench, reference, rtol=1e-8, atol=1e-8)
+
+    def test_workspace(self):
+        """Test that the preallocated workspace does not change the results."""
+        workspace = controllers.OperationSpaceWorkspace(
+            self.num_robots, self.num_dof, self.device, inertial_compensation=True
+        )
+        for decoupled in (False, True):
+            with self.subTest(decoupled=decoupled):
+                expected = controllers.task_space_wrench_cholesky(*self.problem, decoupled)
+                wrench = controllers.task_space_wrench_cholesky(*self.problem, decoupled, workspace=workspace)
+                torch.testing.assert_close(wrench, expected)
+
+    def test_singular_robots(self):
+        """Test that singular Jacobians and mass matrices are damped per robot without affecting the others."""
+        jacobian, mass_matrix, des_ee_acc = (t.clone() for t in self.problem)
+        # -- rank-deficient jacobian of the first robot
+        jacobian[0, 5] = jacobian[0, 4]
+        # -- mass matrix of the second robot that is not positive definite
+        mass_matrix[1, -1, :], mass_matrix[1, :, -1] = 0.0, 0.0
+        # -- indefinite mass matrix of the third robot with a positive diagonal
+        coupling = 10.0 * (mass_matrix[2, 0, 0] * mass_matrix[2, 1, 1]).sqrt()
+        mass_matrix[2, 0, 1], mass_matrix[2, 1, 0] = coupling, coupling
+        wrench = controllers.task_space_wrench_cholesky(jacobian, mass_matrix, des_ee_acc)
+        self.assertTrue(torch.isfinite(wrench).all())
+        expected = controllers.task_space_wrench_cholesky(jacobian[3:], mass_matrix[3:], des_ee_acc[3:])
+        torch.testing.assert_close(wrench[3:], expected)
+
+    def test_damped_cholesky(self):
+        """Test that the pivot-damped factorization matches the exact and the damped least-squares factors."""
+        jacobian, mass_matrix, _ = (t.double() for t in self.problem)
+        lambda_inv = jacobian @ torch.linalg.solve(mass_matrix, jacobian.transpose(1, 2))
+        eye = torch.eye(6, dtype=lambda_inv.dtype, device=self.device)
+        # -- well-conditioned matrices are not damped
+        damped = torch.zeros(self.num_robots, dtype=torch.bool, device=self.device)
+        chol = controllers._damped_cholesky(lambda_inv, 1e-6, 1e-4, damped)
+        self.assertFalse(damped.any())
+        torch.testing.assert_close(chol, torch.linalg.cholesky(lambda_inv))
+        # -- matrices marked beforehand are damped on the whole diagonal
+        damped[::2] = True
+        chol = controllers._damped_cholesky(lambda_inv, 1e-6, 1e-4, damped)
+        torch.testing.assert_close(chol[::2], torch.linalg.cholesky(lambda_inv[::2] + 1e-4 * eye))
+        torch.testing.assert_close(chol[1::2], torch.linalg.cholesky(lambda_inv[1::2]))
+        # -- singular matrices are marked and factorized with a positive diagonal
+        lambda_inv[1, 5], lambda_inv[1, :, 5] = lambda_inv[1, 4], lambda_inv[1, :, 4]
+        damped[:] = False
+        chol = controllers._damped_cholesky(lambda_inv, 1e-6, 1e-4, damped)
+        self.assertTrue(damped[1].item())
+        self.assertFalse(damped[2:].any())
+        self.assertTrue((chol[1].diagonal() > 0.0).all())
+
+
+class TestOperationSpaceController(unittest.TestCase):
+    """Test fixture for the command layouts of the operation-space controller."""
+
+    def setUp(self):
+        """Samples the inputs of the controller."""
+        torch.manual_seed(0)
+        self.device = "cuda:0" if torch.cuda.is_available() else "cpu"
+        self.num_robots, self.num_dof = 64, 27
+        self.jacobian, self.mass_matrix, _ = random_osc_problem(self.num_robots, self.num_dof, self.device)
+        ee_pos = torch.randn(self.num_robots, 3, device=self.device)
+        self.ee_pose = torch.cat((ee_pos, math_utils.random_orientation(self.num_robots, self.device)), dim=-1)
+        self.ee_vel = torch.randn(self.num_robots, 6, device=self.device)
+        self.ee_force = torch.randn(self.num_robots, 6, device=self.device)
+
+    def _random_command(self, controller) -> torch.Tensor:
+        """Samples commands of the controller with valid orientations for the absolute poses."""
+        command = 0.1 * torch.randn(self.num_robots, controller.num_actions, device=self.device)
+        if "pose_abs" in controller.cfg.command_types:
+            command[:, 3:7] = math_utils.random_orientation(self.num_robots, self.device)
+        return command
+
+    def test_command_layouts(self):
+        """Test that the pre-resolved command layouts match the per-command loop."""
+        layouts = {
+            "position_abs": {"command_types": ["position_abs"]},
+            "position_rel": {"command_types": ["position_rel"], "position_command_scale": (0.5, 1.0, 2.0)},
+            "pose_abs": {"command_types": ["pose_abs"], "inertial_compensation": True},
+            "pose_abs_decoupled": {
+                "command_types": ["pose_abs"],
+                "inertial_compensation": True,
+                "uncouple_motion_wrench": True,
+                "dynamics_backend": "inverse",
+            },
+            "pose_rel": {
+                "command_types": ["pose_rel"],
+                "position_command_scale": (0.5, 1.0, 2.0),
+                "rotation_command_scale": (2.0, 1.0, 0.5),
+            },
+            "position_rel+force_abs": {
+                "command_types": ["position_rel", "force_abs"],
+                "motion_control_axes": (1, 1, 0, 1, 1, 1),
+                "force_control_axes": (0, 0, 1, 0, 0, 0),
+                "force_stiffness": 0.5,
+            },
+        }
+        for name, layout in layouts.items():
+            with self.subTest(layout=name):
+                cfg = controllers.OperationSpaceControllerCfg(
+                    impedance_mode="fixed", stiffness=100.0, damping_ratio=1.0, **layout
+                )
+                controller = controllers.OperationSpaceController(cfg, self.num_robots, self.num_dof, self.device)
+                command = self._random_command(controller)
+                controller.set_command(command)
+                inputs = {"ee_pose": self.ee_pose, "ee_vel": self.ee_vel, "ee_force": self.ee_force}
+                if cfg.inertial_compensation:
+                    inputs["mass_matrix"] = self.mass_matrix
+                expected = reference_osc_torques(cfg, command, self.jacobian, **inputs)
+                # the stored target must not be rescaled by repeated calls
+                for _ in range(2):
+                    torques = controller.compute(self.jacobian, **inputs)
+                    torch.testing.assert_close(torques, expected, rtol=1e-3, atol=1e-3)
+
+    def test_missing_inputs(self):
+        """Test that the inputs required by the command layout are checked."""
+        cfg = controllers.OperationSpaceControllerCfg(
+            command_types=["pose_abs"], impedance_mode="fixed", stiffness=100.0, damping_ratio=1.0
+        )
+        controller = controllers.OperationSpaceController(cfg, self.num_robots, self.num_dof, self.device)
+        controller.set_command(self._random_command(controller))
+        with self.assertRaises(ValueError):
+            controller.compute(self.jacobian, ee_pose=self.ee_pose)
+
+
+class TestWBCController(unittest.TestCase):
+    """Test fixture for the hierarchical whole-body controller."""
+
+    def setUp(self):
+        """Creates a Draco-like stack of tasks."""
+        torch.manual_seed(0)
+        self.device = "cuda:0" if torch.cuda.is_available() else "cpu"
+        self.num_envs, self.num_joints = 64, 27
+        self.cfg = controllers.WBCControllerCfg(
+            tasks=[
+                controllers.WBCTaskCfg(name="left_foot", task_type="pose"),
+                controllers.WBCTaskCfg(name="right_foot", task_type="pose"),
+                controllers.WBCTaskCfg(name="com", task_type="com"),
+                controllers.WBCTaskCfg(name="torso_orientation", task_type="orientation"),
+                controllers.WBCTaskCfg(name="joint_posture", task_type="joint", gain=0.1),
+            ]
+        )
+
+    def _random_tasks(self, controller):
+        """Samples the values and the Jacobians of the tasks, with explicit joint selection Jacobians."""
+        task_values, jacobians = list(), list()
+        for task in self.cfg.tasks:
+            if task.task_type == "pose":
+                pos = torch.randn(self.num_envs, 3, device=self.device)
+                task_values.append(torch.cat((pos, math_utils.random_orientation(self.num_envs, self.device)), dim=-1))
+            elif task.task_type == "orientation":
+                task_values.append(math_utils.random_orientation(self.num_envs, self.device))
+            elif task.task_type == "com":
+                task_values.append(torch.randn(self.num_envs, 3, device=self.device))
+            else:
+                task_values.append(torch.randn(self.num_envs, self.num_joints, device=self.device))
+            if task.task_type == "joint":
+                selection = torch.eye(controller.num_dofs, device=self.device)[controller.num_base_dofs :]
+                jacobians.append(selection.expand(self.num_envs, -1, -1))
+            else:
+                dim = 6 if task.task_type == "pose" else 3
+                jacobians.append(torch.randn(self.num_envs, dim, controller.num_dofs, device=self.device))
+        return task_values, jacobians
+
+    def test_task_errors(self):
+        """Test that the task errors after a command are the relative commands."""
+        controller = controllers.WBCController(self.cfg, self.num_envs, self.num_joints, self.device)
+        task_values, jacobians = self._random_tasks(controller)
+        command = 0.1 * torch.randn(self.num_envs, controller.action_dim, device=self.device)
+        controller.set_command(command, task_values)
+        controller.compute(task_values, jacobians, task_values[-1])
+        for task, task_slice in zip(self.cfg.tasks, controller.task_slices):
+            with self.subTest(task=task.name):
+                torch.testing.assert_close(controller.task_errors[task.name], command[:, task_slice], atol=1e-4, rtol=0)
+
+    def test_matches_reference(self):
+        """Test that the joint targets match the explicit pseudo-inverses, with and without a floating base."""
+        for floating_base in (False, True):
+            with self.subTest(floating_base=floating_base):
+                controller = controllers.WBCController(
+                    self.cfg, self.num_envs, self.num_joints, self.device, floating_base=floating_base
+                )
+                task_values, jacobians = self._random_tasks(controller)
+                joint_pos = torch.randn(self.num_envs, self.num_joints, device=self.device)
+                command = 0.1 * torch.randn(self.num_envs, controller.action_dim, device=self.device)
+                controller.set_command(command, task_values)
+                # the joint tasks are passed as None, i.e. with the joint selection of the controller
+                jacobians_in = [None if task.task_type == "joint" else J for task, J in zip(self.cfg.tasks, jacobians)]
+                joint_pos_des = controller.compute(task_values, jacobians_in, joint_pos)
+                errors = [controller.task_errors[task.name] for task in self.cfg.tasks]
+                expected = reference_wbc_displacement(self.cfg, errors, jacobians)[:, controller.num_base_dofs :]
+                torch.testing.assert_close((joint_pos_des - joint_pos).double(), expected, rtol=1e-3, atol=1e-4)
+
+    def test_priority(self):
+        """Test that the highest-priority task is tracked up to the damping, whatever the lower-priority tasks."""
+        controller = controllers.WBCController(self.cfg, self.num_envs, self.num_joints, self.device)
+        task_values, jacobians = self._random_tasks(controller)
+        joint_pos = torch.randn(self.num_envs, self.num_joints, device=self.device)
+        command = 0.1 * torch.randn(self.num_envs, controller.action_dim, device=self.device)
+        controller.set_command(command, task_values)
+        delta_joint_pos = controller.compute(task_values, jacobians, joint_pos) - joint_pos
+        achieved = torch.bmm(jacobians[0], delta_joint_pos.unsqueeze(-1)).squeeze(-1)
+        torch.testing.assert_close(achieved, controller.task_errors[self.cfg.tasks[0].name], rtol=1e-2, atol=1e-3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""Tests of the batched rigid-body dynamics against the Lagrangian of the kinematic tree.
+
+They run without launching the simulator.
+"""
+
+from __future__ import annotations
+
+import os
+import torch
+import unittest
+
+from robot_descriptions import BRANCHED_URDF, ROBOT_URDFS, urdf_file
+from standalone import load_module
+
+dynamics = load_module("tasks/locomotion/mdp/dynamics.py")
+
+
+def jacobian_mass_matrix(model, joint_pos: torch.Tensor) -> torch.Tensor:
+    """Mass matrix from the kinetic energies of the links: sum of m J_c^T J_c + J_w^T R I R^T J_w."""
+    link_pos, link_rot = model.forward_kinematics(joint_pos)
+    jacobians = model.frame_jacobians(joint_pos, list(range(model.num_links)), link_pos, link_rot)
+    jacobian_lin, jacobian_ang = jacobians[:, :, 0:3], jacobians[:, :, 3:6]
+    # shift the linear rows to the centers of mass: v_c = v + w x r
+    offsets = (link_rot @ model._coms.unsqueeze(-1)).expand_as(jacobian_ang)
+    jacobian_com = jacobian_lin + torch.cross(jacobian_ang, offsets, dim=2)
+    inertias = link_rot @ model._inertias @ link_rot.transpose(-1, -2)
+    masses = model._masses.view(1, -1, 1, 1)
+    mass_matrix = masses * jacobian_com.transpose(-1, -2) @ jacobian_com
+    mass_matrix = mass_matrix + jacobian_ang.transpose(-1, -2) @ inertias @ jacobian_ang
+    return mass_matrix.sum(dim=1)
+
+
+def lagrangian_errors(model, eps: float = 1e-5) -> dict[str, float]:
+    """Largest errors of the dynamics against finite differences of the energies and of the center of mass."""
+    q = torch.rand(16, model.num_joints, dtype=torch.float64) * 2.0 - 1.0
+    qd = torch.randn_like(q)
+    qdd = torch.randn_like(q)
+    zero_gravity = torch.zeros(3, dtype=torch.float64)
+    gravity = torch.tensor([0.0, 0.0, -9.81], dtype=torch.float64)
+    eye = torch.eye(model.num_joints, dtype=torch.float64)
+    errors = dict()
+
+    # -- gravity torques are the gradient of the potential energy V = -m g . c
+    def potential(joint_pos):
+        return -model.total_mass * (model.center_of_mass(joint_pos) @ gravity)
+
+    grad = torch.stack([(potential(q + eps * e) - potential(q - eps * e)) / (2 * eps) for e in eye], dim=-1)
+    errors["gravity vs. FD"] = (model.gravity_forces(q) - grad).abs().max()
+    errors["gravity vs. RNEA"] = (model.gravity_forces(q) - model.bias_forces(q, torch.zeros_like(qd))).abs().max()
+
+    # -- mass matrix from the kinetic energies of the links
+    mass_matrix = model.mass_matrix(q)
+    errors["CRBA vs. link energies"] = (mass_matrix - jacobian_mass_matrix(model, q)).abs().max()
+
+    # -- Coriolis torques from the Lagrangian: b = dM/dt qd - 1/2 d(qd^T M qd)/dq
+    def kinetic(joint_pos):
+        return 0.5 * (qd.unsqueeze(1) @ model.mass_matrix(joint_pos) @ qd.unsqueeze(-1)).view(-1)
+
+    mass_matrix_dot = (model.mass_matrix(q + eps * qd) - model.mass_matrix(q - eps * qd)) / (2 * eps)
+    grad = torch.stack([(kinetic(q + eps * e) - kinetic(q - eps * e)) / (2 * eps) for e in eye], dim=-1)
+    coriolis = (mass_matrix_dot @ qd.unsqueeze(-1)).squeeze(-1) - grad
+    errors["coriolis vs. FD"] = (model.bias_forces(q, qd, zero_gravity) - coriolis).abs().max()
+
+    # -- consistency of RNEA and CRBA: tau = M qdd + b
+    tau = (mass_matrix @ qdd.unsqueeze(-1)).squeeze(-1) + model.bias_forces(q, qd)
+    errors["RNEA vs. CRBA"] = (model.inverse_dynamics(q, qd, qdd) - tau).abs().max()
+    errors["mass matrix asymmetry"] = (mass_matrix - mass_matrix.transpose(1, 2)).abs().max()
+
+    # -- linear centroidal momentum is the mass times the velocity of the center of mass
+    com_vel = (model.center_of_mass(q + eps * qd) - model.center_of_mass(q - eps * qd)) / (2 * eps)
+    momentum = (model.centroidal_momentum_matrix(q) @ qd.unsqueeze(-1)).squeeze(-1)
+    errors["linear momentum vs. FD"] = (momentum[:, 0:3] - model.total_mass * com_vel).abs().max()
+    return {name: error.item() for name, error in errors.items()}
+
+
+class TestRigidBodyDynamics(unittest.TestCase):
+    """Test fixture for the rigid-body dynamics."""
+
+    def _assert_lagrangian(self, model):
+        """Asserts the dynamics of a model against its Lagrangian."""
+        for name, error in lagrangian_errors(model).items():
+            with self.subTest(check=name):
+                self.assertLess(error, 1e-6)
+
+    def test_branched_tree(self):
+        """Test the dynamics of a branched tree with rotated inertials against its Lagrangian."""
+        with urdf_file(BRANCHED_URDF) as path:
+            model = dynamics.RigidBodyDynamics.from_urdf(path, dtype=torch.float64)
+        self._assert_lagrangian(model)
+
+    def test_robots(self):
+        """Test the dynamics of the robots of the extension against their Lagrangian."""
+        for name, (path, _) in ROBOT_URDFS.items():
+            with self.subTest(robot=name):
+                if not os.path.isfile(path):
+                    self.skipTest(f"URDF not found at {path}.")
+                self._assert_lagrangian(dynamics.RigidBodyDynamics.from_urdf(path, dtype=torch.float64))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+"""Tests of the vectorized gait scheduler. They run without launching the simulator."""
+
+from __future__ import annotations
+
+import torch
+import unittest
+
+from standalone import load_module
+
+gait = load_module("tasks/locomotion/mdp/gait.py")
+
+
+class TestGaitScheduler(unittest.TestCase):
+    """Test fixture for the gait scheduler."""
+
+    def setUp(self):
+        """Creates the stepping mask of the environments: the first half steps, the second half stands."""
+        self.device = "cuda:0" if torch.cuda.is_available() else "cpu"
+        self.num_envs = 256
+        self.dt = 0.02
+        self.stepping = torch.zeros(self.num_envs, dtype=torch.bool, device=self.device)
+        self.stepping[: self.num_envs // 2] = True
+
+    def test_schedule(self):
+        """Test the state transitions and the duty factor of the contact schedule of the robots."""
+        for cfg in (gait.DracoWalkGaitCfg(), gait.Go1TrotGaitCfg()):
+            with self.subTest(gait=cfg.__class__.__name__):
+                scheduler = gait.GaitScheduler(cfg, self.num_envs, self.device)
+                # stand up
+                self.assertTrue((scheduler.state == gait.GAIT_STAND_UP).all())
+                for _ in range(round(cfg.stand_up_duration / self.dt) + 2):
+                    scheduler.update(self.dt, self.stepping)
+                # step in half of the environments for an integer number of cycles
+                contact_steps = torch.zeros(self.num_envs, scheduler.num_legs, device=self.device)
+                num_steps = round(10 * cfg.period / self.dt)
+                for _ in range(num_steps):
+                    scheduler.update(self.dt, self.stepping)
+                    contact_steps += scheduler.contact
+                self.assertTrue((scheduler.state[self.stepping] == gait.GAIT_SWING).all())
+                self.assertTrue((scheduler.state[~self.stepping] == gait.GAIT_STANCE).all())
+                self.assertTrue(scheduler.contact[~self.stepping].all())
+                # the contact ratio of each leg is the duty factor, up to the quantization of the phase
+                duty = contact_steps[self.stepping] / num_steps
+                self.assertLessEqual((duty - cfg.duty_factor).abs().max().item(), self.dt / cfg.period + 1e-6)
+                # stop stepping: all environments return to stance within a cycle
+                for _ in range(round(cfg.period / self.dt) + 1):
+                    scheduler.update(self.dt, torch.zeros_like(self.stepping))
+                self.assertTrue((scheduler.state == gait.GAIT_STANCE).all())
+                self.assertTrue(scheduler.contact.all())
+
+    def test_invalid_duty_factor(self):
+        """Test that a duty factor outside (0, 1) is rejected."""
+        with self.assertRaises(ValueError):
+            cfg = gait.GaitSchedulerCfg(phase_offsets=[0.0, 0.5], duty_factor=1.0)
+            gait.GaitScheduler(cfg, self.num_envs, self.device)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""Tests of the pure-torch URDF kinematics against closed forms and finite differences.
+
+They run without launching the simulator.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import torch
+import unittest
+
+from robot_descriptions import BRANCHED_URDF, PLANAR_ARM_URDF, ROBOT_URDFS, urdf_file
+from standalone import load_module
+
+kinematics = load_module("tasks/locomotion/mdp/kinematics.py")
+
+
+def finite_difference_errors(tree, frame_ids: list[int], eps: float = 1e-5) -> tuple[float, float]:
+    """Largest errors of the Jacobians and their time-derivatives against central finite differences."""
+    q = torch.rand(16, tree.num_joints, dtype=torch.float64) * 2.0 - 1.0
+    qd = torch.randn_like(q)
+    next_pos, next_rot = tree.forward_kinematics(q + eps * qd)
+    prev_pos, prev_rot = tree.forward_kinematics(q - eps * qd)
+    _, link_rot = tree.forward_kinematics(q)
+    # velocities from finite differences: v = dp/dt, [w]x = dR/dt R^T
+    lin_vel = (next_pos[:, frame_ids] - prev_pos[:, frame_ids]) / (2 * eps)
+    skew = (next_rot[:, frame_ids] - prev_rot[:, frame_ids]) @ link_rot[:, frame_ids].transpose(-1, -2) / (2 * eps)
+    ang_vel = torch.stack((skew[..., 2, 1], skew[..., 0, 2], skew[..., 1, 0]), dim=-1)
+    jacobians = tree.frame_jacobians(q, frame_ids)
+    vel = (jacobians @ qd[:, None, :, None]).squeeze(-1)
+    jac_error = (vel - torch.cat((lin_vel, ang_vel), dim=-1)).abs().max().item()
+    # jacobian derivative from finite differences
+    next_jacobians = tree.frame_jacobians(q + eps * qd, frame_ids)
+    jac_dot = (next_jacobians - tree.frame_jacobians(q - eps * qd, frame_ids)) / (2 * eps)
+    jac_dot_error = (tree.frame_jacobian_derivatives(q, qd, frame_ids) - jac_dot).abs().max().item()
+    return jac_error, jac_dot_error
+
+
+class TestKinematicTree(unittest.TestCase):
+    """Test fixture for the kinematic tree."""
+
+    def test_planar_arm(self):
+        """Test the forward kinematics and the Jacobian of a planar arm against their closed forms."""
+        with urdf_file(PLANAR_ARM_URDF) as path:
+            tree = kinematics.KinematicTree.from_urdf(path, dtype=torch.float64)
+        tip = tree.find_links("tip")
+        q = torch.rand(128, 3, dtype=torch.float64) * 2.0 - 1.0
+        q1, q12, reach = q[:, 0], q[:, 0] + q[:, 1], 0.4 + q[:, 2]
+        # closed form
+        pos = torch.stack((0.5 * q1.cos() + reach * q12.cos(), 0.5 * q1.sin() + reach * q12.sin(), 0.0 * q1), 1)
+        jac = torch.zeros(128, 6, 3, dtype=torch.float64)
+        jac[:, 0, 0], jac[:, 1, 0] = -pos[:, 1], pos[:, 0]
+        jac[:, 0, 1], jac[:, 1, 1] = -reach * q12.sin(), reach * q12.cos()
+        jac[:, 0, 2], jac[:, 1, 2] = q12.cos(), q12.sin()
+        jac[:, 5, 0:2] = 1.0
+        # computed
+        link_pos, link_rot = tree.forward_kinematics(q)
+        yaw = torch.atan2(link_rot[:, tip[0], 1, 0], link_rot[:, tip[0], 0, 0])
+        yaw_error = torch.remainder(yaw - q12 - math.pi / 2 + math.pi, 2 * math.pi) - math.pi
+        torch.testing.assert_close(link_pos[:, tip[0]], pos, rtol=0.0, atol=1e-12)
+        torch.testing.assert_close(yaw_error, torch.zeros_like(yaw_error), rtol=0.0, atol=1e-12)
+        torch.testing.assert_close(tree.frame_jacobians(q, tip)[:, 0], jac, rtol=0.0, atol=1e-12)
+
+    def test_finite_differences(self):
+        """Test the Jacobians and their time-derivatives of a branched tree against finite differences."""
+        with urdf_file(BRANCHED_URDF) as path:
+            tree = kinematics.KinematicTree.from_urdf(path, dtype=torch.float64)
+        jac_error, jac_dot_error = finite_difference_errors(tree, list(range(tree.num_links)))
+        self.assertLess(jac_error, 1e-6)
+        self.assertLess(jac_dot_error, 1e-6)
+
+    def test_robots(self):
+        """Test the Jacobians of the robots of the extension against finite differences."""
+        for name, (path, frames) in ROBOT_URDFS.items():
+            with self.subTest(robot=name):
+                if not os.path.isfile(path):
+                    self.skipTest(f"URDF not found at {path}.")
+                tree = kinematics.KinematicTree.from_urdf(path, dtype=torch.float64)
+                frame_ids = tree.find_links(frames)
+                self.assertGreater(len(frame_ids), 0)
+                jac_error, jac_dot_error = finite_difference_errors(tree, frame_ids)
+                self.assertLess(jac_error, 1e-6)
+                self.assertLess(jac_dot_error, 1e-6)
+
+    def test_requested_frames(self):
+        """Test that the Jacobians of requested frames match the Jacobians of all links gathered."""
+        with urdf_file(BRANCHED_URDF) as path:
+            tree = kinematics.KinematicTree.from_urdf(path)
+        frame_ids = tree.find_links(["foot", "slider"])
+        q = torch.rand(64, tree.num_joints) * 2.0 - 1.0
+        expected = tree.frame_jacobians(q, list(range(tree.num_links)))[:, frame_ids]
+        torch.testing.assert_close(tree.frame_jacobians(q, frame_ids), expected)
+
+    def test_single_precision(self):
+        """Test that the single-precision kinematics match the double-precision kinematics."""
+        with urdf_file(BRANCHED_URDF) as path:
+            tree = kinematics.KinematicTree.from_urdf(path)
+            tree_double = kinematics.KinematicTree.from_urdf(path, dtype=torch.float64)
+        q = torch.rand(64, tree.num_joints, dtype=torch.float64) * 2.0 - 1.0
+        frame_ids = list(range(tree.num_links))
+        expected = tree_double.frame_jacobians(q, frame_ids)
+        torch.testing.assert_close(tree.frame_jacobians(q.float(), frame_ids).double(), expected, rtol=0, atol=1e-5)
+        expected = tree_double.center_of_mass(q)
+        torch.testing.assert_close(tree.center_of_mass(q.float()).double(), expected, rtol=0, atol=1e-5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+"""Tests of the fused navigation rewards against the separate reward terms.
+
+The separate terms read the environment, so their expressions are evaluated here on the same tensors. They run
+without launching the simulator.
+"""
+
+from __future__ import annotations
+
+import torch
+import unittest
+
+from standalone import load_module
+
+reward_kernels = load_module("tasks/navigation/mdp/reward_kernels.py")
+
+TOLERANCE = 1e-6
+"""Tolerance on the differences with the separate terms."""
+
+
+def position_goal_reached_bonus(command: torch.Tensor, threshold: float, bonus: float) -> torch.Tensor:
+    """Expression of :func:`position_goal_reached_bonus`."""
+    goal_pose_body = command[:, :2]
+    return torch.where(torch.linalg.norm(goal_pose_body, dim=-1) < threshold, bonus, 0.0)
+
+
+def pose_tracking_exp_l1(command: torch.Tensor, std: float) -> torch.Tensor:
+    """Expression of :func:`pose_tracking_exp_l1`."""
+    goal_pose_b = command[:, :2]
+    return torch.exp(-torch.sum(goal_pose_b.abs(), dim=-1) / std**2)
+
+
+def heading_tracking_exp_l1(command: torch.Tensor, std: float) -> torch.Tensor:
+    """Expression of :func:`heading_tracking_exp_l1`."""
+    goal_heading_b = command[:, 2]
+    return torch.exp(-goal_heading_b.abs() / std**2)
+
+
+def joint_velocity_limit(joint_vel: torch.Tensor, joint_ids: list[int], threshold: float) -> torch.Tensor:
+    """Expression of :func:`joint_velocity_limit`."""
+    speed = joint_vel[:, joint_ids].abs()
+    velocity_penalty = torch.where(speed > threshold, speed - threshold, 0)
+    return torch.sum(torch.square(velocity_penalty), dim=1)
+
+
+class TestNavigationRewards(unittest.TestCase):
+    """Test fixture for the fused navigation rewards."""
+
+    def setUp(self):
+        """Samples random commands around the goal threshold and random joint velocities around the limits."""
+        self.device = "cuda:0" if torch.cuda.is_available() else "cpu"
+        self.num_envs, self.num_joints = 4096, 7
+        self.command = torch.randn(self.num_envs, 3, device=self.device)
+        self.joint_vel = 2.0 * torch.randn(self.num_envs, self.num_joints, device=self.device)
+        self.goal_threshold, self.goal_bonus = 0.5, 2.0
+        self.pose_std, self.heading_std = 0.8, 1.5
+
+    def fused(self, penalties: dict[str, tuple[list[int], float]], joint_ids: slice | None = None) -> torch.Tensor:
+        """Computes the fused components with joint velocity penalties on the given joints and thresholds."""
+        ids, thresholds, penalty_ids = list(), list(), list()
+        for penalty_id, (joints, threshold) in enumerate(penalties.values()):
+            ids += joints
+            thresholds += [threshold] * len(joints)
+            penalty_ids += [penalty_id] * len(joints)
+        joint_penalties = torch.zeros(len(ids), len(penalties), device=self.device)
+        joint_penalties[torch.arange(len(ids)), torch.tensor(penalty_ids, dtype=torch.long)] = 1.0
+        return reward_kernels._navigation_rewards(
+            self.command,
+            self.joint_vel,
+            torch.tensor(ids, dtype=torch.long, device=self.device) if joint_ids is None else joint_ids,
+            torch.tensor(thresholds, device=self.device),
+            joint_penalties,
+            self.goal_threshold,
+            self.goal_bonus,
+            self.pose_std**2,
+            self.heading_std**2,
+        )
+
+    def assertComponentClose(self, actual: torch.Tensor, expected: torch.Tensor):
+        """Asserts that a fused component matches the value of its separate term."""
+        self.assertEqual(actual.shape, expected.shape)
+        self.assertLess((actual - expected.float()).abs().max().item(), TOLERANCE)
+
+    def test_command_tracking(self):
+        """Test the goal bonus and the tracking components against the separate terms."""
+        values = self.fused(dict())
+        self.assertEqual(values.shape, (self.num_envs, 3))
+        goal_reached = position_goal_reached_bonus(self.command, self.goal_threshold, self.goal_bonus)
+        self.assertComponentClose(values[:, 0], goal_reached)
+        self.assertComponentClose(values[:, 1], pose_tracking_exp_l1(self.command, self.pose_std))
+        self.assertComponentClose(values[:, 2], heading_tracking_exp_l1(self.command, self.heading_std))
+        # both cases of the goal bonus are covered
+        self.assertTrue((values[:, 0] == self.goal_bonus).any() and (values[:, 0] == 0.0).any())
+
+    def test_joint_velocity_limits(self):
+        """Test the joint velocity penalties, on overlapping joint sets, against the separate terms."""
+        penalties = {"arm": ([0, 1, 2, 3], 1.0), "wrist": ([3, 4], 2.5), "base": ([5, 6, 0], 0.5)}
+        values = self.fused(penalties)
+        self.assertEqual(values.shape, (self.num_envs, 3 + len(penalties)))
+        for index, (joint_ids, threshold) in enumerate(penalties.values()):
+            expected = joint_velocity_limit(self.joint_vel, joint_ids, threshold)
+            self.assertComponentClose(values[:, 3 + index], expected)
+
+    def test_all_joints(self):
+        """Test a penalty on all the joints, selected with a slice as for the joint names ".*"."""
+        penalties = {"all": (list(range(self.num_joints)), 1.0)}
+        values = self.fused(penalties, joint_ids=slice(None))
+        expected = joint_velocity_limit(self.joint_vel, list(range(self.num_joints)), 1.0)
+        self.assertComponentClose(values[:, 3], expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
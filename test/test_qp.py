@@ -0,0 +1,113 @@
+"""Tests of the batched QP solver against a reference solver. They run without launching the simulator."""
+
+from __future__ import annotations
+
+import importlib.util
+import torch
+import unittest
+
+from standalone import load_module
+
+qp = load_module("tasks/locomotion/mdp/qp.py")
+
+OBJECTIVE_TOLERANCE = 1e-3
+"""Tolerance on the relative gap between the objective of the solver and of the reference solver."""
+
+CONSTRAINT_TOLERANCE = 1e-3
+"""Tolerance on the violation of the constraints by the solutions of the solver."""
+
+
+def random_feasible_problems(num_problems: int, num_vars: int, num_constraints: int, device: str):
+    """Samples random strictly convex QPs whose constraints are feasible by construction."""
+    M = torch.randn(num_problems, num_vars, num_vars, device=device)
+    P = M @ M.transpose(1, 2) / num_vars + 0.1 * torch.eye(num_vars, device=device)
+    q = torch.randn(num_problems, num_vars, device=device)
+    A = torch.randn(num_problems, num_constraints, num_vars, device=device)
+    # the bounds contain a random (feasible) point
+    Ax0 = torch.bmm(A, torch.randn(num_problems, num_vars, 1, device=device)).squeeze(-1)
+    l = Ax0 - torch.rand(num_problems, num_constraints, device=device)
+    u = Ax0 + torch.rand(num_problems, num_constraints, device=device)
+    return P, q, A, l, u
+
+
+def reference_solution(P, q, A, l, u) -> torch.Tensor:
+    """Solves the problems one by one with SciPy's SLSQP (reference solver)."""
+    import numpy as np
+    from scipy.optimize import minimize
+
+    solutions = list()
+    for P_i, q_i, A_i, l_i, u_i in zip(*(t.double().cpu().numpy() for t in (P, q, A, l, u))):
+        result = minimize(
+            lambda x: 0.5 * x @ P_i @ x + q_i @ x,
+            np.zeros(q_i.shape[0]),
+            jac=lambda x: P_i @ x + q_i,
+            constraints=[
+                {"type": "ineq", "fun": lambda x: A_i @ x - l_i, "jac": lambda x: A_i},
+                {"type": "ineq", "fun": lambda x: u_i - A_i @ x, "jac": lambda x: -A_i},
+            ],
+            method="SLSQP",
+            options={"ftol": 1e-12, "maxiter": 500},
+        )
+        solutions.append(torch.from_numpy(result.x))
+    return torch.stack(solutions)
+
+
+def objective(P, q, x) -> torch.Tensor:
+    """Objective of the problems at the points. Shape is (num_problems,)."""
+    return 0.5 * torch.einsum("bi,bij,bj->b", x, P, x) + (q * x).sum(dim=-1)
+
+
+def constraint_violation(A, l, u, x) -> torch.Tensor:
+    """Largest violation of the constraints of the problems at the points. Shape is (num_problems,)."""
+    Ax = torch.bmm(A, x.unsqueeze(-1)).squeeze(-1)
+    return torch.maximum(l - Ax, Ax - u).clamp_min(0.0).amax(dim=-1)
+
+
+class TestBatchedQPSolver(unittest.TestCase):
+    """Test fixture for the batched QP solver."""
+
+    def setUp(self):
+        """Samples the problems."""
+        torch.manual_seed(0)
+        self.device = "cuda:0" if torch.cuda.is_available() else "cpu"
+        self.num_problems, self.num_vars, self.num_constraints = 32, 12, 20
+        self.problem = random_feasible_problems(self.num_problems, self.num_vars, self.num_constraints, self.device)
+
+    def _solve(self, problem, **kwargs) -> torch.Tensor:
+        """Solves the problems with a cold-started solver of the given configuration."""
+        cfg = qp.BatchedQPSolverCfg(warm_start=False, **kwargs)
+        solver = qp.BatchedQPSolver(cfg, problem[0].shape[0], self.num_vars, self.num_constraints, self.device)
+        return solver.solve(*problem)
+
+    def test_constraint_violation(self):
+        """Test that the solutions satisfy the constraints."""
+        P, q, A, l, u = self.problem
+        x = self._solve(self.problem, num_iterations=1000)
+        violation = constraint_violation(A, l, u, x).max().item()
+        self.assertLess(violation, CONSTRAINT_TOLERANCE)
+
+    @unittest.skipIf(importlib.util.find_spec("scipy") is None, "The reference solver requires SciPy.")
+    def test_objective_gap(self):
+        """Test that the objective of the solutions matches the one of the reference solver."""
+        P, q, A, l, u = self.problem
+        x = self._solve(self.problem, num_iterations=1000)
+        x_ref = reference_solution(*self.problem).float().to(self.device)
+        f, f_ref = objective(P, q, x), objective(P, q, x_ref)
+        gap = ((f - f_ref).abs() / f_ref.abs().clamp_min(1.0)).max().item()
+        self.assertLess(gap, OBJECTIVE_TOLERANCE)
+        self.assertLess(constraint_violation(A, l, u, x_ref).max().item(), CONSTRAINT_TOLERANCE)
+
+    def test_failed_factorization(self):
+        """Test that the problems with a singular linear system are regularized without affecting the others."""
+        P, q, A, l, u = (t.clone() for t in self.problem)
+        # without regularization, a zero cost and zero constraints on the last variable make the system singular
+        cfg = {"num_iterations": 100, "sigma": 0.0}
+        P[0, -1, :], P[0, :, -1], q[0, -1], A[0, :, -1] = 0.0, 0.0, 0.0, 0.0
+        x = self._solve((P, q, A, l, u), **cfg)
+        x_alone = self._solve(tuple(t[1:] for t in (P, q, A, l, u)), **cfg)
+        self.assertTrue(torch.isfinite(x).all())
+        torch.testing.assert_close(x[1:], x_alone)
+
+
+if __name__ == "__main__":
+    unittest.main()
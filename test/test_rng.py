@@ -0,0 +1,71 @@
+"""Tests of the counter-based random streams of the environments. They run without launching the simulator."""
+
+from __future__ import annotations
+
+import torch
+import unittest
+
+from standalone import load_module
+
+rng = load_module("tasks/utils/rng.py")
+
+
+class TestRandomStream(unittest.TestCase):
+    """Test fixture for the random streams."""
+
+    def setUp(self):
+        """Creates two streams with the same key."""
+        self.device = "cuda:0" if torch.cuda.is_available() else "cpu"
+        self.num_envs = 1024
+        self.stream = rng.RandomStream(1234, self.num_envs, self.device)
+        self.other = rng.RandomStream(1234, self.num_envs, self.device)
+
+    def test_batch_invariance(self):
+        """Test that the numbers of an environment do not depend on the other environments of the batch."""
+        reference = self.stream.uniform(None, (8,))
+        # the same environments drawn in shuffled halves
+        permutation = torch.randperm(self.num_envs, device=self.device)
+        first, second = permutation[: self.num_envs // 2], permutation[self.num_envs // 2 :]
+        shuffled = torch.empty_like(reference)
+        shuffled[second] = self.other.uniform(second, (8,))
+        shuffled[first] = self.other.uniform(first, (8,))
+        torch.testing.assert_close(shuffled, reference, rtol=0.0, atol=0.0)
+        torch.testing.assert_close(self.other.counters, self.stream.counters, rtol=0.0, atol=0.0)
+
+    def test_counters(self):
+        """Test that the counters advance the numbers of the drawn environments only."""
+        env_ids = torch.arange(0, self.num_envs, 2, device=self.device)
+        reference = self.stream.uniform(None, (8,))
+        self.other.uniform(env_ids, (8,))
+        numbers = self.other.uniform(None, (8,))
+        self.assertTrue((numbers[env_ids] != reference[env_ids]).any(dim=-1).all())
+        torch.testing.assert_close(numbers[env_ids + 1], reference[env_ids + 1], rtol=0.0, atol=0.0)
+
+    def test_keys(self):
+        """Test that streams with different keys draw different numbers."""
+        numbers = rng.RandomStream(4321, self.num_envs, self.device).uniform(None, (8,))
+        self.assertGreater((numbers != self.stream.uniform(None, (8,))).float().mean().item(), 0.99)
+
+    def test_uniform(self):
+        """Test the range, the mean and the variance of the uniform numbers."""
+        numbers = self.stream.uniform(None, (1024,))
+        self.assertGreaterEqual(numbers.min().item(), 0.0)
+        self.assertLess(numbers.max().item(), 1.0)
+        self.assertAlmostEqual(numbers.mean().item(), 0.5, delta=1e-2)
+        self.assertAlmostEqual(numbers.var().item(), 1.0 / 12.0, delta=1e-2)
+        # bounds
+        numbers = self.stream.uniform(None, (1024,), low=-2.0, high=3.0)
+        self.assertGreaterEqual(numbers.min().item(), -2.0)
+        self.assertLess(numbers.max().item(), 3.0)
+
+    def test_randint(self):
+        """Test the range and the counts of the uniform integers."""
+        numbers = self.stream.randint(None, (1024,), 10)
+        self.assertGreaterEqual(numbers.min().item(), 0)
+        self.assertLess(numbers.max().item(), 10)
+        counts = torch.bincount(numbers.flatten(), minlength=10).float()
+        self.assertLess((counts.std() / counts.mean()).item(), 1e-2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""Tests of the planar (SE(2)) kernels against the generic math utilities.
+
+They run without launching the simulator.
+"""
+
+from __future__ import annotations
+
+import math
+import torch
+import unittest
+
+from omni.isaac.lab.utils.math import (
+    euler_xyz_from_quat,
+    quat_apply_yaw,
+    quat_from_euler_xyz,
+    quat_rotate_inverse,
+    wrap_to_pi,
+    yaw_quat,
+)
+
+from standalone import load_module
+
+se2 = load_module("tasks/navigation/mdp/se2.py")
+
+TOLERANCE = 1e-4
+"""Tolerance on the differences with the generic utilities."""
+
+
+class TestPlanarKernels(unittest.TestCase):
+    """Test fixture for the planar kernels."""
+
+    def setUp(self):
+        """Samples random poses with small roll and pitch, as for mobile bases, and random targets."""
+        self.device = "cuda:0" if torch.cuda.is_available() else "cpu"
+        batch_size = 4096
+        roll_pitch = 0.2 * torch.randn(2, batch_size, device=self.device)
+        yaw = (2.0 * torch.rand(batch_size, device=self.device) - 1.0) * math.pi
+        self.quat = quat_from_euler_xyz(roll_pitch[0], roll_pitch[1], yaw)
+        self.angle = 20.0 * torch.randn(batch_size, device=self.device)
+        self.pos = torch.randn(batch_size, 3, device=self.device)
+        self.target_pos = torch.randn(batch_size, 3, device=self.device)
+        self.target_yaw = (2.0 * torch.rand(batch_size, device=self.device) - 1.0) * math.pi
+        self.vec = torch.randn(batch_size, 3, device=self.device)
+
+    def assertAnglesClose(self, actual: torch.Tensor, expected: torch.Tensor):
+        """Asserts that angles are close on the circle."""
+        self.assertLess(wrap_to_pi(actual - expected).abs().max().item(), TOLERANCE)
+
+    def test_wrap_angle(self):
+        """Test the angle wrapping against the generic utility."""
+        wrapped = se2.wrap_angle(self.angle)
+        self.assertTrue(((wrapped >= -math.pi) & (wrapped <= math.pi)).all())
+        self.assertAnglesClose(wrapped, wrap_to_pi(self.angle))
+        self.assertAnglesClose(wrapped, self.angle)
+
+    def test_yaw_from_quat(self):
+        """Test the yaw and the heading of quaternions against the Euler angle conversion."""
+        yaw = euler_xyz_from_quat(self.quat)[2]
+        self.assertAnglesClose(se2.yaw_from_quat(self.quat), yaw)
+        cos_yaw, sin_yaw = se2.heading_from_quat(self.quat)
+        torch.testing.assert_close(cos_yaw, torch.cos(yaw), atol=TOLERANCE, rtol=0.0)
+        torch.testing.assert_close(sin_yaw, torch.sin(yaw), atol=TOLERANCE, rtol=0.0)
+
+    def test_quat_from_yaw(self):
+        """Test the yaw rotations against the Euler angle conversion, up to the sign of the quaternions."""
+        zeros = torch.zeros_like(self.target_yaw)
+        expected = quat_from_euler_xyz(zeros, zeros, self.target_yaw)
+        quat = se2.quat_from_yaw(self.target_yaw)
+        # note: q and -q are the same rotation
+        error = torch.minimum((quat - expected).abs().amax(-1), (quat + expected).abs().amax(-1))
+        self.assertLess(error.max().item(), TOLERANCE)
+
+    def test_planar_rotate(self):
+        """Test the planar rotations against the yaw rotations of the generic utilities."""
+        cos_yaw, sin_yaw = se2.heading_from_quat(self.quat)
+        torch.testing.assert_close(
+            se2.planar_rotate(self.vec[:, :2], cos_yaw, sin_yaw),
+            quat_apply_yaw(self.quat, self.vec)[:, :2],
+            atol=TOLERANCE,
+            rtol=0.0,
+        )
+        torch.testing.assert_close(
+            se2.planar_rotate_inverse(self.vec[:, :2], cos_yaw, sin_yaw),
+            quat_rotate_inverse(yaw_quat(self.quat), self.vec)[:, :2],
+            atol=TOLERANCE,
+            rtol=0.0,
+        )
+
+    def test_relative_pose_2d(self):
+        """Test the target poses in the yaw frames of the bodies against the generic 3D utilities."""
+        target_vec = self.target_pos - self.pos
+        target_vec[:, 2] = 0.0
+        expected_pos = quat_rotate_inverse(yaw_quat(self.quat), target_vec)[:, :2]
+        expected_yaw = wrap_to_pi(self.target_yaw - euler_xyz_from_quat(self.quat)[2])
+        pos_b, yaw_b = se2.relative_pose_2d(self.pos, self.quat, self.target_pos, self.target_yaw)
+        torch.testing.assert_close(pos_b, expected_pos, atol=TOLERANCE, rtol=0.0)
+        self.assertAnglesClose(yaw_b, expected_yaw)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+"""Tests of the batched swing-foot trajectories. They run without launching the simulator."""
+
+from __future__ import annotations
+
+import torch
+import unittest
+
+from standalone import load_module
+
+swing = load_module("tasks/locomotion/mdp/swing.py")
+
+
+class TestSwingTrajectory(unittest.TestCase):
+    """Test fixture for the swing-foot trajectories."""
+
+    def setUp(self):
+        """Creates random swings."""
+        self.device = "cuda:0" if torch.cuda.is_available() else "cpu"
+        self.num_envs, self.num_feet = 256, 4
+        self.cfg = swing.SwingTrajectoryCfg(apex_height=0.1)
+        self.trajectory = swing.SwingTrajectory(self.cfg, self.num_envs, self.num_feet, self.device)
+        self.liftoff = torch.randn(self.num_envs, self.num_feet, 3, device=self.device) * 0.1
+        self.touchdown = self.liftoff + torch.randn(self.num_envs, self.num_feet, 3, device=self.device) * 0.1
+        self.duration = torch.empty(self.num_envs, self.num_feet, device=self.device).uniform_(0.2, 0.5)
+
+    def _phase(self, value: float) -> torch.Tensor:
+        """Returns the same normalized swing time for all feet."""
+        return torch.full((self.num_envs, self.num_feet), value, device=self.device)
+
+    def test_mask(self):
+        """Test that only the masked feet start a swing."""
+        mask = torch.rand(self.num_envs, self.num_feet, device=self.device) > 0.5
+        self.trajectory.start(self.liftoff, self.touchdown, self.duration, mask)
+        self.assertTrue((self.trajectory.coefficients[~mask] == 0.0).all())
+        self.assertTrue((self.trajectory.duration[~mask] == 1.0).all())
+        self.assertTrue((self.trajectory.duration[mask] == self.duration[mask]).all())
+
+    def test_boundary_conditions(self):
+        """Test the endpoints, the zero end velocities and the apex at mid-swing."""
+        self.trajectory.start(self.liftoff, self.touchdown, self.duration, torch.ones_like(self.duration).bool())
+        pos_0, vel_0 = self.trajectory.evaluate(self._phase(0.0))
+        pos_1, vel_1 = self.trajectory.evaluate(self._phase(1.0))
+        torch.testing.assert_close(pos_0, self.liftoff)
+        torch.testing.assert_close(pos_1, self.touchdown)
+        torch.testing.assert_close(vel_0, torch.zeros_like(vel_0))
+        torch.testing.assert_close(vel_1, torch.zeros_like(vel_1))
+        # -- apex height and horizontal midpoint at mid-swing
+        pos_half, _ = self.trajectory.evaluate(self._phase(0.5))
+        apex = torch.maximum(self.liftoff[..., 2], self.touchdown[..., 2]) + self.cfg.apex_height
+        torch.testing.assert_close(pos_half[..., 2], apex)
+        torch.testing.assert_close(pos_half[..., :2], 0.5 * (self.liftoff + self.touchdown)[..., :2])
+        # -- the phase is clamped to the swing
+        pos_after, vel_after = self.trajectory.evaluate(self._phase(1.5))
+        torch.testing.assert_close(pos_after, pos_1)
+        torch.testing.assert_close(vel_after, vel_1)
+
+    def test_velocity(self):
+        """Test the velocities against central finite differences in time, with durations shared by the feet."""
+        duration = self.duration[:, 0]
+        self.trajectory.start(self.liftoff, self.touchdown, duration, torch.ones_like(self.duration).bool())
+        phase = torch.rand(self.num_envs, self.num_feet, device=self.device) * 0.98 + 0.01
+        eps = 1e-3
+        pos_plus, _ = self.trajectory.evaluate(phase + eps)
+        pos_minus, _ = self.trajectory.evaluate(phase - eps)
+        _, vel = self.trajectory.evaluate(phase)
+        vel_fd = (pos_plus - pos_minus) / (2.0 * eps * duration.view(-1, 1, 1))
+        error = ((vel - vel_fd).abs() / vel_fd.abs().clamp_min(1.0)).max().item()
+        self.assertLess(error, 1e-2)
+
+
+if __name__ == "__main__":
+    unittest.main()